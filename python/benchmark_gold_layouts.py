@@ -0,0 +1,207 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- 1. CONFIGURATION ---
+
+# Requêtes types du cube (agrégations par saison, équipe, nation) et accès par clé de dimension.
+# Paramètres : :season (dernier Time_SK), :team (équipe la plus fréquente à l'extérieur),
+# :date_from / :date_to (30 derniers jours de matchs, clés Date_SK)
+BENCH_QUERIES = {
+    'points_par_saison': (
+        "SELECT t.Season_BK, SUM(f.Points), AVG(f.GoalsFor), MAX(f.Season_Attendance) "
+        "FROM gold.FactTeamPerformance f JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "GROUP BY t.Season_BK", []),
+    'buts_par_saison': (
+        "SELECT t.Season_BK, COUNT(*), SUM(f.FullTimeHomeGoals), SUM(f.FullTimeAwayGoals), AVG(f.B365HomeOdds) "
+        "FROM gold.FactMatchEvent f JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "GROUP BY t.Season_BK", []),
+    'bilan_domicile_par_equipe': (
+        "SELECT d.Squad_Conformed_BK, "
+        "SUM(CASE WHEN f.FullTimeResult = 'H' THEN 1 ELSE 0 END), SUM(f.HomeShots), SUM(f.HomeCorners) "
+        "FROM gold.FactMatchEvent f JOIN gold.DimTeam d ON d.Team_SK = f.HomeTeam_SK "
+        "GROUP BY d.Squad_Conformed_BK", []),
+    'saison_courante': (
+        "SELECT f.HomeTeam_SK, SUM(f.FullTimeHomeGoals), SUM(f.HomeShotsOnTarget) "
+        "FROM gold.FactMatchEvent f WHERE f.Time_SK = ? GROUP BY f.HomeTeam_SK", ['season']),
+    'matchs_exterieur_equipe': (
+        "SELECT f.Time_SK, COUNT(*), SUM(f.FullTimeAwayGoals) "
+        "FROM gold.FactMatchEvent f WHERE f.AwayTeam_SK = ? GROUP BY f.Time_SK", ['team']),
+    'matchs_par_mois': (
+        "SELECT d.Year_Month, COUNT(*), SUM(f.FullTimeHomeGoals + f.FullTimeAwayGoals) "
+        "FROM gold.FactMatchEvent f JOIN gold.DimDate d ON d.Date_SK = f.Date_SK "
+        "GROUP BY d.Year_Month", []),
+    'matchs_intervalle_dates': (
+        "SELECT f.HomeTeam_SK, COUNT(*), SUM(f.FullTimeHomeGoals) "
+        "FROM gold.FactMatchEvent f WHERE f.Date_SK BETWEEN ? AND ? GROUP BY f.HomeTeam_SK", ['date_from', 'date_to']),
+    'buts_par_nation': (
+        "SELECT n.Nation_Standard_Name_BK, t.Season_BK, COUNT(*), SUM(f.Goals) "
+        "FROM gold.FactPlayerPerformance f "
+        "JOIN gold.DimPlayer p ON p.Player_SK = f.Player_SK "
+        "JOIN gold.DimNation n ON n.Nation_SK = p.Nation_SK "
+        "JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "GROUP BY n.Nation_Standard_Name_BK, t.Season_BK", []),
+}
+
+# Base de test SQL Server (doit exister) : le benchmark recrée la couche gold dans chaque disposition
+BENCH_DATABASE = os.environ.get('FOOTBALL_DW_BENCH_DATABASE')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare les dispositions physiques de la couche gold (utils.gold_schema) sur les requêtes du cube.")
+    parser.add_argument('--backend', choices=['sqlserver', 'sqlite', 'duckdb'],
+                        help="Moteur cible (par défaut : variable FOOTBALL_DW_BACKEND, sinon sqlserver).")
+    parser.add_argument('--layouts', nargs='+', default=['rowstore', 'indexed', 'columnstore'],
+                        help="Dispositions comparées.")
+    parser.add_argument('--repeat', type=int, default=5, help="Exécutions mesurées par requête (médiane).")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Multiplie les faits (copies des saisons sous de nouvelles clés Time_SK).")
+    return parser.parse_args()
+
+
+# --- 2. DONNÉES DE RÉFÉRENCE ---
+
+def fetch_table(conn, table_name) -> pd.DataFrame:
+    cursor = conn.execute(f"SELECT * FROM {table_name}")
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+
+def read_gold(conn, tables):
+    """Copie en mémoire des tables gold déjà chargées (run_pipeline) dans la base configurée."""
+    frames = {table.name: fetch_table(conn, table.name) for table in tables}
+    if frames['gold.FactMatchEvent'].empty:
+        raise RuntimeError("La couche gold est vide : lancez d'abord run_pipeline.py.")
+    return frames
+
+
+def scale_frames(frames, scale):
+    """Copies de chaque saison (Season_BK suffixé, Time_SK décalé) : volume des faits x scale, mêmes cardinalités."""
+    if scale <= 1:
+        return frames
+    dim_time = frames['gold.DimTime']
+    offset = int(dim_time['Time_SK'].max())
+    scaled = dict(frames)
+    scaled['gold.DimTime'] = pd.concat(
+        [dim_time] + [dim_time.assign(Time_SK=dim_time['Time_SK'] + copy * offset,
+                                      Season_BK=dim_time['Season_BK'] + f'~{copy}')
+                      for copy in range(1, scale)], ignore_index=True)
+    for name in ['gold.FactTeamPerformance', 'gold.FactPlayerPerformance', 'gold.FactMatchEvent']:
+        fact = frames[name]
+        scaled[name] = pd.concat([fact.assign(Time_SK=fact['Time_SK'] + copy * offset) for copy in range(scale)],
+                                 ignore_index=True)
+    return scaled
+
+
+# --- 3. MESURES ---
+
+def open_scratch_connection(backend, layout_name, scratch_dir):
+    """Base de test distincte par disposition (fichier temporaire, ou FOOTBALL_DW_BENCH_DATABASE sous SQL Server)."""
+    from utils import config
+    from utils.db import open_connection
+    if backend == 'sqlserver':
+        if not BENCH_DATABASE:
+            raise RuntimeError("Définissez FOOTBALL_DW_BENCH_DATABASE (base de test existante) pour SQL Server.")
+        config.DATABASE_NAME = BENCH_DATABASE
+    else:
+        extension = 'sqlite' if backend == 'sqlite' else 'duckdb'
+        config.EMBEDDED_DB_PATH = os.path.join(scratch_dir, f"bench_{layout_name}.{extension}")
+    return open_connection(backend=backend)
+
+
+def load_layout(conn, layout, frames, tables):
+    """Crée la couche gold dans la disposition puis la remplit (clés de substitution conservées)."""
+    from utils.db import apply_statements, bulk_insert
+    from utils.gold_schema import ddl_statements
+    apply_statements(conn, ddl_statements(conn.backend, layout))
+
+    start = time.perf_counter()
+    for table in tables:
+        df = frames[table.name]
+        if 'Time_SK' in df.columns and table.kind == 'fact':
+            # Écriture saison par saison, comme utils.fact_partitions
+            df = df.sort_values('Time_SK', kind='stable')
+        identity = conn.backend == 'sqlserver' and any(col.identity for col in table.columns)
+        if identity:
+            conn.execute(f"SET IDENTITY_INSERT {table.name} ON")
+        bulk_insert(conn, table.name, list(df.columns), df)
+        if identity:
+            conn.execute(f"SET IDENTITY_INSERT {table.name} OFF")
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def time_queries(conn, params, repeat):
+    """Médiane (ms) de chaque requête, après une exécution d'échauffement."""
+    timings = {}
+    for name, (sql, param_names) in BENCH_QUERIES.items():
+        values = [params[param] for param in param_names]
+        conn.execute(sql, *values).fetchall()
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, *values).fetchall()
+            durations.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(durations)
+    return timings
+
+
+def main():
+    args = parse_args()
+    if args.backend:
+        os.environ['FOOTBALL_DW_BACKEND'] = args.backend
+    sys.path.append(PYTHON_DIR)
+    from utils import config
+    from utils.db import open_connection
+    from utils.gold_schema import GOLD_TABLES, get_layout
+
+    backend = config.DB_BACKEND
+    layouts = [get_layout(name) for name in args.layouts]
+    tables = [table for table in GOLD_TABLES if table.kind != 'state']
+
+    conn = open_connection(backend=backend)
+    try:
+        frames = scale_frames(read_gold(conn, tables), args.scale)
+    finally:
+        conn.close()
+
+    matches = frames['gold.FactMatchEvent']
+    last_day = pd.to_datetime(str(int(matches['Date_SK'].max())), format='%Y%m%d')
+    params = {'season': int(matches['Time_SK'].max()),
+              'team': int(matches['AwayTeam_SK'].value_counts().idxmax()),
+              'date_from': int((last_day - pd.Timedelta(days=30)).strftime('%Y%m%d')),
+              'date_to': int(last_day.strftime('%Y%m%d'))}
+    print(f"Données : {len(matches)} matchs, {len(frames['gold.FactTeamPerformance'])} bilans d'équipe, "
+          f"{len(frames['gold.FactPlayerPerformance'])} lignes joueurs (x{args.scale}), moteur {backend}.")
+
+    results, load_times = {}, {}
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        for layout in layouts:
+            conn = open_scratch_connection(backend, layout.name, scratch_dir)
+            try:
+                load_times[layout.name] = load_layout(conn, layout, frames, tables)
+                results[layout.name] = time_queries(conn, params, args.repeat)
+            finally:
+                conn.close()
+            print(f"✅ {layout.name} : chargement {load_times[layout.name]:.2f} s, requêtes mesurées.")
+
+    # --- RÉSULTATS (MÉDIANE EN MS) ---
+    names = [layout.name for layout in layouts]
+    print(f"\n===== MÉDIANE PAR REQUÊTE ({args.repeat} exécutions, ms) =====")
+    print(f"{'Requête':<28}" + ''.join(f"{name:>14}" for name in names))
+    for query in BENCH_QUERIES:
+        print(f"{query:<28}" + ''.join(f"{results[name][query]:>14.2f}" for name in names))
+    print(f"{'TOTAL':<28}" + ''.join(f"{sum(results[name].values()):>14.2f}" for name in names))
+    print(f"{'Chargement (s)':<28}" + ''.join(f"{load_times[name]:>14.2f}" for name in names))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import shutil
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, DB_ERRORS
+from utils.fact_partitions import PARTITION_COLUMN, PARTITION_STATE_TABLE
+from utils.gold_schema import GOLD_TABLES
+from utils.parquet import PARQUET_ENGINE, read_manifest, write_manifest, write_parquet
+
+# --- 1. CONFIGURATION ---
+
+# Dossier du jeu de données : <Table>/part-0.parquet (dimensions), <Table>/Season=2014-15/part-0.parquet (faits)
+EXPORT_DIR = config.PARQUET_DIR
+
+# Tables exportées : dimensions et faits gold, dans l'ordre du schéma
+EXPORT_TABLES = [table for table in GOLD_TABLES if table.kind in ('dimension', 'fact')]
+
+# Partition des faits : dossier Hive nommé d'après la saison (Season_BK de DimTime, '/' remplacé par '-')
+TIME_TABLE = 'gold.DimTime'
+SEASON_PARTITION = 'Season'
+PART_FILE = 'part-0.parquet'
+
+# --- 2. LECTURE ET TYPAGE ---
+
+def fetch_frame(conn, sql, *params) -> pd.DataFrame:
+    cursor = conn.execute(sql, *params)
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def typed_frame(df, table) -> pd.DataFrame:
+    """
+    Colonnes typées d'après le schéma gold quel que soit le moteur source : INT en entier 32 bits nullable,
+    DECIMAL en flottant, DATE en date, textes en chaînes (typées même si la table est vide).
+    """
+    columns = {}
+    for col in table.columns:
+        values = df[col.name]
+        if col.sql_type == 'INT':
+            columns[col.name] = pd.to_numeric(values, errors='coerce').astype('Int32')
+        elif col.sql_type.startswith('DECIMAL'):
+            columns[col.name] = pd.to_numeric(values, errors='coerce').astype('float64')
+        elif col.sql_type == 'DATE':
+            columns[col.name] = pd.to_datetime(values)
+        else:
+            columns[col.name] = values.astype('string')
+    return pd.DataFrame(columns)
+
+
+def date_columns(table):
+    return [col.name for col in table.columns if col.sql_type == 'DATE']
+
+
+def content_hash(df) -> str:
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:32]
+
+
+def is_current(previous, hash_value) -> bool:
+    """Fichier déjà exporté avec la même empreinte (et toujours présent sur disque)."""
+    return (not config.FORCE_REBUILD and previous is not None and previous['hash'] == hash_value
+            and os.path.exists(os.path.join(EXPORT_DIR, previous['path'])))
+
+
+# --- 3. EXPORT ---
+
+def export_dimension(conn, table, previous):
+    """Dimension : un fichier, réécrit uniquement si son contenu a changé."""
+    df = typed_frame(fetch_frame(conn, f"SELECT * FROM {table.name}"), table)
+    hash_value = content_hash(df)
+    if is_current(previous, hash_value):
+        return previous, f"{table.name} : inchangée."
+
+    path = f"{table.short_name}/{PART_FILE}"
+    rows = write_parquet(df, os.path.join(EXPORT_DIR, path), date_columns(table))
+    return ({'kind': 'dimension', 'path': path, 'hash': hash_value, 'rows': rows},
+            f"{table.name} : exportée ({rows} ligne(s)).")
+
+
+def export_fact(conn, table, previous, seasons):
+    """
+    Fait : une partition par saison. L'empreinte de chaque partition est celle du chargement gold
+    (gold.Fact_Partition_State) : seules les saisons dont l'empreinte diffère du manifeste sont relues et réécrites.
+    """
+    state = conn.execute(
+        f"SELECT Partition_Value, Partition_Hash FROM {PARTITION_STATE_TABLE} WHERE Fact_Table = ?", table.name
+    ).fetchall()
+    exported_before = (previous or {}).get('partitions', {})
+    partitions, exported, rows = {}, 0, 0
+
+    for value, hash_value in sorted(state):
+        label = seasons[int(value)].replace('/', '-')
+        if is_current(exported_before.get(label), hash_value.strip()):
+            partitions[label] = exported_before[label]
+            continue
+        df = typed_frame(fetch_frame(conn, f"SELECT * FROM {table.name} WHERE [{PARTITION_COLUMN}] = ?", int(value)),
+                         table)
+        path = f"{table.short_name}/{SEASON_PARTITION}={label}/{PART_FILE}"
+        count = write_parquet(df, os.path.join(EXPORT_DIR, path), date_columns(table))
+        partitions[label] = {'path': path, 'hash': hash_value.strip(), 'rows': count, PARTITION_COLUMN: int(value)}
+        exported += 1
+        rows += count
+
+    # Saisons disparues de la couche gold : dossier de partition supprimé
+    dropped = sorted(set(exported_before) - set(partitions))
+    for label in dropped:
+        shutil.rmtree(os.path.join(EXPORT_DIR, table.short_name, f"{SEASON_PARTITION}={label}"), ignore_errors=True)
+
+    entry = {'kind': 'fact', 'partition_by': SEASON_PARTITION, 'partitions': partitions}
+    return entry, (f"{table.name} : {exported} partition(s) exportée(s) ({rows} ligne(s)), {len(dropped)} supprimée(s), "
+                   f"{len(partitions) - exported} inchangée(s).")
+
+
+def run_parquet_export():
+    """
+    Exporte les dimensions et faits gold en Parquet (dictionnaire, statistiques, zstd) sous config.PARQUET_DIR.
+    Le manifeste (_manifest.json) rend l'export incrémental ; config.FORCE_REBUILD réécrit tout.
+    """
+    conn = None
+    try:
+        conn = get_connection(stage='gold.parquet')
+        start = time.perf_counter()
+
+        seasons = dict(conn.execute(f"SELECT Time_SK, Season_BK FROM {TIME_TABLE}").fetchall())
+        previous = read_manifest(EXPORT_DIR)
+        tables = {}
+        for table in EXPORT_TABLES:
+            export = export_fact if table.kind == 'fact' else export_dimension
+            args = (seasons,) if table.kind == 'fact' else ()
+            tables[table.name], summary = export(conn, table, previous.get(table.name), *args)
+            print(f"-> {summary}")
+
+        write_manifest(EXPORT_DIR, tables)
+        print(f"🎉 Succès ! Export Parquet ({PARQUET_ENGINE}) terminé en {time.perf_counter() - start:.2f} s : {EXPORT_DIR}")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_parquet_export()
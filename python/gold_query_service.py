@@ -0,0 +1,361 @@
+import argparse
+import collections
+import contextlib
+import datetime
+import decimal
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- 1. CONFIGURATION ---
+
+# Écoute locale uniquement (service de lecture pour les consommateurs du poste)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = int(os.environ.get('FOOTBALL_DW_API_PORT', '8765'))
+
+# Cache LRU des résultats complets (toutes les pages d'une requête partagent une entrée)
+CACHE_SIZE = int(os.environ.get('FOOTBALL_DW_API_CACHE_SIZE', '256'))
+
+# Intervalle de relecture de la version gold (gold.Load_Version) : au-delà, un nouveau chargement invalide le cache
+VERSION_POLL_S = float(os.environ.get('FOOTBALL_DW_API_VERSION_POLL_S', '2'))
+
+# Pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Latences conservées par point d'accès (fenêtre glissante des percentiles)
+LATENCY_WINDOW = 1000
+
+
+def date_key(value: str) -> int:
+    """Date ISO ('2014-08-16') -> clé Date_SK de gold.DimDate (20140816)."""
+    return int(datetime.date.fromisoformat(value).strftime('%Y%m%d'))
+
+
+def page_param(params: Dict[str, str], name: str, default: int) -> int:
+    """Paramètre de pagination retiré des filtres et converti en entier."""
+    value = params.pop(name, default)
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Valeur invalide pour {name} : {value}.")
+
+
+class Endpoint:
+    """Point d'accès : requête en étoile, filtres paramétrés {paramètre: (condition SQL, conversion)} et tri."""
+
+    def __init__(self, sql: str, filters: Dict[str, Tuple[str, Callable]], order_by: str, required: Sequence[str] = ()):
+        self.sql = sql
+        self.filters = filters
+        self.order_by = order_by
+        self.required = list(required)
+
+    def build(self, params: Dict[str, str]) -> Tuple[str, list]:
+        missing = [name for name in self.required if name not in params]
+        if missing:
+            raise ValueError(f"Paramètre(s) obligatoire(s) manquant(s) : {', '.join(missing)}.")
+        unknown = [name for name in params if name not in self.filters]
+        if unknown:
+            raise ValueError(f"Paramètre(s) inconnu(s) : {', '.join(unknown)} (attendus : {', '.join(self.filters)}).")
+
+        conditions, values = [], []
+        for name, value in sorted(params.items()):
+            condition, convert = self.filters[name]
+            try:
+                value = convert(value)
+            except ValueError:
+                raise ValueError(f"Valeur invalide pour {name} : {value}.")
+            conditions.append(condition)
+            values += [value] * condition.count('?')
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return f"{self.sql}{where} ORDER BY {self.order_by}", values
+
+
+ENDPOINTS = {
+    '/team-season': Endpoint(
+        "SELECT t.Season_BK AS Season, d.Squad_Conformed_BK AS Team, f.Final_Rank, f.MatchesPlayed, f.Wins, f.Draws, "
+        "f.Losses, f.GoalsFor, f.GoalsAgainst, f.GoalDifference, f.Points, f.PointsPerMatch, f.Season_Attendance, "
+        "f.TopScorer_PlayerName, f.TopScorer_Goals, f.Goalkeeper_PlayerName, n.Notes_Standard_Name_BK AS Notes, "
+        "n.Notes_Category "
+        "FROM gold.FactTeamPerformance f "
+        "JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "JOIN gold.DimTeam d ON d.Team_SK = f.Team_SK "
+        "LEFT JOIN gold.DimNotes n ON n.Notes_SK = f.Notes_SK",
+        {'team': ("d.Squad_Conformed_BK = ?", str), 'season': ("t.Season_BK = ?", str)},
+        order_by="t.Season_BK, f.Final_Rank"),
+    '/player-career': Endpoint(
+        "SELECT p.Player_Name_BK AS Player, p.BirthYear, p.Current_Position, na.Nation_Standard_Name_BK AS Nation, "
+        "t.Season_BK AS Season, d.Squad_Conformed_BK AS Team, f.MatchesPlayed, f.MinutesPlayed, f.Goals, f.Assists, "
+        "f.YellowCards, f.RedCards, f.Goals_Per_90, f.Assists_Per_90, f.MarketValue_Euro_k "
+        "FROM gold.FactPlayerPerformance f "
+        "JOIN gold.DimPlayer p ON p.Player_SK = f.Player_SK "
+        "JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "JOIN gold.DimTeam d ON d.Team_SK = f.Team_SK "
+        "LEFT JOIN gold.DimNation na ON na.Nation_SK = p.Nation_SK",
+        {'player': ("p.Player_Name_BK = ?", str), 'birth_year': ("p.BirthYear = ?", int)},
+        order_by="p.BirthYear, t.Season_BK, d.Squad_Conformed_BK", required=['player']),
+    '/matches': Endpoint(
+        "SELECT t.Season_BK AS Season, f.MatchDate, dt.Matchweek, h.Squad_Conformed_BK AS HomeTeam, "
+        "a.Squad_Conformed_BK AS AwayTeam, "
+        "f.FullTimeHomeGoals, f.FullTimeAwayGoals, f.FullTimeResult, f.HalfTimeHomeGoals, f.HalfTimeAwayGoals, "
+        "f.HomeShots, f.AwayShots, f.HomeShotsOnTarget, f.AwayShotsOnTarget, f.HomeCorners, f.AwayCorners, "
+        "f.B365HomeOdds, f.B365DrawOdds, f.B365AwayOdds "
+        "FROM gold.FactMatchEvent f "
+        "JOIN gold.DimTime t ON t.Time_SK = f.Time_SK "
+        "JOIN gold.DimDate dt ON dt.Date_SK = f.Date_SK "
+        "JOIN gold.DimTeam h ON h.Team_SK = f.HomeTeam_SK "
+        "JOIN gold.DimTeam a ON a.Team_SK = f.AwayTeam_SK",
+        {'season': ("t.Season_BK = ?", str),
+         'team': ("(h.Squad_Conformed_BK = ? OR a.Squad_Conformed_BK = ?)", str),
+         'home': ("h.Squad_Conformed_BK = ?", str),
+         'away': ("a.Squad_Conformed_BK = ?", str),
+         # Filtres de date sur la clé entière (intervalle de clés = intervalle de dates)
+         'date': ("f.Date_SK = ?", date_key),
+         'date_from': ("f.Date_SK >= ?", date_key),
+         'date_to': ("f.Date_SK <= ?", date_key),
+         'matchweek': ("dt.Matchweek = ?", int)},
+        order_by="f.Date_SK, h.Squad_Conformed_BK"),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON local de requêtes sur la couche gold (cache partagé).")
+    parser.add_argument('--backend', choices=['sqlserver', 'sqlite', 'duckdb'],
+                        help="Moteur lu (par défaut : variable FOOTBALL_DW_BACKEND, sinon sqlserver).")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Adresse d'écoute.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port d'écoute.")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help="Nombre de résultats gardés en cache.")
+    return parser.parse_args()
+
+
+# --- 2. CACHE, REGROUPEMENT DES REQUÊTES ET MÉTRIQUES ---
+
+class _Pending:
+    """Calcul en cours d'une clé : les requêtes identiques simultanées attendent son résultat."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """
+    Cache LRU des résultats, clé (point d'accès, paramètres, version gold) : un chargement gold change
+    la version et rend les anciennes entrées inaccessibles (elles sont purgées au changement de version).
+    Une clé absente n'est calculée qu'une fois, même demandée par plusieurs requêtes simultanées.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: 'collections.OrderedDict[tuple, List[dict]]' = collections.OrderedDict()
+        self._pending: Dict[tuple, _Pending] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+
+    def set_version(self, version: str):
+        with self._lock:
+            if version != self.version:
+                self._entries = collections.OrderedDict((key, rows) for key, rows in self._entries.items()
+                                                        if key[-1] == version)
+                self.version = version
+
+    def get_or_compute(self, key: tuple, compute: Callable[[], List[dict]]) -> Tuple[List[dict], str]:
+        """Retourne (lignes, origine) : 'cache', 'coalesced' (calcul d'une autre requête attendu) ou 'query'."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key], 'cache'
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result, 'coalesced'
+
+        try:
+            pending.result = compute()
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+                if pending.error is None and key[-1] == self.version:
+                    self._entries[key] = pending.result
+                    if len(self._entries) > self.size:
+                        self._entries.popitem(last=False)
+            pending.done.set()
+        return pending.result, 'query'
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EndpointMetrics:
+    """Latences (fenêtre glissante) et origine des réponses d'un point d'accès."""
+
+    def __init__(self):
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.counts = collections.Counter()
+
+    def record(self, seconds: float, outcome: str):
+        self.latencies.append(seconds * 1000)
+        self.counts[outcome] += 1
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        result = {'requests': sum(self.counts.values()), **self.counts}
+        if latencies:
+            result.update({
+                'p50_ms': round(statistics.median(latencies), 3),
+                'p95_ms': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3),
+                'max_ms': round(latencies[-1], 3),
+            })
+        return result
+
+
+# --- 3. SERVICE ---
+
+def to_json(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+class GoldQueryService:
+    """Exécute les points d'accès : connexions de lecture réutilisées, cache et métriques partagés."""
+
+    def __init__(self, backend: Optional[str], cache_size: int):
+        self.backend = backend
+        self.cache = ResultCache(cache_size)
+        self.metrics = collections.defaultdict(EndpointMetrics)
+        self._metrics_lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._version_checked_at = 0.0
+        self._version_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Connexion empruntée aux connexions inactives (une nouvelle au plus par requête simultanée).
+        Autocommit : chaque lecture voit le dernier chargement validé (pas d'instantané de transaction).
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            from utils.db import open_connection
+            conn = open_connection(autocommit=True, backend=self.backend)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def current_version(self) -> str:
+        """Version gold, relue au plus toutes les VERSION_POLL_S secondes."""
+        from utils.gold_version import read_load_version
+        with self._version_lock:
+            now = time.monotonic()
+            if self.cache.version is None or now - self._version_checked_at >= VERSION_POLL_S:
+                with self.connection() as conn:
+                    self.cache.set_version(read_load_version(conn))
+                self._version_checked_at = now
+            return self.cache.version
+
+    def fetch(self, sql: str, values: list) -> List[dict]:
+        with self.connection() as conn:
+            cursor = conn.execute(sql, *values)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, dict]:
+        if path == '/metrics':
+            with self._metrics_lock:
+                endpoints = {name: metrics.summary() for name, metrics in self.metrics.items()}
+            return 200, {'version': self.cache.version, 'cache_entries': len(self.cache),
+                         'cache_size': self.cache.size, 'endpoints': endpoints}
+        if path not in ENDPOINTS:
+            return 404, {'error': f"Point d'accès inconnu : {path}.", 'endpoints': list(ENDPOINTS) + ['/metrics']}
+
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            params = {name: values[-1] for name, values in query.items()}
+            page = page_param(params, 'page', 1)
+            page_size = min(page_param(params, 'page_size', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            if page < 1 or page_size < 1:
+                raise ValueError("page et page_size doivent être positifs.")
+            sql, values = ENDPOINTS[path].build(params)
+
+            version = self.current_version()
+            key = (path, tuple(sorted(params.items())), version)
+            rows, outcome = self.cache.get_or_compute(key, lambda: self.fetch(sql, values))
+            offset = (page - 1) * page_size
+            return 200, {'endpoint': path, 'version': version, 'source': outcome, 'page': page,
+                         'page_size': page_size, 'total': len(rows), 'rows': rows[offset:offset + page_size]}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        finally:
+            with self._metrics_lock:
+                self.metrics[path].record(time.perf_counter() - start, outcome)
+
+
+def make_handler(service: GoldQueryService):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                status, payload = service.handle(url.path.rstrip('/') or '/', parse_qs(url.query))
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+            body = json.dumps(payload, default=to_json, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Latences exposées par /metrics plutôt qu'une ligne de journal par requête
+            pass
+
+    return Handler
+
+
+def main():
+    args = parse_args()
+    if args.backend:
+        os.environ['FOOTBALL_DW_BACKEND'] = args.backend
+    sys.path.append(PYTHON_DIR)
+    from utils import config
+
+    service = GoldQueryService(config.DB_BACKEND, args.cache_size)
+    print(f"Version gold : {service.current_version()}")
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"✅ Service gold à l'écoute sur http://{args.host}:{args.port} (moteur {config.DB_BACKEND}) : "
+          f"{', '.join(ENDPOINTS)}, /metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Arrêt du service.")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, bulk_insert
+from utils.categorical import to_categorical
+from utils.temporal import parse_dates, format_hits
+from utils.manifest import file_hash, loaded_hash, record_load, source_name
+
+# --- 1. CONFIGURATION DU PROJET ---
+# Historique des matchs depuis 2000/01 (un seul CSV, déjà nettoyé : dates AAAA-MM-JJ, comptages entiers)
+CSV_FILE = os.path.join(config.PROCESSED_DIR, 'epl_history.csv')
+
+# Table cible (la connexion est gérée par utils.db : SQL Server, SQLite ou DuckDB)
+STAGING_TABLE = 'bronze.staging_epl_history'
+
+# Colonnes texte (faible cardinalité : encodées en catégories)
+TEXT_COLUMNS = ['Season', 'MatchDate', 'HomeTeam', 'AwayTeam', 'FullTimeResult', 'HalfTimeResult']
+
+# Colonnes de comptage (INT dans le DDL)
+INT_COLUMNS = [
+    'FullTimeHomeGoals', 'FullTimeAwayGoals', 'HalfTimeHomeGoals', 'HalfTimeAwayGoals',
+    'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget', 'HomeCorners', 'AwayCorners',
+    'HomeFouls', 'AwayFouls', 'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards'
+]
+
+# Ordre des colonnes du DDL
+FINAL_COLS = ['Season', 'MatchDate', 'HomeTeam', 'AwayTeam',
+              'FullTimeHomeGoals', 'FullTimeAwayGoals', 'FullTimeResult',
+              'HalfTimeHomeGoals', 'HalfTimeAwayGoals', 'HalfTimeResult',
+              'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
+              'HomeCorners', 'AwayCorners', 'HomeFouls', 'AwayFouls',
+              'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards']
+
+# Types explicites : aucune inférence sur les colonnes lues
+CSV_DTYPES = {
+    **{col: 'str' for col in TEXT_COLUMNS},
+    **{col: 'Int64' for col in INT_COLUMNS},
+}
+
+
+# --- 2. LECTURE ET TYPAGE ---
+
+def read_history_csv(file_path: str) -> pd.DataFrame:
+    """Lit les colonnes du DDL avec des types explicites ; la date est typée (une conversion par date distincte)."""
+    df = pd.read_csv(file_path, usecols=FINAL_COLS, dtype=CSV_DTYPES, encoding='utf-8-sig')
+    df = to_categorical(df, TEXT_COLUMNS, max_ratio=None)
+
+    match_dates, hits = parse_dates(df['MatchDate'])
+    print(f"Formats de date reconnus : {format_hits(hits)}")
+    df['MatchDate'] = match_dates.dt.date
+    return df
+
+
+# --- 3. FONCTION PRINCIPALE ETL ---
+def extract_transform_load_history():
+    """
+    Charge l'historique des matchs dans la table de staging, sauf si le fichier n'a pas changé
+    depuis le dernier chargement (bronze.load_manifest) ; sinon la table est remplacée.
+    """
+    try:
+        conn = get_connection(stage=STAGING_TABLE)
+        print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
+    except Exception as e:
+        print(f"Échec de la connexion à la base. Vérifiez le serveur et le pilote : {e}")
+        return
+
+    try:
+        current_hash = file_hash(CSV_FILE)
+        if loaded_hash(conn, STAGING_TABLE, source_name(CSV_FILE)) == current_hash:
+            print(f"--- {source_name(CSV_FILE)} inchangé depuis le dernier chargement, ignoré.")
+            return
+
+        print(f"\n--- Traitement du fichier : {source_name(CSV_FILE)} ---")
+        df = read_history_csv(CSV_FILE)
+
+        # Remplacement de la table, puis mise à jour du manifeste, dans une seule transaction
+        conn.execute(f"DELETE FROM {STAGING_TABLE}")
+        rows_count = bulk_insert(conn, STAGING_TABLE, FINAL_COLS, df)
+        record_load(conn, STAGING_TABLE, source_name(CSV_FILE), current_hash, rows_count)
+        conn.commit()
+
+        print(f"\n✅ PROCESSUS ETL TERMINÉ. {rows_count} lignes insérées dans {STAGING_TABLE}.")
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Échec critique du traitement du fichier {source_name(CSV_FILE)}. Annulation. Erreur : {e}")
+    finally:
+        # Rendre la connexion au pool
+        conn.close()
+
+# Lancer le script
+extract_transform_load_history()
@@ -1,130 +1,120 @@
-import pandas as pd
-import pyodbc
 import os
-import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection
+from utils.categorical import constant_categorical, to_records
+from utils.temporal import season_from_filename
+from utils.manifest import file_hash, loaded_hash, record_load, source_name
+from utils.json_stream import iter_record_batches, to_int, to_decimal
 
 # --- 1. CONFIGURATION DU PROJET ---
 # Chemin du dossier source pour les fichiers JSON 'Overall'
-JSON_DIRECTORY = r'D:\Abbes\Football-DW-Project\data\processed\epl_league_table_overall_json'
+JSON_DIRECTORY = os.path.join(config.PROCESSED_DIR, 'epl_league_table_overall_json')
 JSON_PATTERN = '.json'
 
-# Informations de Connexion SQL Server (Sauvegardées)
-SQL_SERVER_NAME = '(localdb)\MSSQLLocalDB'
-DATABASE_NAME = 'DW_Football_Staging'
+# Table cible (la connexion est gérée par utils.db : SQL Server, SQLite ou DuckDB)
 STAGING_TABLE = 'bronze.staging_league_table_overall' # <--- Table Cible
 
-# Chaîne de connexion SQL Server
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
+# Lecture par lots : la mémoire reste constante quelle que soit la taille du fichier
+BATCH_SIZE = 1000
 
-# --- 2. Fonction de Génération de Saison ---
-def generate_season_from_filename(filename):
-    """
-    Extrait l'année de la saison du nom de fichier (ex: '..._14_15.json' -> '2014/15').
-    """
-    # Regex pour trouver le motif de fin '_YY_YY'
-    match = re.search(r'\_(\d{2})\_(\d{2})\.json$', filename)
-    if match:
-        start_year_short = match.group(1)
-        end_year_short = match.group(2)
-        
-        # Supposons que les années sont 20xx
-        start_year = "20" + start_year_short
-        return f"{start_year}/{end_year_short}"
-    
-    return "Unknown/Season" 
+# Typage appliqué à chaque lot dès la lecture (noms de colonnes du JSON)
+TYPE_CONVERTERS = {
+    # DDL: Rk, MP, W, D, L, GF, GA, Pts, Attendance sont INT (to_int retire les virgules de l'Attendance)
+    **{col: to_int for col in ['Rk', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'Pts', 'Attendance']},
+    # DDL: Pts_per_MP est DECIMAL(4,2)
+    'Pts/MP': to_decimal,
+}
+
+# Colonnes texte encodées en dictionnaire (catégories) : une seule copie par valeur distincte
+CATEGORICAL_COLUMNS = ['Squad', 'Notes']
 
-# --- 3. FONCTION PRINCIPALE ETL ---
+# --- 2. FONCTION PRINCIPALE ETL ---
 def extract_transform_load_overall_table():
     """
     Parcourt tous les fichiers JSON, les transforme et les charge dans la table OVERALL de staging.
+    Un fichier dont l'empreinte n'a pas changé depuis le dernier chargement est ignoré ;
+    un fichier modifié remplace ses lignes précédentes (rechargement idempotent).
     """
     total_rows_loaded = 0
+    skipped_files = 0
     
-    # 3.1. Connexion à la base de données
+    # 2.1. Connexion à la base de données
     try:
-        conn = pyodbc.connect(CONN_STRING)
-        cursor = conn.cursor()
-        print(f"Connexion à SQL Server établie sur [{DATABASE_NAME}].")
+        conn = get_connection(stage=STAGING_TABLE)
+        print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
     except Exception as e:
-        print(f"Échec de la connexion à SQL Server. Vérifiez le serveur et le pilote : {e}")
+        print(f"Échec de la connexion à la base. Vérifiez le serveur et le pilote : {e}")
         return
 
-    # 3.2. La Boucle "For Each File"
-    for filename in os.listdir(JSON_DIRECTORY):
-        if filename.endswith(JSON_PATTERN):
-            file_path = os.path.join(JSON_DIRECTORY, filename)
-            season = generate_season_from_filename(filename)
+    # 2.2. La Boucle "For Each File"
+    for filename in sorted(os.listdir(JSON_DIRECTORY)):
+        if not filename.endswith(JSON_PATTERN):
+            continue
+        file_path = os.path.join(JSON_DIRECTORY, filename)
+        season = season_from_filename(filename)
+
+        try:
+            # Fichier inchangé : rien à faire
+            current_hash = file_hash(file_path)
+            if loaded_hash(conn, STAGING_TABLE, source_name(file_path)) == current_hash:
+                skipped_files += 1
+                print(f"--- {filename} inchangé depuis le dernier chargement, ignoré.")
+                continue
+
             print(f"\n--- Traitement du fichier : {filename} (Saison: {season}) ---")
 
-            try:
-                # --- EXTRACTION (E) ---
-                df = pd.read_json(file_path)
-                
+            # Préparer la requête d'insertion (l'ordre des colonnes DOIT correspondre au DDL)
+            final_cols = ['Season', 'Rk', 'Squad', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts', 'Pts_per_MP',
+                          'Attendance', 'Top_Team_Scorer', 'Goalkeeper', 'Notes', 'Source_File']
+            columns = ', '.join(final_cols)
+            placeholders = ', '.join(['?' for _ in final_cols])
+            insert_query = f"INSERT INTO {STAGING_TABLE} ({columns}) VALUES ({placeholders})"
+
+            # Remplacement des lignes du fichier, puis mise à jour du manifeste, dans une seule transaction
+            conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE Source_File = ?", source_name(file_path))
+            rows_count = 0
+
+            # --- EXTRACTION (E) ---
+            # Le tableau JSON est lu de manière incrémentale, en lots typés de BATCH_SIZE lignes
+            for df in iter_record_batches(file_path, batch_size=BATCH_SIZE, converters=TYPE_CONVERTERS,
+                                          categoricals=CATEGORICAL_COLUMNS):
+
                 # --- TRANSFORMATION (T) ---
-                
-                # a) Créer la colonne Season 
-                df.insert(0, 'Season', season)
-                
+
+                # a) Créer la colonne Season
+                df.insert(0, 'Season', constant_categorical(season, len(df)))
+                df['Source_File'] = constant_categorical(source_name(file_path), len(df))
+
                 # b) Renommer les colonnes pour correspondre au DDL
                 df = df.rename(columns={
                     'Pts/MP': 'Pts_per_MP',
                     'Top Team Scorer': 'Top_Team_Scorer'
                 })
-                
-                # c) Conversion des types et nettoyage
-                
-                # DDL: Rk, MP, W, D, L, GF, GA, Pts, Attendance sont INT
-                int_cols = ['Rk', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'Pts', 'Attendance']
-                for col in int_cols:
-                    # Nettoyage des chaînes avant conversion numérique (retirer les virgules de l'Attendance)
-                    if col == 'Attendance':
-                        df[col] = df[col].astype(str).str.replace(',', '').str.strip()
-                    
-                    # Conversion en INT, gère les erreurs en NaN puis remplace par 0
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-
-                # DDL: Pts_per_MP est DECIMAL(4,2)
-                df['Pts_per_MP'] = pd.to_numeric(df['Pts_per_MP'], errors='coerce')
-                
-                # Assurez-vous que les colonnes string (GD, Scorer, Goalkeeper, Notes) gèrent bien les valeurs nulles
-                
-                # Gérer les valeurs NaN/None pour pyodbc (très important avant l'insertion)
-                df = df.where(pd.notna(df), None)
-                
-                # d) Assurer l'ordre des colonnes (DOIT correspondre à l'ordre du DDL)
-                df = df[['Season', 'Rk', 'Squad', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts', 'Pts_per_MP', 
-                         'Attendance', 'Top_Team_Scorer', 'Goalkeeper', 'Notes']]
-                
+
                 # --- CHARGEMENT (L) ---
-                
-                # Préparer la requête d'insertion
-                columns = ', '.join(df.columns)
-                placeholders = ', '.join(['?' for _ in df.columns])
-                insert_query = f"INSERT INTO {STAGING_TABLE} ({columns}) VALUES ({placeholders})"
-                
-                # Convertir le DataFrame en une liste de tuples
-                data_to_insert = [tuple(row) for row in df.values]
-                
-                # Exécuter l'insertion
-                cursor.executemany(insert_query, data_to_insert)
-                conn.commit()
-                
-                rows_count = len(df)
-                total_rows_loaded += rows_count
-                print(f"Chargement réussi : {rows_count} lignes insérées dans {STAGING_TABLE}.")
-
-            except Exception as e:
-                conn.rollback()
-                print(f"Échec critique du traitement du fichier {filename}. Annulation. Erreur : {e}")
-
-    # Fermer la connexion
+
+                # Décodage des catégories et NaN -> None uniquement ici, au moment de l'écriture
+                data_to_insert = to_records(df, final_cols)
+                conn.prepare(insert_query).executemany(data_to_insert)
+                rows_count += len(data_to_insert)
+
+            record_load(conn, STAGING_TABLE, source_name(file_path), current_hash, rows_count)
+            conn.commit()
+
+            total_rows_loaded += rows_count
+            print(f"Chargement réussi : {rows_count} lignes insérées dans {STAGING_TABLE}.")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"Échec critique du traitement du fichier {filename}. Annulation. Erreur : {e}")
+
+    # Rendre la connexion au pool
     conn.close()
-    print(f"\n✅ PROCESSUS ETL TERMINÉ. Total des lignes chargées : {total_rows_loaded}.")
+    print(f"\n✅ PROCESSUS ETL TERMINÉ. Total des lignes chargées : {total_rows_loaded} "
+          f"({skipped_files} fichier(s) inchangé(s) ignoré(s)).")
 
 # Lancer le script
 extract_transform_load_overall_table()
\ No newline at end of file
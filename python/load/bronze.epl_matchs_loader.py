@@ -0,0 +1,130 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, bulk_insert
+from utils.categorical import to_categorical
+from utils.temporal import parse_dates, format_hits
+from utils.manifest import file_hash, loaded_hash, record_load, source_name
+
+# --- 1. CONFIGURATION DU PROJET ---
+# Fichiers football-data.co.uk (un CSV par saison, 62 à 120 colonnes selon l'année)
+CSV_DIRECTORY = os.path.join(config.RAW_DIR, 'ods')
+CSV_PATTERN = '.csv'
+
+# Table cible (la connexion est gérée par utils.db : SQL Server, SQLite ou DuckDB)
+STAGING_TABLE = 'bronze.staging_epl_matchs'
+
+# Colonnes texte (faible cardinalité : encodées en catégories)
+TEXT_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'HTR']
+
+# Colonnes numériques (FLOAT dans le DDL)
+NUMERIC_COLUMNS = [
+    'FTHG', 'FTAG', 'HTHG', 'HTAG', 'HS', 'AS', 'HST', 'AST', 'HF', 'AF',
+    'HC', 'AC', 'HY', 'AY', 'HR', 'AR', 'B365H', 'B365D', 'B365A'
+]
+
+# Ordre des colonnes du DDL (seules ces colonnes sont lues dans le CSV)
+FINAL_COLS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG', 'HTR',
+              'HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR',
+              'B365H', 'B365D', 'B365A', 'Source_File']
+
+# Types explicites : aucune inférence sur les colonnes lues
+CSV_DTYPES = {
+    **{col: 'str' for col in TEXT_COLUMNS},
+    **{col: 'float64' for col in NUMERIC_COLUMNS},
+}
+
+# Les dates sont au format JJ/MM/AAAA ou JJ/MM/AA (ex: 16/08/14) selon la saison
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%y')
+
+
+# --- 2. LECTURE ET TYPAGE ---
+
+def read_matches_csv(file_path: str) -> pd.DataFrame:
+    """Lit uniquement les colonnes utiles du CSV, avec des types explicites."""
+    df = pd.read_csv(
+        file_path,
+        usecols=lambda col: col in CSV_DTYPES,
+        dtype=CSV_DTYPES,
+        encoding='utf-8-sig',
+    )
+
+    # Lignes vides en fin de fichier (ex: 14-15.csv)
+    df = df.dropna(subset=['Date', 'HomeTeam', 'AwayTeam'], how='all')
+
+    # Colonnes absentes de certaines saisons : NULL
+    for col in CSV_DTYPES:
+        if col not in df.columns:
+            df[col] = np.nan
+
+    # Conversion vectorisée (un passage par format), écriture au format ISO AAAA-MM-JJ
+    # comme le faisait le nettoyage avant SSIS
+    match_dates, hits = parse_dates(df['Date'], DATE_FORMATS)
+    print(f"Formats de date reconnus : {format_hits(hits)}")
+    df['Date'] = match_dates.dt.strftime('%Y-%m-%d')
+    df['Source_File'] = source_name(file_path)
+    return to_categorical(df, TEXT_COLUMNS + ['Source_File'], max_ratio=None)
+
+
+# --- 3. FONCTION PRINCIPALE ETL ---
+def extract_transform_load_matchs():
+    """
+    Charge chaque CSV de match dans la table de staging, sans fichier intermédiaire.
+    Un fichier dont l'empreinte n'a pas changé depuis le dernier chargement est ignoré ;
+    un fichier modifié remplace ses lignes précédentes.
+    """
+    total_rows_loaded = 0
+    skipped_files = 0
+
+    # 3.1. Connexion à la base de données
+    try:
+        conn = get_connection(stage=STAGING_TABLE)
+        print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
+    except Exception as e:
+        print(f"Échec de la connexion à la base. Vérifiez le serveur et le pilote : {e}")
+        return
+
+    # 3.2. La Boucle "For Each File"
+    for filename in sorted(os.listdir(CSV_DIRECTORY)):
+        if not filename.endswith(CSV_PATTERN):
+            continue
+        file_path = os.path.join(CSV_DIRECTORY, filename)
+
+        try:
+            # Fichier inchangé : rien à faire
+            current_hash = file_hash(file_path)
+            if loaded_hash(conn, STAGING_TABLE, source_name(file_path)) == current_hash:
+                skipped_files += 1
+                print(f"--- {filename} inchangé depuis le dernier chargement, ignoré.")
+                continue
+
+            print(f"\n--- Traitement du fichier : {filename} ---")
+
+            # --- EXTRACTION / TRANSFORMATION (E/T) ---
+            df = read_matches_csv(file_path)
+
+            # --- CHARGEMENT (L) ---
+            # Remplacement des lignes du fichier, puis mise à jour du manifeste, dans une seule transaction
+            conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE Source_File = ?", source_name(file_path))
+            rows_count = bulk_insert(conn, STAGING_TABLE, FINAL_COLS, df)
+            record_load(conn, STAGING_TABLE, source_name(file_path), current_hash, rows_count)
+            conn.commit()
+
+            total_rows_loaded += rows_count
+            print(f"Chargement réussi : {rows_count} lignes insérées dans {STAGING_TABLE}.")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"Échec critique du traitement du fichier {filename}. Annulation. Erreur : {e}")
+
+    # Rendre la connexion au pool
+    conn.close()
+    print(f"\n✅ PROCESSUS ETL TERMINÉ. Total des lignes chargées : {total_rows_loaded} "
+          f"({skipped_files} fichier(s) inchangé(s) ignoré(s)).")
+
+# Lancer le script
+extract_transform_load_matchs()
@@ -1,144 +1,137 @@
-import pandas as pd
-import pyodbc
 import os
-import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection
+from utils.categorical import constant_categorical, to_records
+from utils.temporal import season_from_filename
+from utils.manifest import file_hash, loaded_hash, record_load, source_name
+from utils.json_stream import iter_record_batches, to_int, to_decimal, to_date
 
 # --- 1. CONFIGURATION DU PROJET ---
 # Chemin du dossier source pour les fichiers JSON 'Player Stats'
-JSON_DIRECTORY = r'D:\Abbes\Football-DW-Project\data\processed\epl_player_stats_json'
+JSON_DIRECTORY = os.path.join(config.PROCESSED_DIR, 'epl_player_stats_json')
 JSON_PATTERN = '.json'
 
-# Informations de Connexion SQL Server (Sauvegardées)
-SQL_SERVER_NAME = '(localdb)\MSSQLLocalDB'
-DATABASE_NAME = 'DW_Football_Staging'
+# Table cible (la connexion est gérée par utils.db : SQL Server, SQLite ou DuckDB)
 STAGING_TABLE = 'bronze.staging_player_stats' 
 
-# Chaîne de connexion SQL Server
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
+# Lecture par lots : la mémoire reste constante quelle que soit la taille du fichier
+# (les fichiers bruts contiennent en plus l'objet imbriqué 'player_info', aplati à la volée)
+BATCH_SIZE = 1000
 
-# --- 2. Fonction de Génération de Saison (CORRIGÉE) ---
-def generate_season_from_filename(filename):
-    """
-    Extrait l'année de la saison du nom de fichier (ex: '2014-2015_player_info.json' -> '2014/15').
-    """
-    # Regex pour trouver le motif de début 'YYYY-YYYY'
-    match = re.search(r'^(\d{4})\-(\d{4})\_', filename)
-    if match:
-        start_year = match.group(1)
-        end_year = match.group(2)
-        
-        # Le format DDL est 'YYYY/YY'
-        return f"{start_year}/{end_year[2:]}" # Ex: 2014/15
-    
-    return "Unknown/Season" 
+# Typage appliqué à chaque lot dès la lecture (noms de colonnes du JSON)
+TYPE_CONVERTERS = {
+    # Colonnes INT ('Min' contient des virgules '2,307', retirées par to_int)
+    **{col: to_int for col in ['Age', 'Born', 'MP', 'Starts', 'Min', 'Gls', 'Ast', 'CrdY', 'CrdR',
+                               'market_value_€k']},
+    # Colonnes DECIMAL(5,2)
+    **{col: to_decimal for col in ['90s', 'Gls_1', 'Ast_1']},
+    # Conversion de la date
+    'market_value_last_update': to_date('%d/%m/%Y'),
+}
+
+# Colonnes texte encodées en dictionnaire (catégories) : une seule copie par valeur distincte
+CATEGORICAL_COLUMNS = ['Player', 'Nation', 'Pos', 'Squad']
 
-# --- 3. FONCTION PRINCIPALE ETL ---
+# --- 2. FONCTION PRINCIPALE ETL ---
 def extract_transform_load_player_stats():
     """
     Parcourt tous les fichiers JSON, les transforme et les charge dans la table PLAYER STATS de staging.
+    Un fichier dont l'empreinte n'a pas changé depuis le dernier chargement est ignoré ;
+    un fichier modifié remplace ses lignes précédentes (rechargement idempotent).
     """
     total_rows_loaded = 0
+    skipped_files = 0
     
-    # 3.1. Connexion à la base de données
+    # 2.1. Connexion à la base de données
     try:
-        conn = pyodbc.connect(CONN_STRING)
-        cursor = conn.cursor()
-        print(f"Connexion à SQL Server établie sur [{DATABASE_NAME}].")
+        conn = get_connection(stage=STAGING_TABLE)
+        print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
     except Exception as e:
-        print(f"Échec de la connexion à SQL Server. Vérifiez le serveur et le pilote : {e}")
+        print(f"Échec de la connexion à la base. Vérifiez le serveur et le pilote : {e}")
         return
 
-    # 3.2. La Boucle "For Each File"
-    for filename in os.listdir(JSON_DIRECTORY):
-        if filename.endswith(JSON_PATTERN):
-            file_path = os.path.join(JSON_DIRECTORY, filename)
-            season = generate_season_from_filename(filename) # <--- Utilise la fonction corrigée
+    # 2.2. La Boucle "For Each File"
+    for filename in sorted(os.listdir(JSON_DIRECTORY)):
+        if not filename.endswith(JSON_PATTERN):
+            continue
+        file_path = os.path.join(JSON_DIRECTORY, filename)
+        season = season_from_filename(filename)
+
+        try:
+            # Fichier inchangé : rien à faire
+            current_hash = file_hash(file_path)
+            if loaded_hash(conn, STAGING_TABLE, source_name(file_path)) == current_hash:
+                skipped_files += 1
+                print(f"--- {filename} inchangé depuis le dernier chargement, ignoré.")
+                continue
+
             print(f"\n--- Traitement du fichier : {filename} (Saison: {season}) ---")
 
-            try:
-                # --- EXTRACTION (E) ---
-                df = pd.read_json(file_path)
-                
+            # Ordre des colonnes du DataFrame (doit correspondre au DDL SQL)
+            # (pas de colonne Rk dans bronze.staging_player_stats)
+            final_cols = ['Season', 'Player', 'Nation', 'Pos', 'Squad',
+                          'Age', 'Born', 'MP', 'Starts', 'Min', '90s_col',
+                          'Gls', 'Ast', 'CrdY', 'CrdR',
+                          'Gls_1', 'Ast_1',
+                          'market_value_euro_k', 'market_value_last_update', 'Source_File']
+
+            # Préparer la requête d'insertion (utiliser le nom SQL [90s] dans la requête)
+            sql_columns = ['Season', 'Player', 'Nation', 'Pos', 'Squad', 
+                           'Age', 'Born', 'MP', 'Starts', 'Min', '[90s]', # Nom SQL avec crochets
+                           'Gls', 'Ast', 'CrdY', 'CrdR', 
+                           'Gls_1', 'Ast_1', 
+                           'market_value_euro_k', 'market_value_last_update', 'Source_File']
+                           
+            columns_str = ', '.join(sql_columns)
+            placeholders = ', '.join(['?' for _ in sql_columns])
+            insert_query = f"INSERT INTO {STAGING_TABLE} ({columns_str}) VALUES ({placeholders})"
+
+            # Remplacement des lignes du fichier, puis mise à jour du manifeste, dans une seule transaction
+            conn.execute(f"DELETE FROM {STAGING_TABLE} WHERE Source_File = ?", source_name(file_path))
+            rows_count = 0
+
+            # --- EXTRACTION (E) ---
+            # Le tableau JSON est lu de manière incrémentale, en lots typés de BATCH_SIZE lignes
+            for df in iter_record_batches(file_path, batch_size=BATCH_SIZE, converters=TYPE_CONVERTERS,
+                                          categoricals=CATEGORICAL_COLUMNS):
+
                 # --- TRANSFORMATION (T) ---
-                
+
                 # a) Créer la colonne Season (Manquante dans le JSON)
-                df.insert(0, 'Season', season)
-                
+                df.insert(0, 'Season', constant_categorical(season, len(df)))
+                df['Source_File'] = constant_categorical(source_name(file_path), len(df))
+
                 # b) Renommage des colonnes
                 df = df.rename(columns={
                     '90s': '90s_col', # Renommage temporaire pour le DataFrame
                     'market_value_€k': 'market_value_euro_k'
                     # Pas de changement pour Gls_1 et Ast_1, les noms sont corrects
                 })
-                
-                # c) Nettoyage et Conversion des types
-                
-                # Nettoyage de la colonne 'Min' (contient des virgules '2,307')
-                df['Min'] = df['Min'].astype(str).str.replace(',', '').str.strip()
-                
-                # Colonnes INT
-                int_cols = ['Rk', 'Age', 'Born', 'MP', 'Starts', 'Min', 'Gls', 'Ast', 'CrdY', 'CrdR', 'market_value_euro_k']
-                for col in int_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-
-                # Colonnes DECIMAL(5,2)
-                decimal_cols = ['90s_col', 'Gls_1', 'Ast_1']
-                for col in decimal_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-                # d) Conversion de la date
-                df['market_value_last_update'] = pd.to_datetime(
-                    df['market_value_last_update'], 
-                    format='%d/%m/%Y',
-                    errors='coerce'
-                )
-                
-                # Gérer les valeurs NaN/None pour pyodbc
-                df = df.where(pd.notna(df), None)
-                
-                # e) Assurer l'ordre des colonnes du DataFrame (doit correspondre au DDL SQL)
-                df_final = df[['Season', 'Rk', 'Player', 'Nation', 'Pos', 'Squad', 
-                               'Age', 'Born', 'MP', 'Starts', 'Min', '90s_col', 
-                               'Gls', 'Ast', 'CrdY', 'CrdR', 
-                               'Gls_1', 'Ast_1', 
-                               'market_value_euro_k', 'market_value_last_update']].copy()
 
                 # --- CHARGEMENT (L) ---
-                
-                # Préparer la requête d'insertion (utiliser le nom SQL [90s] dans la requête)
-                sql_columns = ['Season', 'Rk', 'Player', 'Nation', 'Pos', 'Squad', 
-                               'Age', 'Born', 'MP', 'Starts', 'Min', '[90s]', # Nom SQL avec crochets
-                               'Gls', 'Ast', 'CrdY', 'CrdR', 
-                               'Gls_1', 'Ast_1', 
-                               'market_value_euro_k', 'market_value_last_update']
-                               
-                columns_str = ', '.join(sql_columns)
-                placeholders = ', '.join(['?' for _ in sql_columns])
-                insert_query = f"INSERT INTO {STAGING_TABLE} ({columns_str}) VALUES ({placeholders})"
-                
-                # Convertir le DataFrame en une liste de tuples
-                data_to_insert = [tuple(row) for row in df_final.values]
-
-                # Exécuter l'insertion
-                cursor.executemany(insert_query, data_to_insert)
-                conn.commit()
-                
-                rows_count = len(df_final)
-                total_rows_loaded += rows_count
-                print(f"Chargement réussi : {rows_count} lignes insérées dans {STAGING_TABLE}.")
-
-            except Exception as e:
-                conn.rollback()
-                print(f"Échec critique du traitement du fichier {filename}. Annulation. Erreur : {e}")
-
-    # Fermer la connexion
+
+                # Décodage des catégories et NaN -> None uniquement ici, au moment de l'écriture
+                data_to_insert = to_records(df, final_cols)
+                conn.prepare(insert_query).executemany(data_to_insert)
+                rows_count += len(data_to_insert)
+
+            record_load(conn, STAGING_TABLE, source_name(file_path), current_hash, rows_count)
+            conn.commit()
+
+            total_rows_loaded += rows_count
+            print(f"Chargement réussi : {rows_count} lignes insérées dans {STAGING_TABLE}.")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"Échec critique du traitement du fichier {filename}. Annulation. Erreur : {e}")
+
+    # Rendre la connexion au pool
     conn.close()
-    print(f"\n✅ PROCESSUS ETL TERMINÉ. Total des lignes chargées : {total_rows_loaded}.")
+    print(f"\n✅ PROCESSUS ETL TERMINÉ. Total des lignes chargées : {total_rows_loaded} "
+          f"({skipped_files} fichier(s) inchangé(s) ignoré(s)).")
 
 # Lancer le script
 extract_transform_load_player_stats()
\ No newline at end of file
@@ -0,0 +1,320 @@
+import numpy as np
+import pandas as pd
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, DB_ERRORS
+from utils.aggregates import refresh_aggregates
+from utils.categorical import map_categorical
+from utils.date_dimension import DATE_TABLE, build_date_dimension, date_keys
+from utils.fact_partitions import replace_partitions
+from utils.gold_version import bump_load_version
+from utils.player_resolver import IDENTITY_TABLE, SOURCE_FBREF, fbref_key
+from utils.surrogate_keys import KeyMap, MISSING_SK, merge_dimension
+
+# --- 1. CONFIGURATION ---
+
+# Tables silver sources
+LEAGUE_TABLE = 'silver.League_Table_Conformed'
+TEAM_EXTRA_TABLE = 'silver.Team_extra_details'
+PLAYER_STATS_TABLE = 'silver.Player_Stats_Conformed'
+MATCHES_TABLE = 'silver.Match_Reconciled'
+TEAM_MAPPING_TABLE = 'silver.Team_Mapping'
+NATION_MAPPING_TABLE = 'silver.Nation_Mapping'
+NOTES_MAPPING_TABLE = 'silver.Notes_Mapping'
+PLAYER_IDENTITY_TABLE = IDENTITY_TABLE
+
+# Dimensions, dans l'ordre de chargement : table -> (clé de substitution, clés métier, attributs)
+DIMENSIONS = {
+    'gold.DimTime': ('Time_SK', ['Season_BK'], ['Season_Start_Year', 'Season_End_Year']),
+    # Clé intelligente AAAAMMJJ : la clé de substitution est aussi la clé métier
+    DATE_TABLE: ('Date_SK', ['Date_SK'], ['Full_Date', 'Time_SK', 'Matchweek', 'Calendar_Year', 'Month_Number',
+                                          'Month_Name', 'Year_Month', 'Day_Of_Month', 'Weekday_Number',
+                                          'Weekday_Name']),
+    'gold.DimTeam': ('Team_SK', ['Squad_Conformed_BK'], []),
+    'gold.DimNation': ('Nation_SK', ['Nation_Standard_Name_BK'], []),
+    'gold.DimPlayer': ('Player_SK', ['Player_Name_BK', 'BirthYear'], ['Current_Position', 'Nation_SK', 'Player_Id']),
+    'gold.DimNotes': ('Notes_SK', ['Notes_Standard_Name_BK'], ['Notes_Category']),
+}
+
+# Faits (remplacés par partition saison, Time_SK)
+FACT_TEAM_TABLE = 'gold.FactTeamPerformance'
+FACT_PLAYER_TABLE = 'gold.FactPlayerPerformance'
+FACT_MATCH_TABLE = 'gold.FactMatchEvent'
+
+# Note par défaut d'une équipe sans événement (comme silver.Team_extra_details)
+DEFAULT_NOTE = 'No Event'
+
+# Catégories de DimNotes (règles du package SSIS "load to gold tables")
+NOTES_CATEGORIES = {
+    '4-point deduction': 'Deduction / Penalty',
+    '8-point deduction': 'Deduction / Penalty',
+    'Relegated': 'Status Change (Relegated)',
+    'No Event': 'No Event / Mid Table',
+}
+EUROPE_PATTERN = 'Champions League|Europa League|Conference League'
+
+# Colonnes des faits : colonne gold -> colonne silver
+TEAM_MEASURES = {
+    'Final_Rank': 'Rk', 'MatchesPlayed': 'MP', 'Wins': 'W', 'Draws': 'D', 'Losses': 'L',
+    'GoalsFor': 'GF', 'GoalsAgainst': 'GA', 'GoalDifference': 'GD', 'Points': 'Pts', 'PointsPerMatch': 'Pts_per_MP',
+    'Season_Attendance': 'Season_Attendance', 'TopScorer_Goals': 'TopScorer_Goals',
+    'TopScorer_PlayerName': 'TopScorer_PlayerName', 'Goalkeeper_PlayerName': 'Goalkeeper_PlayerName',
+}
+PLAYER_MEASURES = ['MatchesPlayed', 'MinutesPlayed', 'Goals', 'Assists', 'YellowCards', 'RedCards',
+                   'Goals_Per_90', 'Assists_Per_90', 'MarketValue_Euro_k']
+MATCH_MEASURES = [
+    'MatchDate',
+    'FullTimeHomeGoals', 'FullTimeAwayGoals', 'FullTimeResult',
+    'HalfTimeHomeGoals', 'HalfTimeAwayGoals', 'HalfTimeResult',
+    'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
+    'HomeFouls', 'AwayFouls', 'HomeCorners', 'AwayCorners',
+    'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards',
+    'B365HomeOdds', 'B365DrawOdds', 'B365AwayOdds'
+]
+
+# Colonnes des faits dans l'ordre du DDL
+FACT_TEAM_COLS = ['Time_SK', 'Team_SK', 'Notes_SK'] + list(TEAM_MEASURES)
+FACT_PLAYER_COLS = ['Time_SK', 'Team_SK', 'Player_SK'] + PLAYER_MEASURES
+FACT_MATCH_COLS = ['Time_SK', 'HomeTeam_SK', 'AwayTeam_SK', 'Date_SK'] + MATCH_MEASURES
+
+# --- 2. EXTRACTION (UNE LECTURE PAR TABLE SILVER) ---
+
+def fetch_frame(conn, sql, *params) -> pd.DataFrame:
+    """Résultat complet d'une requête (décimales converties en flottants, comme pd.read_sql)."""
+    cursor = conn.execute(sql, *params)
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+
+
+def read_silver(conn):
+    league = fetch_frame(conn, f"SELECT * FROM {LEAGUE_TABLE} WHERE [Type] = 'Overall'")
+    extra = fetch_frame(conn, f"SELECT * FROM {TEAM_EXTRA_TABLE}")
+    players = fetch_frame(conn, f"SELECT * FROM {PLAYER_STATS_TABLE}")
+    matches = fetch_frame(conn, f"SELECT * FROM {MATCHES_TABLE}")
+    teams = fetch_frame(conn, f"SELECT DISTINCT Team_Standard_Name FROM {TEAM_MAPPING_TABLE}")
+    nations = fetch_frame(conn, f"SELECT DISTINCT Nation_Standard_Name FROM {NATION_MAPPING_TABLE}")
+    notes = fetch_frame(conn, f"SELECT DISTINCT Notes_Standard_Name FROM {NOTES_MAPPING_TABLE}")
+    identities = fetch_frame(conn, f"SELECT Source_Key, Player_Id FROM {PLAYER_IDENTITY_TABLE} WHERE Source = ?",
+                             SOURCE_FBREF)
+    return league, extra, players, matches, teams, nations, notes, identities
+
+
+def distinct_values(*series) -> pd.Series:
+    """Union triée des valeurs non nulles de plusieurs colonnes (membres d'une dimension)."""
+    values = pd.concat([s.dropna().astype(str) for s in series], ignore_index=True)
+    return pd.Series(np.sort(values.unique()), dtype=object)
+
+
+# --- 3. DIMENSIONS ---
+
+def notes_category(note: str) -> str:
+    if note in NOTES_CATEGORIES:
+        return NOTES_CATEGORIES[note]
+    if re.search(EUROPE_PATTERN, note):
+        return 'Qualification Europe'
+    return 'Other'
+
+
+def build_dim_time(league, extra, players, matches) -> pd.DataFrame:
+    seasons = distinct_values(league['Season'], extra['Season'], players['Season_Key'], matches['Season'])
+    return pd.DataFrame({
+        'Season_BK': seasons,
+        'Season_Start_Year': seasons.str[:4].astype(int),
+        'Season_End_Year': ('20' + seasons.str[5:7]).astype(int),
+    })
+
+
+def build_dim_date(dim_time, matches, time_keys: KeyMap) -> pd.DataFrame:
+    """Calendrier jour par jour des saisons de DimTime (utils.date_dimension), saison rattachée par Time_SK."""
+    dates = build_date_dimension(dim_time, matches)
+    dates['Time_SK'] = time_keys.lookup(dates, ['Season_BK'])
+    return dates.drop(columns='Season_BK')
+
+
+def build_dim_team(teams, league, extra, players, matches) -> pd.DataFrame:
+    # Toutes les équipes référencées par un fait (y compris celles absentes du mapping explicite)
+    names = distinct_values(teams['Team_Standard_Name'], league['Squad_Conformed'], extra['Squad_Conformed'],
+                            players['Squad_Conformed'], matches['HomeTeam_Conformed'], matches['AwayTeam_Conformed'])
+    return pd.DataFrame({'Squad_Conformed_BK': names})
+
+
+def build_dim_nation(nations, players) -> pd.DataFrame:
+    names = distinct_values(nations['Nation_Standard_Name'], players['Nation_Conformed'])
+    return pd.DataFrame({'Nation_Standard_Name_BK': names})
+
+
+def build_dim_player(players, nation_keys: KeyMap, identities) -> pd.DataFrame:
+    """
+    Un joueur par (nom, année de naissance) ; poste et nation de sa dernière saison (SCD type 1),
+    identité résolue par silver.Player_Identity (variantes d'un même joueur, profil Transfermarkt).
+    """
+    latest = (players.sort_values('Season_Key', kind='stable')
+              .drop_duplicates(['Player_Name', 'BirthYear'], keep='last')
+              .reset_index(drop=True))
+    nation_sk = nation_keys.lookup(latest, ['Nation_Conformed'])
+    player_ids = pd.Series(identities['Player_Id'].to_numpy(), index=identities['Source_Key'])
+    keys = [fbref_key(name, year) for name, year in zip(latest['Player_Name'], latest['BirthYear'])]
+    return pd.DataFrame({
+        'Player_Name_BK': latest['Player_Name'],
+        'BirthYear': pd.to_numeric(latest['BirthYear'], errors='coerce').astype('Int64'),
+        'Current_Position': latest['Position'],
+        'Nation_SK': pd.array(np.where(nation_sk == MISSING_SK, None, nation_sk), dtype='Int64'),
+        'Player_Id': pd.array(player_ids.reindex(keys).to_numpy(), dtype='Int64'),
+    })
+
+
+def build_dim_notes(notes, extra) -> pd.DataFrame:
+    names = distinct_values(notes['Notes_Standard_Name'], extra['Qualification_Notes'], pd.Series([DEFAULT_NOTE]))
+    return pd.DataFrame({'Notes_Standard_Name_BK': names,
+                         'Notes_Category': map_categorical(names.astype('category'), notes_category)})
+
+
+def load_dimension(conn, table, df, reports) -> KeyMap:
+    """Ajoute les nouveaux membres (clés de substitution existantes conservées) et retourne la correspondance."""
+    sk_column, bk_columns, attributes = DIMENSIONS[table]
+    key_map, report = merge_dimension(conn, table, sk_column, bk_columns, attributes, df)
+    print(f"-> {report}")
+    reports.append(report)
+    return key_map
+
+
+# --- 4. FAITS ---
+
+def resolve_keys(fact, table, lookups):
+    """
+    Clés étrangères d'un fait, une résolution vectorisée par clé : {colonne SK: (KeyMap, colonnes métier)}.
+    Les lignes dont une clé est introuvable sont écartées (avec avertissement).
+    """
+    keep = np.ones(len(fact), dtype=bool)
+    for sk_column, (key_map, bk_columns) in lookups.items():
+        fact[sk_column] = key_map.lookup(fact, bk_columns)
+        missing = fact[sk_column].to_numpy() == MISSING_SK
+        if missing.any():
+            print(f"⚠️ {table} : {int(missing.sum())} ligne(s) sans correspondance dans {key_map.dimension}, écartée(s).")
+        keep &= ~missing
+    return fact[keep]
+
+
+def drop_duplicate_grain(fact, table, grain):
+    duplicated = fact.duplicated(grain, keep='first')
+    if duplicated.any():
+        print(f"⚠️ {table} : {int(duplicated.sum())} doublon(s) du grain {', '.join(grain)} écarté(s).")
+    return fact[~duplicated]
+
+
+def build_fact_team(league, extra, keys) -> pd.DataFrame:
+    # Jointure interne classement général / détails d'équipe (jointure de fusion du package SSIS)
+    fact = league.merge(extra, on=['Season', 'Squad_Conformed'], how='inner')
+    fact['Qualification_Notes'] = fact['Qualification_Notes'].fillna(DEFAULT_NOTE)
+    fact = resolve_keys(fact, FACT_TEAM_TABLE, {
+        'Time_SK': (keys['gold.DimTime'], ['Season']),
+        'Team_SK': (keys['gold.DimTeam'], ['Squad_Conformed']),
+        'Notes_SK': (keys['gold.DimNotes'], ['Qualification_Notes']),
+    })
+    fact = fact.rename(columns={silver: gold for gold, silver in TEAM_MEASURES.items()})
+    return drop_duplicate_grain(fact, FACT_TEAM_TABLE, ['Time_SK', 'Team_SK'])[FACT_TEAM_COLS]
+
+
+def build_fact_player(players, keys) -> pd.DataFrame:
+    fact = resolve_keys(players.copy(), FACT_PLAYER_TABLE, {
+        'Time_SK': (keys['gold.DimTime'], ['Season_Key']),
+        'Team_SK': (keys['gold.DimTeam'], ['Squad_Conformed']),
+        'Player_SK': (keys['gold.DimPlayer'], ['Player_Name', 'BirthYear']),
+    })
+    # Un joueur homonyme d'une même équipe et saison : la ligne la plus jouée est conservée
+    fact = fact.sort_values('MinutesPlayed', ascending=False, kind='stable', na_position='last')
+    return drop_duplicate_grain(fact, FACT_PLAYER_TABLE, ['Time_SK', 'Team_SK', 'Player_SK'])[FACT_PLAYER_COLS]
+
+
+def build_fact_match(matches, keys) -> pd.DataFrame:
+    fact = resolve_keys(matches, FACT_MATCH_TABLE, {
+        'Time_SK': (keys['gold.DimTime'], ['Season']),
+        'HomeTeam_SK': (keys['gold.DimTeam'], ['HomeTeam_Conformed']),
+        'AwayTeam_SK': (keys['gold.DimTeam'], ['AwayTeam_Conformed']),
+    })
+    fact['MatchDate'] = pd.to_datetime(fact['MatchDate']).dt.date
+    fact['Date_SK'] = date_keys(fact['MatchDate'])
+    fact = drop_duplicate_grain(fact, FACT_MATCH_TABLE, ['Time_SK', 'HomeTeam_SK', 'AwayTeam_SK'])
+    # Écriture dans l'ordre des dates : les min/max de Date_SK par groupe de lignes restent étroits
+    return fact.sort_values('Date_SK', kind='stable')[FACT_MATCH_COLS]
+
+
+# --- 5. CHARGEMENT ---
+
+def run_gold_build():
+    """
+    Met à jour la couche gold en une transaction : fusion des dimensions (clés de substitution stables),
+    correspondances en mémoire, puis remplacement des seules partitions saison des faits qui ont changé.
+    """
+    conn = None
+    try:
+        conn = get_connection(stage='gold')
+        start = time.perf_counter()
+
+        league, extra, players, matches, teams, nations, notes, identities = read_silver(conn)
+        # Sans statistiques joueurs, DimPlayer et FactPlayerPerformance seraient vides sans autre signe
+        if players.empty:
+            raise ValueError(f"{PLAYER_STATS_TABLE} est vide : exécuter load/silver.Player_Stats_Conformed.py "
+                             f"avant la couche gold.")
+        print(f"Extraction terminée en {time.perf_counter() - start:.2f} s : {len(league)} classements, "
+              f"{len(extra)} détails d'équipe, {len(players)} statistiques joueurs, {len(matches)} matchs.")
+
+        keys, reports = {}, []
+        dim_time = build_dim_time(league, extra, players, matches)
+        keys['gold.DimTime'] = load_dimension(conn, 'gold.DimTime', dim_time, reports)
+        keys[DATE_TABLE] = load_dimension(conn, DATE_TABLE, build_dim_date(dim_time, matches, keys['gold.DimTime']),
+                                          reports)
+        keys['gold.DimTeam'] = load_dimension(conn, 'gold.DimTeam', build_dim_team(teams, league, extra, players, matches),
+                                              reports)
+        keys['gold.DimNation'] = load_dimension(conn, 'gold.DimNation', build_dim_nation(nations, players), reports)
+        keys['gold.DimPlayer'] = load_dimension(conn, 'gold.DimPlayer', build_dim_player(players, keys['gold.DimNation'], identities),
+                                                reports)
+        keys['gold.DimNotes'] = load_dimension(conn, 'gold.DimNotes', build_dim_notes(notes, extra), reports)
+
+        facts = {
+            FACT_TEAM_TABLE: (FACT_TEAM_COLS, build_fact_team(league, extra, keys)),
+            FACT_PLAYER_TABLE: (FACT_PLAYER_COLS, build_fact_player(players, keys)),
+            FACT_MATCH_TABLE: (FACT_MATCH_COLS, build_fact_match(matches, keys)),
+        }
+        seasons = keys['gold.DimTime'].business_keys()
+        changed = {}
+        for table, (columns, fact) in facts.items():
+            report = replace_partitions(conn, table, columns, fact)
+            changed[table] = report.changed
+            print(f"-> {report.describe(seasons)}")
+
+        # Agrégats : seules les saisons dont les faits ont changé sont recalculées
+        # (reconstruction si une dimension jointe par l'agrégat a été mise à jour)
+        for table, refresh in refresh_aggregates(conn, changed, reports):
+            print(f"-> {table} : {refresh}.")
+
+        # Nouvelle version gold (invalide les caches de résultats) si le chargement a modifié des données
+        changed_partitions = sum(len(values) for values in changed.values())
+        changed_members = sum(report.inserted + report.updated for report in reports)
+        if changed_partitions or changed_members or config.FORCE_REBUILD:
+            version = bump_load_version(conn, changed_partitions, changed_members)
+            print(f"-> Version gold {version} ({changed_partitions} partition(s), {changed_members} membre(s) modifiés).")
+        conn.commit()
+
+        print(f"🎉 Succès ! Couche gold mise à jour en {time.perf_counter() - start:.2f} s.")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+        print("Annulation de la transaction.")
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_gold_build()
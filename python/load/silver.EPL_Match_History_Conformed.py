@@ -0,0 +1,90 @@
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_connection, bulk_insert, DB_ERRORS
+from utils.categorical import map_categorical, to_categorical
+from utils.streaming import read_sql_chunks
+from utils.team_resolver import TeamResolver
+from utils.watermark import input_token, is_up_to_date, record_watermark
+
+# --- 1. CONFIGURATION ---
+
+# Tables
+BRONZE_TABLE = 'bronze.staging_epl_history'
+SILVER_DESTINATION_TABLE = 'silver.EPL_Match_History_Conformed'
+TEAM_MAPPING_TABLE = 'silver.Team_Mapping'
+
+# Entrées de l'étape : l'étape est ignorée si elles n'ont pas changé depuis le dernier chargement
+INPUT_MAPPINGS = ['team']
+
+# Colonnes à faible cardinalité, encodées en catégories dès l'extraction
+CATEGORICAL_COLUMNS = ['Season', 'HomeTeam', 'AwayTeam', 'FullTimeResult', 'HalfTimeResult']
+
+# Colonnes de comptage et de résultat, reprises telles quelles
+STAT_COLS = [
+    'FullTimeHomeGoals', 'FullTimeAwayGoals', 'FullTimeResult',
+    'HalfTimeHomeGoals', 'HalfTimeAwayGoals', 'HalfTimeResult',
+    'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
+    'HomeCorners', 'AwayCorners', 'HomeFouls', 'AwayFouls',
+    'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards'
+]
+
+# Colonnes de la table silver
+FINAL_COLS = ['Season', 'MatchDate', 'HomeTeam_Conformed', 'AwayTeam_Conformed'] + STAT_COLS
+
+# --- 2. FONCTIONS DE TRANSFORMATION ---
+
+def transform_chunk(df_bronze, resolver):
+    """Standardisation des équipes (une résolution par nom distinct) ; les autres colonnes sont déjà typées."""
+    df_silver = to_categorical(df_bronze, CATEGORICAL_COLUMNS, max_ratio=None)
+    df_silver['HomeTeam_Conformed'] = map_categorical(df_silver['HomeTeam'], resolver.standard_name)
+    df_silver['AwayTeam_Conformed'] = map_categorical(df_silver['AwayTeam'], resolver.standard_name)
+    df_silver['MatchDate'] = pd.to_datetime(df_silver['MatchDate']).dt.date
+    return df_silver[FINAL_COLS]
+
+
+def run_etl_to_silver_history():
+    """Remplace le contenu de silver.EPL_Match_History_Conformed en une transaction."""
+    conn = None
+    try:
+        conn = get_connection(stage=SILVER_DESTINATION_TABLE)
+
+        if is_up_to_date(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE])):
+            print(f"✅ Entrées inchangées depuis le dernier chargement de {SILVER_DESTINATION_TABLE} : étape ignorée.")
+            return
+
+        resolver = TeamResolver.from_reference(conn)
+        sql_bronze = (f"SELECT Season, MatchDate, HomeTeam, AwayTeam, {', '.join(STAT_COLS)} "
+                      f"FROM {BRONZE_TABLE}")
+
+        # La table est vidée puis rechargée en masse dans la même transaction
+        loaded = 0
+        conn.execute(f"DELETE FROM {SILVER_DESTINATION_TABLE}")
+        for df_bronze in read_sql_chunks(conn, sql_bronze):
+            loaded += bulk_insert(conn, SILVER_DESTINATION_TABLE, FINAL_COLS, transform_chunk(df_bronze, resolver))
+            del df_bronze
+
+        resolver.persist(conn, TEAM_MAPPING_TABLE)
+        record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+        conn.commit()
+
+        resolver.report()
+        print(f"🎉 Succès ! {loaded} matchs chargés dans {SILVER_DESTINATION_TABLE}.")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+        print("Annulation de la transaction.")
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_etl_to_silver_history()
@@ -0,0 +1,131 @@
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_connection, DB_ERRORS
+from utils.categorical import map_categorical, to_categorical
+from utils.silver_sync import SilverSync
+from utils.streaming import read_sql_chunks
+from utils.team_resolver import TeamResolver
+from utils.watermark import input_token, is_up_to_date, record_watermark
+
+# --- 1. CONFIGURATION ---
+
+# Tables bronze (une par type de classement) -> valeur de la colonne Type
+BRONZE_TABLES = {
+    'bronze.staging_league_table_overall': 'Overall',
+    'bronze.staging_league_table_home': 'Home',
+    'bronze.staging_league_table_away': 'Away',
+}
+SILVER_DESTINATION_TABLE = 'silver.League_Table_Conformed'
+TEAM_MAPPING_TABLE = 'silver.Team_Mapping'
+
+# Entrées de l'étape : l'étape est ignorée si elles n'ont pas changé depuis le dernier chargement
+# (mapping des équipes et fichiers des trois tables bronze, suivis par bronze.load_manifest)
+INPUT_MAPPINGS = ['team']
+
+# Colonnes communes aux trois tables bronze
+BRONZE_COLUMNS = ['Season', 'Rk', 'Squad', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts', 'Pts_per_MP']
+
+# Colonnes à faible cardinalité, encodées en catégories dès l'extraction
+CATEGORICAL_COLUMNS = ['Season', 'Squad', 'Type']
+
+# Colonnes entières (valeur manquante conservée)
+INT_COLS = ['Rk', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'Pts']
+
+# Clé primaire de la table silver : un classement par saison, équipe et type
+KEY_COLS = ['Season', 'Squad_Conformed', 'Type']
+
+# Colonnes de la table silver
+FINAL_COLS = ['Season', 'Rk', 'Squad_Conformed', 'Type', 'MP', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts', 'Pts_per_MP']
+
+# --- 2. FONCTIONS DE TRANSFORMATION ---
+
+def build_union_select() -> str:
+    """Les trois classements en une seule lecture, chaque branche portant son Type."""
+    bronze_list = ', '.join(f'[{col}]' for col in BRONZE_COLUMNS)
+    return '\nUNION ALL\n'.join(
+        f"SELECT {bronze_list}, '{league_type}' AS [Type] FROM {table}"
+        for table, league_type in BRONZE_TABLES.items()
+    )
+
+
+def parse_goal_difference(gd: pd.Series) -> pd.Series:
+    """'+12' -> 12, '-3' -> -3, '0' -> 0 en une opération sur la colonne ; valeur illisible -> NULL."""
+    text = gd.astype('string').str.strip().str.lstrip('+')
+    return pd.to_numeric(text, errors='coerce').astype('Int64')
+
+
+def transform_chunk(df_bronze, resolver):
+    """Transformation d'un lot bronze (sans copie du lot)."""
+    df_silver = to_categorical(df_bronze, CATEGORICAL_COLUMNS, max_ratio=None)
+
+    # Standardisation des équipes : une résolution par nom distinct (cache des mappings de référence)
+    df_silver['Squad_Conformed'] = map_categorical(df_silver['Squad'], resolver.standard_name)
+
+    # Conversions vectorisées
+    df_silver['GD'] = parse_goal_difference(df_silver['GD'])
+    df_silver['Pts_per_MP'] = pd.to_numeric(df_silver['Pts_per_MP'], errors='coerce').round(2)
+    for col in INT_COLS:
+        df_silver[col] = pd.to_numeric(df_silver[col], errors='coerce').astype('Int64')
+
+    # Clés obligatoires de la table silver
+    df_silver.dropna(subset=['Season', 'Squad_Conformed'], inplace=True)
+    return df_silver[FINAL_COLS]
+
+
+def run_etl_to_silver_league_table():
+    """
+    Met à jour silver.League_Table_Conformed en une transaction (lecture unique des trois tables) :
+    seules les lignes nouvelles, modifiées ou disparues sont appliquées (utils.silver_sync). Une clé
+    (KEY_COLS) chargée deux fois (fichier bronze en double, deux noms source d'une même équipe)
+    n'est gardée qu'une fois, dernière ligne conservée.
+    """
+    conn = None
+    try:
+        conn = get_connection(stage=SILVER_DESTINATION_TABLE)
+
+        token = input_token(conn, INPUT_MAPPINGS, list(BRONZE_TABLES))
+        if is_up_to_date(conn, SILVER_DESTINATION_TABLE, token):
+            print(f"✅ Entrées inchangées depuis le dernier chargement de {SILVER_DESTINATION_TABLE} : étape ignorée.")
+            return
+
+        resolver = TeamResolver.from_reference(conn)
+        extracted, transformed = 0, 0
+
+        # Différentiel lot par lot (les doublons de clé entre lots sont écartés par SilverSync)
+        with SilverSync(conn, SILVER_DESTINATION_TABLE, KEY_COLS) as sync:
+            for df_bronze in read_sql_chunks(conn, build_union_select()):
+                extracted += len(df_bronze)
+                df_final = transform_chunk(df_bronze, resolver)
+                transformed += len(df_final)
+                sync.add(df_final)
+                del df_bronze, df_final
+            report = sync.finish()
+
+        resolver.persist(conn, TEAM_MAPPING_TABLE)
+        record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, list(BRONZE_TABLES)))
+        conn.commit()
+
+        print(f"Extraction terminée. {extracted} lignes extraites du Bronze (overall, home, away).")
+        resolver.report()
+        if extracted != transformed:
+            print(f"⚠️ Avertissement : {extracted - transformed} lignes sans saison ou sans équipe exclues.")
+        print(f"🎉 Succès ! {report}")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+        print("Annulation de la transaction.")
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_etl_to_silver_league_table()
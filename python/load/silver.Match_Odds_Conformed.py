@@ -1,170 +1,240 @@
-import pyodbc
 import pandas as pd
-from datetime import datetime
-import numpy as np
-from io import StringIO
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, DB_ERRORS
+from utils.categorical import map_categorical, to_categorical
+from utils.corrections import CorrectionLog, apply_corrections, corrected_sql
+from utils.temporal import derive_season, format_hits, parse_dates, season_sql
+from utils.silver_sync import SilverSync, sync_from_select
+from utils.streaming import read_sql_chunks
+from utils.team_resolver import TeamResolver, resolve_source_names
+from utils.watermark import changed_sources, input_token, is_up_to_date, record_sources, record_watermark
 
 # --- 1. CONFIGURATION ---
-SQL_SERVER_NAME = '(localdb)\\MSSQLLOCALDB'
-DATABASE_NAME = 'DW_Football_Staging'
 
 # Tables
 BRONZE_TABLE = 'bronze.staging_epl_matchs'
 SILVER_DESTINATION_TABLE = 'silver.Match_Odds_Conformed'
 TEAM_MAPPING_TABLE = 'silver.Team_Mapping' 
 
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
+# Colonnes bronze à faible cardinalité, encodées en catégories dès l'extraction
+CATEGORICAL_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTR', 'HTR']
+
+# Colonnes bronze utilisées par la transformation (pas de SELECT *)
+BRONZE_COLUMNS = ['Date', 'HomeTeam', 'AwayTeam', 'FTHG', 'FTAG', 'FTR', 'HTHG', 'HTAG', 'HTR',
+                  'HS', 'AS', 'HST', 'AST', 'HF', 'AF', 'HC', 'AC', 'HY', 'AY', 'HR', 'AR',
+                  'B365H', 'B365D', 'B365A']
+
+# Entrées de l'étape : l'étape est ignorée si elles n'ont pas changé depuis le dernier chargement
+INPUT_MAPPINGS = ['team']
+
+# Clé métier d'un match (rafraîchissement incrémental par différentiel)
+BUSINESS_KEYS = ['MatchDate', 'HomeTeam_Conformed', 'AwayTeam_Conformed']
+
+# Partition de la table silver : seules les saisons des fichiers bronze nouveaux ou modifiés sont relues
+PARTITION_COLUMN = 'Season'
+
+# Colonnes de comptage bronze (FLOAT) -> colonnes silver (INT, valeur manquante = 0)
+INT_COLS_MAP = {
+    'FTHG': 'FullTimeHomeGoals', 'FTAG': 'FullTimeAwayGoals',
+    'HTHG': 'HalfTimeHomeGoals', 'HTAG': 'HalfTimeAwayGoals',
+    'HS': 'HomeShots', 'AS': 'AwayShots',
+    'HST': 'HomeShotsOnTarget', 'AST': 'AwayShotsOnTarget',
+    'HF': 'HomeFouls', 'AF': 'AwayFouls',
+    'HC': 'HomeCorners', 'AC': 'AwayCorners',
+    'HY': 'HomeYellowCards', 'AY': 'AwayYellowCards',
+    'HR': 'HomeRedCards', 'AR': 'AwayRedCards'
+}
+
+# Colonnes reprises telles quelles (résultats et cotes)
+STR_DEC_MAP = {
+    'FTR': 'FullTimeResult', 'HTR': 'HalfTimeResult',
+    'B365H': 'B365HomeOdds', 'B365D': 'B365DrawOdds', 'B365A': 'B365AwayOdds'
+}
+
+# Colonnes de la table silver
+FINAL_COLS = [
+    'MatchDate', 'Season', 'HomeTeam_Conformed', 'AwayTeam_Conformed',
+    'FullTimeHomeGoals', 'FullTimeAwayGoals', 'FullTimeResult',
+    'HalfTimeHomeGoals', 'HalfTimeAwayGoals', 'HalfTimeResult',
+    'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
+    'HomeFouls', 'AwayFouls', 'HomeCorners', 'AwayCorners',
+    'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards',
+    'B365HomeOdds', 'B365DrawOdds', 'B365AwayOdds'
+]
 
 # --- 2. FONCTIONS DE TRANSFORMATION ---
 
-def derive_season(match_date):
+def build_pushdown_select(dialect) -> str:
+    """
+    Même transformation que le mode pandas, exprimée en un seul SELECT exécuté par le moteur :
+    date typée et saison calculées en SQL, mapping des équipes par LEFT JOIN (les noms non mappés ont été
+    résolus au préalable par utils.team_resolver ; repli sur le nom source),
+    règles de correction compilées en CASE, comptages convertis en entiers. Les dates non convertibles sont exclues.
     """
-    Dérive la saison (AAAA/AA) à partir de la date du match.
-    Ex: 2015-08-08 -> 2015/16
+    expressions = {
+        'MatchDate': 'b.Match_Date',
+        'Season': season_sql(dialect, 'b.Match_Date'),
+        'HomeTeam_Conformed': corrected_sql(dialect, SILVER_DESTINATION_TABLE, 'HomeTeam_Conformed',
+                                            'COALESCE(mh.Team_Standard_Name, b.[HomeTeam])'),
+        'AwayTeam_Conformed': corrected_sql(dialect, SILVER_DESTINATION_TABLE, 'AwayTeam_Conformed',
+                                            'COALESCE(ma.Team_Standard_Name, b.[AwayTeam])'),
+        **{new: f"CAST(COALESCE(b.[{old}], 0) AS INT)" for old, new in INT_COLS_MAP.items()},
+        **{new: f"b.[{old}]" for old, new in STR_DEC_MAP.items()},
+    }
+    select_list = ',\n    '.join(expressions[col] for col in FINAL_COLS)
+    bronze_list = ', '.join(f'[{col}]' for col in BRONZE_COLUMNS)
+    return (
+        f"SELECT DISTINCT\n    {select_list}\n"
+        f"FROM (SELECT {bronze_list}, {dialect.date_sql('[Date]')} AS Match_Date FROM {BRONZE_TABLE}) AS b\n"
+        f"LEFT JOIN {TEAM_MAPPING_TABLE} AS mh ON mh.Team_Source_Name = b.[HomeTeam]\n"
+        f"LEFT JOIN {TEAM_MAPPING_TABLE} AS ma ON ma.Team_Source_Name = b.[AwayTeam]\n"
+        f"WHERE b.Match_Date IS NOT NULL"
+    )
+
+
+def bronze_seasons(conn, source_files) -> list:
     """
-    if pd.isnull(match_date):
-        return None
-    
-    match_date = pd.to_datetime(match_date)
-    year = match_date.year
-    month = match_date.month
-    
-    if month >= 8:
-        # Match en 2015-08 -> Saison 2015/16
-        start_year = year
-        end_year_abbreviated = (year + 1) % 100
-    else:
-        # Match en 2016-04 -> Saison 2015/16
-        start_year = year - 1
-        end_year_abbreviated = year % 100
-    
-    # Formatage AAAA/AA, en s'assurant que l'année abrégée a deux chiffres
-    return f'{start_year}/{end_year_abbreviated:02d}'
+    Saisons des lignes bronze des fichiers donnés, calculées par le moteur.
+    Une saison qui ne figure plus dans un fichier modifié n'est retirée qu'à la reconstruction complète (--force).
+    """
+    if not source_files:
+        return []
+    season = season_sql(conn.dialect, conn.dialect.date_sql('[Date]'))
+    rows = conn.execute(
+        f"SELECT DISTINCT {season} FROM {BRONZE_TABLE} WHERE Source_File IN ({', '.join('?' * len(source_files))})",
+        *source_files
+    ).fetchall()
+    return sorted(value for (value,) in rows if value is not None)
+
+
+def build_bronze_select(dialect, seasons) -> str:
+    """Colonnes bronze utiles ; restreintes aux saisons données (paramètres) si `seasons` n'est pas None."""
+    sql = f"SELECT {', '.join(f'[{col}]' for col in BRONZE_COLUMNS)} FROM {BRONZE_TABLE}"
+    if seasons is None:
+        return sql
+    return f"{sql} WHERE {season_sql(dialect, dialect.date_sql('[Date]'))} IN ({', '.join('?' * len(seasons))})"
+
+
+def transform_chunk(df_bronze, resolver, corrections):
+    """Transformation d'un lot bronze (sans copie du lot) ; retourne (lignes silver, formats de date reconnus)."""
+    df_silver = to_categorical(df_bronze, CATEGORICAL_COLUMNS, max_ratio=None)
+
+    # A. Dérivation et Typage de la Date (Gestion des multiples formats)
+    # Un passage vectorisé par format (JJ/MM/AAAA, JJ/MM/AA, AAAA-MM-JJ), une fois par date distincte
+    df_silver['Date_converted'], date_hits = parse_dates(df_silver['Date'])
+
+    # Dates totalement invalides : exclues (comptées dans date_hits['invalid'])
+    df_silver.dropna(subset=['Date_converted'], inplace=True)
+
+    # B. Dérivation de la Saison (une seule opération sur tableaux, bascule en août)
+    df_silver['Season'] = derive_season(df_silver['Date_converted'])
+
+    # Finalisation
+    df_silver['MatchDate'] = df_silver['Date_converted'].dt.date
+    df_silver.drop(columns=['Date', 'Date_converted'], inplace=True)
+
+    # C. Standardisation des Noms d'Équipes
+    # Lookup une fois par équipe distincte (résolution approchée si le nom est absent du mapping),
+    # le nom source est conservé s'il n'est pas résolu
+    df_silver['HomeTeam_Conformed'] = map_categorical(df_silver['HomeTeam'], resolver.standard_name)
+    df_silver['AwayTeam_Conformed'] = map_categorical(df_silver['AwayTeam'], resolver.standard_name)
+
+    # Règles de correction (utils.corrections) appliquées avant le chargement : la table n'est écrite qu'une fois
+    apply_corrections(df_silver, SILVER_DESTINATION_TABLE, corrections)
+
+    # D. Renommage et Conversion des Types
+    for old, new in INT_COLS_MAP.items():
+        df_silver[new] = pd.to_numeric(df_silver[old], errors='coerce').fillna(0).astype(int)
+
+    for old, new in STR_DEC_MAP.items():
+        df_silver[new] = df_silver[old]
+
+    # E. Sélection des colonnes finales
+    return df_silver[FINAL_COLS], date_hits
 
 
 def run_etl():
     """Exécute l'intégralité du processus ETL."""
     conn = None
     try:
-        conn = pyodbc.connect(CONN_STRING, autocommit=True)
+        conn = get_connection(autocommit=False, stage=SILVER_DESTINATION_TABLE)
         print("Connexion à la base de données établie.")
-        
-        # --- E: EXTRACTION ---
-        
-        sql_bronze = f"SELECT * FROM {BRONZE_TABLE};"
-        df_bronze = pd.read_sql(sql_bronze, conn)
-        
-        sql_mapping = f"SELECT Team_Source_Name, Team_Standard_Name FROM {TEAM_MAPPING_TABLE};"
-        df_mapping = pd.read_sql(sql_mapping, conn)
-        
-        team_map = df_mapping.set_index('Team_Source_Name')['Team_Standard_Name'].to_dict()
-        
-        print(f"Extraction terminée. {len(df_bronze)} lignes extraites du Bronze.")
-        
-        # --- T: TRANSFORMATION ---
 
-        df_silver = df_bronze.copy()
-        
-        # A. Dérivation et Typage de la Date (Gestion des multiples formats)
-        
-        df_silver['Date_str'] = df_silver['Date'].astype(str).str.strip()
-        
-        # 1. Première tentative : Format DD/MM/AAAA (ex: 24/08/2015)
-        df_silver['Date_converted'] = pd.to_datetime(
-            df_silver['Date_str'], format='%d/%m/%Y', errors='coerce'
-        )
-        
-        # 2. Deuxième tentative : Format AAAA-MM-JJ (format par défaut) pour les lignes qui ont échoué
-        mask_nat = df_silver['Date_converted'].isna()
-        
-        df_silver.loc[mask_nat, 'Date_converted'] = pd.to_datetime(
-            df_silver.loc[mask_nat, 'Date_str'], errors='coerce'
-        )
+        # Versions des mappings et fichiers bronze identiques au dernier chargement : rien à reconstruire
+        if is_up_to_date(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE])):
+            print(f"✅ Entrées inchangées depuis le dernier chargement de {SILVER_DESTINATION_TABLE} : étape ignorée.")
+            return
 
-        # 3. Gestion des NaT persistants (dates totalement invalides)
-        rows_with_invalid_date = df_silver['Date_converted'].isna().sum()
-        
-        if rows_with_invalid_date > 0:
-            print(f"⚠️ Avertissement : {rows_with_invalid_date} lignes avec des dates non convertibles détectées et exclues.")
-            df_silver.dropna(subset=['Date_converted'], inplace=True)
-            
-        # 4. Finalisation
-        df_silver['MatchDate'] = df_silver['Date_converted'].dt.date
-        df_silver.drop(columns=['Date', 'Date_str', 'Date_converted'], inplace=True)
+        # --- MODE PUSHDOWN : extraction, conformité et différentiel exécutés par le moteur ---
+        if config.SILVER_MODE == 'pushdown':
+            resolver = resolve_source_names(
+                conn, f"SELECT [HomeTeam] FROM {BRONZE_TABLE} UNION SELECT [AwayTeam] FROM {BRONZE_TABLE}"
+            )
+            resolver.report()
+            report = sync_from_select(conn, SILVER_DESTINATION_TABLE, build_pushdown_select(conn.dialect),
+                                      FINAL_COLS, BUSINESS_KEYS)
+            record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+            record_sources(conn, SILVER_DESTINATION_TABLE, INPUT_MAPPINGS, BRONZE_TABLE)
+            conn.commit()
+            print(f"🎉 ETL terminé avec succès (pushdown). {report}")
+            return
 
-        
-        # B. Dérivation de la Saison (Utilise la fonction corrigée)
-        df_silver['Season'] = df_silver['MatchDate'].apply(derive_season)
-        
-        # C. Standardisation des Noms d'Équipes
-        df_silver['HomeTeam_Conformed'] = df_silver['HomeTeam'].map(team_map).fillna(df_silver['HomeTeam'])
-        df_silver['AwayTeam_Conformed'] = df_silver['AwayTeam'].map(team_map).fillna(df_silver['AwayTeam'])
-        
-        # D. Renommage et Conversion des Types
-        
-        int_cols_map = {
-            'FTHG': 'FullTimeHomeGoals', 'FTAG': 'FullTimeAwayGoals', 
-            'HTHG': 'HalfTimeHomeGoals', 'HTAG': 'HalfTimeAwayGoals', 
-            'HS': 'HomeShots', 'AS': 'AwayShots', 
-            'HST': 'HomeShotsOnTarget', 'AST': 'AwayShotsOnTarget', 
-            'HF': 'HomeFouls', 'AF': 'AwayFouls', 
-            'HC': 'HomeCorners', 'AC': 'AwayCorners',
-            'HY': 'HomeYellowCards', 'AY': 'AwayYellowCards',
-            'HR': 'HomeRedCards', 'AR': 'AwayRedCards'
-        }
-        
-        for old, new in int_cols_map.items():
-            df_silver[new] = pd.to_numeric(df_silver[old], errors='coerce').fillna(0).astype(int)
-            
-        str_dec_map = {
-            'FTR': 'FullTimeResult', 'HTR': 'HalfTimeResult',
-            'B365H': 'B365HomeOdds', 'B365D': 'B365DrawOdds', 'B365A': 'B365AwayOdds'
-        }
-        for old, new in str_dec_map.items():
-            df_silver[new] = df_silver[old]
-            
-        # E. Sélection des colonnes finales
-        final_cols = [
-            'MatchDate', 'Season', 'HomeTeam_Conformed', 'AwayTeam_Conformed',
-            'FullTimeHomeGoals', 'FullTimeAwayGoals', 'FullTimeResult',
-            'HalfTimeHomeGoals', 'HalfTimeAwayGoals', 'HalfTimeResult',
-            'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
-            'HomeFouls', 'AwayFouls', 'HomeCorners', 'AwayCorners',
-            'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards',
-            'B365HomeOdds', 'B365DrawOdds', 'B365AwayOdds'
-        ]
-        
-        df_final = df_silver[final_cols]
-        print(f"Transformation terminée. {len(df_final)} lignes prêtes pour le chargement.")
-        
-        # --- L: CHARGEMENT ---
-        
-        cursor = conn.cursor()
-        print(f"Suppression des données existantes dans {SILVER_DESTINATION_TABLE}...")
-        cursor.execute(f"TRUNCATE TABLE {SILVER_DESTINATION_TABLE};")
-        conn.commit()
-        
-        placeholders = ', '.join(['?' for _ in final_cols])
-        insert_sql = f"INSERT INTO {SILVER_DESTINATION_TABLE} VALUES ({placeholders})"
-        
-        data_to_insert = [tuple(row) for row in df_final.replace({np.nan: None, pd.NaT: None}).values]
+        # --- E: EXTRACTION ---
+        # Le mapping des équipes (cache partagé du processus) est indexé par le résolveur. Le bronze est lu par lots
+        # dimensionnés selon le budget mémoire.
+        resolver = TeamResolver.from_reference(conn)
 
-        print(f"Début du chargement de {len(data_to_insert)} lignes...")
-        
-        cursor.executemany(insert_sql, data_to_insert)
+        # Mapping inchangé et aucun fichier retiré : seules les saisons des fichiers nouveaux ou modifiés sont
+        # relues dans le bronze et dans la table silver ; sinon reconstruction complète
+        changed_files = changed_sources(conn, SILVER_DESTINATION_TABLE, INPUT_MAPPINGS, BRONZE_TABLE)
+        seasons = None if changed_files is None else bronze_seasons(conn, changed_files)
+        if seasons is not None:
+            print(f"-> {len(changed_files)} fichier(s) bronze modifié(s) : saison(s) reconstruite(s) "
+                  f"{', '.join(seasons) or '(aucune)'}.")
+        sql_bronze = build_bronze_select(conn.dialect, seasons)
+
+        # --- T/L : TRANSFORMATION ET CHARGEMENT PAR LOT ---
+        # Seules les lignes nouvelles, modifiées ou disparues sont appliquées (MERGE / DELETE + INSERT)
+        extracted, date_hits = 0, {}
+        corrections = CorrectionLog(SILVER_DESTINATION_TABLE)
+        with SilverSync(conn, SILVER_DESTINATION_TABLE, BUSINESS_KEYS,
+                        partition_column=None if seasons is None else PARTITION_COLUMN, partitions=seasons) as sync:
+            chunks = read_sql_chunks(conn, sql_bronze, *(seasons or [])) if seasons != [] else []
+            for df_bronze in chunks:
+                extracted += len(df_bronze)
+                df_final, chunk_hits = transform_chunk(df_bronze, resolver, corrections)
+                for date_format, count in chunk_hits.items():
+                    date_hits[date_format] = date_hits.get(date_format, 0) + count
+                sync.add(df_final)
+                del df_bronze, df_final
+            report = sync.finish()
+        # Correspondances approchées acceptées : enregistrées dans le mapping avec les lignes silver
+        resolver.persist(conn, TEAM_MAPPING_TABLE)
+        # Entrées du chargement, mapping enrichi compris
+        record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+        record_sources(conn, SILVER_DESTINATION_TABLE, INPUT_MAPPINGS, BRONZE_TABLE)
         conn.commit()
 
-        print(f"🎉 ETL terminé avec succès. {len(data_to_insert)} lignes insérées dans {SILVER_DESTINATION_TABLE}.")
+        print(f"Extraction terminée. {extracted} lignes extraites du Bronze.")
+        print(f"Formats de date reconnus : {format_hits(date_hits)}")
+        # Gestion des NaT persistants (dates totalement invalides)
+        if date_hits.get('invalid', 0) > 0:
+            print(f"⚠️ Avertissement : {date_hits['invalid']} lignes avec des dates non convertibles détectées et exclues.")
+        resolver.report()
+        corrections.report()
+
+        print(f"🎉 ETL terminé avec succès. {report}")
         
-    except pyodbc.Error as ex:
+    except DB_ERRORS as ex:
         sqlstate = ex.args[0]
         print(f"❌ Erreur lors de l'exécution de l'ETL : {sqlstate}")
         print(ex)
+        if conn:
+            conn.rollback()
     except Exception as e:
         print(f"❌ Erreur Critique inattendue : {e}")
     finally:
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_connection, bulk_insert, DB_ERRORS
+
+# --- 1. CONFIGURATION ---
+
+# Tables
+HISTORY_TABLE = 'silver.EPL_Match_History_Conformed'
+ODDS_TABLE = 'silver.Match_Odds_Conformed'
+RECONCILED_TABLE = 'silver.Match_Reconciled'
+CONFLICTS_TABLE = 'silver.Match_Conflicts'
+
+# Clé d'un match commune aux deux sources
+MATCH_KEYS = ['Season', 'MatchDate', 'HomeTeam_Conformed', 'AwayTeam_Conformed']
+
+# Deuxième passe : même saison et mêmes équipes, dates distantes d'au plus TOLERANCE_DAYS jours
+TOLERANCE_DAYS = 1
+
+# Résultats et statistiques présents dans les deux sources (comparés pour le rapport de conflits)
+COUNT_COLS = [
+    'FullTimeHomeGoals', 'FullTimeAwayGoals', 'HalfTimeHomeGoals', 'HalfTimeAwayGoals',
+    'HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget',
+    'HomeCorners', 'AwayCorners', 'HomeFouls', 'AwayFouls',
+    'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards'
+]
+RESULT_COLS = ['FullTimeResult', 'HalfTimeResult']
+COMPARED_COLS = COUNT_COLS + RESULT_COLS
+
+# Cotes : uniquement dans Match_Odds_Conformed
+ODDS_COLS = ['B365HomeOdds', 'B365DrawOdds', 'B365AwayOdds']
+
+# Colonnes des tables silver
+RECONCILED_COLS = MATCH_KEYS + ['Match_Source', 'Odds_MatchDate', 'Date_Offset_Days'] + COMPARED_COLS + ODDS_COLS
+CONFLICT_COLS = MATCH_KEYS + ['Column_Name', 'History_Value', 'Odds_Value']
+
+# --- 2. EXTRACTION ---
+
+def read_source(conn, table, columns) -> pd.DataFrame:
+    cursor = conn.execute(f"SELECT {', '.join(f'[{col}]' for col in columns)} FROM {table}")
+    df = pd.DataFrame.from_records(cursor.fetchall(), columns=list(columns), coerce_float=True)
+    df['MatchDate'] = pd.to_datetime(df['MatchDate'])
+    for col in COUNT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    return df
+
+
+# --- 3. RAPPROCHEMENT ---
+
+def _one_to_one(pairs: pd.DataFrame) -> pd.DataFrame:
+    """Chaque match d'une source n'est rapproché qu'une fois (le plus petit écart de date l'emporte)."""
+    pairs = pairs.sort_values('_gap', key=lambda gap: gap.abs(), kind='stable')
+    return pairs.drop_duplicates('_h').drop_duplicates('_o')
+
+
+def match_pairs(history: pd.DataFrame, odds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Couples (ligne historique, ligne cotes) en deux passes de jointure par hachage :
+    1. clé exacte (saison, date, équipes) ;
+    2. pour les lignes restantes, clé (saison, équipes) puis écart de date <= TOLERANCE_DAYS.
+    Retourne les positions _h / _o et l'écart de date en jours (cotes - historique).
+    """
+    h = history[MATCH_KEYS].assign(_h=np.arange(len(history)))
+    o = odds[MATCH_KEYS].assign(_o=np.arange(len(odds)))
+
+    exact = h.merge(o, on=MATCH_KEYS, how='inner')[['_h', '_o']].assign(_gap=0)
+    exact = _one_to_one(exact)
+
+    team_keys = ['Season', 'HomeTeam_Conformed', 'AwayTeam_Conformed']
+    h_rest = h[~h['_h'].isin(exact['_h'])]
+    o_rest = o[~o['_o'].isin(exact['_o'])]
+    near = h_rest.merge(o_rest, on=team_keys, how='inner', suffixes=('_hist', '_odds'))
+    near['_gap'] = (near['MatchDate_odds'] - near['MatchDate_hist']).dt.days
+    near = near[near['_gap'].abs().between(1, TOLERANCE_DAYS)]
+    near = _one_to_one(near[['_h', '_o', '_gap']])
+
+    return pd.concat([exact, near], ignore_index=True)
+
+
+def conflicts_for(keys: pd.DataFrame, hist: pd.DataFrame, odds: pd.DataFrame) -> pd.DataFrame:
+    """Une ligne par (match, colonne) dont les deux sources renseignent des valeurs différentes."""
+    frames = []
+    for col in COMPARED_COLS:
+        h_values, o_values = hist[col], odds[col]
+        differs = (h_values.notna() & o_values.notna() & (h_values.astype('string') != o_values.astype('string')))
+        differs = differs.fillna(False).to_numpy(dtype=bool)
+        if differs.any():
+            frames.append(keys[differs].assign(
+                Column_Name=col,
+                History_Value=h_values[differs].astype('string').to_numpy(),
+                Odds_Value=o_values[differs].astype('string').to_numpy(),
+            ))
+    if not frames:
+        return pd.DataFrame(columns=CONFLICT_COLS)
+    return pd.concat(frames, ignore_index=True)[CONFLICT_COLS]
+
+
+def reconcile(history: pd.DataFrame, odds: pd.DataFrame):
+    """
+    Fusion des deux sources en un passage vectorisé : l'historique fait foi pour les résultats et
+    statistiques (complétés par les cotes si absents), les cotes apportent B365.
+    Retourne (matchs rapprochés, conflits, couples).
+    """
+    pairs = match_pairs(history, odds)
+    hist = history.iloc[pairs['_h'].to_numpy()].reset_index(drop=True)
+    odd = odds.iloc[pairs['_o'].to_numpy()].reset_index(drop=True)
+
+    both = hist[MATCH_KEYS].copy()
+    both['Match_Source'] = 'both'
+    both['Odds_MatchDate'] = odd['MatchDate'].to_numpy()
+    both['Date_Offset_Days'] = pairs['_gap'].to_numpy()
+    for col in COMPARED_COLS:
+        both[col] = hist[col].where(hist[col].notna(), odd[col])
+    for col in ODDS_COLS:
+        both[col] = odd[col].to_numpy()
+
+    conflicts = conflicts_for(hist[MATCH_KEYS], hist, odd)
+
+    history_only = history[~np.isin(np.arange(len(history)), pairs['_h'])].assign(
+        Match_Source='history', Odds_MatchDate=pd.NaT, Date_Offset_Days=np.nan,
+        **{col: np.nan for col in ODDS_COLS})
+    odds_only = odds[~np.isin(np.arange(len(odds)), pairs['_o'])].assign(
+        Match_Source='odds', Odds_MatchDate=lambda df: df['MatchDate'], Date_Offset_Days=np.nan)
+
+    reconciled = pd.concat([both, history_only[RECONCILED_COLS], odds_only[RECONCILED_COLS]], ignore_index=True)
+    reconciled['Date_Offset_Days'] = reconciled['Date_Offset_Days'].astype('Int64')
+    for col in COUNT_COLS:
+        reconciled[col] = reconciled[col].astype('Int64')
+    for col in ['MatchDate', 'Odds_MatchDate']:
+        reconciled[col] = pd.to_datetime(reconciled[col]).dt.date
+    conflicts['MatchDate'] = pd.to_datetime(conflicts['MatchDate']).dt.date
+    return reconciled, conflicts, pairs
+
+
+def print_match_rates(history, odds, pairs, conflicts):
+    exact = int((pairs['_gap'] == 0).sum())
+    near = len(pairs) - exact
+    print(f"Rapprochement : {exact} match(s) à clé exacte, {near} avec une tolérance de ±{TOLERANCE_DAYS} jour(s).")
+    print(f"-> Historique : {len(pairs)}/{len(history)} rapprochés ({len(pairs) / max(len(history), 1):.1%}).")
+    print(f"-> Cotes : {len(pairs)}/{len(odds)} rapprochées ({len(pairs) / max(len(odds), 1):.1%}).")
+    if len(conflicts):
+        by_column = conflicts['Column_Name'].value_counts()
+        print(f"⚠️ {len(conflicts)} valeur(s) divergente(s) sur "
+              f"{conflicts[['MatchDate', 'HomeTeam_Conformed']].drop_duplicates().shape[0]} match(s) : "
+              + ', '.join(f"{col} ({count})" for col, count in by_column.items()))
+
+
+def run_reconciliation():
+    """Remplace silver.Match_Reconciled et silver.Match_Conflicts en une transaction."""
+    conn = None
+    try:
+        conn = get_connection(stage=RECONCILED_TABLE)
+
+        history = read_source(conn, HISTORY_TABLE, MATCH_KEYS + COMPARED_COLS)
+        odds = read_source(conn, ODDS_TABLE, MATCH_KEYS + COMPARED_COLS + ODDS_COLS)
+        print(f"Extraction terminée. {len(history)} matchs historiques, {len(odds)} matchs avec cotes.")
+
+        reconciled, conflicts, pairs = reconcile(history, odds)
+
+        conn.execute(f"DELETE FROM {RECONCILED_TABLE}")
+        conn.execute(f"DELETE FROM {CONFLICTS_TABLE}")
+        loaded = bulk_insert(conn, RECONCILED_TABLE, RECONCILED_COLS, reconciled)
+        bulk_insert(conn, CONFLICTS_TABLE, CONFLICT_COLS, conflicts)
+        conn.commit()
+
+        print_match_rates(history, odds, pairs, conflicts)
+        print(f"🎉 Succès ! {loaded} matchs chargés dans {RECONCILED_TABLE}, "
+              f"{len(conflicts)} conflit(s) dans {CONFLICTS_TABLE}.")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+        print("Annulation de la transaction.")
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_reconciliation()
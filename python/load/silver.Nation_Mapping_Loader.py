@@ -1,21 +1,17 @@
-import pyodbc
 from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.session import session
+from utils.mapping_sync import sync_mapping
 
 # --- 1. CONFIGURATION DU PROJET ---
 
-# Informations de Connexion SQL Server
-SQL_SERVER_NAME = '(localdb)\\MSSQLLOCALDB'
-DATABASE_NAME = 'DW_Football_Staging'
+# Table cible (la connexion est gérée par utils.db)
 MAPPING_TABLE = 'silver.Nation_Mapping'
 
-# Chaîne de connexion SQL Server
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
-
 # Dictionnaire de mapping fourni par l'utilisateur (Source Key -> Standard Name)
 country_dict = {
     "uzUZB": "Ouzbékistan", "slSLE": "Sierra Leone", "gaGAB": "Gabon", "gtGUA": "Guatemala", "iqIRQ": "Irak",
@@ -51,43 +47,29 @@ def prepare_nation_data(raw_dict: Dict[str, str]) -> List[Tuple[str, str]]:
     return list(raw_dict.items())
 
 
-def populate_nation_mapping(conn_string: str, mapping_data: List[Tuple[str, str]], mapping_table: str):
+def populate_nation_mapping(mapping_data: List[Tuple[str, str]], mapping_table: str):
     """
-    Vide la table de mapping et insère les données préparées.
+    Aligne la table de mapping sur les données préparées (différentiel, une seule transaction).
     """
     if not mapping_data:
         print("Erreur : Les données de mapping sont vides. Aucune insertion effectuée.")
         return
 
     try:
-        with pyodbc.connect(conn_string) as conn:
-            conn.autocommit = False 
-            with conn.cursor() as cursor:
-                print(f"Connexion à SQL Server établie sur [{DATABASE_NAME}].")
+        # Portée transactionnelle de l'étape : validation en sortie, annulation en cas d'erreur
+        with session(mapping_table) as conn:
+            print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
+
+            # Seul le différentiel est appliqué ; nouvelle version du mapping s'il y a un changement
+            change = sync_mapping(conn, 'nation', dict(mapping_data))
+            conn.commit()
 
-                # 1. EXÉCUTION DE LA COMMANDE TRUNCATE
-                truncate_command = f"TRUNCATE TABLE {mapping_table};"
-                print(f"Exécution : {truncate_command}")
-                cursor.execute(truncate_command) 
-                
-                # 2. Préparation de la requête d'insertion (deux colonnes seulement)
-                insert_query = f"INSERT INTO {mapping_table} (Nation_Source_Key, Nation_Standard_Name) VALUES (?, ?)"
-                
-                # 3. Exécution de l'insertion 
-                cursor.executemany(insert_query, mapping_data)
-                
-                # 4. Validation de la transaction
-                conn.commit()
-                
-                print(f"\n✅ CHARGEMENT TERMINÉ. {len(mapping_data)} nations insérées dans {mapping_table}.")
+            print(f"\n✅ SYNCHRONISATION TERMINÉE ({mapping_table}). {change}")
 
     except Exception as e:
-        print(f"Échec critique de l'insertion dans la table {mapping_table}. Erreur : {e}")
-        try:
-            conn.rollback()
-            print("Transaction annulée.")
-        except:
-            pass
+        print(f"Échec critique de la synchronisation de la table {mapping_table}. Erreur : {e}")
+        # La session a déjà annulé la transaction
+        print("Transaction annulée.")
 
 # --- 4. EXÉCUTION DU SCRIPT ---
 if __name__ == "__main__":
@@ -98,4 +80,4 @@ if __name__ == "__main__":
     print("--- DÉBUT DE LA CRÉATION EXPLICITE DE silver.Nation_Mapping ---")
     
     # Étape 2 : Chargement dans SQL Server
-    populate_nation_mapping(CONN_STRING, data_to_insert, MAPPING_TABLE)
\ No newline at end of file
+    populate_nation_mapping(data_to_insert, MAPPING_TABLE)
\ No newline at end of file
@@ -1,21 +1,17 @@
-import pyodbc
 from typing import Dict, List, Tuple
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection
+from utils.mapping_sync import sync_mapping
 
 # --- 1. CONFIGURATION DU PROJET ---
 
-# Informations de Connexion SQL Server
-SQL_SERVER_NAME = '(localdb)\\MSSQLLOCALDB'
-DATABASE_NAME = 'DW_Football_Staging'
+# Table cible (la connexion est gérée par utils.db)
 MAPPING_TABLE = 'silver.Notes_Mapping'
 
-# Chaîne de connexion SQL Server
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
-
 # Dictionnaire de mapping fourni par l'utilisateur (Source Key -> Standard Name)
 team_notes_dict = {
     "? Champions League": "Champions League",
@@ -50,39 +46,30 @@ def prepare_notes_data(raw_dict: Dict[str, str]) -> List[Tuple[str, str]]:
     return list(raw_dict.items())
 
 
-def populate_notes_mapping(conn_string: str, mapping_data: List[Tuple[str, str]], mapping_table: str):
+def populate_notes_mapping(mapping_data: List[Tuple[str, str]], mapping_table: str):
     """
-    Vide la table de mapping et insère les données préparées.
+    Aligne la table de mapping sur les données préparées (différentiel, une seule transaction).
     """
     if not mapping_data:
         print("Erreur : Les données de mapping sont vides. Aucune insertion effectuée.")
         return
 
     try:
-        conn = pyodbc.connect(conn_string)
+        conn = get_connection(stage=mapping_table)
         conn.autocommit = False 
-        cursor = conn.cursor()
         
-        print(f"Connexion à SQL Server établie sur [{DATABASE_NAME}].")
+        print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
 
-        # 1. TRUNCATE (Vider la table)
-        truncate_command = f"TRUNCATE TABLE {mapping_table};"
-        print(f"Exécution : {truncate_command}")
-        cursor.execute(truncate_command) 
-        
-        # 2. Préparation de la requête d'insertion (deux colonnes)
-        insert_query = f"INSERT INTO {mapping_table} (Notes_Source_Key, Notes_Standard_Name) VALUES (?, ?)"
-        
-        # 3. Exécution de l'insertion 
-        cursor.executemany(insert_query, mapping_data)
+        # Seul le différentiel est appliqué ; nouvelle version du mapping s'il y a un changement
+        change = sync_mapping(conn, 'notes', dict(mapping_data))
         
-        # 4. Validation de la transaction
+        # Validation de la transaction
         conn.commit()
         
-        print(f"\n✅ CHARGEMENT TERMINÉ. {len(mapping_data)} notes/qualifications insérées dans {mapping_table}.")
+        print(f"\n✅ SYNCHRONISATION TERMINÉE ({mapping_table}). {change}")
 
     except Exception as e:
-        print(f"Échec critique de l'insertion dans la table {mapping_table}. Erreur : {e}")
+        print(f"Échec critique de la synchronisation de la table {mapping_table}. Erreur : {e}")
         try:
             conn.rollback()
             print("Transaction annulée.")
@@ -101,4 +88,4 @@ if __name__ == "__main__":
     print("--- DÉBUT DE LA CRÉATION EXPLICITE DE silver.Notes_Mapping ---")
     
     # Étape 2 : Chargement dans SQL Server
-    populate_notes_mapping(CONN_STRING, data_to_insert, MAPPING_TABLE)
\ No newline at end of file
+    populate_notes_mapping(data_to_insert, MAPPING_TABLE)
\ No newline at end of file
@@ -0,0 +1,153 @@
+from collections import Counter, defaultdict
+import datetime
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, DB_ERRORS
+from utils.json_stream import flatten_record, iter_json_records
+from utils.player_resolver import (IDENTITY_TABLE, SOURCE_FBREF, SOURCE_TRANSFERMARKT, fbref_key,
+                                   resolve_players)
+from utils.reference_cache import get_mapping
+
+# --- 1. CONFIGURATION DU PROJET ---
+
+# Joueurs FBref (table conformée, nations standardisées)
+PLAYER_STATS_TABLE = 'silver.Player_Stats_Conformed'
+
+# Fichiers bruts enrichis par extract/trasfert_market_scraper.py (objet 'player_info' de chaque ligne FBref)
+TRANSFERMARKT_DIRECTORY = os.path.join(config.RAW_DIR, 'players_info')
+JSON_PATTERN = '.json'
+
+# Profil Transfermarkt : nom d'usage (URL) et identifiant numérique, date de naissance 'JJ/MM/AAAA (âge)'
+PROFILE_PATTERN = re.compile(r'transfermarkt\.[a-z.]+/([^/]+)/profil/spieler/(\d+)')
+BIRTH_DATE_PATTERN = re.compile(r'(\d{2})/(\d{2})/(\d{4})')
+
+# Citoyenneté Transfermarkt (nom anglais) -> code nation FBref : code majoritaire parmi les lignes enrichies
+# pour la première citoyenneté listée (sélection nationale en général, celle que retient FBref),
+# retenu s'il représente au moins cette part des lignes de la citoyenneté
+MIN_NATION_SHARE = 0.5
+
+# --- 2. EXTRACTION ---
+
+def read_fbref_players(conn) -> pd.DataFrame:
+    """Un enregistrement par clé de gold.DimPlayer (nom, année de naissance), avec toutes ses nations."""
+    rows = conn.execute(
+        f"SELECT DISTINCT Player_Name, BirthYear, Nation_Conformed FROM {PLAYER_STATS_TABLE}"
+    ).fetchall()
+    nations = defaultdict(set)
+    for name, birth_year, nation in rows:
+        nations[(name, None if birth_year is None else int(birth_year))].add(nation)
+    return pd.DataFrame({
+        'Source': SOURCE_FBREF,
+        'Source_Key': [fbref_key(name, year) for name, year in nations],
+        'Player_Name': [name for name, _ in nations],
+        'BirthYear': pd.array([year for _, year in nations], dtype='Int64'),
+        'Nations': [sorted(n for n in values if n) for values in nations.values()],
+        'Birth_Date': None,
+    }, columns=['Source', 'Source_Key', 'Player_Name', 'BirthYear', 'Nations', 'Birth_Date'])
+
+
+def parse_birth_date(text):
+    match = BIRTH_DATE_PATTERN.search(text or '')
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def read_transfermarkt_profiles():
+    """
+    Profils distincts (URL canonique) des fichiers enrichis, lus en continu.
+    Retourne les profils et les votes (première citoyenneté, code nation FBref de la ligne) qui servent
+    à traduire les citoyennetés.
+    """
+    profiles, votes = {}, Counter()
+    for filename in sorted(os.listdir(TRANSFERMARKT_DIRECTORY)):
+        if not filename.endswith(JSON_PATTERN):
+            continue
+        for record in iter_json_records(os.path.join(TRANSFERMARKT_DIRECTORY, filename)):
+            record = flatten_record(record)
+            match = PROFILE_PATTERN.search(record.get('player_info_profile_url') or '')
+            if not match:
+                continue
+            citizenships = [c.strip() for c in (record.get('player_info_citizenship') or '').split('\n') if c.strip()]
+            if citizenships:
+                votes[(citizenships[0], record.get('Nation'))] += 1
+
+            slug, profile_id = match.groups()
+            url = f"https://www.transfermarkt.com/{slug}/profil/spieler/{profile_id}"
+            if url in profiles:
+                continue
+            birth_date = parse_birth_date(record.get('player_info_date_of_birth'))
+            profiles[url] = {'Source': SOURCE_TRANSFERMARKT, 'Source_Key': url, 'Player_Name': slug.replace('-', ' '),
+                             'BirthYear': birth_date.year if birth_date else None,
+                             'Citizenships': citizenships, 'Birth_Date': birth_date}
+    return pd.DataFrame(list(profiles.values())), votes
+
+
+def citizenship_nations(votes: Counter, nation_mapping) -> dict:
+    """Citoyenneté Transfermarkt -> nation standard (silver.Nation_Mapping), par vote majoritaire sur les codes FBref."""
+    by_citizenship = defaultdict(Counter)
+    for (citizenship, code), count in votes.items():
+        if code:
+            by_citizenship[citizenship][code] += count
+    translations = {}
+    for citizenship, codes in by_citizenship.items():
+        code, count = codes.most_common(1)[0]
+        if count / sum(codes.values()) >= MIN_NATION_SHARE and code in nation_mapping:
+            translations[citizenship] = nation_mapping[code]
+    return translations
+
+
+# --- 3. RÉSOLUTION ---
+
+def run_player_identity_resolution():
+    """
+    Rapproche les joueurs FBref et les profils Transfermarkt (blocage année de naissance + jeton du nom,
+    score nom / nation / date de naissance) et met à jour silver.Player_Identity en une transaction.
+    """
+    conn = None
+    try:
+        conn = get_connection(stage=IDENTITY_TABLE)
+        start = time.perf_counter()
+
+        fbref = read_fbref_players(conn)
+        profiles, votes = read_transfermarkt_profiles()
+        translations = citizenship_nations(votes, get_mapping(conn, 'nation'))
+        if not profiles.empty:
+            profiles['Nations'] = profiles['Citizenships'].map(
+                lambda values: [translations[c] for c in values if c in translations])
+            profiles = profiles.drop(columns='Citizenships')
+        print(f"Extraction terminée : {len(fbref)} joueur(s) FBref, {len(profiles)} profil(s) Transfermarkt, "
+              f"{len(translations)} citoyenneté(s) traduite(s).")
+
+        records = pd.concat([fbref, profiles], ignore_index=True)
+        report = resolve_players(conn, records)
+        conn.commit()
+        print(f"-> {report}")
+        print(f"🎉 Succès ! {IDENTITY_TABLE} mise à jour en {time.perf_counter() - start:.2f} s.")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur SQL/ODBC : {sqlstate}")
+        print("Annulation de la transaction.")
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+# --- EXÉCUTION ---
+if __name__ == "__main__":
+    run_player_identity_resolution()
@@ -0,0 +1,178 @@
+import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, DB_ERRORS
+from utils.categorical import map_categorical, to_categorical
+from utils.corrections import CorrectionLog, apply_corrections, corrected_sql
+from utils.reference_cache import get_mapping
+from utils.silver_sync import SilverSync, sync_from_select
+from utils.streaming import read_sql_chunks
+from utils.team_resolver import TeamResolver, resolve_source_names
+from utils.watermark import input_token, is_up_to_date, record_watermark
+
+# --- 1. CONFIGURATION ---
+
+# Tables
+BRONZE_TABLE = 'bronze.staging_player_stats'
+SILVER_DESTINATION_TABLE = 'silver.Player_Stats_Conformed'
+TEAM_MAPPING_TABLE = 'silver.Team_Mapping'
+NATION_MAPPING_TABLE = 'silver.Nation_Mapping'
+
+# Colonnes bronze à faible cardinalité, encodées en catégories dès l'extraction
+CATEGORICAL_COLUMNS = ['Season', 'Nation', 'Pos', 'Squad']
+
+# Entrées de l'étape : l'étape est ignorée si elles n'ont pas changé depuis le dernier chargement
+INPUT_MAPPINGS = ['team', 'nation']
+
+# Clé métier d'une ligne joueur (un joueur par équipe et par saison)
+BUSINESS_KEYS = ['Season_Key', 'Squad_Conformed', 'Player_Name']
+
+# Colonnes bronze -> colonnes silver (reprises telles quelles)
+RENAME_MAP = {
+    'Season': 'Season_Key', 'Player': 'Player_Name', 'Pos': 'Position', 'Born': 'BirthYear',
+}
+
+# Colonnes de comptage bronze -> colonnes silver (INT, valeur manquante conservée)
+INT_COLS_MAP = {
+    'Age': 'Age', 'MP': 'MatchesPlayed', 'Starts': 'Starts', 'Min': 'MinutesPlayed',
+    'Gls': 'Goals', 'Ast': 'Assists', 'CrdY': 'YellowCards', 'CrdR': 'RedCards',
+    'market_value_euro_k': 'MarketValue_Euro_k',
+}
+
+# Colonnes décimales bronze -> colonnes silver
+DEC_COLS_MAP = {'90s': 'NinetyMinsPlayed', 'Gls_1': 'Goals_Per_90', 'Ast_1': 'Assists_Per_90'}
+
+# Colonnes bronze utilisées par la transformation (pas de SELECT *)
+BRONZE_COLUMNS = ['Season', 'Player', 'Nation', 'Pos', 'Squad', 'Born', *INT_COLS_MAP, *DEC_COLS_MAP,
+                  'market_value_last_update']
+
+# Colonnes de la table silver (ordre du DDL)
+FINAL_COLS = [
+    'Season_Key', 'Squad_Conformed', 'Nation_Conformed', 'Player_Name', 'Position', 'Age', 'BirthYear',
+    'MatchesPlayed', 'Starts', 'MinutesPlayed', 'NinetyMinsPlayed', 'Goals', 'Assists', 'YellowCards', 'RedCards',
+    'Goals_Per_90', 'Assists_Per_90', 'MarketValue_Euro_k', 'MarketValue_LastUpdate'
+]
+
+# --- 2. FONCTIONS DE TRANSFORMATION ---
+
+def build_pushdown_select(dialect) -> str:
+    """
+    Même transformation que le mode pandas, exprimée en un seul SELECT exécuté par le moteur :
+    mapping des équipes et des nations par LEFT JOIN (repli sur la valeur source), règles de correction
+    compilées en CASE (nations tronquées, position principale), date de mise à jour typée par le moteur.
+    """
+    expressions = {
+        'Season_Key': 'b.[Season]',
+        'Squad_Conformed': 'COALESCE(tm.Team_Standard_Name, b.[Squad])',
+        'Nation_Conformed': corrected_sql(dialect, SILVER_DESTINATION_TABLE, 'Nation_Conformed',
+                                          'COALESCE(nm.Nation_Standard_Name, b.[Nation])'),
+        'Player_Name': 'b.[Player]',
+        'Position': corrected_sql(dialect, SILVER_DESTINATION_TABLE, 'Position', 'b.[Pos]'),
+        'BirthYear': 'b.[Born]',
+        **{new: f"CAST(b.[{old}] AS INT)" for old, new in INT_COLS_MAP.items()},
+        **{new: f"b.[{old}]" for old, new in DEC_COLS_MAP.items()},
+        'MarketValue_LastUpdate': dialect.date_sql('CAST(b.[market_value_last_update] AS VARCHAR(30))'),
+    }
+    select_list = ',\n    '.join(expressions[col] for col in FINAL_COLS)
+    return (
+        f"SELECT\n    {select_list}\n"
+        f"FROM {BRONZE_TABLE} AS b\n"
+        f"LEFT JOIN {TEAM_MAPPING_TABLE} AS tm ON tm.Team_Source_Name = b.[Squad]\n"
+        f"LEFT JOIN {NATION_MAPPING_TABLE} AS nm ON nm.Nation_Source_Key = b.[Nation]"
+    )
+
+
+def transform_chunk(df_bronze, resolver, nation_map, corrections):
+    """Transformation d'un lot bronze (sans copie du lot) ; retourne les lignes silver."""
+    df_silver = to_categorical(df_bronze, CATEGORICAL_COLUMNS, max_ratio=None)
+
+    # A. Standardisation des clés (une fois par valeur distincte)
+    # Équipe : résolution approchée des noms absents du mapping, repli sur le nom source
+    df_silver['Squad_Conformed'] = map_categorical(df_silver['Squad'], resolver.standard_name)
+    # Nation : code FBref ('engENG') -> nom complet, repli sur le code source
+    df_silver['Nation_Conformed'] = nation_map.map(df_silver['Nation'])
+    df_silver.rename(columns=RENAME_MAP, inplace=True)
+
+    # B. Règles de correction (utils.corrections) appliquées avant le chargement : la table n'est écrite qu'une fois
+    apply_corrections(df_silver, SILVER_DESTINATION_TABLE, corrections)
+
+    # C. Conversion des types
+    for old, new in INT_COLS_MAP.items():
+        df_silver[new] = pd.to_numeric(df_silver[old], errors='coerce').astype('Int64')
+    for old, new in DEC_COLS_MAP.items():
+        df_silver[new] = pd.to_numeric(df_silver[old], errors='coerce').astype(float)
+    df_silver['BirthYear'] = pd.to_numeric(df_silver['BirthYear'], errors='coerce').astype('Int64')
+    update_dates = pd.to_datetime(df_silver['market_value_last_update'], errors='coerce')
+    df_silver['MarketValue_LastUpdate'] = update_dates.dt.date.where(update_dates.notna(), None)
+
+    return df_silver[FINAL_COLS]
+
+
+def run_etl():
+    """Exécute l'intégralité du processus ETL."""
+    conn = None
+    try:
+        conn = get_connection(autocommit=False, stage=SILVER_DESTINATION_TABLE)
+        print("Connexion à la base de données établie.")
+
+        # Versions des mappings et fichiers bronze identiques au dernier chargement : rien à reconstruire
+        if is_up_to_date(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE])):
+            print(f"✅ Entrées inchangées depuis le dernier chargement de {SILVER_DESTINATION_TABLE} : étape ignorée.")
+            return
+
+        # --- MODE PUSHDOWN : extraction, conformité et différentiel exécutés par le moteur ---
+        if config.SILVER_MODE == 'pushdown':
+            resolver = resolve_source_names(conn, f"SELECT DISTINCT [Squad] FROM {BRONZE_TABLE}")
+            resolver.report()
+            report = sync_from_select(conn, SILVER_DESTINATION_TABLE, build_pushdown_select(conn.dialect),
+                                      FINAL_COLS, BUSINESS_KEYS)
+            record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+            conn.commit()
+            print(f"🎉 ETL terminé avec succès (pushdown). {report}")
+            return
+
+        # --- E: EXTRACTION ---
+        # Mappings de référence (cache partagé du processus) ; le bronze est lu par lots
+        resolver = TeamResolver.from_reference(conn)
+        nation_map = get_mapping(conn, 'nation')
+
+        sql_bronze = f"SELECT {', '.join(f'[{col}]' for col in BRONZE_COLUMNS)} FROM {BRONZE_TABLE};"
+
+        # --- T/L : TRANSFORMATION ET CHARGEMENT PAR LOT ---
+        # Seules les lignes nouvelles, modifiées ou disparues sont appliquées (MERGE / DELETE + INSERT)
+        extracted = 0
+        corrections = CorrectionLog(SILVER_DESTINATION_TABLE)
+        with SilverSync(conn, SILVER_DESTINATION_TABLE, BUSINESS_KEYS) as sync:
+            for df_bronze in read_sql_chunks(conn, sql_bronze):
+                extracted += len(df_bronze)
+                sync.add(transform_chunk(df_bronze, resolver, nation_map, corrections))
+                del df_bronze
+            report = sync.finish()
+        # Correspondances approchées acceptées : enregistrées dans le mapping avec les lignes silver
+        resolver.persist(conn, TEAM_MAPPING_TABLE)
+        record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+        conn.commit()
+
+        print(f"Extraction terminée. {extracted} lignes extraites du Bronze.")
+        resolver.report()
+        corrections.report()
+        print(f"🎉 ETL terminé avec succès. {report}")
+
+    except DB_ERRORS as ex:
+        sqlstate = ex.args[0]
+        print(f"❌ Erreur lors de l'exécution de l'ETL : {sqlstate}")
+        print(ex)
+        if conn:
+            conn.rollback()
+    except Exception as e:
+        print(f"❌ Erreur Critique inattendue : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+
+if __name__ == '__main__':
+    run_etl()
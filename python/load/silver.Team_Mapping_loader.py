@@ -1,21 +1,18 @@
-import pyodbc
-from typing import Dict, List, Tuple
+from typing import Dict
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.session import session
+from utils.mapping_sync import sync_mapping
+from utils.team_resolver import SOURCE_EXPLICIT
 
 # --- 1. CONFIGURATION DU PROJET ---
 
-# Informations de Connexion SQL Server
-SQL_SERVER_NAME = '(localdb)\\MSSQLLocalDB'
-DATABASE_NAME = 'DW_Football_Staging'
+# Table cible (la connexion est gérée par utils.db)
 MAPPING_TABLE = 'silver.Team_Mapping'
 
-# Chaîne de connexion SQL Server
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
-
 # Liste des noms d'équipe standardisés (pour référence)
 STANDARD_TEAMS_FINAL = {
     "Arsenal", "Aston Villa FC", "AFC Bournemouth", "Brentford FC", "Brighton & Hove Albion FC", "Burnley FC", 
@@ -24,7 +21,10 @@ STANDARD_TEAMS_FINAL = {
     "Luton Town FC", "Manchester City FC", "Manchester United FC", "Middlesbrough FC", "Newcastle United FC", 
     "Norwich City FC", "Nottingham Forest FC", "Queens Park Rangers FC (QPR)", "Sheffield United FC", 
     "Southampton FC", "Stoke City FC", "Sunderland AFC", "Swansea City AFC", "Tottenham Hotspur FC", 
-    "Watford FC", "West Bromwich Albion FC (West Brom)", "West Ham United FC", "Wolverhampton Wanderers FC (Wolves)"
+    "Watford FC", "West Bromwich Albion FC (West Brom)", "West Ham United FC", "Wolverhampton Wanderers FC (Wolves)",
+    # Clubs de l'historique uniquement
+    "Birmingham City FC", "Blackburn Rovers FC", "Blackpool FC", "Bolton Wanderers FC", "Bradford City AFC",
+    "Charlton Athletic FC", "Coventry City FC", "Derby County FC", "Portsmouth FC", "Reading FC", "Wigan Athletic FC"
 }
 
 
@@ -96,56 +96,52 @@ EXPLICIT_TEAM_MAPPING: Dict[str, str] = {
     "Newcastle Utd": "Newcastle United FC",
     "Nott'ham Forest": "Nottingham Forest FC",
     "Sheffield Utd": "Sheffield United FC",
+
+    # Historique uniquement (clubs absents de la Premier League depuis 2014/15)
+    "Birmingham": "Birmingham City FC",
+    "Blackburn": "Blackburn Rovers FC",
+    "Blackpool": "Blackpool FC",
+    "Bolton": "Bolton Wanderers FC",
+    "Bradford": "Bradford City AFC",
+    "Charlton": "Charlton Athletic FC",
+    "Coventry": "Coventry City FC",
+    "Derby": "Derby County FC",
+    "Portsmouth": "Portsmouth FC",
+    "Reading": "Reading FC",
+    "Wigan": "Wigan Athletic FC",
 }
 
 
-# --- 3. FONCTION D'INSERTION SÉCURISÉE ---
+# --- 3. FONCTION DE SYNCHRONISATION ---
 
-def populate_team_mapping(conn_string: str, mapping_data: Dict[str, str], mapping_table: str):
+def populate_team_mapping(mapping_data: Dict[str, str], mapping_table: str):
     """
-    Exécute TRUNCATE TABLE et insère le dictionnaire de correspondances.
+    Aligne les correspondances explicites sur le dictionnaire (différentiel, une seule transaction) ;
+    les correspondances approchées enregistrées par utils.team_resolver sont conservées
+    (sauf si le dictionnaire couvre le même nom).
     """
     if not mapping_data:
         print("Erreur : Le dictionnaire de mapping est vide. Aucune insertion effectuée.")
         return
 
-    # Convertir le dictionnaire en liste de tuples (Source, Standard) pour executemany
-    insertion_data: List[Tuple[str, str]] = list(mapping_data.items())
-    
     try:
-        with pyodbc.connect(conn_string) as conn:
-            # Démarrer une transaction
-            conn.autocommit = False 
-            with conn.cursor() as cursor:
-                print(f"Connexion à SQL Server établie sur [{DATABASE_NAME}].")
+        # Portée transactionnelle de l'étape : validation en sortie, annulation en cas d'erreur
+        with session(mapping_table) as conn:
+            print(f"Connexion établie sur [{config.DATABASE_NAME}] (moteur {conn.backend}).")
+
+            # Seul le différentiel est appliqué ; nouvelle version du mapping s'il y a un changement
+            change = sync_mapping(conn, 'team', mapping_data, origin=SOURCE_EXPLICIT)
+            conn.commit()
 
-                # 1. EXÉCUTION DE LA COMMANDE TRUNCATE (Demandée par l'utilisateur)
-                truncate_command = f"TRUNCATE TABLE {mapping_table};"
-                print(f"Exécution : {truncate_command}")
-                cursor.execute(truncate_command) 
-                
-                # 2. Préparation de la requête d'insertion
-                insert_query = f"INSERT INTO {mapping_table} (Team_Source_Name, Team_Standard_Name) VALUES (?, ?)"
-                
-                # 3. Exécution de l'insertion 
-                cursor.executemany(insert_query, insertion_data)
-                
-                # 4. Validation de la transaction
-                conn.commit()
-                
-                print(f"\n✅ CHARGEMENT TERMINÉ. {len(insertion_data)} paires (Source -> Standard) insérées dans {mapping_table}.")
+            print(f"\n✅ SYNCHRONISATION TERMINÉE ({mapping_table}). {change}")
 
     except Exception as e:
-        print(f"Échec critique de l'insertion dans la table {mapping_table}. Erreur : {e}")
-        # Annulation en cas d'erreur
-        try:
-            conn.rollback()
-            print("Transaction annulée.")
-        except:
-            pass
+        print(f"Échec critique de la synchronisation de la table {mapping_table}. Erreur : {e}")
+        # La session a déjà annulé la transaction
+        print("Transaction annulée.")
 
 # --- 4. EXÉCUTION DU SCRIPT ---
 if __name__ == "__main__":
     
     print("--- DÉBUT DE LA CRÉATION EXPLICITE DE silver.Team_Mapping ---")
-    populate_team_mapping(CONN_STRING, EXPLICIT_TEAM_MAPPING, MAPPING_TABLE)
\ No newline at end of file
+    populate_team_mapping(EXPLICIT_TEAM_MAPPING, MAPPING_TABLE)
\ No newline at end of file
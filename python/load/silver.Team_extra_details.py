@@ -1,11 +1,18 @@
-import pyodbc
 import pandas as pd
-import io
-import re
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.db import get_connection, bulk_insert, create_temp_table, DB_ERRORS
+from utils.categorical import map_categorical, to_categorical
+from utils.reference_cache import get_mapping
+from utils.silver_sync import SilverSync, sync_from_select
+from utils.streaming import read_sql_chunks
+from utils.team_resolver import TeamResolver, resolve_source_names
+from utils.watermark import input_token, is_up_to_date, record_watermark
 
 # --- 1. CONFIGURATION ---
-SQL_SERVER_NAME = '(localdb)\\MSSQLLOCALDB'
-DATABASE_NAME = 'DW_Football_Staging'
 
 # Tables
 BRONZE_TABLE = 'bronze.staging_league_table_overall'
@@ -13,137 +20,191 @@ SILVER_DESTINATION_TABLE = 'silver.Team_extra_details'
 TEAM_MAPPING_TABLE = 'silver.Team_Mapping'
 NOTES_MAPPING_TABLE = 'silver.Notes_Mapping'
 
-CONN_STRING = (
-    f'Driver={{ODBC Driver 17 for SQL Server}};'
-    f'Server={SQL_SERVER_NAME};'
-    f'Database={DATABASE_NAME};'
-    f'Trusted_Connection=yes;'
-)
+# Colonnes bronze à faible cardinalité, encodées en catégories dès l'extraction
+CATEGORICAL_COLUMNS = ['Season', 'Squad', 'Notes']
+
+# Entrées de l'étape : l'étape est ignorée si elles n'ont pas changé depuis le dernier chargement
+# (la table bronze doit être suivie par bronze.load_manifest)
+INPUT_MAPPINGS = ['team', 'notes']
+
+# Clé métier (rafraîchissement incrémental par différentiel)
+BUSINESS_KEYS = ['Season', 'Squad_Conformed']
+
+# Colonnes de la table silver
+FINAL_COLS = [
+    'Season', 'Squad_Conformed', 'Season_Attendance',
+    'TopScorer_PlayerName', 'TopScorer_Goals', 'Goalkeeper_PlayerName',
+    'Qualification_Notes'
+]
+
+# Table de liaison des meilleurs buteurs (plusieurs joueurs possibles par équipe et saison)
+SCORERS_TABLE = 'silver.Team_Top_Scorers'
+SCORER_KEYS = ['Season', 'Squad_Conformed', 'Player_Name']
+SCORER_COLS = ['Season', 'Squad_Conformed', 'Player_Name', 'Scorer_Rank', 'Goals']
+
+# Top_Team_Scorer : 'Joueur[,Joueur...]-Buts' ; le .* gourmand place la coupure au dernier tiret
+TOP_SCORER_PATTERN = r'^(?P<players>.*)-(?P<goals>[^-]*)$'
+TRUNCATION_MARKER = r'\.{3}$'
+
+# Table temporaire des meilleurs buteurs analysés (mode pushdown)
+SCORER_LOOKUP_TABLE = 'silver_top_scorer_lookup'
 
 # --- 2. FONCTION DE TRANSFORMATION PRINCIPALE ---
 
-def transform_top_scorer(scorer_str):
+def split_top_scorers(scorers: pd.Series) -> pd.DataFrame:
     """
-    Gère l'extraction du nom du joueur et des buts, gérant les noms composés et les doubles buteurs.
-    Retourne (player_name, goals)
+    Analyse vectorisée de Top_Team_Scorer (une extraction par expression régulière sur toute la colonne) :
+    les buts suivent le dernier tiret, les co-meilleurs buteurs sont séparés par des virgules.
+    Ex: "James Ward-Prowse-9" -> ("James Ward-Prowse", 9)
+    Ex: "Rasmus Højlund,Bruno Fernandes-10" -> ("Rasmus Højlund", 10), ("Bruno Fernandes", 10)
+    Comme transform_top_scorer (SSIS) : une valeur sans tiret ne donne aucun buteur, des buts non
+    numériques ('X-abc') donnent le joueur avec Goals vide. Un joueur répété dans une liste n'est gardé qu'une fois.
+    Retourne une ligne par buteur (Scorer_Rank, Player_Name, Goals), indexée par la ligne source.
     """
-    if pd.isna(scorer_str) or scorer_str.strip() == '':
-        return (None, None)
+    parts = scorers.astype('string').str.extract(TOP_SCORER_PATTERN)
+    goals = pd.to_numeric(parts['goals'].str.strip(), errors='coerce').astype('Int64')
 
-    scorer_str = scorer_str.strip()
+    # Un buteur par ligne ; la marque de liste tronquée ('...') est retirée du dernier nom
+    players = parts['players'].str.split(',').explode()
+    players = players.str.strip().str.replace(TRUNCATION_MARKER, '', regex=True).str.strip()
+    players = players[players.notna() & (players != '')]
+    players = players[~pd.MultiIndex.from_arrays([players.index, players]).duplicated()]
 
-    # 1. Splitter au dernier tiret pour isoler les buts
-    # Ex: "James Ward-Prowse-9" -> ["James Ward-Prowse", "9"]
-    # Ex: "Rasmus Højlund,Bruno Fernandes-10" -> ["Rasmus Højlund,Bruno Fernandes", "10"]
-    parts = scorer_str.rsplit('-', 1)
-    
-    if len(parts) != 2:
-        # Si le format est incorrect (pas de tiret), on retourne None
-        return (None, None)
+    scorers_df = pd.DataFrame({'Player_Name': players, 'Goals': goals.reindex(players.index)})
+    scorers_df['Scorer_Rank'] = scorers_df.groupby(level=0).cumcount() + 1
+    return scorers_df[['Scorer_Rank', 'Player_Name', 'Goals']]
 
-    player_part = parts[0].strip()
-    goals_part = parts[1].strip()
 
-    # Tente de convertir les buts en INT
-    try:
-        goals = int(goals_part)
-    except ValueError:
-        goals = None
+def load_scorer_lookup(conn) -> str:
+    """
+    Seule étape qui demande Python en mode pushdown : chaque valeur distincte de Top_Team_Scorer
+    est analysée par split_top_scorers puis écrite dans une table temporaire de correspondance
+    (une ligne par buteur).
+    """
+    cursor = conn.execute(f"SELECT DISTINCT Top_Team_Scorer FROM {BRONZE_TABLE} WHERE Top_Team_Scorer IS NOT NULL")
+    distinct_scorers = pd.Series([value for (value,) in cursor.fetchall()], dtype=object)
+    lookup_rows = split_top_scorers(distinct_scorers)
+    lookup_rows.insert(0, 'Top_Team_Scorer', distinct_scorers.reindex(lookup_rows.index))
 
-    # 2. Gérer les doubles buteurs (s'il y a une virgule dans la partie joueur)
-    if ',' in player_part:
-        # On prend seulement le premier buteur (Choix B)
-        player_name = player_part.split(',')[0].strip()
-    else:
-        player_name = player_part
+    lookup = create_temp_table(conn, SCORER_LOOKUP_TABLE,
+                               "[Top_Team_Scorer] VARCHAR(255), [Scorer_Rank] INT, [Player_Name] VARCHAR(100), [Goals] INT")
+    bulk_insert(conn, lookup, list(lookup_rows.columns), lookup_rows)
+    return lookup
 
-    return (player_name, goals)
 
+def build_pushdown_select(scorer_lookup: str) -> str:
+    """
+    Mapping des équipes (repli sur le nom source) et des notes (repli sur 'No Event')
+    par LEFT JOIN, exécuté par le moteur. Le meilleur buteur est le premier de la liste.
+    """
+    return (
+        f"SELECT DISTINCT b.Season, COALESCE(tm.Team_Standard_Name, b.Squad), CAST(b.Attendance AS INT), "
+        f"sc.Player_Name, sc.Goals, b.Goalkeeper, COALESCE(nm.Notes_Standard_Name, 'No Event') "
+        f"FROM {BRONZE_TABLE} AS b "
+        f"LEFT JOIN {TEAM_MAPPING_TABLE} AS tm ON tm.Team_Source_Name = b.Squad "
+        f"LEFT JOIN {NOTES_MAPPING_TABLE} AS nm ON nm.Notes_Source_Key = b.Notes "
+        f"LEFT JOIN {scorer_lookup} AS sc ON sc.Top_Team_Scorer = b.Top_Team_Scorer AND sc.Scorer_Rank = 1"
+    )
 
-def run_etl_to_silver_team_extra_details():
-    try:
-        conn = pyodbc.connect(CONN_STRING)
-        
-        # 1. Chargement des données sources et des tables de mapping
-        df_bronze = pd.read_sql(f"SELECT Season, Squad, Attendance, Top_Team_Scorer, Goalkeeper, Notes FROM {BRONZE_TABLE}", conn)
-        df_map_team = pd.read_sql(f"SELECT Team_Source_Name, Team_Standard_Name FROM {TEAM_MAPPING_TABLE}", conn)
-        df_map_notes = pd.read_sql(f"SELECT Notes_Source_Key, Notes_Standard_Name FROM {NOTES_MAPPING_TABLE}", conn)
-        
-        print("✅ Données chargées dans Pandas.")
-
-        # --- 2. Standardisation des Clés (Lookup/Jointure) ---
-
-        # Jointure 1: Squad -> Team_Conformed
-        df_silver = pd.merge(
-            df_bronze, 
-            df_map_team, 
-            left_on='Squad', 
-            right_on='Team_Source_Name', 
-            how='left'
-        ).rename(columns={'Team_Standard_Name': 'Squad_Conformed'})
-        df_silver['Squad_Conformed'] = df_silver['Squad_Conformed'].fillna(df_silver['Squad']) # Fallback au nom source
-
-        # Jointure 2: Notes -> Qualification_Notes
-        df_silver = pd.merge(
-            df_silver, 
-            df_map_notes, 
-            left_on='Notes', 
-            right_on='Notes_Source_Key', 
-            how='left'
-        ).rename(columns={'Notes_Standard_Name': 'Qualification_Notes'})
-        # Remplacer les NULLs de jointure par 'No Event' (ou la valeur vide de votre mapping)
-        df_silver['Qualification_Notes'] = df_silver['Qualification_Notes'].fillna('No Event')
-
-
-        # --- 3. Transformations du Top Scorer et de l'Attendance ---
-
-        # Application de la fonction complexe sur Top_Team_Scorer
-        df_silver[['TopScorer_PlayerName', 'TopScorer_Goals']] = df_silver['Top_Team_Scorer'].apply(
-            lambda x: pd.Series(transform_top_scorer(x))
-        )
-        
-        # Conversion de l'Attendance en INT
-        # Utilisation de pd.to_numeric avec errors='coerce' pour transformer les non-numériques en NaN
-        df_silver['Season_Attendance'] = pd.to_numeric(df_silver['Attendance'], errors='coerce').astype('Int64') 
-
-        
-        # --- 4. Finalisation et Sélection des Colonnes ---
-
-        # Renommage final pour le Gardien
-        df_silver.rename(columns={'Goalkeeper': 'Goalkeeper_PlayerName'}, inplace=True)
-
-        # Sélection des colonnes finales pour la destination
-        df_final = df_silver[[
-            'Season', 'Squad_Conformed', 'Season_Attendance', 
-            'TopScorer_PlayerName', 'TopScorer_Goals', 'Goalkeeper_PlayerName', 
-            'Qualification_Notes'
-        ]]
 
-        print("✅ Transformations Silver terminées.")
-        
-        # --- 5. Chargement dans SQL Server (Couche Silver) ---
+def build_pushdown_scorers_select(scorer_lookup: str) -> str:
+    """Table de liaison : une ligne par buteur de chaque équipe / saison."""
+    return (
+        f"SELECT DISTINCT b.Season, COALESCE(tm.Team_Standard_Name, b.Squad), sc.Player_Name, sc.Scorer_Rank, sc.Goals "
+        f"FROM {BRONZE_TABLE} AS b "
+        f"LEFT JOIN {TEAM_MAPPING_TABLE} AS tm ON tm.Team_Source_Name = b.Squad "
+        f"INNER JOIN {scorer_lookup} AS sc ON sc.Top_Team_Scorer = b.Top_Team_Scorer"
+    )
 
-        # Créer le curseur
-        cursor = conn.cursor()
 
-        # Vider la table de destination (approche TRUNCATE pour une table vide)
-        cursor.execute(f"TRUNCATE TABLE {SILVER_DESTINATION_TABLE};")
-        conn.commit()
+def transform_chunk(df_bronze, resolver, notes_map):
+    """Transformation d'un lot bronze, sans copie du lot ; retourne (lignes équipe, lignes buteurs)."""
+    df_silver = to_categorical(df_bronze, CATEGORICAL_COLUMNS, max_ratio=None)
+
+    # --- Standardisation des Clés (Lookup/Jointure) ---
+
+    # Lookup 1: Squad -> Team_Conformed (une fois par équipe distincte, résolution approchée des noms
+    # absents du mapping, fallback au nom source)
+    df_silver['Squad_Conformed'] = map_categorical(df_silver['Squad'], resolver.standard_name)
+
+    # Lookup 2: Notes -> Qualification_Notes
+    # Les notes absentes du mapping (ou NULL) deviennent 'No Event' (ou la valeur vide de votre mapping)
+    df_silver['Qualification_Notes'] = notes_map.map(df_silver['Notes'], default='No Event')
+
+    # --- Transformations du Top Scorer et de l'Attendance ---
+
+    # Table de liaison des buteurs, puis premier buteur de chaque liste pour les colonnes TopScorer_*
+    scorers = split_top_scorers(df_silver['Top_Team_Scorer'])
+    first_scorers = scorers[scorers['Scorer_Rank'] == 1]
+    df_silver['TopScorer_PlayerName'] = first_scorers['Player_Name'].reindex(df_silver.index)
+    df_silver['TopScorer_Goals'] = first_scorers['Goals'].reindex(df_silver.index)
+
+    # Clés de la table de liaison : celles de la ligne équipe dont provient chaque buteur
+    for key in ['Season', 'Squad_Conformed']:
+        scorers[key] = df_silver[key].reindex(scorers.index)
+    # Un joueur par (Season, Squad_Conformed) : deux noms source d'une même équipe ne dupliquent pas la liaison
+    scorers = scorers.drop_duplicates(subset=SCORER_KEYS)
 
-        # Préparer la commande INSERT
-        insert_query = f"INSERT INTO {SILVER_DESTINATION_TABLE} (Season, Squad_Conformed, Season_Attendance, TopScorer_PlayerName, TopScorer_Goals, Goalkeeper_PlayerName, Qualification_Notes) VALUES (?, ?, ?, ?, ?, ?, ?)"
-        
-        # Préparer les données pour l'insertion
-        # Remplacer les NaT (Not a Time) par None pour que pyodbc gère les NULLs SQL
-        data_to_insert = [tuple(row) for row in df_final.replace({pd.NA: None, pd.NaT: None}).values]
+    # Conversion de l'Attendance en INT
+    # Utilisation de pd.to_numeric avec errors='coerce' pour transformer les non-numériques en NaN
+    df_silver['Season_Attendance'] = pd.to_numeric(df_silver['Attendance'], errors='coerce').astype('Int64')
 
-        # Insertion
-        cursor.executemany(insert_query, data_to_insert)
+    # --- Finalisation et Sélection des Colonnes ---
+
+    # Renommage final pour le Gardien
+    df_silver.rename(columns={'Goalkeeper': 'Goalkeeper_PlayerName'}, inplace=True)
+    return df_silver[FINAL_COLS], scorers[SCORER_COLS]
+
+
+def run_etl_to_silver_team_extra_details():
+    try:
+        conn = get_connection(stage=SILVER_DESTINATION_TABLE)
+
+        if is_up_to_date(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE])):
+            print(f"✅ Entrées inchangées depuis le dernier chargement de {SILVER_DESTINATION_TABLE} : étape ignorée.")
+            return
+
+        # Mode pushdown : seules les valeurs distinctes du meilleur buteur transitent par Python
+        if config.SILVER_MODE == 'pushdown':
+            resolver = resolve_source_names(conn, f"SELECT DISTINCT Squad FROM {BRONZE_TABLE}")
+            resolver.report()
+            scorer_lookup = load_scorer_lookup(conn)
+            report = sync_from_select(conn, SILVER_DESTINATION_TABLE, build_pushdown_select(scorer_lookup),
+                                      FINAL_COLS, BUSINESS_KEYS)
+            scorers_report = sync_from_select(conn, SCORERS_TABLE, build_pushdown_scorers_select(scorer_lookup),
+                                              SCORER_COLS, SCORER_KEYS)
+            conn.execute(f"DROP TABLE IF EXISTS {scorer_lookup}")
+            record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
+            conn.commit()
+            print(f"🎉 Succès (pushdown) ! {report}")
+            print(f"🎉 {scorers_report}")
+            return
+
+        # 1. Mappings de référence (cache partagé du processus) ; le bronze est lu par lots
+        resolver = TeamResolver.from_reference(conn)
+        notes_map = get_mapping(conn, 'notes')
+
+        # 2. Transformation et différentiel lot par lot (seules les lignes nouvelles, modifiées
+        #    ou disparues sont appliquées à la table existante)
+        sql_bronze = f"SELECT Season, Squad, Attendance, Top_Team_Scorer, Goalkeeper, Notes FROM {BRONZE_TABLE}"
+        with SilverSync(conn, SILVER_DESTINATION_TABLE, BUSINESS_KEYS) as sync, \
+                SilverSync(conn, SCORERS_TABLE, SCORER_KEYS) as scorers_sync:
+            for df_bronze in read_sql_chunks(conn, sql_bronze):
+                df_final, df_scorers = transform_chunk(df_bronze, resolver, notes_map)
+                sync.add(df_final)
+                scorers_sync.add(df_scorers)
+            report = sync.finish()
+            scorers_report = scorers_sync.finish()
+        resolver.persist(conn, TEAM_MAPPING_TABLE)
+        record_watermark(conn, SILVER_DESTINATION_TABLE, input_token(conn, INPUT_MAPPINGS, [BRONZE_TABLE]))
         conn.commit()
-        
-        print(f"🎉 Succès ! {len(data_to_insert)} lignes insérées dans {SILVER_DESTINATION_TABLE}.")
 
-    except pyodbc.Error as ex:
+        print("✅ Transformations Silver terminées.")
+        resolver.report()
+        print(f"🎉 Succès ! {report}")
+        print(f"🎉 {scorers_report}")
+
+    except DB_ERRORS as ex:
         sqlstate = ex.args[0]
         print(f"❌ Erreur SQL/ODBC : {sqlstate}")
         print("Annulation de la transaction.")
@@ -0,0 +1,111 @@
+import argparse
+import os
+import runpy
+import sys
+import time
+
+# --- 1. ORDRE D'EXÉCUTION DES ÉTAPES (chemins relatifs au dossier python/) ---
+PIPELINE_STAGES = {
+    'bronze': [
+        'load/bronze.epl_matchs_loader.py',
+        'load/bronze.epl_league_table_overall_loader.py',
+        'load/bronze.epl_league_table_home_loader.py',
+        'load/bronze.epl_league_table_away_loader.py',
+        'load/bronze.epl_player_stats_loader.py',
+        'load/bronze.epl_squad_stats_loader.py',
+        'load/bronze.epl_history_loader.py',
+    ],
+    'silver': [
+        'load/silver.Team_Mapping_loader.py',
+        'load/silver.Nation_Mapping_Loader.py',
+        'load/silver.Notes_Mapping_Loader.py',
+        'load/silver.Match_Odds_Conformed.py',
+        'load/silver.Team_extra_details.py',
+        'load/silver.League_Table_Conformed.py',
+        'load/silver.EPL_Match_History_Conformed.py',
+        'load/silver.Match_Reconciliation.py',
+        'load/silver.Player_Stats_Conformed.py',
+        'load/silver.Player_Identity_Resolver.py',
+    ],
+    'gold': [
+        'load/gold.Gold_Builder.py',
+        'export/gold.Parquet_Export.py',
+    ],
+}
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Exécute et chronomètre le pipeline bronze -> silver -> gold.")
+    parser.add_argument('--backend', choices=['sqlserver', 'sqlite', 'duckdb'],
+                        help="Moteur cible (par défaut : variable FOOTBALL_DW_BACKEND, sinon sqlserver).")
+    parser.add_argument('--init-schema', action='store_true',
+                        help="(Re)crée les tables bronze/silver/gold à partir des scripts DDL de sql/ avant l'exécution.")
+    parser.add_argument('--layers', nargs='+', default=['bronze', 'silver', 'gold'],
+                        choices=['bronze', 'silver', 'gold'], help="Couches à exécuter.")
+    parser.add_argument('--silver-mode', choices=['pandas', 'pushdown'],
+                        help="Conformité silver en mémoire ou exécutée par le moteur "
+                             "(par défaut : variable FOOTBALL_DW_SILVER_MODE, sinon pandas).")
+    parser.add_argument('--force', action='store_true',
+                        help="Reconstruit les étapes silver même si leurs entrées n'ont pas changé.")
+    return parser.parse_args()
+
+
+def run_stage(script_path: str):
+    """
+    Exécute un script du pipeline comme s'il était lancé directement.
+    Retourne sa durée et le pic de mémoire résidente atteint pendant son exécution.
+    """
+    from utils.streaming import track_memory
+    start = time.perf_counter()
+    with track_memory(script_path) as memory:
+        runpy.run_path(os.path.join(PYTHON_DIR, script_path), run_name='__main__')
+    return time.perf_counter() - start, memory.peak
+
+
+def main():
+    args = parse_args()
+
+    # Le moteur doit être fixé avant le premier import de utils.config
+    if args.backend:
+        os.environ['FOOTBALL_DW_BACKEND'] = args.backend
+    if args.silver_mode:
+        os.environ['FOOTBALL_DW_SILVER_MODE'] = args.silver_mode
+    if args.force:
+        os.environ['FOOTBALL_DW_FORCE_REBUILD'] = '1'
+    sys.path.append(PYTHON_DIR)
+    from utils.db import initialize_schema
+    from utils.session import RUN_METRICS, session
+    from utils.streaming import format_mb
+
+    timings = []
+    pipeline_start = time.perf_counter()
+
+    if args.init_schema:
+        start = time.perf_counter()
+        with session('ddl') as conn:
+            initialize_schema(conn)
+        timings.append(('ddl', 'sql/ (bronze, silver, gold)', time.perf_counter() - start, None))
+
+    for layer in ['bronze', 'silver', 'gold']:
+        if layer not in args.layers:
+            continue
+        for script_path in PIPELINE_STAGES[layer]:
+            print(f"\n===== [{layer.upper()}] {script_path} =====")
+            timings.append((layer, script_path, *run_stage(script_path)))
+
+    total = time.perf_counter() - pipeline_start
+
+    # --- RÉSUMÉ DES DURÉES ---
+    print("\n===== DURÉES ET PIC MÉMOIRE PAR ÉTAPE =====")
+    for layer, script_path, duration, peak_rss in timings:
+        print(f"{layer:<7} {script_path:<60} {duration:8.2f} s {format_mb(peak_rss) if peak_rss else '':>10}")
+    print(f"{'TOTAL':<68} {total:8.2f} s")
+
+    # --- RÉPARTITION CONNEXION / EXÉCUTION / VALIDATION ---
+    RUN_METRICS.report()
+
+
+if __name__ == '__main__':
+    main()
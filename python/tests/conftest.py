@@ -0,0 +1,21 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Les modules du pipeline s'importent depuis le dossier python/ (comme les scripts d'étape)
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PYTHON_DIR)
+
+
+@pytest.fixture(scope='session')
+def load_stage():
+    """Importe un script d'étape par son chemin (noms pointés, ex: 'load/silver.Match_Reconciliation.py')."""
+    def load(relative_path):
+        name = os.path.splitext(os.path.basename(relative_path))[0].replace('.', '_')
+        spec = importlib.util.spec_from_file_location(name, os.path.join(PYTHON_DIR, relative_path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
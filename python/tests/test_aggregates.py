@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from utils.aggregates import PLAYER_NATION_RELATION, build_query, refresh_aggregates
+from utils.db import Connection, Dialect, _connect_sqlite, apply_statements
+from utils.gold_schema import ddl_statements
+from utils.surrogate_keys import merge_dimension
+
+PLAYER_ATTRIBUTES = ['Current_Position', 'Nation_SK', 'Player_Id']
+
+
+@pytest.fixture
+def conn():
+    connection = Connection(_connect_sqlite(':memory:'), Dialect('sqlite'))
+    apply_statements(connection, ddl_statements('sqlite'))
+    connection.execute("INSERT INTO gold.DimTime (Season_BK, Season_Start_Year, Season_End_Year) VALUES ('2014/15', 2014, 2015)")
+    connection.execute("INSERT INTO gold.DimTeam (Squad_Conformed_BK) VALUES ('Arsenal')")
+    for nation in ['England', 'France']:
+        connection.execute("INSERT INTO gold.DimNation (Nation_Standard_Name_BK) VALUES (?)", nation)
+    yield connection
+    connection._conn.close()
+
+
+def players(nations):
+    return pd.DataFrame({'Player_Name_BK': ['Theo Walcott', 'Olivier Giroud'], 'BirthYear': [1989, 1986],
+                         'Current_Position': ['FW', 'FW'], 'Nation_SK': nations, 'Player_Id': [None, None]})
+
+
+def nation_rows(conn, sql):
+    return sorted(conn.execute(sql).fetchall())
+
+
+def test_dimension_update_rebuilds_nation_rollup(conn):
+    _, report = merge_dimension(conn, 'gold.DimPlayer', 'Player_SK', ['Player_Name_BK', 'BirthYear'],
+                                PLAYER_ATTRIBUTES, players([1, 2]))
+    conn.execute("INSERT INTO gold.FactPlayerPerformance (Time_SK, Team_SK, Player_SK, MinutesPlayed, Goals) "
+                 "SELECT 1, 1, Player_SK, 900, 5 FROM gold.DimPlayer")
+    refresh_aggregates(conn, {}, [report])
+
+    # Mise à jour de type 1 de la nation : aucune partition de faits ne change
+    _, report = merge_dimension(conn, 'gold.DimPlayer', 'Player_SK', ['Player_Name_BK', 'BirthYear'],
+                                PLAYER_ATTRIBUTES, players([1, 1]))
+    assert report.updated == 1
+    results = dict(refresh_aggregates(conn, {}, [report]))
+
+    assert results['gold.Agg_Nation_Season'] == 'reconstruit (gold.DimPlayer modifiée)'
+    assert results['gold.Agg_Squad_Season'] == 'inchangé'
+    stored = nation_rows(conn, "SELECT Time_SK, Nation_SK, Player_Rows, Goals FROM gold.Agg_Nation_Season")
+    fresh = nation_rows(conn, f"SELECT Time_SK, Nation_SK, COUNT(*), SUM(Goals) FROM {PLAYER_NATION_RELATION} s "
+                              f"GROUP BY Time_SK, Nation_SK")
+    assert stored == fresh == [(1, 1, 2, 10)]
+
+
+def served_by(group_by, measures, filters=None, source='player'):
+    return build_query(source, group_by, measures, filters)[2]
+
+
+def test_count_distinct_needs_exact_grain():
+    # Joueurs distincts par équipe toutes saisons confondues : non réagrégeable depuis Agg_Squad_Season
+    assert served_by(['Team_SK'], ['Players']) == 'player'
+    assert served_by(['Time_SK', 'Team_SK'], ['Players']) == 'gold.Agg_Squad_Season'
+    # Clé fixée par un filtre d'égalité : le grain exact est atteint
+    assert served_by(['Team_SK'], ['Players'], {'Time_SK': 1}) == 'gold.Agg_Squad_Season'
+
+
+def test_additive_measure_over_coarser_grain():
+    sql, params, table = build_query('player', ['Time_SK'], ['Goals', 'Player_Rows'])
+    assert table == 'gold.Agg_Squad_Season'
+    assert 'SUM([Goals]) AS [Goals]' in sql and 'SUM([Player_Rows]) AS [Player_Rows]' in sql
+    assert served_by(['Team_SK'], ['Wins'], source='match_team') == 'gold.Agg_Team_Season_Venue'
+    # Colonne groupée absente du grain des agrégats : servie par la source
+    assert served_by(['Player_SK'], ['Goals']) == 'player'
+
+
+def test_unknown_measure():
+    with pytest.raises(ValueError):
+        build_query('player', ['Time_SK'], ['Goals_Per_90'])
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from utils.cube import MEASURE_GROUPS, Cube
+
+
+def player_fact(rows):
+    fact = pd.DataFrame(rows, columns=['Time_SK', 'Team_SK', 'Player_SK', 'Goals', 'MinutesPlayed'])
+    for measure in MEASURE_GROUPS['player'].measures:
+        if measure not in fact.columns:
+            fact[measure] = None
+    return fact
+
+
+@pytest.fixture(scope='module')
+def cube():
+    dimensions = {
+        'Time': pd.DataFrame({'Time_SK': [1, 2], 'Season_BK': ['2014/15', '2015/16'],
+                              'Season_Start_Year': [2014, 2015], 'Season_End_Year': [2015, 2016]}),
+        'Team': pd.DataFrame({'Team_SK': [1, 2], 'Squad_Conformed_BK': ['Arsenal', 'Chelsea FC']}),
+        'Nation': pd.DataFrame({'Nation_SK': [1, 2], 'Nation_Standard_Name_BK': ['Angleterre', 'France']}),
+        # Colonnes INT relues avec des NULL : réels, comme après from_records
+        'Player': pd.DataFrame({'Player_SK': [1, 2, 3, 4],
+                                'Player_Name_BK': ['Theo Walcott', 'Olivier Giroud', 'Laurent Koscielny', 'Inconnu'],
+                                'BirthYear': [1989.0, 1986.0, 1985.0, None],
+                                'Current_Position': ['FW', 'FW', 'DF', 'MF'],
+                                'Nation_SK': [1.0, 2.0, 2.0, None], 'Player_Id': [10.0, 11.0, None, None]}),
+    }
+    facts = {'player': player_fact([
+        (1, 1, 1, 5, 900),
+        (1, 1, 2, 14, 2000),
+        (1, 1, 3, 2, None),
+        (2, 1, 2, 16, 2100),
+        (2, 2, 4, None, 300),
+    ])}
+    return Cube(dimensions, facts)
+
+
+def records(result):
+    return [tuple(None if pd.isna(value) else value for value in row) for row in result.itertuples(index=False)]
+
+
+def test_sum_avg_count(cube):
+    result = cube.query('player', ['Season'], ['Goals', 'AVG(MinutesPlayed)', 'COUNT(*)', 'COUNT(Goals)'])
+    assert records(result) == [('2014/15', 21, 1450.0, 3, 3), ('2015/16', 16, 1200.0, 2, 1)]
+
+
+def test_null_measure(cube):
+    # Groupe sans valeur non nulle : NULL, comme en SQL
+    result = cube.query('player', ['Team'], ['Goals', 'MAX(Goals)'], filters={'Season': '2015/16'})
+    assert records(result) == [('Arsenal', 16, 16), ('Chelsea FC', None, None)]
+
+
+def test_snowflake_nation(cube):
+    # Joueur -> nation (Player.Nation) ; nation inconnue en premier
+    result = cube.query('player', ['Player.Nation.Nation_Standard_Name_BK'], ['Goals', 'COUNT(*)'])
+    assert records(result) == [(None, None, 1), ('Angleterre', 5, 1), ('France', 32, 3)]
+
+
+def test_multi_value_filters(cube):
+    result = cube.query('player', ['Position'], ['COUNT(*)'],
+                        filters={'Nation': ['France', 'Angleterre'], 'Season': ['2014/15']})
+    assert records(result) == [('DF', 1), ('FW', 2)]
+
+
+def test_filter_values_typed(cube):
+    # Valeurs texte (ligne de commande) converties au type du niveau ; entiers sans '.0'
+    result = cube.query('player', ['PlayerId'], ['Goals'], filters={'PlayerId': ['11']})
+    assert records(result) == [(11, 30)]
+    with pytest.raises(ValueError, match='absente'):
+        cube.query('player', filters={'PlayerId': ['12']})
+    with pytest.raises(ValueError, match='invalide'):
+        cube.query('player', filters={'PlayerId': ['abc']})
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from utils.date_dimension import matchweeks
+
+
+def matches(rows):
+    return pd.DataFrame(rows, columns=['Season', 'MatchDate', 'HomeTeam_Conformed', 'AwayTeam_Conformed'])
+
+
+def weeks_of(series):
+    return {(season, day.strftime('%Y-%m-%d')): int(week) for (season, day), week in series.items()}
+
+
+def test_matchweeks_rank_per_season():
+    # Lignes dans le désordre : le rang du match de chaque équipe suit la date, et repart à 1 chaque saison
+    weeks = matchweeks(matches([
+        ('2015/16', '2015-08-08', 'A', 'B'),
+        ('2014/15', '2014-08-23', 'A', 'C'),
+        ('2014/15', '2014-08-16', 'A', 'B'),
+        ('2014/15', '2014-08-16', 'C', 'D'),
+    ]))
+    assert weeks_of(weeks) == {('2014/15', '2014-08-16'): 1, ('2014/15', '2014-08-23'): 2,
+                               ('2015/16', '2015-08-08'): 1}
+
+
+def test_matchweeks_never_decrease():
+    # Match en retard (B-D, 2e match de chaque équipe) joué après la 3e journée : reste en journée 3
+    weeks = matchweeks(matches([
+        ('2014/15', '2014-08-16', 'A', 'B'),
+        ('2014/15', '2014-08-16', 'C', 'D'),
+        ('2014/15', '2014-08-23', 'A', 'C'),
+        ('2014/15', '2014-08-30', 'C', 'A'),
+        ('2014/15', '2014-09-13', 'B', 'D'),
+    ]))
+    assert weeks_of(weeks) == {('2014/15', '2014-08-16'): 1, ('2014/15', '2014-08-23'): 2,
+                               ('2014/15', '2014-08-30'): 3, ('2014/15', '2014-09-13'): 3}
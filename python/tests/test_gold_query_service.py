@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+import gold_query_service
+from gold_query_service import ENDPOINTS, GoldQueryService, ResultCache
+
+
+def test_version_change_purges_entries():
+    cache = ResultCache(8)
+    cache.set_version('v1')
+    key = ('/matches', (), 'v1')
+    assert cache.get_or_compute(key, lambda: [{'n': 1}]) == ([{'n': 1}], 'query')
+    assert cache.get_or_compute(key, lambda: [{'n': 2}]) == ([{'n': 1}], 'cache')
+
+    cache.set_version('v2')
+    assert len(cache) == 0
+    # Résultat calculé pour une version dépassée : rendu mais pas conservé
+    assert cache.get_or_compute(key, lambda: [{'n': 3}]) == ([{'n': 3}], 'query')
+    assert len(cache) == 0
+
+
+def test_concurrent_requests_are_coalesced(monkeypatch):
+    cache = ResultCache(8)
+    cache.set_version('v1')
+    key = ('/team-season', (), 'v1')
+    started, waiting, release, calls, results = (threading.Event(), threading.Event(), threading.Event(), [], [])
+
+    class TrackedPending(gold_query_service._Pending):
+        def __init__(self):
+            super().__init__()
+            wait = self.done.wait
+            self.done.wait = lambda timeout=None: waiting.set() or wait(timeout)
+
+    monkeypatch.setattr(gold_query_service, '_Pending', TrackedPending)
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return [{'n': 1}]
+
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+    owner.start()
+    started.wait(5)
+    # Le calcul est en cours : la seconde requête attend son résultat sans recalculer
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute(key, compute)))
+    waiter.start()
+    waiting.wait(5)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(calls) == 1
+    assert sorted(origin for _, origin in results) == ['coalesced', 'query']
+
+
+def test_errors_are_not_cached():
+    cache = ResultCache(8)
+    cache.set_version('v1')
+    key = ('/matches', (), 'v1')
+
+    def failing():
+        raise ValueError('moteur indisponible')
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute(key, failing)
+    assert len(cache) == 0
+    assert cache.get_or_compute(key, lambda: [{'n': 1}]) == ([{'n': 1}], 'query')
+
+
+def test_build_rejects_unknown_and_missing_parameters():
+    with pytest.raises(ValueError, match='inconnu'):
+        ENDPOINTS['/team-season'].build({'squad': 'Arsenal'})
+    with pytest.raises(ValueError, match='manquant'):
+        ENDPOINTS['/player-career'].build({'birth_year': '1989'})
+    with pytest.raises(ValueError, match='Valeur invalide pour birth_year : abc.'):
+        ENDPOINTS['/player-career'].build({'player': 'Theo Walcott', 'birth_year': 'abc'})
+
+
+def test_build_team_filter_binds_both_placeholders():
+    sql, values = ENDPOINTS['/matches'].build({'team': 'Arsenal', 'date_from': '2014-08-16'})
+    assert '(h.Squad_Conformed_BK = ? OR a.Squad_Conformed_BK = ?)' in sql
+    assert sql.count('?') == len(values)
+    assert values == [20140816, 'Arsenal', 'Arsenal']
+
+
+def test_invalid_page_is_a_domain_error():
+    service = GoldQueryService(None, 8)
+    assert service.handle('/matches', {'page': ['abc']}) == (400, {'error': 'Valeur invalide pour page : abc.'})
+    assert service.handle('/matches', {'page_size': ['0']})[0] == 400
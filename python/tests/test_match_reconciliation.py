@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def reconciliation(load_stage):
+    return load_stage('load/silver.Match_Reconciliation.py')
+
+
+def matches(rows):
+    df = pd.DataFrame(rows, columns=['Season', 'MatchDate', 'HomeTeam_Conformed', 'AwayTeam_Conformed'])
+    df['MatchDate'] = pd.to_datetime(df['MatchDate'])
+    return df
+
+
+def pairs_of(pairs):
+    return sorted(zip(pairs['_h'], pairs['_o'], pairs['_gap']))
+
+
+def test_exact_key_first(reconciliation):
+    history = matches([('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC'),
+                       ('2014/15', '2014-08-17', 'Liverpool FC', 'Southampton FC')])
+    odds = matches([('2014/15', '2014-08-17', 'Liverpool FC', 'Southampton FC'),
+                    ('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC')])
+    assert pairs_of(reconciliation.match_pairs(history, odds)) == [(0, 1, 0), (1, 0, 0)]
+
+
+def test_one_day_fallback(reconciliation):
+    # Match rapporté la veille par une source : rapproché avec un écart signé (cotes - historique)
+    history = matches([('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC')])
+    odds = matches([('2014/15', '2014-08-17', 'Arsenal', 'Crystal Palace FC')])
+    assert pairs_of(reconciliation.match_pairs(history, odds)) == [(0, 0, 1)]
+
+    odds_before = matches([('2014/15', '2014-08-15', 'Arsenal', 'Crystal Palace FC')])
+    assert pairs_of(reconciliation.match_pairs(history, odds_before)) == [(0, 0, -1)]
+
+
+def test_no_match_beyond_tolerance(reconciliation):
+    history = matches([('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC')])
+    odds = matches([('2014/15', '2014-08-18', 'Arsenal', 'Crystal Palace FC'),
+                    ('2015/16', '2014-08-16', 'Arsenal', 'Crystal Palace FC')])
+    assert reconciliation.match_pairs(history, odds).empty
+
+
+def test_one_to_one(reconciliation):
+    # Deux candidats à ±1 jour pour un même match historique : un seul est retenu (le premier à écart égal),
+    # et un match déjà rapproché par la clé exacte ne l'est pas une seconde fois
+    history = matches([('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC'),
+                       ('2014/15', '2015-02-21', 'Arsenal', 'Crystal Palace FC')])
+    odds = matches([('2014/15', '2014-08-16', 'Arsenal', 'Crystal Palace FC'),
+                    ('2014/15', '2015-02-20', 'Arsenal', 'Crystal Palace FC'),
+                    ('2014/15', '2015-02-22', 'Arsenal', 'Crystal Palace FC')])
+    pairs = reconciliation.match_pairs(history, odds)
+    assert pairs['_h'].is_unique and pairs['_o'].is_unique
+    assert pairs_of(pairs) == [(0, 0, 0), (1, 1, -1)]
@@ -0,0 +1,89 @@
+import datetime
+
+import pandas as pd
+
+from utils.player_resolver import (SOURCE_FBREF, SOURCE_TRANSFERMARKT, assign_ids, cluster_records, fbref_key,
+                                   prepare_records)
+
+TM_URL = 'https://www.transfermarkt.fr/{}/profil/spieler/{}'
+
+
+def fbref(name, year, nation):
+    return {'Source': SOURCE_FBREF, 'Source_Key': fbref_key(name, year), 'Player_Name': name,
+            'BirthYear': year, 'Nations': [nation], 'Birth_Date': None}
+
+
+def transfermarkt(slug, player_id, name, birth_date, nation):
+    return {'Source': SOURCE_TRANSFERMARKT, 'Source_Key': TM_URL.format(slug, player_id), 'Player_Name': name,
+            'BirthYear': birth_date.year, 'Nations': [nation], 'Birth_Date': birth_date}
+
+
+def make_records(rows):
+    """Enregistrements préparés comme dans resolve_players."""
+    records = prepare_records(pd.DataFrame(rows))
+    records['birth_date'] = records['Birth_Date'].where(records['Birth_Date'].notna(), None)
+    return records
+
+
+ROWS = [
+    # Variante accentuée : 'Ødegaard' (FBref) / 'Odegaard' (Transfermarkt)
+    fbref('Martin Ødegaard', 1998, 'Norvège'),
+    transfermarkt('martin-odegaard', 316264, 'Martin Odegaard', datetime.date(1998, 12, 17), 'Norvège'),
+    # Homonymes : deux 'Danny Ward' distincts (années de naissance différentes)
+    fbref('Danny Ward', 1991, 'Angleterre'),
+    fbref('Danny Ward', 1993, 'Pays de Galles'),
+    transfermarkt('danny-ward', 93797, 'Danny Ward', datetime.date(1991, 12, 11), 'Angleterre'),
+    transfermarkt('danny-ward', 186908, 'Danny Ward', datetime.date(1993, 6, 22), 'Pays de Galles'),
+    # Joueur FBref sans profil Transfermarkt
+    fbref('Rolando Aarons', 1995, 'Angleterre'),
+]
+
+
+def groups_by_key(records, groups):
+    return dict(zip(records['Source_Key'], groups))
+
+
+def test_accent_variant_is_linked():
+    records = make_records(ROWS)
+    groups, best, _ = cluster_records(records)
+    by_key = groups_by_key(records, groups)
+    assert by_key['Martin Ødegaard|1998'] == by_key[TM_URL.format('martin-odegaard', 316264)]
+    assert best[0] >= 0.8
+
+
+def test_same_name_players_stay_apart():
+    records = make_records(ROWS)
+    groups, _, _ = cluster_records(records)
+    by_key = groups_by_key(records, groups)
+    assert by_key['Danny Ward|1991'] == by_key[TM_URL.format('danny-ward', 93797)]
+    assert by_key['Danny Ward|1993'] == by_key[TM_URL.format('danny-ward', 186908)]
+    assert by_key['Danny Ward|1991'] != by_key['Danny Ward|1993']
+
+
+def test_two_profiles_never_share_a_group():
+    # Même nom, même année : au plus un profil Transfermarkt par joueur
+    records = make_records([
+        fbref('Danny Ward', 1993, 'Pays de Galles'),
+        transfermarkt('danny-ward', 186908, 'Danny Ward', datetime.date(1993, 6, 22), 'Pays de Galles'),
+        transfermarkt('danny-ward', 999999, 'Danny Ward', datetime.date(1993, 1, 1), 'Pays de Galles'),
+    ])
+    groups, _, _ = cluster_records(records)
+    assert groups[1] != groups[2]
+    assert groups[0] in (groups[1], groups[2])
+
+
+def test_rerun_keeps_ids():
+    records = make_records(ROWS)
+    groups, _, _ = cluster_records(records)
+    ids = assign_ids(records, groups, known={})
+    assert len(set(ids)) == 4
+
+    # Nouvelle exécution : ordre des enregistrements changé, un nouveau joueur
+    known = dict(zip(zip(records['Source'], records['Source_Key']), ids))
+    rerun = make_records(list(reversed(ROWS)) + [fbref('Bukayo Saka', 2001, 'Angleterre')])
+    rerun_groups, _, _ = cluster_records(rerun)
+    rerun_ids = assign_ids(rerun, rerun_groups, known)
+
+    rerun_by_key = dict(zip(zip(rerun['Source'], rerun['Source_Key']), rerun_ids))
+    assert all(rerun_by_key[key] == player_id for key, player_id in known.items())
+    assert rerun_by_key[(SOURCE_FBREF, 'Bukayo Saka|2001')] == max(ids) + 1
@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from utils.db import Connection, Dialect, _connect_sqlite
+from utils.silver_sync import SilverSync, row_hashes, sync_from_select, sync_table
+
+TABLE = 'silver.Standings'
+KEYS = ['Season', 'Team']
+
+
+@pytest.fixture
+def conn():
+    connection = Connection(_connect_sqlite(':memory:'), Dialect('sqlite'))
+    connection.execute(f"CREATE TABLE {TABLE} (Season VARCHAR(10), Team VARCHAR(50), Points INT, Row_Hash CHAR(16))")
+    yield connection
+    connection._conn.close()
+
+
+def standings(rows):
+    return pd.DataFrame(rows, columns=['Season', 'Team', 'Points'])
+
+
+def table_rows(conn):
+    return sorted(conn.execute(f"SELECT Season, Team, Points FROM {TABLE}").fetchall())
+
+
+def counts(report):
+    return report.inserted, report.updated, report.deleted, report.unchanged
+
+
+INITIAL = [('2014/15', 'Arsenal', 75), ('2014/15', 'Chelsea', 87), ('2015/16', 'Arsenal', 71), ('2015/16', 'Chelsea', 50)]
+
+
+def test_row_hashes_ignore_encoding_and_follow_values():
+    df = standings(INITIAL)
+    categorical = df.astype({'Season': 'category', 'Team': 'category'})
+    hashes = row_hashes(df, df.columns)
+    assert (hashes == row_hashes(categorical, df.columns)).all()
+    assert hashes.str.len().eq(16).all()
+
+    changed = df.assign(Points=df['Points'] + 1)
+    assert (hashes != row_hashes(changed, df.columns)).all()
+
+
+def test_insert_update_delete_counts(conn):
+    assert counts(sync_table(conn, TABLE, standings(INITIAL), KEYS)) == (4, 0, 0, 0)
+    assert counts(sync_table(conn, TABLE, standings(INITIAL), KEYS)) == (0, 0, 0, 4)
+
+    # Une ligne modifiée, une disparue, une nouvelle
+    source = standings([('2014/15', 'Arsenal', 75), ('2014/15', 'Chelsea', 88), ('2015/16', 'Arsenal', 71),
+                        ('2015/16', 'Leicester', 81)])
+    assert counts(sync_table(conn, TABLE, source, KEYS)) == (1, 1, 1, 2)
+    assert table_rows(conn) == sorted(source.itertuples(index=False, name=None))
+
+
+def test_batches_keep_the_last_version_of_a_key(conn):
+    with SilverSync(conn, TABLE, KEYS) as sync:
+        sync.add(standings(INITIAL[:2]))
+        sync.add(standings([('2014/15', 'Chelsea', 90)] + INITIAL[2:]))
+        report = sync.finish()
+    assert counts(report) == (4, 0, 0, 0)
+    assert ('2014/15', 'Chelsea', 90) in table_rows(conn)
+
+
+def test_partitions_limit_deletes(conn):
+    sync_table(conn, TABLE, standings(INITIAL), KEYS)
+
+    # Seule la saison 2015/16 est transmise : les lignes de 2014/15 ne sont ni lues ni supprimées
+    report = sync_table(conn, TABLE, standings([('2015/16', 'Arsenal', 71)]), KEYS, partition_column='Season')
+    assert counts(report) == (0, 0, 1, 1)
+    assert table_rows(conn) == sorted(INITIAL[:2] + [('2015/16', 'Arsenal', 71)])
+
+
+def test_announced_partition_without_rows_is_emptied(conn):
+    sync_table(conn, TABLE, standings(INITIAL), KEYS)
+    with SilverSync(conn, TABLE, KEYS, partition_column='Season', partitions=['2014/15']) as sync:
+        report = sync.finish()
+    assert report.deleted == 2
+    assert table_rows(conn) == sorted(INITIAL[2:])
+
+
+def test_duplicate_keys_keep_the_last_row_in_both_modes(conn):
+    # Deux noms source conformés en une même équipe : la dernière ligne est conservée, en mode pandas comme en pushdown
+    source = INITIAL + [('2014/15', 'Chelsea', 90)]
+    assert counts(sync_table(conn, TABLE, standings(source), KEYS)) == (4, 0, 0, 0)
+    pandas_rows = table_rows(conn)
+
+    conn.execute(f"DELETE FROM {TABLE}")
+    conn.execute("CREATE TABLE silver.Standings_Source (Seq INT, Season VARCHAR(10), Team VARCHAR(50), Points INT)")
+    conn.prepare("INSERT INTO silver.Standings_Source VALUES (?, ?, ?, ?)").executemany(
+        [(seq, *row) for seq, row in enumerate(source)])
+    report = sync_from_select(conn, TABLE, "SELECT Season, Team, Points FROM silver.Standings_Source ORDER BY Seq",
+                              ['Season', 'Team', 'Points'], KEYS)
+    assert counts(report) == (4, 0, 0, 0)
+    assert table_rows(conn) == pandas_rows
+    assert ('2014/15', 'Chelsea', 90) in pandas_rows
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from utils.db import Connection, Dialect, _connect_sqlite
+from utils.temporal import derive_season, parse_dates, season_sql
+
+RAW_DATES = ['16/08/2014', '16/08/14', '2014-08-16', ' 17/08/2014 ', 'pas une date', None]
+
+
+def iso(dates):
+    return [None if pd.isna(day) else day.strftime('%Y-%m-%d') for day in dates]
+
+
+@pytest.mark.parametrize('dtype', [object, 'category'])
+def test_parse_dates_formats_in_order(dtype):
+    # Chaque format n'est essayé que sur les valeurs restantes ; la valeur manquante n'est pas comptée invalide
+    dates, hits = parse_dates(pd.Series(RAW_DATES, index=range(10, 16), dtype=dtype))
+    assert iso(dates) == ['2014-08-16', '2014-08-16', '2014-08-16', '2014-08-17', None, None]
+    assert list(dates.index) == list(range(10, 16))
+    assert hits == {'%d/%m/%Y': 2, '%d/%m/%y': 1, '%Y-%m-%d': 1, 'invalid': 1}
+
+
+def test_parse_dates_custom_formats():
+    dates, hits = parse_dates(pd.Series(['16/08/14', '2014-08-16']), formats=('%d/%m/%y',))
+    assert iso(dates) == ['2014-08-16', None]
+    assert hits == {'%d/%m/%y': 1, 'invalid': 1}
+
+
+def test_derive_season_cutover():
+    # Bascule au 1er août ; fin de saison sur deux chiffres complétée d'un zéro
+    dates = pd.Series(pd.to_datetime(['2015-07-31', '2015-08-01', '2016-04-02', '2000-01-15', None]))
+    seasons = derive_season(dates)
+    assert isinstance(seasons.dtype, pd.CategoricalDtype)
+    assert list(seasons.astype(object).where(seasons.notna(), None)) == [
+        '2014/15', '2015/16', '2015/16', '1999/00', None]
+    assert sorted(seasons.cat.categories) == ['1999/00', '2014/15', '2015/16']
+
+
+def test_derive_season_without_dates():
+    seasons = derive_season(pd.Series([None, None], dtype='datetime64[ns]'))
+    assert seasons.isna().all()
+
+
+def test_season_sql_matches_derive_season():
+    conn = Connection(_connect_sqlite(':memory:'), Dialect('sqlite'))
+    days = ['2015-07-31', '2015-08-01', '2000-01-15', '2009-12-26']
+    sql = f"SELECT {season_sql(conn.dialect, 'd.Day')} FROM (SELECT ? AS Day) AS d"
+    sql_seasons = [conn.execute(sql, day).fetchone()[0] for day in days]
+    assert sql_seasons == list(derive_season(pd.Series(pd.to_datetime(days))).astype(str))
+    conn._conn.close()
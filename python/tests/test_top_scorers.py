@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope='module')
+def extra_details(load_stage):
+    return load_stage('load/silver.Team_extra_details.py')
+
+
+def scorers_of(extra_details, values):
+    scorers = extra_details.split_top_scorers(pd.Series(values, dtype=object))
+    return [(index, row.Scorer_Rank, row.Player_Name, None if pd.isna(row.Goals) else int(row.Goals))
+            for index, row in scorers.iterrows()]
+
+
+def test_hyphenated_name(extra_details):
+    # Les buts suivent le dernier tiret : le nom composé est conservé
+    assert scorers_of(extra_details, ['James Ward-Prowse-9']) == [(0, 1, 'James Ward-Prowse', 9)]
+
+
+def test_co_scorers(extra_details):
+    assert scorers_of(extra_details, ['Danny Ings,James Ward-Prowse-7']) == [
+        (0, 1, 'Danny Ings', 7), (0, 2, 'James Ward-Prowse', 7)]
+
+
+def test_truncation_marker(extra_details):
+    # Liste tronquée par la source : la marque '...' est retirée du dernier nom
+    assert scorers_of(extra_details, ['Scott Dann,Yohan Cabaye... -5']) == [
+        (0, 1, 'Scott Dann', 5), (0, 2, 'Yohan Cabaye', 5)]
+
+
+def test_edge_cases(extra_details):
+    # Sans tiret : aucun buteur ; buts non numériques : joueur conservé, buts vides ; valeur vide ou NULL ignorée
+    assert scorers_of(extra_details, ['Harry Kane 21', 'X-abc', '', None]) == [(1, 1, 'X', None)]
+
+
+def test_duplicate_players(extra_details):
+    # Un joueur répété dans la liste ne produit qu'une ligne de liaison
+    assert scorers_of(extra_details, ['A,A-3', 'A,B,A-4']) == [
+        (0, 1, 'A', 3), (1, 1, 'A', 4), (1, 2, 'B', 4)]
@@ -0,0 +1,4 @@
+"""
+Modules partagés par les scripts d'extraction, de chargement et de transformation
+du Data Warehouse Football (bronze -> silver -> gold).
+"""
@@ -0,0 +1,258 @@
+import datetime
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils import config
+from utils.db import Connection
+from utils.surrogate_keys import DimensionReport
+
+# --- 1. CONFIGURATION ---
+# État des agrégats : empreinte de la définition (une définition modifiée reconstruit l'agrégat)
+AGGREGATE_STATE_TABLE = 'gold.Aggregate_State'
+
+# Colonne de rafraîchissement : seules les saisons (Time_SK) dont les faits ont changé sont recalculées
+SEASON_COLUMN = 'Time_SK'
+
+# Réagrégation d'une mesure pré-calculée vers un grain plus grossier (None : mesure non additive)
+REAGGREGATE = {'SUM': 'SUM', 'COUNT': 'SUM', 'MIN': 'MIN', 'MAX': 'MAX', 'COUNT_DISTINCT': None}
+
+
+# --- 2. SOURCES ET MESURES ---
+
+class Measure:
+    """Mesure d'une source : fonction d'agrégation appliquée à une expression de la source."""
+
+    def __init__(self, func: str, expr: str = '*', sql_type: str = 'INT'):
+        self.func = func
+        self.expr = expr
+        self.sql_type = sql_type
+
+    @property
+    def additive(self) -> bool:
+        return REAGGREGATE[self.func] is not None
+
+    def sql(self) -> str:
+        if self.func == 'COUNT_DISTINCT':
+            return f"COUNT(DISTINCT {self.expr})"
+        return f"{self.func}({self.expr})"
+
+
+class Source:
+    """Source logique de requêtes : table de faits gold ou sous-requête sur un fait (fait de base pour le rafraîchissement)."""
+
+    def __init__(self, name: str, fact: str, relation: str, measures: Dict[str, Measure]):
+        self.name = name
+        self.fact = fact
+        self.relation = relation
+        self.measures = measures
+
+
+def _outcome(result: str) -> str:
+    return f"CASE WHEN FullTimeResult = '{result}' THEN 1 ELSE 0 END"
+
+
+# Chaque match vu par les deux équipes (domicile / extérieur)
+MATCH_TEAM_RELATION = f"""(
+    SELECT Time_SK, HomeTeam_SK AS Team_SK, 'Home' AS Venue,
+           FullTimeHomeGoals AS GoalsFor, FullTimeAwayGoals AS GoalsAgainst,
+           {_outcome('H')} AS Win, {_outcome('D')} AS Draw, {_outcome('A')} AS Loss,
+           HomeShots AS Shots, HomeShotsOnTarget AS ShotsOnTarget, HomeCorners AS Corners
+    FROM gold.FactMatchEvent
+    UNION ALL
+    SELECT Time_SK, AwayTeam_SK, 'Away',
+           FullTimeAwayGoals, FullTimeHomeGoals,
+           {_outcome('A')}, {_outcome('D')}, {_outcome('H')},
+           AwayShots, AwayShotsOnTarget, AwayCorners
+    FROM gold.FactMatchEvent
+)"""
+
+PLAYER_NATION_RELATION = """(
+    SELECT f.*, p.Nation_SK
+    FROM gold.FactPlayerPerformance f
+    JOIN gold.DimPlayer p ON p.Player_SK = f.Player_SK
+)"""
+
+_PLAYER_MEASURES = {
+    'Player_Rows': Measure('COUNT'),
+    'Players': Measure('COUNT_DISTINCT', 'Player_SK'),
+    'MatchesPlayed': Measure('SUM', 'MatchesPlayed'),
+    'MinutesPlayed': Measure('SUM', 'MinutesPlayed'),
+    'Goals': Measure('SUM', 'Goals'),
+    'Assists': Measure('SUM', 'Assists'),
+    'YellowCards': Measure('SUM', 'YellowCards'),
+    'RedCards': Measure('SUM', 'RedCards'),
+    'MarketValue_Euro_k': Measure('SUM', 'MarketValue_Euro_k'),
+}
+
+SOURCES = {
+    'match_team': Source('match_team', 'gold.FactMatchEvent', MATCH_TEAM_RELATION, {
+        'Matches': Measure('COUNT'),
+        'Wins': Measure('SUM', 'Win'),
+        'Draws': Measure('SUM', 'Draw'),
+        'Losses': Measure('SUM', 'Loss'),
+        'GoalsFor': Measure('SUM', 'GoalsFor'),
+        'GoalsAgainst': Measure('SUM', 'GoalsAgainst'),
+        'Shots': Measure('SUM', 'Shots'),
+        'ShotsOnTarget': Measure('SUM', 'ShotsOnTarget'),
+        'Corners': Measure('SUM', 'Corners'),
+    }),
+    'player': Source('player', 'gold.FactPlayerPerformance', 'gold.FactPlayerPerformance', _PLAYER_MEASURES),
+    'player_nation': Source('player_nation', 'gold.FactPlayerPerformance', PLAYER_NATION_RELATION, _PLAYER_MEASURES),
+}
+
+
+# --- 3. AGRÉGATS DÉCLARÉS ---
+
+class Rollup:
+    """
+    Agrégat matérialisé : grain (clés, dont Time_SK) et mesures d'une source.
+    `depends_on` : dimensions lues par la source (jointure) ; une mise à jour de leurs membres
+    ne change aucune partition de faits, l'agrégat est alors reconstruit.
+    """
+
+    def __init__(self, table: str, source: str, keys: Sequence[str], measures: Sequence[str],
+                 key_types: Optional[Dict[str, str]] = None, depends_on: Sequence[str] = ()):
+        self.table = table
+        self.source = SOURCES[source]
+        self.keys = list(keys)
+        self.measures = list(measures)
+        self.key_types = key_types or {}
+        self.depends_on = list(depends_on)
+        if SEASON_COLUMN not in self.keys:
+            raise ValueError(f"{table} : le grain d'un agrégat doit contenir {SEASON_COLUMN}.")
+
+    @property
+    def columns(self) -> List[str]:
+        return self.keys + self.measures
+
+    def select_sql(self, seasons: Optional[Sequence[int]] = None) -> str:
+        measures = ', '.join(f"{self.source.measures[m].sql()} AS [{m}]" for m in self.measures)
+        where = f" WHERE {SEASON_COLUMN} IN ({', '.join('?' for _ in seasons)})" if seasons else ''
+        return (f"SELECT {', '.join(self.keys)}, {measures} FROM {self.source.relation} s{where} "
+                f"GROUP BY {', '.join(self.keys)}")
+
+    @property
+    def definition_hash(self) -> str:
+        return hashlib.sha256(f"{self.table}\n{self.select_sql()}".encode('utf-8')).hexdigest()[:32]
+
+
+ROLLUPS = [
+    # Bilan domicile / extérieur par équipe et saison (FactMatchEvent)
+    Rollup('gold.Agg_Team_Season_Venue', 'match_team', ['Time_SK', 'Team_SK', 'Venue'],
+           ['Matches', 'Wins', 'Draws', 'Losses', 'GoalsFor', 'GoalsAgainst', 'Shots', 'ShotsOnTarget', 'Corners'],
+           key_types={'Venue': 'VARCHAR(4)'}),
+    # Totaux d'effectif par équipe et saison (FactPlayerPerformance)
+    Rollup('gold.Agg_Squad_Season', 'player', ['Time_SK', 'Team_SK'],
+           ['Player_Rows', 'Players', 'MatchesPlayed', 'MinutesPlayed', 'Goals', 'Assists',
+            'YellowCards', 'RedCards', 'MarketValue_Euro_k']),
+    # Joueurs et buts par nation et saison
+    Rollup('gold.Agg_Nation_Season', 'player_nation', ['Time_SK', 'Nation_SK'],
+           ['Player_Rows', 'Players', 'MinutesPlayed', 'Goals', 'Assists'], depends_on=['gold.DimPlayer']),
+]
+
+
+# --- 4. RAFRAÎCHISSEMENT APRÈS LE CHARGEMENT GOLD ---
+
+def _stored_hashes(conn: Connection) -> Dict[str, str]:
+    rows = conn.execute(f"SELECT Aggregate_Name, Definition_Hash FROM {AGGREGATE_STATE_TABLE}").fetchall()
+    return {name: hash_value.strip() for name, hash_value in rows}
+
+
+def _record_state(conn: Connection, rollup: Rollup):
+    conn.execute(f"DELETE FROM {AGGREGATE_STATE_TABLE} WHERE Aggregate_Name = ?", rollup.table)
+    conn.execute(
+        f"INSERT INTO {AGGREGATE_STATE_TABLE} (Aggregate_Name, Definition_Hash, Refreshed_At) VALUES (?, ?, ?)",
+        rollup.table, rollup.definition_hash, datetime.datetime.now()
+    )
+
+
+def refresh_aggregates(conn: Connection, changed: Dict[str, Sequence[int]],
+                       dimensions: Sequence[DimensionReport] = ()) -> List[Tuple[str, str]]:
+    """
+    Recalcule les agrégats dans la transaction du chargement gold (INSERT ... SELECT exécuté par le moteur) :
+    - définition nouvelle ou modifiée (ou config.FORCE_REBUILD) : agrégat entièrement reconstruit ;
+    - membres mis à jour dans une dimension dont dépend l'agrégat (`dimensions` : rapports de fusion
+      des dimensions) : agrégat reconstruit, les saisons concernées ne sont pas connues ;
+    - sinon, uniquement les saisons dont le fait de base a changé (`changed` : fait -> Time_SK remplacés).
+    Retourne (agrégat, description du rafraîchissement).
+    """
+    stored = _stored_hashes(conn)
+    updated_dimensions = {report.table for report in dimensions if report.updated}
+    results = []
+    for rollup in ROLLUPS:
+        insert = f"INSERT INTO {rollup.table} ({', '.join(f'[{c}]' for c in rollup.columns)}) "
+        stale = [table for table in rollup.depends_on if table in updated_dimensions]
+        if config.FORCE_REBUILD or stored.get(rollup.table) != rollup.definition_hash or stale:
+            conn.execute(f"DELETE FROM {rollup.table}")
+            conn.execute(insert + rollup.select_sql())
+            _record_state(conn, rollup)
+            results.append((rollup.table, f"reconstruit ({', '.join(stale)} modifiée)" if stale else 'reconstruit'))
+            continue
+
+        seasons = sorted(int(value) for value in changed.get(rollup.source.fact, []))
+        if not seasons:
+            results.append((rollup.table, 'inchangé'))
+            continue
+        placeholders = ', '.join('?' for _ in seasons)
+        conn.execute(f"DELETE FROM {rollup.table} WHERE {SEASON_COLUMN} IN ({placeholders})", *seasons)
+        conn.execute(insert + rollup.select_sql(seasons), *seasons)
+        _record_state(conn, rollup)
+        results.append((rollup.table, f"{len(seasons)} saison(s) recalculée(s)"))
+    return results
+
+
+# --- 5. ROUTAGE DES REQUÊTES ---
+
+def find_rollup(source: str, group_by: Sequence[str], measures: Sequence[str],
+                filters: Optional[Dict[str, object]] = None) -> Optional[Rollup]:
+    """
+    Agrégat capable de répondre : même source, grain contenant les colonnes groupées et filtrées,
+    toutes les mesures demandées. Une mesure non additive (COUNT DISTINCT) exige le grain exact
+    (clés de l'agrégat toutes groupées ou fixées par un filtre d'égalité). Le plus petit grain l'emporte.
+    """
+    needed = set(group_by) | set(filters or {})
+    candidates = []
+    for rollup in ROLLUPS:
+        if rollup.source.name != source or not needed <= set(rollup.keys) or not set(measures) <= set(rollup.measures):
+            continue
+        exact = set(rollup.keys) <= needed
+        if not exact and not all(rollup.source.measures[m].additive for m in measures):
+            continue
+        candidates.append(rollup)
+    return min(candidates, key=lambda rollup: len(rollup.keys), default=None)
+
+
+def build_query(source: str, group_by: Sequence[str], measures: Sequence[str],
+                filters: Optional[Dict[str, object]] = None) -> Tuple[str, list, str]:
+    """Requête SQL (et paramètres) servie par l'agrégat correspondant s'il existe, sinon par la source."""
+    filters = filters or {}
+    definition = SOURCES[source]
+    unknown = [m for m in measures if m not in definition.measures]
+    if unknown:
+        raise ValueError(f"Mesure(s) inconnue(s) pour {source} : {', '.join(unknown)}.")
+
+    rollup = find_rollup(source, group_by, measures, filters)
+    if rollup is not None:
+        relation, served_by = rollup.table, rollup.table
+        selected = [f"{REAGGREGATE[definition.measures[m].func] or 'MAX'}([{m}]) AS [{m}]" for m in measures]
+    else:
+        relation, served_by = definition.relation, source
+        selected = [f"{definition.measures[m].sql()} AS [{m}]" for m in measures]
+
+    sql = f"SELECT {', '.join(list(group_by) + selected)} FROM {relation} s"
+    if filters:
+        sql += ' WHERE ' + ' AND '.join(f"{col} = ?" for col in filters)
+    if group_by:
+        sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+    return sql, list(filters.values()), served_by
+
+
+def query(conn: Connection, source: str, group_by: Sequence[str], measures: Sequence[str],
+          filters: Optional[Dict[str, object]] = None) -> Tuple[pd.DataFrame, str]:
+    """Exécute une requête d'agrégation routée ; retourne (résultat, table ou source qui l'a servie)."""
+    sql, params, served_by = build_query(source, group_by, measures, filters)
+    cursor = conn.execute(sql, *params)
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns), served_by
@@ -0,0 +1,91 @@
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# --- 1. CONFIGURATION ---
+# Une colonne texte n'est encodée que si elle répète suffisamment ses valeurs
+# (nombre de valeurs distinctes / nombre de lignes en dessous de ce seuil)
+MAX_CARDINALITY_RATIO = 0.5
+
+_KEEP = object()  # Valeur non trouvée dans le mapping : on conserve la catégorie source
+
+
+# --- 2. ENCODAGE ---
+
+def to_categorical(df: pd.DataFrame, columns: Iterable[str],
+                   max_ratio: Optional[float] = MAX_CARDINALITY_RATIO) -> pd.DataFrame:
+    """
+    Encode en place les colonnes texte listées sous forme de dictionnaire (dtype 'category') :
+    chaque valeur distincte est stockée une seule fois, les lignes ne portent qu'un code entier.
+    Les colonnes trop peu répétitives (ratio > `max_ratio`) restent en 'object' ; None force l'encodage.
+    """
+    for col in columns:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        if max_ratio is not None and len(df) and df[col].nunique(dropna=True) / len(df) > max_ratio:
+            continue
+        df[col] = df[col].astype('category')
+    return df
+
+
+def constant_categorical(value, length: int) -> pd.Categorical:
+    """Colonne constante (ex: la saison d'un fichier) : une seule catégorie, des codes à zéro."""
+    return pd.Categorical.from_codes(np.zeros(length, dtype=np.int8), categories=[value])
+
+
+def map_categorical(series: pd.Series,
+                    mapping: Union[Dict, Callable],
+                    default=_KEEP) -> pd.Series:
+    """
+    Applique un mapping (dictionnaire ou fonction) une seule fois par valeur distincte,
+    puis recompose la colonne à partir des codes : le coût dépend du nombre de catégories, pas de lignes.
+    Les valeurs absentes du mapping gardent leur valeur source (ou `default` si fourni) ;
+    plusieurs sources peuvent converger vers la même valeur standard (ex: 'Man United', 'Manchester Utd').
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+
+    categories = series.cat.categories
+    if callable(mapping):
+        mapped = [mapping(c) for c in categories]
+        mapped = [_KEEP if m is None else m for m in mapped]
+    else:
+        mapped = [mapping.get(c, _KEEP) for c in categories]
+    mapped = [(c if default is _KEEP else default) if m is _KEEP else m for c, m in zip(categories, mapped)]
+
+    # Dédoublonnage des valeurs standard : ancien code -> nouveau code (le code -1 reste manquant)
+    new_codes, new_categories = pd.factorize(pd.Index(mapped, dtype=object), use_na_sentinel=True)
+    codes = series.cat.codes.to_numpy()
+    remapped = np.append(new_codes, -1)[codes]
+
+    # Valeurs manquantes de la source : remplacées par `default` s'il est fourni
+    if default is not _KEEP and default is not None and (codes < 0).any():
+        if default not in new_categories:
+            new_categories = new_categories.append(pd.Index([default], dtype=object))
+        remapped = np.where(codes < 0, new_categories.get_loc(default), remapped)
+
+    return pd.Series(pd.Categorical.from_codes(remapped, categories=new_categories),
+                     index=series.index, name=series.name)
+
+
+# --- 3. DÉCODAGE À L'ÉCRITURE ---
+
+def _column_for_write(series: pd.Series) -> np.ndarray:
+    """Colonne -> tableau d'objets Python, NaN/NaT/NA remplacés par None."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Décodage direct par les codes : la dernière case (code -1) vaut None
+        lookup = np.append(series.cat.categories.to_numpy(dtype=object), None)
+        return lookup[series.cat.codes.to_numpy()]
+    values = series.to_numpy(dtype=object, copy=True)
+    values[pd.isna(series).to_numpy()] = None
+    return values
+
+
+def to_records(df: pd.DataFrame, columns: Optional[List[str]] = None) -> List[tuple]:
+    """
+    Lignes prêtes pour executemany : les catégories ne sont décodées qu'ici, au moment de l'écriture,
+    et les valeurs manquantes deviennent None (NULL SQL).
+    """
+    columns = list(df.columns) if columns is None else columns
+    return list(zip(*(_column_for_write(df[col]) for col in columns)))
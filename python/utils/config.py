@@ -0,0 +1,55 @@
+import os
+
+# --- 1. CHEMINS DU PROJET ---
+# Racine du dépôt (python/utils/config.py -> ../../)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dossier des données (surchargeable pour pointer vers un autre poste ou un runner CI)
+DATA_DIR = os.environ.get('FOOTBALL_DW_DATA_DIR', os.path.join(PROJECT_ROOT, 'data'))
+PROCESSED_DIR = os.path.join(DATA_DIR, 'processed')
+RAW_DIR = os.path.join(DATA_DIR, 'raw')
+
+# Scripts DDL des couches bronze / silver / gold
+SQL_DIR = os.path.join(PROJECT_ROOT, 'sql')
+DDL_FILES = {
+    'bronze': os.path.join(SQL_DIR, 'bronze', 'bronze_ddl.sql'),
+    'silver': os.path.join(SQL_DIR, 'silver', 'silver_ddl.sql'),
+    'gold': os.path.join(SQL_DIR, 'gold', 'ddl gold layer.sql'),
+}
+
+# --- 2. BASE DE DONNÉES ---
+# Moteur cible : 'sqlserver' (LocalDB, par défaut), 'sqlite' ou 'duckdb' (moteurs embarqués)
+DB_BACKEND = os.environ.get('FOOTBALL_DW_BACKEND', 'sqlserver').lower()
+
+# Informations de Connexion SQL Server
+SQL_SERVER_NAME = os.environ.get('FOOTBALL_DW_SQL_SERVER', '(localdb)\\MSSQLLocalDB')
+DATABASE_NAME = os.environ.get('FOOTBALL_DW_DATABASE', 'DW_Football_Staging')
+ODBC_DRIVER = os.environ.get('FOOTBALL_DW_ODBC_DRIVER', 'ODBC Driver 17 for SQL Server')
+
+# Fichier de la base embarquée (':memory:' possible pour SQLite)
+EMBEDDED_DB_DIR = os.environ.get('FOOTBALL_DW_DB_DIR', os.path.join(DATA_DIR, 'warehouse'))
+EMBEDDED_DB_PATH = os.environ.get('FOOTBALL_DW_DB_PATH')
+
+# --- 3. COUCHE SILVER ---
+# Exécution des jointures de conformité : 'pandas' (lecture puis transformation en mémoire)
+# ou 'pushdown' (INSERT ... SELECT exécuté par le moteur, seules les valeurs à analyser quittent la base)
+SILVER_MODES = ('pandas', 'pushdown')
+SILVER_MODE = os.environ.get('FOOTBALL_DW_SILVER_MODE', 'pandas').lower()
+
+# Budget mémoire (Mo) d'une transformation silver : dimensionne les lots lus par utils.streaming
+MEMORY_BUDGET_MB = float(os.environ.get('FOOTBALL_DW_MEMORY_BUDGET_MB', '256'))
+
+# Cliché disque des mappings de référence (utils.reference_cache) : démarrage à chaud d'un nouveau processus.
+# Vide (par défaut) : pas de cliché, les mappings sont lus une fois par processus et par version.
+REFERENCE_SNAPSHOT_PATH = os.environ.get('FOOTBALL_DW_REFERENCE_SNAPSHOT') or None
+
+# Reconstruction forcée des étapes silver, même si leurs entrées n'ont pas changé (utils.watermark)
+FORCE_REBUILD = os.environ.get('FOOTBALL_DW_FORCE_REBUILD', '').lower() in ('1', 'true', 'yes')
+
+# --- 4. COUCHE GOLD ---
+# Disposition physique des faits (utils.gold_schema) : 'rowstore', 'indexed' (index par clé de dimension)
+# ou 'columnstore' (columnstore cluster et partition par saison sous SQL Server, index de clés partout)
+GOLD_LAYOUT = os.environ.get('FOOTBALL_DW_GOLD_LAYOUT', 'rowstore').lower()
+
+# Export Parquet de la couche gold (export/gold.Parquet_Export.py) : un dossier par table, faits partitionnés par saison
+PARQUET_DIR = os.environ.get('FOOTBALL_DW_PARQUET_DIR', os.path.join(DATA_DIR, 'gold_parquet'))
@@ -0,0 +1,193 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.categorical import map_categorical
+from utils.db import Connection, Dialect
+from utils.silver_sync import ROW_HASH_COLUMN
+
+# --- 1. RÈGLES DE CORRECTION ---
+
+class CorrectionRule(ABC):
+    """
+    Règle déclarative de correction d'une ou plusieurs colonnes d'une table silver.
+    Chaque règle s'applique de deux façons équivalentes :
+    - dans le flux (DataFrame, une évaluation par valeur distincte) avant le premier chargement ;
+    - dans la base, compilée en expression CASE (toutes les règles d'une table en un seul UPDATE).
+    """
+
+    def __init__(self, name: str, table: str, columns: Sequence[str], description: str = ''):
+        self.name = name
+        self.table = table
+        self.columns = list(columns)
+        self.description = description
+
+    @abstractmethod
+    def correct_value(self, value):
+        """Valeur corrigée, ou la valeur elle-même si la règle ne s'applique pas."""
+
+    @abstractmethod
+    def sql_expression(self, dialect: Dialect, expr: str) -> str:
+        """Expression SQL de la valeur corrigée de `expr`."""
+
+    @abstractmethod
+    def sql_hit_condition(self, dialect: Dialect, expr: str) -> str:
+        """Condition SQL vraie si la règle modifie `expr`."""
+
+    def apply_series(self, series: pd.Series):
+        """Retourne (colonne corrigée (catégorielle), nombre de lignes corrigées)."""
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        changed = np.array([self.correct_value(c) != c for c in series.cat.categories] + [False])
+        hits = int(changed[series.cat.codes.to_numpy()].sum())
+        if not hits:
+            return series, 0
+        return map_categorical(series, self.correct_value), hits
+
+
+def _literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class ValueReplacement(CorrectionRule):
+    """Remplacement de valeurs exactes (ex: nom tronqué -> nom complet)."""
+
+    def __init__(self, name: str, table: str, columns: Sequence[str], replacements: Dict[str, str],
+                 description: str = ''):
+        super().__init__(name, table, columns, description)
+        self.replacements = dict(replacements)
+
+    def correct_value(self, value):
+        return self.replacements.get(value, value)
+
+    def sql_expression(self, dialect: Dialect, expr: str) -> str:
+        cases = ' '.join(f"WHEN {_literal(old)} THEN {_literal(new)}" for old, new in self.replacements.items())
+        return f"CASE {expr} {cases} ELSE {expr} END"
+
+    def sql_hit_condition(self, dialect: Dialect, expr: str) -> str:
+        return f"{expr} IN ({', '.join(_literal(old) for old in self.replacements)})"
+
+
+class FirstToken(CorrectionRule):
+    """Liste de valeurs séparées : seule la première est conservée (ex: 'FW,MF' -> 'FW')."""
+
+    def __init__(self, name: str, table: str, columns: Sequence[str], separator: str = ',',
+                 description: str = ''):
+        super().__init__(name, table, columns, description)
+        self.separator = separator
+
+    def correct_value(self, value):
+        if isinstance(value, str) and self.separator in value:
+            return value.split(self.separator)[0].strip()
+        return value
+
+    def sql_expression(self, dialect: Dialect, expr: str) -> str:
+        position = dialect.position_sql(_literal(self.separator), expr)
+        first = dialect.trim_sql(dialect.substring_sql(expr, '1', f"{position} - 1"))
+        return f"CASE WHEN {position} > 0 THEN {first} ELSE {expr} END"
+
+    def sql_hit_condition(self, dialect: Dialect, expr: str) -> str:
+        return f"{dialect.position_sql(_literal(self.separator), expr)} > 0"
+
+
+# --- 2. CATALOGUE DES RÈGLES (ordre d'application) ---
+# Les noms d'équipe non mappés sont résolus par utils.team_resolver, pas par une règle
+
+CORRECTION_RULES: List[CorrectionRule] = [
+    ValueReplacement(
+        'nations_tronquees', 'silver.Player_Stats_Conformed', ['Nation_Conformed'],
+        {
+            'République démocrat': 'République démocratique du Congo',
+            'République dominica': 'République dominicaine',
+            'Saint-Christophe-et': 'Saint-Christophe-et-Niévès',
+        },
+        description="Noms de nations tronqués à 19 caractères dans la source",
+    ),
+    FirstToken(
+        'position_principale', 'silver.Player_Stats_Conformed', ['Position'], ',',
+        description="Seule la première position est conservée (ex: 'FW,MF' -> 'FW')",
+    ),
+]
+
+
+def rules_for(table: str) -> List[CorrectionRule]:
+    return [rule for rule in CORRECTION_RULES if rule.table == table]
+
+
+# --- 3. JOURNAL DES CORRECTIONS ---
+
+class CorrectionLog:
+    """Nombre de lignes corrigées par règle (cumulé sur les lots d'un même chargement)."""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.hits: Dict[str, int] = OrderedDict((rule.name, 0) for rule in rules_for(table))
+
+    def add(self, rule_name: str, hits: int):
+        self.hits[rule_name] = self.hits.get(rule_name, 0) + int(hits)
+
+    def report(self):
+        for rule in rules_for(self.table):
+            print(f"-> Règle '{rule.name}' ({rule.description}) : {self.hits.get(rule.name, 0)} ligne(s) corrigée(s).")
+
+
+# --- 4. APPLICATION DANS LE FLUX ---
+
+def apply_corrections(df: pd.DataFrame, table: str, log: Optional[CorrectionLog] = None) -> pd.DataFrame:
+    """Applique en place les règles de la table aux colonnes présentes du DataFrame (avant chargement)."""
+    for rule in rules_for(table):
+        for column in rule.columns:
+            if column not in df.columns:
+                continue
+            df[column], hits = rule.apply_series(df[column])
+            if log is not None:
+                log.add(rule.name, hits)
+    return df
+
+
+def corrected_sql(dialect: Dialect, table: str, column: str, expr: str) -> str:
+    """Expression SQL de la colonne après application des règles (mode pushdown)."""
+    for rule in rules_for(table):
+        if column in rule.columns:
+            expr = rule.sql_expression(dialect, expr)
+    return expr
+
+
+# --- 5. APPLICATION ENSEMBLISTE DANS LA BASE ---
+
+def apply_corrections_in_place(conn: Connection, table: str) -> CorrectionLog:
+    """
+    Compile toutes les règles de la table en un seul UPDATE (une expression CASE par colonne,
+    les règles d'une même colonne étant composées dans l'ordre du catalogue).
+    Les comptages par règle sont lus par un seul SELECT avant la mise à jour.
+    L'empreinte des lignes corrigées est remise à NULL (voir utils.silver_sync). Ne valide pas la transaction.
+    """
+    log = CorrectionLog(table)
+    dialect = conn.dialect
+    expressions: Dict[str, str] = OrderedDict()
+    conditions = []   # (règle, condition évaluée sur la valeur produite par les règles précédentes)
+    for rule in rules_for(table):
+        for column in rule.columns:
+            current = expressions.get(column, f"[{column}]")
+            conditions.append((rule, rule.sql_hit_condition(dialect, current)))
+            expressions[column] = rule.sql_expression(dialect, current)
+    if not conditions:
+        return log
+
+    counts = conn.execute(
+        "SELECT " + ', '.join(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)" for _, condition in conditions)
+        + f" FROM {table}"
+    ).fetchone()
+    for (rule, _), count in zip(conditions, counts):
+        log.add(rule.name, count or 0)
+
+    if any(log.hits.values()):
+        assignments = ', '.join(f"[{column}] = {expr}" for column, expr in expressions.items())
+        conn.execute(
+            f"UPDATE {table} SET {assignments}, [{ROW_HASH_COLUMN}] = NULL "
+            f"WHERE {' OR '.join(f'({condition})' for _, condition in conditions)}"
+        )
+    return log
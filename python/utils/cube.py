@@ -0,0 +1,356 @@
+import argparse
+import datetime
+import re
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.db import Connection
+from utils.gold_schema import GOLD_TABLES
+
+# --- 1. CONFIGURATION ---
+# Cube en mémoire équivalent au projet ssas/Football_DW_Cube (groupes de mesures = faits gold, mêmes dimensions)
+
+# Fonctions d'agrégation d'une mesure ('Goals' équivaut à 'SUM(Goals)', 'COUNT(*)' compte les lignes du fait)
+AGGREGATES = ('SUM', 'COUNT', 'AVG', 'MIN', 'MAX')
+MEASURE_PATTERN = re.compile(r'^(SUM|COUNT|AVG|MIN|MAX)\((\*|\w+)\)$', re.IGNORECASE)
+
+# Valeur d'un code absent (clé de dimension introuvable ou attribut NULL)
+MISSING_CODE = -1
+
+
+class Dimension:
+    """Dimension du cube : table gold, clé de substitution, attributs et dimensions référencées (flocon)."""
+
+    def __init__(self, table: str, sk: str, attributes: Sequence[str], references: Optional[Dict[str, str]] = None):
+        self.table = table
+        self.sk = sk
+        self.attributes = list(attributes)
+        self.references = references or {}    # dimension référencée -> colonne clé de cette dimension
+
+
+class MeasureGroup:
+    """Groupe de mesures : table de faits, rôles de dimension (rôle -> (colonne clé, dimension)) et mesures."""
+
+    def __init__(self, fact: str, roles: Dict[str, Tuple[str, str]]):
+        self.fact = fact
+        self.roles = roles
+        table = next(table for table in GOLD_TABLES if table.name == fact)
+        # Mesures : colonnes numériques du fait qui ne sont pas des clés de dimension
+        self.measures = {col.name: col.sql_type for col in table.columns
+                         if not col.references and (col.sql_type == 'INT' or col.sql_type.startswith('DECIMAL'))}
+
+
+DIMENSIONS = {
+    'Time': Dimension('gold.DimTime', 'Time_SK', ['Season_BK', 'Season_Start_Year', 'Season_End_Year']),
+    'Date': Dimension('gold.DimDate', 'Date_SK', ['Full_Date', 'Matchweek', 'Calendar_Year', 'Month_Number', 'Month_Name',
+                                                  'Year_Month', 'Weekday_Number', 'Weekday_Name'],
+                      references={'Time': 'Time_SK'}),
+    'Team': Dimension('gold.DimTeam', 'Team_SK', ['Squad_Conformed_BK']),
+    'Nation': Dimension('gold.DimNation', 'Nation_SK', ['Nation_Standard_Name_BK']),
+    'Player': Dimension('gold.DimPlayer', 'Player_SK', ['Player_Name_BK', 'BirthYear', 'Current_Position', 'Player_Id'],
+                        references={'Nation': 'Nation_SK'}),
+    'Notes': Dimension('gold.DimNotes', 'Notes_SK', ['Notes_Standard_Name_BK', 'Notes_Category']),
+}
+
+MEASURE_GROUPS = {
+    'team': MeasureGroup('gold.FactTeamPerformance', {
+        'Time': ('Time_SK', 'Time'), 'Team': ('Team_SK', 'Team'), 'Notes': ('Notes_SK', 'Notes')}),
+    'player': MeasureGroup('gold.FactPlayerPerformance', {
+        'Time': ('Time_SK', 'Time'), 'Team': ('Team_SK', 'Team'), 'Player': ('Player_SK', 'Player')}),
+    # Dimension équipe à deux rôles (domicile / extérieur), comme Home Team SK / Away Team SK du cube SSAS
+    'match': MeasureGroup('gold.FactMatchEvent', {
+        'Time': ('Time_SK', 'Time'), 'HomeTeam': ('HomeTeam_SK', 'Team'), 'AwayTeam': ('AwayTeam_SK', 'Team'),
+        'Date': ('Date_SK', 'Date')}),
+}
+
+# Niveaux usuels ('Rôle.[Dimension référencée.]Attribut'), pré-calculés au chargement pour chaque groupe concerné
+LEVEL_ALIASES = {
+    'Season': 'Time.Season_BK',
+    'Month': 'Date.Year_Month',
+    'Matchweek': 'Date.Matchweek',
+    'Weekday': 'Date.Weekday_Number',
+    'Team': 'Team.Squad_Conformed_BK',
+    'HomeTeam': 'HomeTeam.Squad_Conformed_BK',
+    'AwayTeam': 'AwayTeam.Squad_Conformed_BK',
+    'Player': 'Player.Player_Name_BK',
+    'Position': 'Player.Current_Position',
+    'PlayerId': 'Player.Player_Id',
+    'Nation': 'Player.Nation.Nation_Standard_Name_BK',
+    'Notes': 'Notes.Notes_Standard_Name_BK',
+    'NotesCategory': 'Notes.Notes_Category',
+}
+
+
+# --- 2. STOCKAGE EN COLONNES ---
+
+class Level:
+    """Niveau d'une hiérarchie projeté sur un fait : code entier par ligne de fait et libellés triés."""
+
+    def __init__(self, codes: np.ndarray, labels: pd.Index):
+        self.codes = codes
+        self.labels = labels
+
+
+def _take(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """values[positions], en conservant MISSING_CODE pour les positions absentes."""
+    if len(values) == 0:
+        return np.full(len(positions), MISSING_CODE, dtype=np.int32)
+    return np.where(positions >= 0, values[positions], MISSING_CODE).astype(np.int32)
+
+
+def _positions(sorted_sks: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Position de chaque clé de substitution dans la dimension (triée par clé), MISSING_CODE si introuvable."""
+    index = np.searchsorted(sorted_sks, keys)
+    found = index < len(sorted_sks)
+    found[found] = sorted_sks[index[found]] == keys[found]
+    return np.where(found, index, MISSING_CODE).astype(np.int32)
+
+
+def _fetch_frame(conn: Connection, sql: str) -> pd.DataFrame:
+    cursor = conn.execute(sql)
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def _keys(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors='coerce').fillna(MISSING_CODE).to_numpy(np.int64)
+
+
+def _typed(table: str, frame: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes INT de la dimension en Int64 (un entier NULL relu par from_records devient un réel : 5.0)."""
+    columns = next(t for t in GOLD_TABLES if t.name == table).columns
+    return frame.assign(**{col.name: pd.to_numeric(frame[col.name], errors='coerce').astype('Int64')
+                           for col in columns if col.sql_type == 'INT' and col.name in frame.columns})
+
+
+def _label_codes(level: Level, name: str, values: Sequence[object]) -> np.ndarray:
+    """
+    Codes des valeurs filtrées, converties au type des libellés du niveau (valeurs texte de la ligne
+    de commande : '5' -> 5, '2014-08-16' -> date). Une valeur invalide ou absente du niveau lève ValueError.
+    """
+    labels = level.labels
+    try:
+        if len(labels) and isinstance(labels[0], datetime.date):
+            wanted = pd.Index(pd.to_datetime(list(values)).date, dtype=object)
+        else:
+            wanted = pd.Index(list(values), dtype=object).astype(labels.dtype)
+    except (ValueError, TypeError):
+        raise ValueError(f"Valeur invalide pour {name} : {', '.join(map(str, values))}.")
+    codes = labels.get_indexer(wanted)
+    if (codes < 0).any():
+        missing = [str(value) for value, code in zip(values, codes) if code < 0]
+        raise ValueError(f"Valeur(s) absente(s) du niveau {name} : {', '.join(missing)}.")
+    return codes
+
+
+class Cube:
+    """
+    Faits gold en tableaux NumPy : clés de dimension codées en positions entières, mesures en float64.
+    Les niveaux de hiérarchie (codes par ligne de fait) sont calculés une fois puis mis en cache ;
+    une requête n'est plus qu'un masque, une clé de groupe entière et des réductions vectorisées.
+    """
+
+    def __init__(self, dimensions: Dict[str, pd.DataFrame], facts: Dict[str, pd.DataFrame]):
+        self.dimensions = {}
+        self.sorted_sks = {}
+        for name, frame in dimensions.items():
+            sk = DIMENSIONS[name].sk
+            frame = _typed(DIMENSIONS[name].table, frame)
+            frame = frame.assign(**{sk: _keys(frame[sk])}).sort_values(sk, kind='stable').reset_index(drop=True)
+            self.dimensions[name] = frame
+            self.sorted_sks[name] = frame[sk].to_numpy()
+
+        self.rows: Dict[str, int] = {}
+        self.positions: Dict[str, Dict[str, np.ndarray]] = {}
+        self.measures: Dict[str, Dict[str, np.ndarray]] = {}
+        for group, frame in facts.items():
+            definition = MEASURE_GROUPS[group]
+            self.rows[group] = len(frame)
+            self.positions[group] = {role: _positions(self.sorted_sks[dimension], _keys(frame[column]))
+                                     for role, (column, dimension) in definition.roles.items()}
+            self.measures[group] = {name: pd.to_numeric(frame[name], errors='coerce').to_numpy(np.float64)
+                                    for name in definition.measures}
+
+        self._attributes: Dict[Tuple[str, str], Level] = {}
+        self._references: Dict[Tuple[str, str], np.ndarray] = {}
+        self._levels: Dict[Tuple[str, str], Level] = {}
+        self.precompute_levels()
+
+    @classmethod
+    def load(cls, conn: Connection, groups: Optional[Sequence[str]] = None) -> 'Cube':
+        """Lit les dimensions et les faits gold (une lecture par table)."""
+        groups = list(groups or MEASURE_GROUPS)
+        dimensions = {name: _fetch_frame(conn, f"SELECT * FROM {dimension.table}")
+                      for name, dimension in DIMENSIONS.items()}
+        facts = {}
+        for group in groups:
+            definition = MEASURE_GROUPS[group]
+            columns = [column for column, _ in definition.roles.values()] + list(definition.measures)
+            facts[group] = _fetch_frame(conn, f"SELECT {', '.join(columns)} FROM {definition.fact}")
+        return cls(dimensions, facts)
+
+    # --- 3. NIVEAUX DE HIÉRARCHIE ---
+
+    def _attribute(self, dimension: str, attribute: str) -> Level:
+        """Attribut d'une dimension codé en entiers (libellés triés), par ligne de dimension."""
+        key = (dimension, attribute)
+        if key not in self._attributes:
+            if attribute not in self.dimensions[dimension].columns:
+                raise ValueError(f"Attribut inconnu pour la dimension {dimension} : {attribute}.")
+            codes, labels = pd.factorize(self.dimensions[dimension][attribute], sort=True)
+            self._attributes[key] = Level(codes.astype(np.int32), pd.Index(labels))
+        return self._attributes[key]
+
+    def _reference(self, dimension: str, referenced: str) -> np.ndarray:
+        """Position, dans la dimension référencée, de chaque ligne de la dimension (flocon : joueur -> nation)."""
+        key = (dimension, referenced)
+        if key not in self._references:
+            column = DIMENSIONS[dimension].references[referenced]
+            self._references[key] = _positions(self.sorted_sks[referenced], _keys(self.dimensions[dimension][column]))
+        return self._references[key]
+
+    def level(self, group: str, name: str) -> Level:
+        """
+        Niveau 'Rôle.[Dimension référencée.]Attribut' (ou alias de LEVEL_ALIASES) projeté sur les lignes du fait.
+        Calculé une fois par groupe de mesures : composition de tableaux d'indices, sans jointure.
+        """
+        path = LEVEL_ALIASES.get(name, name)
+        key = (group, path)
+        if key in self._levels:
+            return self._levels[key]
+
+        role, *references, attribute = path.split('.')
+        roles = MEASURE_GROUPS[group].roles
+        if role not in roles or not attribute:
+            raise ValueError(f"Niveau inconnu pour le groupe {group} : {name} (rôles : {', '.join(roles)}).")
+        dimension = roles[role][1]
+        positions = self.positions[group][role]
+        for referenced in references:
+            if referenced not in DIMENSIONS[dimension].references:
+                raise ValueError(f"La dimension {dimension} ne référence pas {referenced}.")
+            positions = _take(self._reference(dimension, referenced), positions)
+            dimension = referenced
+
+        attribute_level = self._attribute(dimension, attribute)
+        self._levels[key] = Level(_take(attribute_level.codes, positions), attribute_level.labels)
+        return self._levels[key]
+
+    def precompute_levels(self):
+        """Pré-calcule les niveaux usuels (saison, équipe, nation...) de chaque groupe de mesures chargé."""
+        for group in self.positions:
+            roles = MEASURE_GROUPS[group].roles
+            for alias, path in LEVEL_ALIASES.items():
+                if path.split('.')[0] in roles:
+                    self.level(group, alias)
+
+    # --- 4. REQUÊTES ---
+
+    def _mask(self, group: str, filters: Dict[str, object]) -> np.ndarray:
+        mask = np.ones(self.rows[group], dtype=bool)
+        for name, values in filters.items():
+            level = self.level(group, name)
+            values = list(values) if isinstance(values, (list, tuple, set)) else [values]
+            mask &= np.isin(level.codes, _label_codes(level, name, values))
+        return mask
+
+    def _aggregate(self, group: str, measure: str, mask: np.ndarray, inverse: np.ndarray, size: int) -> pd.Series:
+        match = MEASURE_PATTERN.match(measure.replace(' ', ''))
+        func, column = (match.group(1).upper(), match.group(2)) if match else ('SUM', measure)
+        if column == '*':
+            return pd.Series(np.bincount(inverse, minlength=size), dtype='int64')
+        if column not in self.measures[group]:
+            raise ValueError(f"Mesure inconnue pour le groupe {group} : {measure}.")
+
+        values = self.measures[group][column][mask]
+        valid = ~np.isnan(values)
+        slots, values = inverse[valid], values[valid]
+        counts = np.bincount(slots, minlength=size)
+        if func == 'COUNT':
+            return pd.Series(counts, dtype='int64')
+        if func in ('SUM', 'AVG'):
+            totals = np.bincount(slots, weights=values, minlength=size)
+            result = totals / np.where(counts > 0, counts, 1) if func == 'AVG' else totals
+        else:
+            result = np.full(size, np.inf if func == 'MIN' else -np.inf)
+            (np.minimum if func == 'MIN' else np.maximum).at(result, slots, values)
+        # Groupe sans valeur non nulle : NULL, comme en SQL
+        result = np.where(counts > 0, result, np.nan)
+        if func != 'AVG' and MEASURE_GROUPS[group].measures[column] == 'INT':
+            return pd.Series(result).round().astype('Int64')
+        return pd.Series(result)
+
+    def query(self, group: str, rows: Sequence[str] = (), measures: Sequence[str] = ('COUNT(*)',),
+              filters: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+        """
+        Tableau croisé : niveaux `rows` en lignes, mesures ('Goals', 'AVG(Goals)', 'COUNT(*)'),
+        filtres {niveau: valeur ou liste de valeurs, absentes du niveau : ValueError}.
+        Résultat trié par libellés (NULL en premier).
+        """
+        if group not in self.positions:
+            raise ValueError(f"Groupe de mesures non chargé : {group}.")
+        mask = self._mask(group, filters or {})
+        levels = [self.level(group, name) for name in rows]
+
+        # Clé de groupe entière : codes décalés de 1 (0 = absent), combinés en indice mixte
+        shape = [len(level.labels) + 1 for level in levels]
+        if levels:
+            combined = np.ravel_multi_index([level.codes[mask] + 1 for level in levels], shape)
+        else:
+            combined = np.zeros(int(mask.sum()), dtype=np.int64)
+        groups, inverse = np.unique(combined, return_inverse=True)
+        inverse = inverse.ravel()
+
+        result = {}
+        for name, level, codes in zip(rows, levels, np.unravel_index(groups, shape) if levels else []):
+            labels = level.labels.to_numpy(dtype=object)
+            result[name] = [labels[code - 1] if code > 0 else None for code in codes]
+        for measure in measures:
+            result[measure] = self._aggregate(group, measure, mask, inverse, len(groups)).to_numpy()
+        return pd.DataFrame(result, columns=list(rows) + list(measures))
+
+
+# --- 5. LIGNE DE COMMANDE ---
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Requête sur le cube gold en mémoire (sans instance SSAS).")
+    parser.add_argument('group', choices=list(MEASURE_GROUPS), help="Groupe de mesures (fait gold).")
+    parser.add_argument('--backend', choices=['sqlserver', 'sqlite', 'duckdb'],
+                        help="Moteur lu (par défaut : variable FOOTBALL_DW_BACKEND, sinon sqlserver).")
+    parser.add_argument('--rows', nargs='*', default=[], help="Niveaux en lignes (ex. Season, HomeTeam, Nation).")
+    parser.add_argument('--measures', nargs='+', default=['COUNT(*)'], help="Mesures (ex. Goals, 'AVG(Points)').")
+    parser.add_argument('--filter', nargs='*', default=[], metavar='NIVEAU=VALEUR',
+                        help="Filtres d'égalité (valeurs multiples séparées par des virgules).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    from utils.db import open_connection
+    filters = {}
+    for item in args.filter:
+        name, _, values = item.partition('=')
+        filters[name] = values.split(',')
+
+    start = time.perf_counter()
+    conn = open_connection(backend=args.backend)
+    try:
+        cube = Cube.load(conn, [args.group])
+    finally:
+        conn.close()
+    loaded = time.perf_counter()
+    try:
+        result = cube.query(args.group, args.rows, args.measures, filters)
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    elapsed = time.perf_counter() - loaded
+
+    print(result.to_string(index=False))
+    print(f"\n{len(result)} ligne(s) ; cube chargé en {loaded - start:.2f} s ({cube.rows[args.group]} faits), "
+          f"requête en {elapsed * 1000:.2f} ms.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# --- 1. CONFIGURATION ---
+DATE_TABLE = 'gold.DimDate'
+
+# Saison sans match connu : commence le 1er juillet de son année de début
+SEASON_START_MONTH = 7
+
+MONTH_NAMES = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+               'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+WEEKDAY_NAMES = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
+# Colonnes de la dimension (Season_BK est remplacée par Time_SK au chargement)
+DATE_COLUMNS = ['Date_SK', 'Full_Date', 'Season_BK', 'Matchweek', 'Calendar_Year', 'Month_Number', 'Month_Name',
+                'Year_Month', 'Day_Of_Month', 'Weekday_Number', 'Weekday_Name']
+
+
+# --- 2. CLÉ DE DATE ---
+
+def date_keys(dates) -> np.ndarray:
+    """Clés entières AAAAMMJJ (20140816) : l'ordre des clés est celui des dates, un intervalle de dates en est un de clés."""
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    return (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(np.int64)
+
+
+# --- 3. SAISONS ET JOURNÉES ---
+
+def season_starts(seasons: pd.DataFrame, matches: pd.DataFrame) -> pd.Series:
+    """Premier jour de chaque saison (Season_BK -> date) : date de son premier match, sinon 1er juillet de l'année de début."""
+    starts = pd.Series(pd.to_datetime({'year': seasons['Season_Start_Year'].astype(int),
+                                       'month': SEASON_START_MONTH, 'day': 1}).to_numpy(),
+                       index=seasons['Season_BK'].to_numpy())
+    first_match = pd.to_datetime(matches['MatchDate']).groupby(matches['Season']).min()
+    starts.update(first_match[first_match.index.isin(starts.index)])
+    return starts.sort_values(kind='stable')
+
+
+def matchweeks(matches: pd.DataFrame) -> pd.Series:
+    """
+    Journée de championnat de chaque (saison, date de match) : rang médian du match dans la saison
+    des équipes qui jouent ce jour-là, jamais décroissant au fil de la saison (matchs en retard lissés).
+    """
+    dates = pd.to_datetime(matches['MatchDate'])
+    sides = pd.concat([pd.DataFrame({'Season': matches['Season'], 'Team': matches[col], 'Day': dates})
+                       for col in ['HomeTeam_Conformed', 'AwayTeam_Conformed']], ignore_index=True)
+    sides = sides.sort_values('Day', kind='stable')
+    sides['Game'] = sides.groupby(['Season', 'Team']).cumcount() + 1
+    per_day = sides.groupby(['Season', 'Day'])['Game'].median().round()
+    return per_day.groupby(level='Season').cummax()
+
+
+# --- 4. CALENDRIER ---
+
+def build_date_dimension(seasons: pd.DataFrame, matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calendrier jour par jour couvrant les saisons de DimTime (Season_BK, Season_Start_Year, Season_End_Year)
+    et toutes les dates de match. Chaque jour appartient à la dernière saison commencée (l'intersaison
+    est rattachée à la saison écoulée) ; la journée de championnat est celle du dernier match joué
+    de la saison (vide avant son premier match).
+    """
+    if seasons.empty:
+        return pd.DataFrame(columns=DATE_COLUMNS)
+    starts = season_starts(seasons, matches)
+    first_day = min(starts.min(), pd.Timestamp(year=int(seasons['Season_Start_Year'].min()),
+                                               month=SEASON_START_MONTH, day=1))
+    last_day = pd.Timestamp(year=int(seasons['Season_End_Year'].max()), month=SEASON_START_MONTH, day=1) \
+        - pd.Timedelta(days=1)
+    if len(matches):
+        last_day = max(last_day, pd.to_datetime(matches['MatchDate']).max())
+    days = pd.date_range(first_day, last_day, freq='D')
+
+    position = np.searchsorted(starts.to_numpy(), days.to_numpy(), side='right') - 1
+    frame = pd.DataFrame({'Season_BK': starts.index.to_numpy()[np.maximum(position, 0)], 'Day': days})
+    week_index = pd.MultiIndex.from_arrays([frame['Season_BK'], frame['Day']])
+    frame['Matchweek'] = matchweeks(matches).reindex(week_index).to_numpy() if len(matches) else np.nan
+    frame['Matchweek'] = frame.groupby('Season_BK')['Matchweek'].ffill()
+
+    return pd.DataFrame({
+        'Date_SK': date_keys(days),
+        'Full_Date': days.date,
+        'Season_BK': frame['Season_BK'],
+        'Matchweek': pd.array(frame['Matchweek'], dtype='Int64'),
+        'Calendar_Year': days.year,
+        'Month_Number': days.month,
+        'Month_Name': [MONTH_NAMES[month - 1] for month in days.month],
+        'Year_Month': days.strftime('%Y-%m'),
+        'Day_Of_Month': days.day,
+        'Weekday_Number': days.dayofweek + 1,
+        'Weekday_Name': [WEEKDAY_NAMES[day] for day in days.dayofweek],
+    }, columns=DATE_COLUMNS)
@@ -0,0 +1,661 @@
+import datetime
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from utils import config
+
+try:
+    import pyodbc
+except ImportError:  # Pilote ODBC absent (ex: runner Linux) : seuls les moteurs embarqués sont disponibles
+    pyodbc = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# --- 1. CONFIGURATION ---
+SCHEMAS = ('bronze', 'silver', 'gold')
+BACKENDS = ('sqlserver', 'sqlite', 'duckdb')
+
+# Nombre d'instructions préparées conservées par connexion (cache LRU)
+STATEMENT_CACHE_SIZE = 64
+
+# Nombre de lignes envoyées par appel executemany lors des chargements en masse
+BULK_INSERT_BATCH_SIZE = 5000
+
+# Exceptions levées par les différents pilotes (à utiliser dans les blocs except des scripts)
+DB_ERRORS = tuple(
+    err for err in (
+        pyodbc.Error if pyodbc else None,
+        sqlite3.Error,
+        duckdb.Error if duckdb else None,
+    ) if err is not None
+)
+
+
+def build_conn_string() -> str:
+    """Chaîne de connexion SQL Server (authentification Windows)."""
+    return (
+        f'Driver={{{config.ODBC_DRIVER}}};'
+        f'Server={config.SQL_SERVER_NAME};'
+        f'Database={config.DATABASE_NAME};'
+        f'Trusted_Connection=yes;'
+        f'MARS_Connection=yes;'
+    )
+
+
+# --- 2. DIALECTE (SHIM T-SQL -> MOTEUR EMBARQUÉ) ---
+
+_GO_SPLIT = re.compile(r'^\s*GO\s*;?\s*$', re.IGNORECASE | re.MULTILINE)
+_LINE_COMMENT = re.compile(r'--[^\n]*')
+_BRACKET_IDENT = re.compile(r'\[([^\[\]\r\n]+)\]')
+_TRUNCATE = re.compile(r'\bTRUNCATE\s+TABLE\s+', re.IGNORECASE)
+_DROP_IF_EXISTS = re.compile(
+    r"IF\s+OBJECT_ID\s*\(\s*'([^']+)'\s*(?:,\s*'U'\s*)?\)\s+IS\s+NOT\s+NULL\s+DROP\s+TABLE\s+([\w.\[\]\"]+)",
+    re.IGNORECASE,
+)
+_CREATE_SCHEMA = re.compile(r'^\s*CREATE\s+SCHEMA\s+(\w+)\s*$', re.IGNORECASE)
+_CREATE_TABLE = re.compile(r'^\s*CREATE\s+TABLE\s+([\w.]+)\s*\((.*)\)\s*$', re.IGNORECASE | re.DOTALL)
+_IDENTITY_PK = re.compile(r'\bINT\s+IDENTITY\s*\(\s*1\s*,\s*1\s*\)\s+PRIMARY\s+KEY', re.IGNORECASE)
+_TABLE_CONSTRAINT = re.compile(r'^\s*(PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CONSTRAINT|CHECK)\b', re.IGNORECASE)
+_QUALIFIED_REFERENCE = re.compile(r'\bREFERENCES\s+\w+\.(\w+)\s*\(', re.IGNORECASE)
+_COLUMN_REFERENCE = re.compile(r'\s+REFERENCES\s+[\w.]+\s*\([^)]*\)', re.IGNORECASE)
+_SERVER_ONLY = re.compile(r'^\s*(USE|PRINT|CREATE\s+DATABASE)\b|\bDB_ID\s*\(', re.IGNORECASE)
+_TYPE_MAP = [
+    (re.compile(r'\bDATETIME2?\b', re.IGNORECASE), 'TIMESTAMP'),
+    (re.compile(r'\bNVARCHAR\b', re.IGNORECASE), 'VARCHAR'),
+    (re.compile(r'\bBIT\b', re.IGNORECASE), 'BOOLEAN'),
+    # FLOAT T-SQL = double précision (FLOAT est sur 4 octets sous DuckDB)
+    (re.compile(r'\bFLOAT\b(?!\s*\()', re.IGNORECASE), 'DOUBLE'),
+]
+
+
+def split_batches(script: str) -> List[str]:
+    """Découpe un script T-SQL sur les séparateurs GO (comme SSMS / sqlcmd)."""
+    return [batch for batch in _GO_SPLIT.split(script) if batch.strip()]
+
+
+def split_statements(batch: str) -> List[str]:
+    """Découpe un lot en instructions sur les ';' de premier niveau (hors chaînes et commentaires)."""
+    batch = _LINE_COMMENT.sub('', batch)
+    statements, current, in_string = [], [], False
+    for char in batch:
+        if char == "'":
+            in_string = not in_string
+        if char == ';' and not in_string:
+            statements.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    statements.append(''.join(current))
+    return [s.strip() for s in statements if s.strip()]
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Découpe la liste des colonnes d'un CREATE TABLE sur les virgules de premier niveau."""
+    items, current, depth = [], [], 0
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            items.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    items.append(''.join(current).strip())
+    return [item for item in items if item]
+
+
+class Dialect:
+    """
+    Traduit le SQL écrit pour SQL Server (T-SQL) vers le moteur cible.
+    Pour SQL Server, les requêtes sont transmises telles quelles.
+    """
+
+    def __init__(self, name: str):
+        if name not in BACKENDS:
+            raise ValueError(f"Moteur inconnu '{name}'. Valeurs possibles : {', '.join(BACKENDS)}.")
+        self.name = name
+
+    @property
+    def is_embedded(self) -> bool:
+        return self.name != 'sqlserver'
+
+    def translate(self, sql: str) -> str:
+        """Traduction des requêtes DML (TRUNCATE, identifiants entre crochets)."""
+        if not self.is_embedded:
+            return sql
+        return _translate_cached(self.name, sql)
+
+    def translate_ddl(self, script: str) -> List[str]:
+        """Traduit un script DDL complet (lots GO) en une liste d'instructions exécutables."""
+        if not self.is_embedded:
+            return split_batches(script)
+
+        statements = []
+        for batch in split_batches(script):
+            for statement in split_statements(batch):
+                statements.extend(self._translate_ddl_statement(statement))
+        return statements
+
+    def _translate_ddl_statement(self, statement: str) -> List[str]:
+        # Instructions propres au serveur (création de base, USE, PRINT) : ignorées
+        if _SERVER_ONLY.search(statement):
+            return []
+
+        # CREATE SCHEMA : SQLite utilise des bases attachées, DuckDB gère les schémas nativement
+        schema_match = _CREATE_SCHEMA.match(statement)
+        if schema_match:
+            if self.name == 'duckdb':
+                return [f"CREATE SCHEMA IF NOT EXISTS {schema_match.group(1)}"]
+            return []
+
+        statement = _DROP_IF_EXISTS.sub(lambda m: f"DROP TABLE IF EXISTS {m.group(2)}", statement)
+        statement = _BRACKET_IDENT.sub(r'"\1"', statement)
+        for pattern, replacement in _TYPE_MAP:
+            statement = pattern.sub(replacement, statement)
+
+        table_match = _CREATE_TABLE.match(statement)
+        if not table_match:
+            return [statement]
+
+        # CREATE TABLE : les contraintes de table doivent suivre toutes les colonnes
+        table_name, body = table_match.group(1), table_match.group(2)
+        items = _split_top_level(body)
+        columns = [item for item in items if not _TABLE_CONSTRAINT.match(item)]
+        constraints = [item for item in items if _TABLE_CONSTRAINT.match(item)]
+
+        prelude = []
+        if self.name == 'sqlite':
+            columns = [_IDENTITY_PK.sub('INTEGER PRIMARY KEY AUTOINCREMENT', col) for col in columns]
+            # SQLite : la table référencée doit être nommée sans schéma (même base attachée)
+            columns = [_QUALIFIED_REFERENCE.sub(r'REFERENCES \1(', col) for col in columns]
+        else:
+            # DuckDB : les clés étrangères ne sont pas déclarées (comme sous SQLite, qui ne les vérifie pas) ;
+            # DuckDB rejette toute mise à jour d'une ligne référencée, même sur une colonne non clé
+            columns = [_COLUMN_REFERENCE.sub('', col) for col in columns]
+            if any(_IDENTITY_PK.search(col) for col in columns):
+                # IDENTITY émulé par une séquence
+                sequence = f"{table_name}_seq"
+                prelude.append(f"DROP SEQUENCE IF EXISTS {sequence}")
+                prelude.append(f"CREATE SEQUENCE {sequence} START 1")
+                columns = [_IDENTITY_PK.sub(f"INTEGER PRIMARY KEY DEFAULT nextval('{sequence}')", col)
+                           for col in columns]
+
+        definition = ',\n    '.join(columns + constraints)
+        return prelude + [f"CREATE TABLE {table_name} (\n    {definition}\n)"]
+
+    # --- Expressions propres au moteur (requêtes exécutées dans la base, voir SILVER_MODE) ---
+
+    def date_sql(self, expr: str) -> str:
+        """Date d'un texte AAAA-MM-JJ ou JJ/MM/AAAA ; NULL si la valeur n'est pas une date."""
+        if self.name == 'sqlserver':
+            return f"COALESCE(TRY_CONVERT(DATE, {expr}, 23), TRY_CONVERT(DATE, {expr}, 103))"
+        if self.name == 'duckdb':
+            return f"COALESCE(TRY_CAST({expr} AS DATE), CAST(TRY_STRPTIME({expr}, '%d/%m/%Y') AS DATE))"
+        return (f"COALESCE(date({expr}), "
+                f"date(substr({expr}, 7, 4) || '-' || substr({expr}, 4, 2) || '-' || substr({expr}, 1, 2)))")
+
+    def date_part_sql(self, part: str, expr: str) -> str:
+        """Année ('year') ou mois ('month') d'une date, en entier."""
+        if self.name == 'sqlite':
+            return f"CAST(strftime('{'%Y' if part == 'year' else '%m'}', {expr}) AS INTEGER)"
+        return f"{part.upper()}({expr})"
+
+    def position_sql(self, needle: str, haystack: str) -> str:
+        """Position (à partir de 1) de `needle` dans `haystack`, 0 si absent."""
+        if self.name == 'sqlserver':
+            return f"CHARINDEX({needle}, {haystack})"
+        return f"instr({haystack}, {needle})"
+
+    def substring_sql(self, expr: str, start: str, length: str) -> str:
+        return f"{'SUBSTRING' if self.name == 'sqlserver' else 'substr'}({expr}, {start}, {length})"
+
+    def trim_sql(self, expr: str) -> str:
+        if self.name == 'sqlserver':
+            return f"LTRIM(RTRIM({expr}))"
+        return f"trim({expr})"
+
+    def concat_sql(self, *parts: str) -> str:
+        """Concaténation d'expressions texte."""
+        if self.name == 'sqlserver':
+            return f"CONCAT({', '.join(parts)})"
+        return ' || '.join(parts)
+
+
+@lru_cache(maxsize=512)
+def _translate_cached(backend: str, sql: str) -> str:
+    sql = _TRUNCATE.sub('DELETE FROM ', sql)
+    sql = _BRACKET_IDENT.sub(r'"\1"', sql)
+    return sql
+
+
+# --- 3. CONNEXION ET CURSEUR (API COMMUNE, CALQUÉE SUR PYODBC) ---
+
+def _normalize_params(params):
+    """Accepte cursor.execute(sql, a, b) (style pyodbc) comme cursor.execute(sql, (a, b))."""
+    if len(params) == 1 and isinstance(params[0], (list, tuple)):
+        return tuple(params[0])
+    return tuple(params)
+
+
+class Cursor:
+    """Curseur DB-API commun : traduit le SQL selon le dialecte avant exécution."""
+
+    def __init__(self, raw_cursor, dialect: Dialect, connection=None, independent: bool = False):
+        self._cursor = raw_cursor
+        self.dialect = dialect
+        self._connection = connection
+        self._independent = independent   # Curseur DuckDB dupliqué : hors de la transaction de la connexion
+        self._rowcount = -1
+        # Accélère executemany sous pyodbc (envoi des paramètres par tableau)
+        if pyodbc is not None and isinstance(raw_cursor, pyodbc.Cursor):
+            raw_cursor.fast_executemany = True
+
+    @property
+    def fast_executemany(self):
+        return getattr(self._cursor, 'fast_executemany', False)
+
+    @fast_executemany.setter
+    def fast_executemany(self, value):
+        if hasattr(self._cursor, 'fast_executemany'):
+            self._cursor.fast_executemany = value
+
+    def _begin(self):
+        if self._connection is not None and not self._independent:
+            self._connection.begin_if_needed()
+
+    def _record(self, kind: str, start: float):
+        """Temps passé côté base, rattaché aux métriques de l'étape en cours (voir utils.session)."""
+        if self._connection is not None and self._connection.metrics is not None:
+            self._connection.metrics.add(kind, time.perf_counter() - start)
+
+    def execute(self, sql: str, *params):
+        start = time.perf_counter()
+        sql = self.dialect.translate(sql)
+        self._begin()
+        self._cursor.execute(sql, _normalize_params(params))
+        self._rowcount = self._fetch_rowcount(sql)
+        self._record('execute', start)
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        if not seq_of_params:
+            self._rowcount = 0
+            return self
+        start = time.perf_counter()
+        self._begin()
+        self._cursor.executemany(self.dialect.translate(sql), seq_of_params)
+        self._rowcount = len(seq_of_params) if self.dialect.name == 'duckdb' else self._cursor.rowcount
+        self._record('execute', start)
+        return self
+
+    def _fetch_rowcount(self, sql: str) -> int:
+        if self.dialect.name != 'duckdb':
+            return self._cursor.rowcount
+        # DuckDB renvoie le nombre de lignes affectées comme résultat des DML
+        if re.match(r'^\s*(INSERT|UPDATE|DELETE|MERGE)\b', sql, re.IGNORECASE):
+            row = self._cursor.fetchone()
+            return row[0] if row else 0
+        return -1
+
+    @property
+    def rowcount(self) -> int:
+        return self._rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._record('execute', start)
+        return rows
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size) if size is not None else self._cursor.fetchmany()
+        self._record('execute', start)
+        return rows
+
+    def close(self):
+        # DuckDB : le curseur est la connexion partagée elle-même, elle ne doit pas être fermée ici
+        if self.dialect.name != 'duckdb' or self._independent:
+            self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PreparedStatement:
+    """Instruction conservée dans le cache d'une connexion : le curseur est réutilisé d'un appel à l'autre."""
+
+    def __init__(self, sql: str, cursor: Cursor):
+        self.sql = sql
+        self.cursor = cursor
+
+    def execute(self, *params) -> Cursor:
+        return self.cursor.execute(self.sql, *params)
+
+    def executemany(self, seq_of_params) -> Cursor:
+        return self.cursor.executemany(self.sql, seq_of_params)
+
+
+class Connection:
+    """
+    Connexion commune aux moteurs SQL Server, SQLite et DuckDB.
+    Comme pyodbc, le gestionnaire de contexte valide la transaction en sortie sans fermer la connexion.
+    Une connexion issue du pool (utils.session) y retourne lors de close().
+    """
+
+    def __init__(self, raw_connection, dialect: Dialect, autocommit: bool = False):
+        self._conn = raw_connection
+        self.dialect = dialect
+        self._autocommit = autocommit
+        self._statements = OrderedDict()
+        self._in_transaction = False
+        self.pool = None      # Pool propriétaire (None : connexion autonome)
+        self.metrics = None   # Métriques de l'étape qui détient la connexion
+
+    @property
+    def backend(self) -> str:
+        return self.dialect.name
+
+    @property
+    def autocommit(self) -> bool:
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value: bool):
+        self._autocommit = value
+        if self.dialect.name == 'sqlserver':
+            self._conn.autocommit = value
+        elif self.dialect.name == 'sqlite':
+            self._conn.isolation_level = None if value else ''
+        elif value and self._in_transaction:
+            self.commit()
+
+    def begin_if_needed(self):
+        """
+        DuckDB valide chaque instruction par défaut : hors autocommit, on ouvre explicitement
+        une transaction à la première instruction (SQL Server et SQLite le font implicitement).
+        """
+        if self.dialect.name == 'duckdb' and not self._autocommit and not self._in_transaction:
+            self._conn.execute("BEGIN TRANSACTION")
+            self._in_transaction = True
+
+    def cursor(self) -> Cursor:
+        # DuckDB : conn.cursor() ouvrirait une connexion distincte (autre transaction),
+        # on travaille donc directement sur la connexion partagée
+        raw_cursor = self._conn if self.dialect.name == 'duckdb' else self._conn.cursor()
+        return Cursor(raw_cursor, self.dialect, connection=self)
+
+    def read_cursor(self) -> Cursor:
+        """
+        Curseur de lecture en continu (fetchmany) qui reste valide pendant que la connexion écrit.
+        DuckDB : curseur dupliqué, qui ne voit que les données validées ;
+        SQL Server : plusieurs résultats actifs grâce à MARS (voir build_conn_string).
+        """
+        if self.dialect.name == 'duckdb':
+            return Cursor(self._conn.cursor(), self.dialect, connection=self, independent=True)
+        return self.cursor()
+
+    def prepare(self, sql: str) -> PreparedStatement:
+        """
+        Retourne l'instruction préparée du cache (un curseur dédié par texte SQL).
+        Sous pyodbc, réexécuter le même texte sur le même curseur réutilise le plan préparé.
+        Le curseur appartient au cache : il ne doit pas être fermé par l'appelant.
+        """
+        statement = self._statements.get(sql)
+        if statement is not None:
+            self._statements.move_to_end(sql)
+            if self.metrics is not None:
+                self.metrics.statement_cache_hits += 1
+            return statement
+
+        if self.metrics is not None:
+            self.metrics.statement_cache_misses += 1
+        statement = PreparedStatement(sql, self.cursor())
+        self._statements[sql] = statement
+        if len(self._statements) > STATEMENT_CACHE_SIZE:
+            _, evicted = self._statements.popitem(last=False)
+            evicted.cursor.close()
+        return statement
+
+    def execute(self, sql: str, *params) -> Cursor:
+        return self.cursor().execute(sql, *params)
+
+    def commit(self):
+        start = time.perf_counter()
+        if self.dialect.name == 'duckdb':
+            # DuckDB lève une erreur si aucune transaction n'est ouverte
+            if self._in_transaction:
+                self._conn.commit()
+                self._in_transaction = False
+        else:
+            self._conn.commit()
+        if self.metrics is not None:
+            self.metrics.add('commit', time.perf_counter() - start)
+
+    def rollback(self):
+        if self.dialect.name == 'duckdb' and not self._in_transaction:
+            return
+        try:
+            self._conn.rollback()
+        except DB_ERRORS:
+            pass
+        self._in_transaction = False
+
+    def close(self):
+        """Rend la connexion au pool (fin de l'étape) ou la ferme si elle est autonome."""
+        if self.pool is not None:
+            self.pool.release(self)
+        else:
+            self.close_raw()
+
+    def close_raw(self):
+        for statement in self._statements.values():
+            try:
+                statement.cursor.close()
+            except DB_ERRORS:
+                pass
+        self._statements.clear()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
+# --- 4. OUVERTURE DES CONNEXIONS ---
+
+def _register_sqlite_adapters():
+    """Types Python/NumPy/Pandas non gérés nativement par sqlite3."""
+    sqlite3.register_adapter(np.int64, int)
+    sqlite3.register_adapter(np.int32, int)
+    sqlite3.register_adapter(np.float32, float)
+    sqlite3.register_adapter(np.bool_, int)
+    sqlite3.register_adapter(Decimal, float)
+    sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+    sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(sep=' '))
+    sqlite3.register_adapter(pd.Timestamp, lambda d: d.isoformat(sep=' '))
+    sqlite3.register_adapter(type(pd.NaT), lambda d: None)
+
+
+def embedded_db_path(backend: str) -> str:
+    """Chemin du fichier de base embarquée (un fichier principal par moteur)."""
+    if config.EMBEDDED_DB_PATH:
+        return config.EMBEDDED_DB_PATH
+    extension = 'sqlite' if backend == 'sqlite' else 'duckdb'
+    return os.path.join(config.EMBEDDED_DB_DIR, f"{config.DATABASE_NAME}.{extension}")
+
+
+def _connect_sqlite(path: str):
+    _register_sqlite_adapters()
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Le pool garantit un seul utilisateur à la fois : la connexion peut changer de thread
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # Les schémas bronze/silver/gold sont des bases attachées : 'bronze.staging_x' reste valide
+    for schema in SCHEMAS:
+        schema_path = ':memory:' if path == ':memory:' else f"{os.path.splitext(path)[0]}_{schema}.sqlite"
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (schema_path,))
+    return conn
+
+
+def _connect_duckdb(path: str):
+    if duckdb is None:
+        raise ImportError("Le moteur 'duckdb' nécessite le paquet duckdb (pip install duckdb).")
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = duckdb.connect(path)
+    for schema in SCHEMAS:
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+    return conn
+
+
+def open_connection(autocommit: bool = False, backend: Optional[str] = None) -> Connection:
+    """
+    Ouvre une nouvelle connexion (hors pool) vers le moteur configuré (FOOTBALL_DW_BACKEND) ou celui demandé.
+    """
+    dialect = Dialect(backend or config.DB_BACKEND)
+
+    if dialect.name == 'sqlserver':
+        if pyodbc is None:
+            raise ImportError("Le moteur 'sqlserver' nécessite le paquet pyodbc et un pilote ODBC.")
+        raw = pyodbc.connect(build_conn_string(), autocommit=autocommit)
+    elif dialect.name == 'sqlite':
+        raw = _connect_sqlite(embedded_db_path('sqlite'))
+    else:
+        raw = _connect_duckdb(embedded_db_path('duckdb'))
+
+    conn = Connection(raw, dialect)
+    conn.autocommit = autocommit
+    return conn
+
+
+def get_connection(autocommit: bool = False, backend: Optional[str] = None, stage: str = 'default') -> Connection:
+    """
+    Emprunte une connexion au pool du processus pour l'étape `stage`.
+    close() la rend au pool : les transactions non validées sont annulées en fin d'étape.
+    """
+    from utils.session import get_pool
+    return get_pool(backend).acquire(stage, autocommit=autocommit)
+
+
+# --- 5. CHARGEMENT EN MASSE ---
+
+def bulk_insert(conn: Connection, table: str, columns: Sequence[str],
+                rows: Union[pd.DataFrame, Sequence[tuple]],
+                batch_size: int = BULK_INSERT_BATCH_SIZE) -> int:
+    """
+    Insère les lignes par paquets de `batch_size` avec une seule instruction préparée
+    (fast_executemany sous pyodbc). Accepte un DataFrame (décodé par utils.categorical.to_records)
+    ou une liste de tuples dans l'ordre de `columns`. Ne valide pas la transaction.
+    """
+    if isinstance(rows, pd.DataFrame) and conn.backend == 'duckdb':
+        return _bulk_insert_duckdb(conn, table, columns, rows)
+    if isinstance(rows, pd.DataFrame):
+        from utils.categorical import to_records
+        rows = to_records(rows, list(columns))
+
+    column_list = ', '.join(f'[{col}]' for col in columns)
+    placeholders = ', '.join('?' for _ in columns)
+    statement = conn.prepare(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})")
+
+    for start in range(0, len(rows), batch_size):
+        statement.executemany(rows[start:start + batch_size])
+    return len(rows)
+
+
+def _bulk_insert_duckdb(conn: Connection, table: str, columns: Sequence[str], df: pd.DataFrame) -> int:
+    """DuckDB lit directement le DataFrame (balayage colonnaire), sans passer par executemany."""
+    start = time.perf_counter()
+    frame = pd.DataFrame({
+        col: df[col].astype(object).where(df[col].notna(), None) if isinstance(df[col].dtype, pd.CategoricalDtype)
+        else df[col]
+        for col in columns
+    })
+    column_list = ', '.join(f'"{col}"' for col in columns)
+    conn.begin_if_needed()
+    conn._conn.register('_bulk_rows', frame)
+    try:
+        conn._conn.execute(f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM _bulk_rows")
+    finally:
+        conn._conn.unregister('_bulk_rows')
+    if conn.metrics is not None:
+        conn.metrics.add('execute', time.perf_counter() - start)
+    return len(frame)
+
+
+def create_temp_table(conn: Connection, name: str, definition: str) -> str:
+    """
+    Crée (ou recrée) une table temporaire à la session et retourne son nom effectif
+    (préfixé par # sous SQL Server). `definition` : liste des colonnes, ex: "[Key] VARCHAR(255), [N] INT".
+    """
+    table = f"#{name}" if conn.backend == 'sqlserver' else name
+    conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.execute(f"CREATE {'' if conn.backend == 'sqlserver' else 'TEMP '}TABLE {table} ({definition})")
+    return table
+
+
+# --- 6. DDL ---
+
+def apply_statements(conn: Connection, statements: Sequence[str]) -> int:
+    """Exécute des instructions DDL déjà traduites pour le moteur cible, puis valide."""
+    cursor = conn.cursor()
+    for statement in statements:
+        # Le DDL est déjà traduit : on passe directement par le curseur natif
+        cursor._cursor.execute(statement)
+    conn.commit()
+    return len(statements)
+
+
+def apply_sql_file(conn: Connection, path: str) -> int:
+    """Exécute un script DDL (lots GO) sur la connexion, traduit pour le moteur cible."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        script = f.read()
+    return apply_statements(conn, conn.dialect.translate_ddl(script))
+
+
+def initialize_schema(conn: Connection, layers=SCHEMAS):
+    """
+    Crée (ou recrée) les tables des couches demandées : scripts de sql/ pour bronze et silver,
+    définition Python (utils.gold_schema, disposition config.GOLD_LAYOUT) pour gold.
+    """
+    for layer in layers:
+        if layer == 'gold':
+            from utils.gold_schema import ddl_statements
+            count = apply_statements(conn, ddl_statements(conn.backend))
+            print(f"DDL gold ({config.GOLD_LAYOUT}) appliqué ({count} instructions, moteur {conn.backend}).")
+            continue
+        count = apply_sql_file(conn, config.DDL_FILES[layer])
+        print(f"DDL {layer} appliqué ({count} instructions, moteur {conn.backend}).")
@@ -0,0 +1,101 @@
+import datetime
+import hashlib
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils import config
+from utils.db import Connection, bulk_insert
+
+# --- 1. CONFIGURATION ---
+# État des partitions de faits chargées : une empreinte par (table de faits, saison)
+PARTITION_STATE_TABLE = 'gold.Fact_Partition_State'
+
+# Colonne de partitionnement des faits gold (une partition par saison)
+PARTITION_COLUMN = 'Time_SK'
+
+
+# --- 2. RAPPORT ---
+
+class PartitionReport:
+    """Partitions remplacées / supprimées / inchangées lors du chargement d'une table de faits."""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.replaced: List[int] = []
+        self.dropped: List[int] = []
+        self.unchanged: List[int] = []
+        self.rows = 0
+
+    @property
+    def changed(self) -> List[int]:
+        """Partitions dont le contenu a changé (à retraiter en aval : agrégats, cube)."""
+        return sorted(self.replaced + self.dropped)
+
+    def describe(self, labels: Dict[int, object]) -> str:
+        names = ', '.join(str(labels.get(sk, sk)) for sk in self.changed) or 'aucune'
+        return (f"{self.table} : {len(self.replaced)} partition(s) remplacée(s) ({self.rows} ligne(s)), "
+                f"{len(self.dropped)} supprimée(s), {len(self.unchanged)} inchangée(s) — {names}.")
+
+
+# --- 3. EMPREINTE DES PARTITIONS ---
+
+def partition_hashes(fact: pd.DataFrame, columns: Sequence[str], partition_column: str = PARTITION_COLUMN) -> pd.Series:
+    """
+    SHA-256 (32 caractères) du contenu de chaque partition, indépendante de l'ordre des lignes :
+    empreintes 64 bits des lignes triées, puis hachées ensemble. Indexée par la valeur de partition.
+    """
+    hashed = pd.util.hash_pandas_object(fact[list(columns)], index=False, categorize=True).to_numpy()
+    partitions = fact[partition_column].to_numpy()
+    result = {}
+    for value in np.unique(partitions):
+        row_hashes = np.sort(hashed[partitions == value])
+        result[int(value)] = hashlib.sha256(row_hashes.tobytes()).hexdigest()[:32]
+    return pd.Series(result, dtype=object)
+
+
+def _stored_state(conn: Connection, table: str) -> Dict[int, str]:
+    rows = conn.execute(
+        f"SELECT Partition_Value, Partition_Hash FROM {PARTITION_STATE_TABLE} WHERE Fact_Table = ?", table
+    ).fetchall()
+    return {int(value): hash_value.strip() for value, hash_value in rows}
+
+
+# --- 4. REMPLACEMENT PAR PARTITION ---
+
+def replace_partitions(conn: Connection, table: str, columns: Sequence[str], fact: pd.DataFrame,
+                       partition_column: str = PARTITION_COLUMN) -> PartitionReport:
+    """
+    Remplace uniquement les partitions (saisons) dont l'empreinte a changé depuis le dernier chargement :
+    DELETE de la partition puis insertion en masse, dans la transaction de l'appelant. Les partitions
+    disparues de la source sont supprimées. config.FORCE_REBUILD remplace toutes les partitions.
+    """
+    report = PartitionReport(table)
+    current = partition_hashes(fact, columns, partition_column)
+    stored = _stored_state(conn, table)
+    partitions = fact[partition_column].to_numpy()
+
+    for value, hash_value in current.items():
+        if stored.get(value) == hash_value and not config.FORCE_REBUILD:
+            report.unchanged.append(value)
+            continue
+        conn.execute(f"DELETE FROM {table} WHERE [{partition_column}] = ?", value)
+        report.rows += bulk_insert(conn, table, columns, fact[partitions == value])
+        _record_partition(conn, table, value, hash_value, int((partitions == value).sum()))
+        report.replaced.append(value)
+
+    for value in set(stored) - set(current.index):
+        conn.execute(f"DELETE FROM {table} WHERE [{partition_column}] = ?", value)
+        conn.execute(f"DELETE FROM {PARTITION_STATE_TABLE} WHERE Fact_Table = ? AND Partition_Value = ?", table, value)
+        report.dropped.append(value)
+    return report
+
+
+def _record_partition(conn: Connection, table: str, value: int, hash_value: str, row_count: int):
+    conn.execute(f"DELETE FROM {PARTITION_STATE_TABLE} WHERE Fact_Table = ? AND Partition_Value = ?", table, value)
+    conn.execute(
+        f"INSERT INTO {PARTITION_STATE_TABLE} (Fact_Table, Partition_Value, Partition_Hash, Row_Count, Loaded_At) "
+        f"VALUES (?, ?, ?, ?, ?)",
+        table, value, hash_value, row_count, datetime.datetime.now()
+    )
@@ -0,0 +1,349 @@
+import argparse
+from typing import List, Optional, Sequence
+
+from utils import config
+from utils.aggregates import AGGREGATE_STATE_TABLE, ROLLUPS
+from utils.db import Dialect, split_batches
+from utils.gold_version import LOAD_VERSION_TABLE
+
+# --- 1. CONFIGURATION ---
+# Fonction et schéma de partitionnement des faits par saison (SQL Server)
+PARTITION_FUNCTION = 'pf_Gold_Season'
+PARTITION_SCHEME = 'ps_Gold_Season'
+PARTITION_COLUMN = 'Time_SK'
+
+# Bornes de partition : une partition par Time_SK jusqu'à SEASON_PARTITIONS saisons
+# (les clés de DimTime sont stables, une saison reste dans sa partition ; au-delà : SPLIT RANGE)
+SEASON_PARTITIONS = 40
+
+
+# --- 2. DÉFINITION DU SCHÉMA ---
+
+class Column:
+    """Colonne d'une table gold (type T-SQL, traduit pour les moteurs embarqués par utils.db.Dialect)."""
+
+    def __init__(self, name: str, sql_type: str, nullable: bool = True, references: Optional[str] = None,
+                 identity: bool = False, comment: Optional[str] = None):
+        self.name = name
+        self.sql_type = sql_type
+        self.nullable = nullable
+        self.references = references      # 'gold.DimTime(Time_SK)'
+        self.identity = identity          # Clé de substitution (IDENTITY, clé primaire)
+        self.comment = comment
+
+
+class Table:
+    """Table gold : dimension (clé de substitution), fait (clé composite, partitionnable) ou table d'état."""
+
+    def __init__(self, name: str, kind: str, columns: Sequence[Column], primary_key: Sequence[str] = (),
+                 unique: Sequence[Sequence[str]] = (), title: Optional[str] = None, notes: Sequence[str] = ()):
+        self.name = name
+        self.kind = kind
+        self.columns = list(columns)
+        self.primary_key = list(primary_key)
+        self.unique = [list(cols) for cols in unique]
+        self.title = title
+        self.notes = list(notes)
+
+    @property
+    def short_name(self) -> str:
+        return self.name.split('.')[-1]
+
+    @property
+    def key_columns(self) -> List[str]:
+        """Colonnes clés étrangères (candidates à un index de recherche par clé de dimension)."""
+        return [col.name for col in self.columns if col.references]
+
+
+def _sk(name, dimension, nullable=False, comment=None):
+    return Column(name, 'INT', nullable=nullable, references=f"gold.{dimension}({dimension[3:]}_SK)", comment=comment)
+
+
+def _measures(names, sql_type='INT', comments=None):
+    comments = comments or {}
+    return [Column(name, sql_type, comment=comments.get(name)) for name in names]
+
+
+MATCH_STAT_COLUMNS = ['HomeShots', 'AwayShots', 'HomeShotsOnTarget', 'AwayShotsOnTarget', 'HomeFouls', 'AwayFouls',
+                      'HomeCorners', 'AwayCorners', 'HomeYellowCards', 'AwayYellowCards', 'HomeRedCards', 'AwayRedCards']
+
+# Tables dans l'ordre de création (dimensions avant les faits qui les référencent)
+GOLD_TABLES = [
+    Table('gold.DimTime', 'dimension', [
+        Column('Time_SK', 'INT', nullable=False, identity=True),
+        Column('Season_BK', 'VARCHAR(10)', nullable=False, comment="Clé métier (Ex: '2014/15')"),
+        Column('Season_Start_Year', 'INT', nullable=False, comment='2014'),
+        Column('Season_End_Year', 'INT', nullable=False, comment='2015'),
+    ], unique=[['Season_BK']], title='DimTime (Basé sur Season)',
+        notes=['Source: silver.League_Table_Conformed, silver.Match_Reconciled, etc.']),
+    Table('gold.DimDate', 'dimension', [
+        Column('Date_SK', 'INT', nullable=False, comment='Clé AAAAMMJJ (Ex: 20140816), dans l\'ordre des dates'),
+        Column('Full_Date', 'DATE', nullable=False),
+        _sk('Time_SK', 'DimTime', comment='Saison (intersaison rattachée à la saison écoulée)'),
+        Column('Matchweek', 'INT', comment='Journée de championnat (dernière jouée les jours sans match)'),
+        Column('Calendar_Year', 'INT', nullable=False),
+        Column('Month_Number', 'INT', nullable=False),
+        Column('Month_Name', 'VARCHAR(20)', nullable=False, comment="Ex: 'Août'"),
+        Column('Year_Month', 'CHAR(7)', nullable=False, comment="Ex: '2014-08'"),
+        Column('Day_Of_Month', 'INT', nullable=False),
+        Column('Weekday_Number', 'INT', nullable=False, comment='1 = lundi ... 7 = dimanche'),
+        Column('Weekday_Name', 'VARCHAR(10)', nullable=False, comment="Ex: 'Samedi'"),
+    ], primary_key=['Date_SK'], unique=[['Full_Date']], title='DimDate (Calendrier, granularité journalière)',
+        notes=['Générée par utils.date_dimension (saisons de DimTime, journées de silver.Match_Reconciled)']),
+    Table('gold.DimTeam', 'dimension', [
+        Column('Team_SK', 'INT', nullable=False, identity=True),
+        Column('Squad_Conformed_BK', 'VARCHAR(100)', nullable=False, comment="Clé métier (Ex: 'Manchester City')"),
+    ], unique=[['Squad_Conformed_BK']], title='DimTeam (Basé sur Squad_Conformed)',
+        notes=['Source: silver.Team_Mapping']),
+    Table('gold.DimNation', 'dimension', [
+        Column('Nation_SK', 'INT', nullable=False, identity=True),
+        Column('Nation_Standard_Name_BK', 'VARCHAR(100)', nullable=False),
+    ], unique=[['Nation_Standard_Name_BK']], title='DimNation', notes=['Source: silver.Nation_Mapping']),
+    Table('gold.DimPlayer', 'dimension', [
+        Column('Player_SK', 'INT', nullable=False, identity=True),
+        Column('Player_Name_BK', 'VARCHAR(100)', nullable=False, comment='Clé métier (Nom du joueur)'),
+        Column('BirthYear', 'INT'),
+        Column('Current_Position', 'VARCHAR(10)', comment='Attribut semi-statique (SCD Type 1)'),
+        _sk('Nation_SK', 'DimNation', nullable=True, comment='FK vers Nation'),
+        Column('Player_Id', 'INT', comment='Identité résolue (variantes de nom, profil Transfermarkt)'),
+    ], unique=[['Player_Name_BK', 'BirthYear']], title='DimPlayer (Basé sur Player_Name et BirthYear)',
+        notes=['Source: silver.Player_Stats_Conformed, silver.Player_Identity']),
+    Table('gold.DimNotes', 'dimension', [
+        Column('Notes_SK', 'INT', nullable=False, identity=True),
+        Column('Notes_Standard_Name_BK', 'VARCHAR(255)', nullable=False, comment="Clé métier (Ex: 'Champions League')"),
+        Column('Notes_Category', 'VARCHAR(50)', comment="Ex: 'Qualification Europe', 'Status Change (Relegated)'"),
+    ], unique=[['Notes_Standard_Name_BK']], title='DimNotes (Qualification/Relégation)',
+        notes=['Source: silver.Notes_Mapping']),
+
+    Table('gold.FactTeamPerformance', 'fact', [
+        _sk('Time_SK', 'DimTime'),
+        _sk('Team_SK', 'DimTeam'),
+        _sk('Notes_SK', 'DimNotes', comment='Qualification / Relégation'),
+        *_measures(['Final_Rank', 'MatchesPlayed', 'Wins', 'Draws', 'Losses', 'GoalsFor', 'GoalsAgainst',
+                    'GoalDifference', 'Points'],
+                   comments={'Final_Rank': 'Rk', 'MatchesPlayed': 'MP', 'Wins': 'W', 'Draws': 'D', 'Losses': 'L',
+                             'GoalsFor': 'GF', 'GoalsAgainst': 'GA', 'GoalDifference': 'GD', 'Points': 'Pts'}),
+        Column('PointsPerMatch', 'DECIMAL(4,2)', comment='Pts_per_MP'),
+        Column('Season_Attendance', 'INT'),
+        Column('TopScorer_Goals', 'INT'),
+        Column('TopScorer_PlayerName', 'VARCHAR(100)', comment='Attribut de pont (Top Buteur non mappé)'),
+        Column('Goalkeeper_PlayerName', 'VARCHAR(100)'),
+    ], primary_key=['Time_SK', 'Team_SK'], title='FactTeamPerformance (Agrégé par Saison/Équipe)',
+        notes=['Grain: 1 ligne par Équipe et par Saison',
+               'Sources: silver.League_Table_Conformed (Type = Overall), silver.Team_extra_details']),
+    Table('gold.FactPlayerPerformance', 'fact', [
+        _sk('Time_SK', 'DimTime'),
+        _sk('Team_SK', 'DimTeam'),
+        _sk('Player_SK', 'DimPlayer'),
+        *_measures(['MatchesPlayed', 'MinutesPlayed', 'Goals', 'Assists', 'YellowCards', 'RedCards']),
+        *_measures(['Goals_Per_90', 'Assists_Per_90'], sql_type='DECIMAL(5,2)'),
+        Column('MarketValue_Euro_k', 'INT'),
+    ], primary_key=['Time_SK', 'Team_SK', 'Player_SK'], title='FactPlayerPerformance (Détaillé par Saison/Équipe/Joueur)',
+        notes=['Grain: 1 ligne par Joueur, par Équipe, par Saison', 'Source: silver.Player_Stats_Conformed']),
+    Table('gold.FactMatchEvent', 'fact', [
+        _sk('Time_SK', 'DimTime'),
+        Column('HomeTeam_SK', 'INT', nullable=False, references='gold.DimTeam(Team_SK)'),
+        Column('AwayTeam_SK', 'INT', nullable=False, references='gold.DimTeam(Team_SK)'),
+        _sk('Date_SK', 'DimDate', comment='Date du match (AAAAMMJJ)'),
+        Column('MatchDate', 'DATE', nullable=False, comment='Date exacte (granularité journalière)'),
+        *_measures(['FullTimeHomeGoals', 'FullTimeAwayGoals']),
+        Column('FullTimeResult', 'VARCHAR(5)'),
+        *_measures(['HalfTimeHomeGoals', 'HalfTimeAwayGoals']),
+        Column('HalfTimeResult', 'VARCHAR(5)'),
+        *_measures(MATCH_STAT_COLUMNS),
+        *_measures(['B365HomeOdds', 'B365DrawOdds', 'B365AwayOdds'], sql_type='DECIMAL(5,2)'),
+    ], primary_key=['Time_SK', 'HomeTeam_SK', 'AwayTeam_SK'], title='FactMatchEvent (Granulaire par Match)',
+        notes=['Grain: 1 ligne par Match',
+               'Source: silver.Match_Reconciled (historique EPL_Match_History_Conformed et cotes Match_Odds_Conformed rapprochés)']),
+
+    Table('gold.Fact_Partition_State', 'state', [
+        Column('Fact_Table', 'VARCHAR(100)', nullable=False, comment="Ex: 'gold.FactMatchEvent'"),
+        Column('Partition_Value', 'INT', nullable=False, comment='Time_SK de la saison'),
+        Column('Partition_Hash', 'CHAR(32)', nullable=False),
+        Column('Row_Count', 'INT', nullable=False),
+        Column('Loaded_At', 'DATETIME'),
+    ], primary_key=['Fact_Table', 'Partition_Value'], title='Fact_Partition_State (Empreinte de chaque partition saison des faits)',
+        notes=['Renseignée par utils.fact_partitions : seules les partitions dont l\'empreinte change sont rechargées']),
+]
+
+
+# Agrégats déclarés dans utils.aggregates (grain = clé primaire), puis leur table d'état
+GOLD_TABLES += [
+    Table(rollup.table, 'aggregate',
+          [Column(key, rollup.key_types.get(key, 'INT'), nullable=False) for key in rollup.keys]
+          + [Column(name, rollup.source.measures[name].sql_type) for name in rollup.measures],
+          primary_key=rollup.keys, title=f"{rollup.table.split('.')[-1]} (Agrégat de {rollup.source.fact})",
+          notes=[f"Grain: {', '.join(rollup.keys)} ; rafraîchi par saison par utils.aggregates"])
+    for rollup in ROLLUPS
+]
+GOLD_TABLES.append(Table(AGGREGATE_STATE_TABLE, 'state', [
+    Column('Aggregate_Name', 'VARCHAR(100)', nullable=False),
+    Column('Definition_Hash', 'CHAR(32)', nullable=False, comment='Empreinte de la requête de l\'agrégat'),
+    Column('Refreshed_At', 'DATETIME'),
+], primary_key=['Aggregate_Name'], title='Aggregate_State (Définition de chaque agrégat matérialisé)',
+    notes=['Une définition modifiée reconstruit l\'agrégat entier au chargement suivant']))
+GOLD_TABLES.append(Table(LOAD_VERSION_TABLE, 'state', [
+    Column('Load_Id', 'INT', nullable=False, identity=True),
+    Column('Version_Token', 'CHAR(32)', nullable=False, comment='Jeton unique de la version'),
+    Column('Changed_Partitions', 'INT', comment='Partitions saison de faits remplacées ou supprimées'),
+    Column('Changed_Members', 'INT', comment='Membres de dimension ajoutés ou mis à jour'),
+    Column('Loaded_At', 'DATETIME'),
+], title='Load_Version (Version de la couche gold, une ligne par chargement modifiant des données)',
+    notes=['Renseignée par load/gold.Gold_Builder.py ; clé du cache de résultats de gold_query_service.py']))
+
+# --- 3. DISPOSITIONS PHYSIQUES ---
+
+class GoldLayout:
+    """
+    Options physiques des faits :
+    - columnstore : index columnstore cluster (la clé primaire devient non cluster) ;
+    - partitioned : faits et index alignés sur un schéma de partition par saison (Time_SK) ;
+    - key_indexes : index non cluster sur chaque clé de dimension hors tête de clé primaire.
+    Seul key_indexes a un équivalent embarqué (CREATE INDEX) : DuckDB stocke déjà par colonnes et élimine
+    les groupes de lignes par min/max (les faits sont écrits saison par saison), SQLite n'a ni l'un ni l'autre.
+    """
+
+    def __init__(self, name: str, columnstore: bool = False, partitioned: bool = False, key_indexes: bool = False):
+        self.name = name
+        self.columnstore = columnstore
+        self.partitioned = partitioned
+        self.key_indexes = key_indexes
+
+
+LAYOUTS = {
+    'rowstore': GoldLayout('rowstore'),
+    'indexed': GoldLayout('indexed', key_indexes=True),
+    'columnstore': GoldLayout('columnstore', columnstore=True, partitioned=True, key_indexes=True),
+}
+
+
+def get_layout(name: Optional[str] = None) -> GoldLayout:
+    name = name or config.GOLD_LAYOUT
+    if name not in LAYOUTS:
+        raise ValueError(f"Disposition gold inconnue '{name}'. Valeurs possibles : {', '.join(LAYOUTS)}.")
+    return LAYOUTS[name]
+
+
+# --- 4. GÉNÉRATION DU DDL T-SQL ---
+
+def _column_sql(col: Column, physical: bool) -> str:
+    definition = f"{col.name:<24}{col.sql_type}"
+    if col.identity:
+        definition += ' IDENTITY(1,1) PRIMARY KEY'
+    else:
+        definition += ' NOT NULL' if not col.nullable else ' NULL'
+    if col.references and physical:
+        definition += f" REFERENCES {col.references}"
+    return definition
+
+
+def _on_scheme(table: Table, layout: GoldLayout) -> str:
+    if layout.partitioned and table.kind == 'fact':
+        return f" ON {PARTITION_SCHEME}({PARTITION_COLUMN})"
+    return ''
+
+
+def _create_table_sql(table: Table, layout: GoldLayout, with_comments: bool = True) -> str:
+    lines = []
+    for col in table.columns:
+        comment = f"  -- {col.comment}" if col.comment and with_comments else ''
+        lines.append((f"    {_column_sql(col, physical=True)}", comment))
+    for cols in table.unique:
+        lines.append((f"    UNIQUE ({', '.join(cols)})", ''))
+    if table.primary_key:
+        clustered = ' NONCLUSTERED' if layout.columnstore and table.kind == 'fact' else ''
+        lines.append((f"    CONSTRAINT PK_{table.short_name} PRIMARY KEY{clustered} ({', '.join(table.primary_key)})", ''))
+    body = '\n'.join(f"{sql}{',' if i < len(lines) - 1 else ''}{comment}" for i, (sql, comment) in enumerate(lines))
+    return f"CREATE TABLE {table.name} (\n{body}\n){_on_scheme(table, layout)};"
+
+
+def _index_names(table: Table):
+    """Index de recherche par clé de dimension : clés étrangères hors tête de clé primaire."""
+    leading = table.primary_key[0] if table.primary_key else None
+    return [(f"IX_{table.short_name}_{col}", col) for col in table.key_columns if col != leading]
+
+
+def ddl_script(layout: Optional[GoldLayout] = None) -> str:
+    """Script T-SQL complet de la couche gold (lots séparés par GO), pour SQL Server ou SSMS."""
+    layout = layout or get_layout()
+    parts = [
+        f"-- Généré par python/utils/gold_schema.py (disposition '{layout.name}') : ne pas modifier à la main.",
+        "-- python -m utils.gold_schema --layout <rowstore|indexed|columnstore> --output \"sql/gold/ddl gold layer.sql\"",
+        '',
+        '-- Les faits sont supprimés avant les dimensions qu\'ils référencent (clés étrangères)',
+    ]
+    parts += [f"IF OBJECT_ID('{t.name}','U') IS NOT NULL DROP TABLE {t.name};" for t in reversed(GOLD_TABLES)]
+    parts += [
+        f"IF EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = '{PARTITION_SCHEME}') DROP PARTITION SCHEME {PARTITION_SCHEME};",
+        f"IF EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = '{PARTITION_FUNCTION}') DROP PARTITION FUNCTION {PARTITION_FUNCTION};",
+        'GO', '',
+    ]
+
+    if layout.partitioned:
+        boundaries = ', '.join(str(value) for value in range(2, SEASON_PARTITIONS + 1))
+        parts += [
+            '-- Une partition par saison (Time_SK) : rechargement et traitement du cube par saison',
+            f"CREATE PARTITION FUNCTION {PARTITION_FUNCTION} (INT) AS RANGE RIGHT FOR VALUES ({boundaries});",
+            f"CREATE PARTITION SCHEME {PARTITION_SCHEME} AS PARTITION {PARTITION_FUNCTION} ALL TO ([PRIMARY]);",
+            'GO', '',
+        ]
+
+    for table in GOLD_TABLES:
+        parts += ['-----------------------------------', f"-- {table.title or table.short_name}",
+                  '-----------------------------------']
+        parts += [f"-- {note}" for note in table.notes]
+        parts.append(_create_table_sql(table, layout))
+        if table.kind == 'fact' and layout.columnstore:
+            parts.append(f"CREATE CLUSTERED COLUMNSTORE INDEX CCI_{table.short_name} ON {table.name}"
+                         f"{_on_scheme(table, layout)};")
+        if layout.key_indexes:
+            parts += [f"CREATE NONCLUSTERED INDEX {name} ON {table.name} ({col}){_on_scheme(table, layout)};"
+                      for name, col in _index_names(table)]
+        parts += ['GO', '']
+    return '\n'.join(parts)
+
+
+# --- 5. INSTRUCTIONS PAR MOTEUR ---
+
+def _embedded_index_sql(backend: str, table: Table, name: str, column: str) -> str:
+    schema = table.name.split('.')[0]
+    if backend == 'sqlite':
+        # SQLite : l'index est créé dans la base attachée, la table est nommée sans schéma
+        return f"CREATE INDEX {schema}.{name} ON {table.short_name} ({column})"
+    return f"CREATE INDEX {name} ON {table.name} ({column})"
+
+
+def ddl_statements(backend: str, layout: Optional[GoldLayout] = None) -> List[str]:
+    """
+    Instructions de création de la couche gold pour le moteur : le script T-SQL sous SQL Server ;
+    pour SQLite / DuckDB, les tables (DDL traduit par utils.db.Dialect) puis les index de clés.
+    """
+    layout = layout or get_layout()
+    dialect = Dialect(backend)
+    if not dialect.is_embedded:
+        return split_batches(ddl_script(layout))
+
+    rowstore = GoldLayout(layout.name)
+    script = '\n'.join([f"IF OBJECT_ID('{t.name}','U') IS NOT NULL DROP TABLE {t.name};" for t in reversed(GOLD_TABLES)]
+                       + ['GO'] + [_create_table_sql(t, rowstore, with_comments=False) + '\nGO' for t in GOLD_TABLES])
+    statements = dialect.translate_ddl(script)
+    if layout.key_indexes:
+        statements += [_embedded_index_sql(backend, table, name, col)
+                       for table in GOLD_TABLES for name, col in _index_names(table)]
+    return statements
+
+
+# --- EXÉCUTION : RÉGÉNÉRATION DU SCRIPT sql/gold (depuis python/ : python -m utils.gold_schema) ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Génère le DDL T-SQL de la couche gold.")
+    parser.add_argument('--layout', choices=list(LAYOUTS), default=config.GOLD_LAYOUT)
+    parser.add_argument('--output', help="Fichier de sortie (par défaut : sortie standard).")
+    args = parser.parse_args()
+
+    script = ddl_script(LAYOUTS[args.layout])
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(script)
+        print(f"✅ DDL gold ({args.layout}) écrit dans {args.output}.")
+    else:
+        print(script)
@@ -0,0 +1,35 @@
+import datetime
+import uuid
+
+from utils.db import Connection
+
+# --- 1. CONFIGURATION ---
+# Version de la couche gold : une ligne par chargement qui a modifié des données (clé des caches de résultats)
+LOAD_VERSION_TABLE = 'gold.Load_Version'
+
+# Version rapportée tant qu'aucun chargement n'a été enregistré
+INITIAL_VERSION = 'initial'
+
+
+# --- 2. ENREGISTREMENT ET LECTURE ---
+
+def bump_load_version(conn: Connection, changed_partitions: int, changed_members: int) -> str:
+    """
+    Nouvelle version de la couche gold, à appeler dans la transaction du chargement.
+    Le jeton est unique : une base recréée ne retrouve jamais la version d'un cache plus ancien.
+    """
+    token = uuid.uuid4().hex
+    conn.execute(
+        f"INSERT INTO {LOAD_VERSION_TABLE} (Version_Token, Changed_Partitions, Changed_Members, Loaded_At) "
+        f"VALUES (?, ?, ?, ?)", token, changed_partitions, changed_members, datetime.datetime.now()
+    )
+    return token
+
+
+def read_load_version(conn: Connection) -> str:
+    """Jeton du dernier chargement gold (INITIAL_VERSION si aucun)."""
+    row = conn.execute(
+        f"SELECT Version_Token FROM {LOAD_VERSION_TABLE} "
+        f"WHERE Load_Id = (SELECT MAX(Load_Id) FROM {LOAD_VERSION_TABLE})"
+    ).fetchone()
+    return row[0].strip() if row else INITIAL_VERSION
@@ -0,0 +1,153 @@
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from utils.categorical import to_categorical
+
+# --- 1. CONFIGURATION ---
+# Taille de lecture du fichier (en caractères) à chaque remplissage du tampon
+READ_CHUNK_SIZE = 64 * 1024
+
+# Taille par défaut des lots de lignes produits pour le chargement
+DEFAULT_BATCH_SIZE = 1000
+
+# Objets imbriqués aplatis à la volée (ex: 'player_info' des fichiers Transfermarkt)
+NESTED_KEYS = ('player_info',)
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+# --- 2. LECTURE INCRÉMENTALE DU TABLEAU JSON ---
+
+def iter_json_records(file_path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Parcourt un fichier JSON de la forme [ {...}, {...}, ... ] objet par objet,
+    sans charger le fichier complet en mémoire.
+    Seul l'objet en cours de décodage est conservé dans le tampon.
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        buffer = ''
+        eof = False
+        started = False
+
+        while True:
+            # 1. Remplir le tampon si nécessaire
+            buffer = buffer.lstrip(_WHITESPACE)
+            if not buffer and not eof:
+                chunk = f.read(chunk_size)
+                eof = chunk == ''
+                buffer = chunk
+                continue
+
+            # 2. Ouverture du tableau de premier niveau
+            if not started:
+                if not buffer:
+                    return  # Fichier vide
+                if buffer[0] != '[':
+                    raise ValueError(f"Le fichier {file_path} ne contient pas un tableau JSON de premier niveau.")
+                buffer = buffer[1:]
+                started = True
+                continue
+
+            if not buffer:
+                raise ValueError(f"Fin de fichier inattendue dans {file_path} (tableau JSON non fermé).")
+
+            # 3. Séparateurs et fin du tableau
+            if buffer[0] == ',':
+                buffer = buffer[1:]
+                continue
+            if buffer[0] == ']':
+                return
+
+            # 4. Décodage d'un élément (on relit si l'objet est coupé par la fin du tampon)
+            try:
+                record, end = _DECODER.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                end = None
+
+            if end is None or (end == len(buffer) and not eof):
+                chunk = f.read(chunk_size)
+                eof = chunk == ''
+                buffer += chunk
+                continue
+
+            buffer = buffer[end:]
+            yield record
+
+
+def flatten_record(record: dict, nested_keys=NESTED_KEYS) -> dict:
+    """
+    Aplatit les objets imbriqués d'un enregistrement.
+    Ex: {'Player': 'X', 'player_info': {'height': '1,76 m'}} -> {'Player': 'X', 'player_info_height': '1,76 m'}
+    """
+    if not any(key in record for key in nested_keys):
+        return record
+
+    flat = {}
+    for key, value in record.items():
+        if key in nested_keys:
+            # Un 'player_info' absent ou nul donne simplement des colonnes manquantes (NULL)
+            for sub_key, sub_value in (value or {}).items():
+                flat[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+# --- 3. CONVERTISSEURS DE TYPES (appliqués par lot) ---
+
+def to_int(series: pd.Series) -> pd.Series:
+    """Chaîne -> INT (retire les séparateurs de milliers '2,307'), NaN remplacé par 0."""
+    cleaned = series.astype(str).str.replace(',', '', regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0).astype(int)
+
+
+def to_decimal(series: pd.Series) -> pd.Series:
+    """Chaîne -> DECIMAL (float), les valeurs invalides deviennent NaN (NULL)."""
+    return pd.to_numeric(series, errors='coerce')
+
+
+def to_date(date_format: str) -> Callable[[pd.Series], pd.Series]:
+    """Retourne un convertisseur chaîne -> date pour le format donné (ex: '%d/%m/%Y')."""
+    def _convert(series: pd.Series) -> pd.Series:
+        return pd.to_datetime(series, format=date_format, errors='coerce')
+    return _convert
+
+
+# --- 4. LOTS TYPÉS POUR LES LOADERS BRONZE ---
+
+def _build_batch(records: List[dict], converters: Optional[Dict[str, Callable]],
+                 categoricals: Iterable[str]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records)
+    for col, convert in (converters or {}).items():
+        if col in df.columns:
+            df[col] = convert(df[col])
+    return to_categorical(df, categoricals)
+
+
+def iter_record_batches(file_path: str,
+                        batch_size: int = DEFAULT_BATCH_SIZE,
+                        converters: Optional[Dict[str, Callable]] = None,
+                        categoricals: Iterable[str] = ()) -> Iterator[pd.DataFrame]:
+    """
+    Lit un fichier JSON de manière incrémentale et produit des DataFrames de `batch_size` lignes au plus.
+    Les objets imbriqués sont aplatis, les colonnes listées dans `converters` sont typées lot par lot
+    et les colonnes texte répétitives listées dans `categoricals` sont encodées en dictionnaire.
+    La mémoire utilisée dépend de la taille du lot, pas de la taille du fichier.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size doit être strictement positif.")
+
+    batch = []
+    for record in iter_json_records(file_path):
+        batch.append(flatten_record(record))
+        if len(batch) >= batch_size:
+            yield _build_batch(batch, converters, categoricals)
+            batch = []
+
+    if batch:
+        yield _build_batch(batch, converters, categoricals)
@@ -0,0 +1,53 @@
+import datetime
+import hashlib
+import os
+from typing import Optional
+
+from utils.db import Connection
+
+# --- 1. CONFIGURATION ---
+MANIFEST_TABLE = 'bronze.load_manifest'
+
+# Taille des blocs lus pour le calcul de l'empreinte
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+# --- 2. EMPREINTE DES FICHIERS SOURCES ---
+
+def file_hash(file_path: str) -> str:
+    """SHA-256 du contenu du fichier (lu par blocs)."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# --- 3. MANIFESTE DES CHARGEMENTS ---
+
+def loaded_hash(conn: Connection, target_table: str, source_file: str) -> Optional[str]:
+    """Empreinte enregistrée lors du dernier chargement du fichier (None s'il n'a jamais été chargé)."""
+    cursor = conn.execute(
+        f"SELECT File_Hash FROM {MANIFEST_TABLE} WHERE Target_Table = ? AND Source_File = ?",
+        target_table, source_file
+    )
+    row = cursor.fetchone()
+    return row[0].strip() if row else None
+
+
+def record_load(conn: Connection, target_table: str, source_file: str, hash_value: str, row_count: int):
+    """Remplace l'entrée du fichier dans le manifeste (dans la transaction du chargement)."""
+    conn.execute(
+        f"DELETE FROM {MANIFEST_TABLE} WHERE Target_Table = ? AND Source_File = ?",
+        target_table, source_file
+    )
+    conn.execute(
+        f"INSERT INTO {MANIFEST_TABLE} (Target_Table, Source_File, File_Hash, Row_Count, Loaded_At) "
+        f"VALUES (?, ?, ?, ?, ?)",
+        target_table, source_file, hash_value, row_count, datetime.datetime.now()
+    )
+
+
+def source_name(file_path: str) -> str:
+    """Clé d'un fichier dans le manifeste : son nom, indépendant du poste ou du dossier de données."""
+    return os.path.basename(file_path)
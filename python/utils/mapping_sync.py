@@ -0,0 +1,70 @@
+from typing import Dict, Optional
+
+from utils.db import Connection
+from utils.reference_cache import REFERENCE_MAPPINGS, bump_version
+
+# --- 1. CONFIGURATION ---
+# Colonne d'origine des lignes d'un mapping alimenté par plusieurs sources
+# (silver.Team_Mapping : 'explicit' pour le loader, 'fuzzy' pour utils.team_resolver)
+ORIGIN_COLUMNS = {'team': 'Match_Source'}
+
+
+# --- 2. DIFFÉRENTIEL D'UN MAPPING ---
+
+class MappingChange:
+    """Résumé du différentiel appliqué à un mapping (version : None si rien n'a changé)."""
+
+    def __init__(self, name: str, inserted: int, updated: int, deleted: int, unchanged: int,
+                 version: Optional[int] = None):
+        self.name = name
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+        self.unchanged = unchanged
+        self.version = version
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def __str__(self):
+        version = f"version {self.version}" if self.changed else "version inchangée"
+        return (f"Mapping '{self.name}' : {self.inserted} ajout(s), {self.updated} modification(s), "
+                f"{self.deleted} suppression(s), {self.unchanged} inchangé(s) ({version}).")
+
+
+def sync_mapping(conn: Connection, name: str, desired: Dict[str, str], origin: Optional[str] = None) -> MappingChange:
+    """
+    Aligne la table du mapping sur le dictionnaire voulu en n'appliquant que le différentiel
+    (la table n'est jamais vidée : un lecteur concurrent voit l'ancien ou le nouvel état).
+    Les lignes modifiées sont remplacées (DELETE + INSERT), ce qui remet à zéro leurs colonnes annexes.
+    `origin` : valeur de la colonne d'origine des lignes voulues ; seules les lignes de cette origine
+    (ou sans origine) peuvent être supprimées. Une nouvelle version n'est créée que si quelque chose change.
+    Ne valide pas la transaction.
+    """
+    table, key_column, value_column = REFERENCE_MAPPINGS[name]
+    origin_column = ORIGIN_COLUMNS.get(name) if origin is not None else None
+
+    columns = [key_column, value_column] + ([origin_column] if origin_column else [])
+    current = {row[0]: tuple(row[1:]) for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()}
+    target = {key: (value, origin) if origin_column else (value,) for key, value in desired.items()}
+
+    inserted = [key for key in target if key not in current]
+    updated = [key for key in target if key in current and current[key] != target[key]]
+    deleted = [key for key, row in current.items()
+               if key not in target and (origin_column is None or row[1] in (None, origin))]
+    unchanged = len(target) - len(inserted) - len(updated)
+
+    if not (inserted or updated or deleted):
+        return MappingChange(name, 0, 0, 0, unchanged)
+
+    if updated or deleted:
+        conn.prepare(f"DELETE FROM {table} WHERE {key_column} = ?").executemany(
+            [(key,) for key in updated + deleted])
+    if inserted or updated:
+        conn.prepare(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        ).executemany([(key, *target[key]) for key in inserted + updated])
+
+    version = bump_version(conn, name, len(inserted), len(updated), len(deleted))
+    return MappingChange(name, len(inserted), len(updated), len(deleted), unchanged, version)
@@ -0,0 +1,89 @@
+import datetime
+import json
+import os
+from typing import Dict, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    pa = pq = None
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    duckdb = None
+
+# --- 1. CONFIGURATION ---
+# Écriture Parquet : pyarrow si installé, sinon le moteur DuckDB (déjà utilisé comme base embarquée)
+PARQUET_ENGINE = 'pyarrow' if pq is not None else ('duckdb' if duckdb is not None else None)
+
+# Compression et taille des groupes de lignes (unité des statistiques min/max lues par les lecteurs)
+COMPRESSION = 'zstd'
+ROW_GROUP_SIZE = 122_880
+
+# Manifeste du jeu de données (racine de l'export) : empreinte et fichier de chaque table / partition exportée.
+# Une version différente (format de l'export modifié) ré-exporte tout.
+MANIFEST_FILE = '_manifest.json'
+MANIFEST_VERSION = 1
+
+
+# --- 2. ÉCRITURE ---
+
+def write_parquet(df: pd.DataFrame, path: str, date_columns: Sequence[str] = ()) -> int:
+    """
+    Écrit `df` dans un fichier Parquet (dictionnaire pour les colonnes texte, statistiques par groupe
+    de lignes). L'écriture passe par un fichier temporaire renommé : un lecteur ne voit jamais
+    de fichier partiel. Retourne le nombre de lignes écrites.
+    """
+    if PARQUET_ENGINE is None:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow) ou duckdb.")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+
+    if PARQUET_ENGINE == 'pyarrow':
+        frame = df.assign(**{col: pd.to_datetime(df[col]).dt.date for col in date_columns})
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        pq.write_table(table, temp_path, compression=COMPRESSION, use_dictionary=True,
+                       write_statistics=True, row_group_size=ROW_GROUP_SIZE)
+    else:
+        frame = df.assign(**{col: pd.to_datetime(df[col]) for col in date_columns})
+        columns = ', '.join(f'CAST("{col}" AS DATE) AS "{col}"' if col in date_columns else f'"{col}"'
+                            for col in frame.columns)
+        conn = duckdb.connect()
+        try:
+            conn.register('_parquet_rows', frame)
+            conn.execute(f"COPY (SELECT {columns} FROM _parquet_rows) TO '{temp_path}' "
+                         f"(FORMAT PARQUET, COMPRESSION {COMPRESSION.upper()}, ROW_GROUP_SIZE {ROW_GROUP_SIZE})")
+        finally:
+            conn.close()
+
+    os.replace(temp_path, path)
+    return len(df)
+
+
+# --- 3. MANIFESTE DU JEU DE DONNÉES ---
+
+def read_manifest(root: str) -> Dict[str, dict]:
+    """Tables exportées lors du dernier export (vide si absent ou d'une autre version)."""
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('tables', {})
+
+
+def write_manifest(root: str, tables: Dict[str, dict]):
+    """Remplace le manifeste (fichier temporaire renommé), une fois tous les fichiers de l'export écrits."""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, MANIFEST_FILE)
+    manifest = {'version': MANIFEST_VERSION, 'engine': PARQUET_ENGINE,
+                'exported_at': datetime.datetime.now().isoformat(timespec='seconds'), 'tables': tables}
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
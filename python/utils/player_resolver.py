@@ -0,0 +1,236 @@
+import datetime
+import re
+from collections import Counter
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.db import Connection, bulk_insert
+
+# --- 1. CONFIGURATION ---
+IDENTITY_TABLE = 'silver.Player_Identity'
+
+# Sources d'un enregistrement joueur (clé source : 'Nom|Année' pour FBref, profile_url pour Transfermarkt)
+SOURCE_FBREF = 'fbref'
+SOURCE_TRANSFERMARKT = 'transfermarkt'
+
+# Score d'une paire candidate : similarité des noms, nation (citoyenneté Transfermarkt), date de naissance
+WEIGHTS = {'name': 0.6, 'nation': 0.25, 'birth': 0.15}
+ACCEPT_SCORE = 0.8
+
+# Nation inconnue d'un côté : ni preuve ni contre-preuve
+UNKNOWN_NATION_SCORE = 0.5
+
+# Date de naissance : date complète identique, ou seule l'année est connue d'un côté (FBref : 'Born')
+SAME_DATE_SCORE = 1.0
+SAME_YEAR_SCORE = 0.8
+
+# Lettres que la décomposition Unicode ne ramène pas à l'ASCII ('Ødegaard' -> 'odegaard')
+TRANSLITERATIONS = str.maketrans({'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE', 'ß': 'ss', 'đ': 'd', 'Đ': 'D',
+                                  'ł': 'l', 'Ł': 'L', 'ı': 'i', 'þ': 'th', 'ð': 'd'})
+
+
+# --- 2. NORMALISATION ET CLÉS DE BLOCAGE ---
+
+def fbref_key(player_name: str, birth_year) -> str:
+    """Clé source d'un joueur FBref : clé métier de gold.DimPlayer ('Nom|Année', année vide si inconnue)."""
+    return f"{player_name}|{'' if pd.isna(birth_year) else int(birth_year)}"
+
+
+def normalize_person(name: str) -> str:
+    """'Martin Ødegaard' -> 'martin odegaard', 'martin-odegaard' (URL Transfermarkt) -> 'martin odegaard'."""
+    text = unicodedata.normalize('NFKD', str(name).translate(TRANSLITERATIONS))
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', re.sub(r"['’]", '', text)))
+
+
+def blocking_keys(normalized: str, birth_year) -> List[str]:
+    """
+    Année de naissance + jeton de nom de famille (dernier jeton), et + premier jeton pour les noms
+    d'usage à un seul mot ou les noms de famille changés ('Emerson' / 'Emerson Palmieri').
+    Seules les paires d'un même bloc sont comparées.
+    """
+    tokens = normalized.split()
+    if not tokens or pd.isna(birth_year):
+        return []
+    year = int(birth_year)
+    return sorted({f"{year}|{tokens[-1]}", f"{year}|{tokens[0]}"})
+
+
+# --- 3. SCORE D'UNE PAIRE ---
+
+def name_similarity(a: str, b: str) -> float:
+    """Moyenne du ratio de séquence et de la part des jetons du nom le plus court présents dans l'autre."""
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    if not tokens_a or not tokens_b:
+        return 0.0
+    containment = len(tokens_a & tokens_b) / min(len(tokens_a), len(tokens_b))
+    return (SequenceMatcher(None, a, b).ratio() + containment) / 2
+
+
+def nation_similarity(nations_a: frozenset, nations_b: frozenset) -> float:
+    if not nations_a or not nations_b:
+        return UNKNOWN_NATION_SCORE
+    return 1.0 if nations_a & nations_b else 0.0
+
+
+def birth_similarity(date_a: Optional[datetime.date], date_b: Optional[datetime.date]) -> float:
+    """Les deux enregistrements sont déjà dans le même bloc (même année de naissance)."""
+    if date_a is not None and date_b is not None:
+        return SAME_DATE_SCORE if date_a == date_b else 0.0
+    return SAME_YEAR_SCORE
+
+
+def pair_score(a: dict, b: dict) -> float:
+    return (WEIGHTS['name'] * name_similarity(a['normalized'], b['normalized'])
+            + WEIGHTS['nation'] * nation_similarity(a['nations'], b['nations'])
+            + WEIGHTS['birth'] * birth_similarity(a['birth_date'], b['birth_date']))
+
+
+# --- 4. RÉSOLUTION ---
+
+class _Clusters:
+    """Union-find des enregistrements ; un groupe contient au plus un profil Transfermarkt (un profil = un joueur)."""
+
+    def __init__(self, records: pd.DataFrame):
+        self.parent = list(range(len(records)))
+        self.profile = [key if source == SOURCE_TRANSFERMARKT else None
+                        for source, key in zip(records['Source'], records['Source_Key'])]
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+        if self.profile[root_i] and self.profile[root_j]:
+            return False
+        self.parent[root_j] = root_i
+        self.profile[root_i] = self.profile[root_i] or self.profile[root_j]
+        return True
+
+
+def candidate_pairs(records: pd.DataFrame) -> pd.DataFrame:
+    """Paires (i, j) partageant une clé de blocage, hors paires de deux profils Transfermarkt."""
+    blocks = records[['Block_Keys']].explode('Block_Keys').dropna().reset_index()
+    blocks.columns = ['i', 'key']
+    pairs = blocks.merge(blocks.rename(columns={'i': 'j'}), on='key')
+    pairs = pairs[pairs['i'] < pairs['j']].drop_duplicates(['i', 'j'])
+    sources = records['Source'].to_numpy()
+    both_profiles = (sources[pairs['i'].to_numpy()] == SOURCE_TRANSFERMARKT) & \
+                    (sources[pairs['j'].to_numpy()] == SOURCE_TRANSFERMARKT)
+    return pairs[~both_profiles][['i', 'j']].reset_index(drop=True)
+
+
+def cluster_records(records: pd.DataFrame, accept_score: float = ACCEPT_SCORE) -> Tuple[List[int], List[float], int]:
+    """
+    Regroupe les enregistrements d'un même joueur : paires candidates des blocs, scorées,
+    puis fusionnées par score décroissant au-dessus du seuil.
+    Retourne (groupe de chaque enregistrement, meilleur score de liaison, nombre de paires comparées).
+    """
+    pairs = candidate_pairs(records)
+    rows = records[['normalized', 'nations', 'birth_date']].to_dict('records')
+    scores = [pair_score(rows[i], rows[j]) for i, j in zip(pairs['i'], pairs['j'])]
+    pairs['score'] = scores
+
+    clusters = _Clusters(records)
+    best = [1.0 if source == SOURCE_TRANSFERMARKT else 0.0 for source in records['Source']]
+    for i, j, score in pairs[pairs['score'] >= accept_score].sort_values('score', ascending=False).itertuples(index=False):
+        if clusters.union(int(i), int(j)):
+            best[i], best[j] = max(best[i], score), max(best[j], score)
+    return [clusters.find(i) for i in range(len(records))], best, len(pairs)
+
+
+def assign_ids(records: pd.DataFrame, groups: Sequence[int], known: Dict[Tuple[str, str], int]) -> List[int]:
+    """
+    Identifiant stable par groupe : l'identifiant déjà porté par le plus de membres (le plus ancien à égalité),
+    s'il n'est pas déjà pris par un groupe plus grand ; sinon un nouvel identifiant.
+    """
+    members: Dict[int, List[int]] = {}
+    for index, group in enumerate(groups):
+        members.setdefault(group, []).append(index)
+
+    keys = list(zip(records['Source'], records['Source_Key']))
+    next_id = max(known.values(), default=0) + 1
+    taken, ids = set(), [0] * len(records)
+    for group in sorted(members, key=lambda g: -len(members[g])):
+        previous = Counter(known[keys[i]] for i in members[group] if keys[i] in known)
+        ranked = sorted(previous.items(), key=lambda item: (-item[1], item[0]))
+        player_id = next((pid for pid, _ in ranked if pid not in taken), None)
+        if player_id is None:
+            player_id, next_id = next_id, next_id + 1
+        taken.add(player_id)
+        for i in members[group]:
+            ids[i] = int(player_id)
+    return ids
+
+
+def prepare_records(records: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes dérivées : nom normalisé, ensemble des nations normalisées, clés de blocage."""
+    records = records.reset_index(drop=True).copy()
+    records['normalized'] = records['Player_Name'].map(normalize_person)
+    records['nations'] = records['Nations'].map(lambda values: frozenset(normalize_person(v) for v in values if v))
+    records['Block_Keys'] = [blocking_keys(name, year) for name, year in zip(records['normalized'], records['BirthYear'])]
+    return records
+
+
+class ResolutionReport:
+    def __init__(self, records: int, pairs: int, players: int, linked_profiles: int, reassigned: int):
+        self.records = records
+        self.pairs = pairs
+        self.players = players
+        self.linked_profiles = linked_profiles
+        self.reassigned = reassigned
+
+    def __str__(self):
+        return (f"{self.records} enregistrement(s), {self.pairs} paire(s) comparée(s) (blocage), "
+                f"{self.players} joueur(s) distinct(s), {self.linked_profiles} profil(s) Transfermarkt rapproché(s) "
+                f"de FBref, {self.reassigned} identifiant(s) réattribué(s).")
+
+
+def read_identities(conn: Connection) -> pd.DataFrame:
+    cursor = conn.execute(f"SELECT Source, Source_Key, Player_Id, Player_Name, BirthYear, Nation, Match_Score, Resolved_At "
+                          f"FROM {IDENTITY_TABLE}")
+    columns = [col[0] for col in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+
+
+def resolve_players(conn: Connection, records: pd.DataFrame, accept_score: float = ACCEPT_SCORE) -> ResolutionReport:
+    """
+    Résout les enregistrements joueurs (colonnes Source, Source_Key, Player_Name, BirthYear, Nations, Birth_Date)
+    et réécrit silver.Player_Identity dans la transaction de l'appelant. Les identifiants déjà attribués
+    sont conservés ; les enregistrements absents de cette exécution gardent leur ligne.
+    """
+    records = prepare_records(records.drop_duplicates(['Source', 'Source_Key']))
+    records['birth_date'] = records['Birth_Date'].where(records['Birth_Date'].notna(), None)
+    stored = read_identities(conn)
+    known = {(source, key): int(pid) for source, key, pid in zip(stored['Source'], stored['Source_Key'], stored['Player_Id'])}
+
+    groups, best, pair_count = cluster_records(records, accept_score)
+    ids = assign_ids(records, groups, known)
+    keys = list(zip(records['Source'], records['Source_Key']))
+    reassigned = sum(1 for key, pid in zip(keys, ids) if key in known and known[key] != pid)
+
+    resolved = pd.DataFrame({
+        'Source': records['Source'], 'Source_Key': records['Source_Key'], 'Player_Id': ids,
+        'Player_Name': records['Player_Name'], 'BirthYear': records['BirthYear'].astype('Int64'),
+        'Nation': records['Nations'].map(lambda values: next(iter(values), None)),
+        'Match_Score': [round(score, 3) for score in best], 'Resolved_At': datetime.datetime.now(),
+    })
+    current = set(keys)
+    kept = stored.loc[[key not in current for key in zip(stored['Source'], stored['Source_Key'])], :]
+
+    columns = list(resolved.columns)
+    conn.execute(f"DELETE FROM {IDENTITY_TABLE}")
+    bulk_insert(conn, IDENTITY_TABLE, columns, pd.concat([resolved, kept[columns]], ignore_index=True))
+
+    profiles = records['Source'] == SOURCE_TRANSFERMARKT
+    fbref_groups = {group for group, source in zip(groups, records['Source']) if source == SOURCE_FBREF}
+    linked = sum(1 for group, is_profile in zip(groups, profiles) if is_profile and group in fbref_groups)
+    return ResolutionReport(len(records), pair_count, len(set(ids)), linked, reassigned)
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import uuid
+from typing import Dict, Optional
+
+import pandas as pd
+
+from utils import config
+from utils.categorical import map_categorical
+from utils.db import Connection
+
+# --- 1. CONFIGURATION ---
+VERSION_TABLE = 'silver.Mapping_Version'
+CHANGE_LOG_TABLE = 'silver.Mapping_Change_Log'
+
+# Tables de référence : nom -> (table, colonne clé, colonne valeur)
+REFERENCE_MAPPINGS = {
+    'team': ('silver.Team_Mapping', 'Team_Source_Name', 'Team_Standard_Name'),
+    'nation': ('silver.Nation_Mapping', 'Nation_Source_Key', 'Nation_Standard_Name'),
+    'notes': ('silver.Notes_Mapping', 'Notes_Source_Key', 'Notes_Standard_Name'),
+}
+
+
+# --- 2. VERSIONS DES MAPPINGS ---
+
+def bump_version(conn: Connection, name: str, inserted: int = 0, updated: int = 0, deleted: int = 0) -> int:
+    """
+    Nouvelle version d'un mapping, à appeler dans la transaction qui le modifie ; la version et le résumé
+    des changements sont journalisés dans silver.Mapping_Change_Log. Retourne le numéro de version.
+    La version est aussi un jeton unique : une base recréée ne peut pas retrouver la version d'un cliché ancien.
+    """
+    token = uuid.uuid4().hex
+    cursor = conn.execute(
+        f"UPDATE {VERSION_TABLE} SET Version = Version + 1, Version_Token = ?, Updated_At = CURRENT_TIMESTAMP "
+        f"WHERE Mapping_Name = ?", token, name
+    )
+    if cursor.rowcount == 0:
+        conn.execute(
+            f"INSERT INTO {VERSION_TABLE} (Mapping_Name, Version, Version_Token, Updated_At) "
+            f"VALUES (?, 1, ?, CURRENT_TIMESTAMP)", name, token
+        )
+    version = conn.execute(f"SELECT Version FROM {VERSION_TABLE} WHERE Mapping_Name = ?", name).fetchone()[0]
+    conn.execute(
+        f"INSERT INTO {CHANGE_LOG_TABLE} (Mapping_Name, Version, Version_Token, Inserted, Updated, Deleted, Changed_At) "
+        f"VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)", name, version, token, inserted, updated, deleted
+    )
+    return version
+
+
+def read_versions(conn: Connection) -> Dict[str, str]:
+    return {name: token for name, token in conn.execute(
+        f"SELECT Mapping_Name, Version_Token FROM {VERSION_TABLE}").fetchall()}
+
+
+# --- 3. MAPPING EN MÉMOIRE ---
+
+class ReferenceMapping:
+    """Mapping source -> standard chargé une fois : lookup O(1) et application vectorisée (par catégorie)."""
+
+    def __init__(self, name: str, version: Optional[str], data: Dict[str, str]):
+        self.name = name
+        self.version = version
+        self._data = data
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def as_dict(self) -> Dict[str, str]:
+        """Copie modifiable du mapping."""
+        return dict(self._data)
+
+    def map(self, series: pd.Series, **kwargs) -> pd.Series:
+        """Colonne standardisée (voir utils.categorical.map_categorical, `default` accepté)."""
+        return map_categorical(series, self._data, **kwargs)
+
+
+# --- 4. CACHE DU PROCESSUS ---
+
+class ReferenceCache:
+    """
+    Mappings de référence partagés par toutes les étapes du processus (run_pipeline les exécute
+    dans le même interpréteur). À chaque accès, les jetons de silver.Mapping_Version sont relus
+    (une petite requête) : seul un mapping dont la version a changé est rechargé.
+    Le cliché disque optionnel (config.REFERENCE_SNAPSHOT_PATH) permet à un nouveau processus
+    de démarrer sans relire les tables si les versions sont inchangées.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path
+        self._mappings: Dict[str, ReferenceMapping] = {}
+        self._snapshot_loaded = False
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _load_snapshot(self):
+        self._snapshot_loaded = True
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            # Cliché JSON : {nom: [jeton de version, {clé source: nom standard}]}
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self._mappings.update({name: ReferenceMapping(name, version, dict(data))
+                                   for name, (version, data) in snapshot.items()})
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"⚠️ Cliché des mappings illisible ({self.snapshot_path}) : {e}")
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        snapshot = {name: (m.version, m._data) for name, m in self._mappings.items() if m.version is not None}
+        tmp_path = f"{self.snapshot_path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def get(self, conn: Connection, name: str) -> ReferenceMapping:
+        with self._lock:
+            if not self._snapshot_loaded:
+                self._load_snapshot()
+            version = read_versions(conn).get(name)
+            cached = self._mappings.get(name)
+            # Un mapping sans version (jamais chargé par son loader) n'est jamais considéré comme à jour
+            if cached is not None and version is not None and cached.version == version:
+                return cached
+
+            table, key_column, value_column = REFERENCE_MAPPINGS[name]
+            rows = conn.execute(f"SELECT {key_column}, {value_column} FROM {table}").fetchall()
+            mapping = ReferenceMapping(name, version, {key: value for key, value in rows})
+            self._mappings[name] = mapping
+            self.loads += 1
+            if version is not None:
+                self._save_snapshot()
+            return mapping
+
+    def invalidate(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._mappings.clear()
+            else:
+                self._mappings.pop(name, None)
+
+
+REFERENCE_CACHE = ReferenceCache(config.REFERENCE_SNAPSHOT_PATH)
+
+
+def get_mapping(conn: Connection, name: str) -> ReferenceMapping:
+    """Mapping de référence ('team', 'nation', 'notes') à jour, lu au plus une fois par version."""
+    return REFERENCE_CACHE.get(conn, name)
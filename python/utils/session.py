@@ -0,0 +1,209 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from utils import config
+from utils.db import Connection, DB_ERRORS, open_connection
+
+# --- 1. CONFIGURATION ---
+# Nombre maximal de connexions ouvertes par moteur
+POOL_MAX_SIZE = 4
+
+# Une connexion inactive depuis plus longtemps est vérifiée (SELECT 1) avant d'être rendue
+HEALTH_CHECK_INTERVAL_S = 30.0
+
+# Attente maximale d'une connexion libre avant erreur
+ACQUIRE_TIMEOUT_S = 60.0
+
+
+# --- 2. MÉTRIQUES D'EXÉCUTION ---
+
+class StageMetrics:
+    """Temps passé en connexion, exécution (y compris lecture des résultats) et validation pour une étape."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.connect_s = 0.0
+        self.execute_s = 0.0
+        self.commit_s = 0.0
+        self.acquisitions = 0
+        self.reconnects = 0
+        self.statement_cache_hits = 0
+        self.statement_cache_misses = 0
+
+    def add(self, kind: str, seconds: float):
+        setattr(self, f"{kind}_s", getattr(self, f"{kind}_s") + seconds)
+
+
+class RunMetrics:
+    """Registre des métriques de toutes les étapes du processus."""
+
+    def __init__(self):
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def for_stage(self, stage: str) -> StageMetrics:
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = StageMetrics(stage)
+            return self._stages[stage]
+
+    def stages(self) -> List[StageMetrics]:
+        return list(self._stages.values())
+
+    def report(self):
+        """Affiche la répartition connexion / exécution / validation par étape."""
+        if not self._stages:
+            return
+        print("\n===== MÉTRIQUES BASE DE DONNÉES PAR ÉTAPE =====")
+        print(f"{'Étape':<52} {'connect':>9} {'execute':>9} {'commit':>9} {'cache':>9}")
+        totals = [0.0, 0.0, 0.0]
+        for m in self.stages():
+            cache = f"{m.statement_cache_hits}/{m.statement_cache_hits + m.statement_cache_misses}"
+            print(f"{m.stage:<52} {m.connect_s:8.3f}s {m.execute_s:8.3f}s {m.commit_s:8.3f}s {cache:>9}")
+            totals[0] += m.connect_s
+            totals[1] += m.execute_s
+            totals[2] += m.commit_s
+        print(f"{'TOTAL':<52} {totals[0]:8.3f}s {totals[1]:8.3f}s {totals[2]:8.3f}s")
+
+
+RUN_METRICS = RunMetrics()
+
+
+# --- 3. POOL DE CONNEXIONS ---
+
+class ConnectionPool:
+    """
+    Pool de connexions partagé par toutes les étapes du processus.
+    Les connexions rendues restent ouvertes (avec leur cache d'instructions préparées)
+    et sont vérifiées avant réutilisation si elles sont restées inactives.
+    """
+
+    def __init__(self, backend: str, max_size: int = POOL_MAX_SIZE,
+                 health_check_interval: float = HEALTH_CHECK_INTERVAL_S):
+        self.backend = backend
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self._idle: List[tuple] = []   # (connexion, instant de retour au pool)
+        self._size = 0
+        self._cond = threading.Condition()
+
+    def _open(self, metrics: StageMetrics) -> Connection:
+        start = time.perf_counter()
+        conn = open_connection(backend=self.backend)
+        metrics.add('connect', time.perf_counter() - start)
+        conn.pool = self
+        return conn
+
+    def _is_healthy(self, conn: Connection) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            conn.rollback()
+            return True
+        except DB_ERRORS:
+            return False
+
+    def acquire(self, stage: str, autocommit: bool = False) -> Connection:
+        metrics = RUN_METRICS.for_stage(stage)
+        deadline = time.monotonic() + ACQUIRE_TIMEOUT_S
+        conn = None
+
+        with self._cond:
+            while conn is None:
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    # Vérification de santé des connexions restées inactives
+                    if time.monotonic() - released_at > self.health_check_interval and not self._is_healthy(conn):
+                        self._discard(conn)
+                        metrics.reconnects += 1
+                        conn = None
+                        continue
+                elif self._size < self.max_size:
+                    self._size += 1
+                    try:
+                        conn = self._open(metrics)
+                    except Exception:
+                        self._size -= 1
+                        raise
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError(f"Aucune connexion libre dans le pool après {ACQUIRE_TIMEOUT_S} s.")
+
+        metrics.acquisitions += 1
+        conn.metrics = metrics
+        conn.autocommit = autocommit
+        return conn
+
+    def release(self, conn: Connection):
+        """Fin de l'étape : le travail non validé est annulé avant le retour au pool."""
+        with self._cond:
+            if any(idle is conn for idle, _ in self._idle):
+                return  # Double close() : déjà rendue
+        try:
+            conn.rollback()
+            conn.autocommit = False
+        except DB_ERRORS:
+            with self._cond:
+                self._discard(conn)
+                self._cond.notify()
+            return
+        conn.metrics = None
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn: Connection):
+        self._size -= 1
+        try:
+            conn.close_raw()
+        except DB_ERRORS:
+            pass
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+
+
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(backend: Optional[str] = None) -> ConnectionPool:
+    """Pool unique du processus pour le moteur donné (par défaut celui de la configuration)."""
+    backend = backend or config.DB_BACKEND
+    with _POOLS_LOCK:
+        if backend not in _POOLS:
+            _POOLS[backend] = ConnectionPool(backend)
+        return _POOLS[backend]
+
+
+@atexit.register
+def close_pools():
+    for pool in _POOLS.values():
+        pool.close_all()
+
+
+# --- 4. PORTÉE TRANSACTIONNELLE PAR ÉTAPE ---
+
+@contextmanager
+def session(stage: str, autocommit: bool = False, backend: Optional[str] = None):
+    """
+    Emprunte une connexion pour une étape du pipeline :
+    validation en sortie normale, annulation en cas d'erreur, retour au pool dans tous les cas.
+    """
+    conn = get_pool(backend).acquire(stage, autocommit=autocommit)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
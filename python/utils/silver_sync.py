@@ -0,0 +1,373 @@
+import datetime
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.categorical import to_records
+from utils.db import Connection, bulk_insert
+
+# --- 1. CONFIGURATION ---
+# Colonne d'empreinte des tables silver (16 caractères hexadécimaux = 64 bits)
+ROW_HASH_COLUMN = 'Row_Hash'
+
+# Colonne d'opération de la table de préparation : I (insertion), U (mise à jour), D (suppression)
+CHANGE_OP_COLUMN = 'Change_Op'
+
+# Préfixe de la table temporaire de préparation, suivi du nom de la table cible
+# (plusieurs synchronisations peuvent être ouvertes sur la même connexion ; préfixée par # sous SQL Server)
+STAGE_TABLE_NAME = 'silver_sync_stage'
+
+# Ordre d'insertion des lignes de la table de préparation (doublons de clé : la dernière est conservée) ;
+# colonne IDENTITY sous SQL Server, rowid des moteurs embarqués
+STAGE_ROW_COLUMN = 'Stage_Row'
+
+# Nombre maximal de partitions par lecture de la cible (paramètres d'une clause IN)
+PARTITIONS_PER_QUERY = 500
+
+
+# --- 2. RAPPORT DE SYNCHRONISATION ---
+
+class SyncReport:
+    """Nombre de lignes insérées / mises à jour / supprimées / inchangées lors d'une synchronisation."""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def __str__(self):
+        return (f"{self.table} : {self.inserted} insérée(s), {self.updated} mise(s) à jour, "
+                f"{self.deleted} supprimée(s), {self.unchanged} inchangée(s).")
+
+
+# --- 3. EMPREINTES ET CLÉS ---
+
+def row_hashes(df: pd.DataFrame, columns: Sequence[str]) -> pd.Series:
+    """
+    Empreinte 64 bits (hexadécimale) de chaque ligne sur les colonnes données.
+    Les catégories sont hachées par leur valeur : le résultat ne dépend pas de l'encodage.
+    """
+    hashed = pd.util.hash_pandas_object(df[list(columns)], index=False, categorize=True)
+    return pd.Series(np.char.mod('%016x', hashed.to_numpy()), index=df.index)
+
+
+def _normalize_key(series: pd.Series) -> pd.Series:
+    """
+    Représentation texte commune d'une colonne de clé, qu'elle vienne du DataFrame source
+    ou de la table cible (les dates reviennent en texte sous SQLite, en date ailleurs).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime('%Y-%m-%d')
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        series = series.astype('Int64')
+    elif series.dtype == object:
+        series = series.map(lambda v: v.isoformat()[:10] if isinstance(v, (datetime.date, pd.Timestamp)) else v)
+    return series.astype('string').fillna('\x00')
+
+
+def _key_index(df: pd.DataFrame, keys: Sequence[str]) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([_normalize_key(df[key]) for key in keys], names=list(keys))
+
+
+def _quoted(columns: Sequence[str]) -> str:
+    return ', '.join(f'[{col}]' for col in columns)
+
+
+# --- 4. DIFFÉRENTIEL ET APPLICATION ---
+
+class SilverSync:
+    """
+    Synchronise une table silver avec une source transmise par lots (clés métier + attributs) :
+    1. lecture des clés et empreintes de la cible (jamais des attributs) : une seule fois, ou, si
+       `partition_column` est fourni (ex: les saisons reconstruites), pour les seules partitions
+       vues dans les lots ou annoncées par `partitions` ;
+    2. pour chaque lot : empreinte des lignes, comparaison avec la cible, écriture des seules
+       lignes nouvelles ou modifiées dans une table temporaire de préparation ;
+    3. à la fin : lignes de la cible absentes de la source marquées 'D' (limitées aux partitions
+       lues), puis application ensembliste (MERGE sous SQL Server, DELETE + INSERT sur les moteurs embarqués).
+    Une partition annoncée sans ligne source est vidée. La mémoire occupée ne dépend que de la taille
+    d'un lot et du nombre de clés (des partitions lues).
+    Ne valide pas la transaction. S'utilise comme gestionnaire de contexte (la préparation est supprimée en sortie).
+    """
+
+    def __init__(self, conn: Connection, table: str, keys: Sequence[str], partition_column: Optional[str] = None,
+                 partitions: Optional[Iterable] = None):
+        self.conn = conn
+        self.table = table
+        self.keys = list(keys)
+        self.partition_column = partition_column
+        self.report = SyncReport(table)
+        self._columns = None
+        self._stage = None
+        self._target = None
+        self._target_index = None
+        self._target_hashes = None
+        self._seen = {}            # clé normalisée -> opération retenue ('I', 'U' ou '-' inchangée)
+        self._partitions = set(partitions or ())
+        self._loaded_partitions = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load_target(self):
+        """Cible : clés, partition et empreintes uniquement (partitions pas encore lues, si `partition_column`)."""
+        columns = self.keys + ([self.partition_column]
+                               if self.partition_column and self.partition_column not in self.keys else [])
+        sql = f"SELECT {_quoted(columns)}, [{ROW_HASH_COLUMN}] FROM {self.table}"
+        if self.partition_column is None:
+            if self._target is not None:
+                return
+            rows = self.conn.execute(sql).fetchall()
+        else:
+            pending = sorted(self._partitions - self._loaded_partitions)
+            if not pending and self._target is not None:
+                return
+            self._loaded_partitions.update(pending)
+            rows = []
+            for start in range(0, len(pending), PARTITIONS_PER_QUERY):
+                batch = pending[start:start + PARTITIONS_PER_QUERY]
+                rows.extend(self.conn.execute(
+                    f"{sql} WHERE [{self.partition_column}] IN ({', '.join('?' * len(batch))})", *batch).fetchall())
+        loaded = pd.DataFrame.from_records(rows, columns=columns + [ROW_HASH_COLUMN])
+        if self._target is not None:
+            if loaded.empty:
+                return
+            loaded = pd.concat([self._target, loaded], ignore_index=True) if len(self._target) else loaded
+        self._target = loaded
+        self._target_index = _key_index(self._target, self.keys)
+        # Empreinte absente (ligne chargée hors de ce module) : la ligne est considérée comme modifiée
+        stored_hashes = self._target[ROW_HASH_COLUMN].astype('string').str.strip().fillna('')
+        self._target_hashes = pd.Series(stored_hashes.to_numpy(dtype=object), index=self._target_index)
+
+    def add(self, df: pd.DataFrame):
+        """Compare un lot à la cible et prépare ses lignes nouvelles ou modifiées."""
+        if self._columns is None:
+            self._columns = [col for col in df.columns if col != ROW_HASH_COLUMN]
+        keys, report = self.keys, self.report
+
+        source = df[self._columns].copy()
+        duplicates = source.duplicated(subset=keys, keep='last')
+        if duplicates.any():
+            print(f"⚠️ {int(duplicates.sum())} ligne(s) en double sur la clé {tuple(keys)} ignorée(s) (dernière conservée).")
+            source = source[~duplicates]
+        if source.empty:
+            return
+        source[ROW_HASH_COLUMN] = row_hashes(source, self._columns)
+        if self.partition_column is not None:
+            self._partitions.update(p for p in pd.unique(source[self.partition_column].astype(object)) if pd.notna(p))
+        self._load_target()
+
+        source_index = _key_index(source, keys)
+        self._forget_earlier_versions(source, source_index)
+
+        in_target = source_index.isin(self._target_index)
+        stored = self._target_hashes.reindex(source_index[in_target]).to_numpy()
+        changed = source[ROW_HASH_COLUMN].to_numpy()[in_target] != stored
+
+        ops = np.full(len(source), '-', dtype=object)
+        ops[~in_target] = 'I'
+        ops[np.flatnonzero(in_target)[changed]] = 'U'
+        self._seen.update(zip(source_index, ops))
+
+        report.inserted += int((~in_target).sum())
+        report.updated += int(changed.sum())
+        report.unchanged += int(in_target.sum()) - int(changed.sum())
+
+        self._stage_rows('I', source[~in_target])
+        self._stage_rows('U', source[in_target][changed])
+
+    def _forget_earlier_versions(self, source: pd.DataFrame, source_index: pd.MultiIndex):
+        """Clé déjà vue dans un lot précédent : la dernière version l'emporte, la précédente est retirée."""
+        repeated = [key for key in source_index if key in self._seen]
+        if not repeated:
+            return
+        print(f"⚠️ {len(repeated)} ligne(s) en double sur la clé {tuple(self.keys)} entre deux lots (dernière conservée).")
+        counters = {'I': 'inserted', 'U': 'updated', '-': 'unchanged'}
+        for key in repeated:
+            op = self._seen.pop(key)
+            setattr(self.report, counters[op], getattr(self.report, counters[op]) - 1)
+        staged = source[source_index.isin(repeated)]
+        if self._stage is not None and len(staged):
+            where = ' AND '.join(f"[{key}] = ?" for key in self.keys)
+            self.conn.prepare(f"DELETE FROM {self._stage} WHERE {where}").executemany(
+                to_records(staged, self.keys))
+
+    def _stage_rows(self, op: str, rows: pd.DataFrame):
+        if not len(rows):
+            return
+        stage_columns = self._columns + [ROW_HASH_COLUMN, CHANGE_OP_COLUMN]
+        if self._stage is None:
+            self._stage = _create_stage(self.conn, self.table, self._columns)
+        rows = rows.reindex(columns=stage_columns)
+        rows[CHANGE_OP_COLUMN] = op
+        bulk_insert(self.conn, self._stage, stage_columns, rows)
+
+    def finish(self) -> SyncReport:
+        """Marque les suppressions et applique le différentiel préparé."""
+        if self._columns is None:
+            # Aucun lot : les partitions annoncées sont vidées
+            if self.partition_column is not None and self._partitions:
+                self.report.deleted = self._clear_partitions()
+            return self.report
+        self._load_target()
+
+        # --- Lignes disparues de la source ---
+        missing = ~self._target_index.isin(list(self._seen)) if self._seen else np.ones(len(self._target), dtype=bool)
+        if self.partition_column is not None:
+            missing &= self._target[self.partition_column].isin(self._partitions).to_numpy()
+        self._stage_rows('D', self._target[missing])
+        self.report.deleted = int(missing.sum())
+
+        # --- Application ensembliste ---
+        if self.report.changed:
+            _apply_stage(self.conn, self.table, self._stage, self._columns, self.keys)
+        return self.report
+
+    def _clear_partitions(self) -> int:
+        partitions = sorted(self._partitions)
+        deleted = 0
+        for start in range(0, len(partitions), PARTITIONS_PER_QUERY):
+            batch = partitions[start:start + PARTITIONS_PER_QUERY]
+            where = f"[{self.partition_column}] IN ({', '.join('?' * len(batch))})"
+            deleted += self.conn.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {where}", *batch).fetchone()[0]
+            self.conn.execute(f"DELETE FROM {self.table} WHERE {where}", *batch)
+        return int(deleted)
+
+    def close(self):
+        if self._stage is not None:
+            self.conn.execute(f"DROP TABLE IF EXISTS {self._stage}")
+            self._stage = None
+
+
+def sync_table(conn: Connection, table: str, df: pd.DataFrame, keys: Sequence[str],
+               partition_column: Optional[str] = None, partitions: Optional[Iterable] = None) -> SyncReport:
+    """Synchronise la table silver avec un DataFrame complet (un seul lot, voir SilverSync)."""
+    with SilverSync(conn, table, keys, partition_column, partitions) as sync:
+        sync.add(df)
+        return sync.finish()
+
+
+def _create_stage(conn: Connection, table: str, columns: List[str]) -> str:
+    """Table temporaire de même structure que la cible, plus la colonne d'opération."""
+    select_list = ', '.join(f"t.[{col}]" for col in columns + [ROW_HASH_COLUMN])
+    select_list += f", CAST(NULL AS CHAR(1)) AS [{CHANGE_OP_COLUMN}]"
+    stage = f"{STAGE_TABLE_NAME}_{table.split('.')[-1]}"
+    if conn.backend == 'sqlserver':
+        stage = f"#{stage}"
+        conn.execute(f"DROP TABLE IF EXISTS {stage}")
+        select_list += f", IDENTITY(INT, 1, 1) AS [{STAGE_ROW_COLUMN}]"
+        # La jointure externe rend toutes les colonnes NULLables (les lignes 'D' ne portent que la clé)
+        conn.execute(f"SELECT {select_list} INTO {stage} FROM (SELECT 1 AS x) AS d LEFT JOIN {table} AS t ON 1 = 0 WHERE 1 = 0")
+    else:
+        conn.execute(f"DROP TABLE IF EXISTS {stage}")
+        conn.execute(f"CREATE TEMP TABLE {stage} AS SELECT {select_list} FROM {table} AS t WHERE 1 = 0")
+    return stage
+
+
+def _apply_stage(conn: Connection, table: str, stage: str, columns: List[str], keys: Sequence[str]):
+    all_columns = columns + [ROW_HASH_COLUMN]
+    join = ' AND '.join(f"t.[{key}] = s.[{key}]" for key in keys)
+
+    if conn.backend == 'sqlserver':
+        updates = ', '.join(f"t.[{col}] = s.[{col}]" for col in all_columns if col not in keys)
+        conn.execute(
+            f"MERGE {table} AS t USING {stage} AS s ON {join} "
+            f"WHEN MATCHED AND s.[{CHANGE_OP_COLUMN}] = 'D' THEN DELETE "
+            f"WHEN MATCHED AND s.[{CHANGE_OP_COLUMN}] = 'U' THEN UPDATE SET {updates} "
+            f"WHEN NOT MATCHED BY TARGET AND s.[{CHANGE_OP_COLUMN}] = 'I' THEN "
+            f"INSERT ({_quoted(all_columns)}) VALUES ({', '.join(f's.[{col}]' for col in all_columns)});"
+        )
+        return
+
+    # Moteurs embarqués : suppression des lignes modifiées ou disparues, puis insertion des nouvelles versions
+    conn.execute(
+        f"DELETE FROM {table} AS t WHERE EXISTS ("
+        f"SELECT 1 FROM {stage} AS s WHERE s.[{CHANGE_OP_COLUMN}] IN ('U', 'D') AND {join})"
+    )
+    conn.execute(
+        f"INSERT INTO {table} ({_quoted(all_columns)}) "
+        f"SELECT {_quoted(all_columns)} FROM {stage} WHERE [{CHANGE_OP_COLUMN}] IN ('I', 'U')"
+    )
+
+
+# --- 5. DIFFÉRENTIEL CALCULÉ DANS LA BASE (MODE PUSHDOWN) ---
+
+def _differs(columns: Sequence[str], source: str) -> str:
+    """Au moins un attribut différent entre t (cible) et `source` (préparation), NULL compris."""
+    return ' OR '.join(
+        f"(t.[{col}] <> {source}.[{col}] OR (t.[{col}] IS NULL AND {source}.[{col}] IS NOT NULL) "
+        f"OR (t.[{col}] IS NOT NULL AND {source}.[{col}] IS NULL))"
+        for col in columns
+    )
+
+
+def sync_from_select(conn: Connection, table: str, select_sql: str, columns: Sequence[str],
+                     keys: Sequence[str], *params) -> SyncReport:
+    """
+    Variante de sync_table où les lignes source ne quittent pas la base :
+    `select_sql` (colonnes dans l'ordre de `columns`) alimente directement la table de préparation
+    par INSERT ... SELECT, le différentiel est marqué par des UPDATE ensemblistes, puis appliqué
+    comme dans sync_table. Les attributs sont comparés colonne par colonne ; l'empreinte des
+    lignes écrites reste NULL (le mode pandas les considérera une fois comme modifiées).
+    Ne valide pas la transaction.
+    """
+    report = SyncReport(table)
+    columns = list(columns)
+    attributes = [col for col in columns if col not in keys]
+    stage = _create_stage(conn, table, columns)
+    try:
+        conn.execute(f"INSERT INTO {stage} ({_quoted(columns)}) {select_sql}", *params)
+
+        # Clés en double (ex: deux noms source conformés en une même équipe) : même règle que SilverSync.add,
+        # la dernière ligne produite par la requête est conservée
+        duplicates = conn.execute(
+            f"SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {stage} "
+            f"GROUP BY {_quoted(keys)} HAVING COUNT(*) > 1) AS d"
+        ).fetchone()[0]
+        if duplicates:
+            print(f"⚠️ {int(duplicates)} ligne(s) en double sur la clé {tuple(keys)} ignorée(s) (dernière conservée).")
+            row = f"[{STAGE_ROW_COLUMN}]" if conn.backend == 'sqlserver' else 'rowid'
+            conn.execute(f"DELETE FROM {stage} WHERE {row} NOT IN "
+                         f"(SELECT MAX({row}) FROM {stage} GROUP BY {_quoted(keys)})")
+
+        # --- Marquage du différentiel ---
+        join = ' AND '.join(f"t.[{key}] = s.[{key}]" for key in keys)
+        stage_join = ' AND '.join(f"t.[{key}] = {stage}.[{key}]" for key in keys)
+        conn.execute(f"UPDATE {stage} SET [{CHANGE_OP_COLUMN}] = 'I' "
+                     f"WHERE NOT EXISTS (SELECT 1 FROM {table} AS t WHERE {stage_join})")
+        if attributes:
+            conn.execute(f"UPDATE {stage} SET [{CHANGE_OP_COLUMN}] = 'U' WHERE EXISTS ("
+                         f"SELECT 1 FROM {table} AS t WHERE {stage_join} AND "
+                         f"({_differs(attributes, stage)}))")
+        conn.execute(
+            f"INSERT INTO {stage} ({_quoted(keys)}, [{CHANGE_OP_COLUMN}]) "
+            f"SELECT {', '.join(f't.[{key}]' for key in keys)}, 'D' FROM {table} AS t "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {stage} AS s WHERE {join})"
+        )
+
+        counts = dict(conn.execute(
+            f"SELECT COALESCE([{CHANGE_OP_COLUMN}], '-'), COUNT(*) FROM {stage} "
+            f"GROUP BY COALESCE([{CHANGE_OP_COLUMN}], '-')"
+        ).fetchall())
+        report.inserted, report.updated = counts.get('I', 0), counts.get('U', 0)
+        report.deleted, report.unchanged = counts.get('D', 0), counts.get('-', 0)
+
+        # --- Application ensembliste ---
+        if report.changed:
+            _apply_stage(conn, table, stage, columns, keys)
+    finally:
+        conn.execute(f"DROP TABLE IF EXISTS {stage}")
+
+    return report
@@ -0,0 +1,149 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from utils import config
+from utils.db import Connection
+
+try:
+    import psutil
+except ImportError:  # Optionnel : /proc/self/statm (Linux) ou getrusage servent de repli
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- 1. CONFIGURATION ---
+# Taille du premier lot lu, avant toute mesure de l'occupation mémoire réelle d'une ligne
+INITIAL_CHUNK_ROWS = 1000
+
+# Bornes de la taille des lots recalculée après chaque lot
+MIN_CHUNK_ROWS = 100
+MAX_CHUNK_ROWS = 200_000
+
+# Un lot occupe plusieurs fois sa taille pendant la transformation (colonnes dérivées, décodage à l'écriture)
+WORKING_SET_FACTOR = 4
+
+# Intervalle d'échantillonnage de la mémoire résidente
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+
+# --- 2. MÉMOIRE RÉSIDENTE DU PROCESSUS ---
+
+def current_rss() -> Optional[int]:
+    """Mémoire résidente du processus en octets (None si elle ne peut pas être mesurée)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # Repli : pic depuis le démarrage du processus (Ko sous Linux)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+class MemoryTracker:
+    """Échantillonne la mémoire résidente dans un thread et retient le pic atteint."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.baseline = None
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None:
+            self.peak = rss if self.peak is None else max(self.peak, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.baseline = current_rss()
+        self.peak = self.baseline
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        return self
+
+    @property
+    def growth(self) -> Optional[int]:
+        """Augmentation de la mémoire résidente pendant l'étape (pic - niveau de départ)."""
+        if self.peak is None or self.baseline is None:
+            return None
+        return self.peak - self.baseline
+
+
+@contextmanager
+def track_memory(stage: str, budget_mb: Optional[float] = None):
+    """
+    Mesure le pic de mémoire résidente d'une étape et signale un dépassement du budget
+    (croissance au-delà du niveau de départ, le processus Python lui-même n'est pas compté).
+    """
+    budget_mb = config.MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    tracker = MemoryTracker().start()
+    try:
+        yield tracker
+    finally:
+        tracker.stop()
+        if tracker.growth is not None and tracker.growth > budget_mb * 1024 * 1024:
+            print(f"⚠️ {stage} : pic mémoire de {format_mb(tracker.peak)} "
+                  f"(+{format_mb(tracker.growth)}), au-delà du budget de {budget_mb:g} Mo.")
+
+
+def format_mb(size: Optional[int]) -> str:
+    return 'n/d' if size is None else f"{size / (1024 * 1024):.0f} Mo"
+
+
+# --- 3. LECTURE PAR LOTS ---
+
+def next_chunk_rows(chunk: pd.DataFrame, budget_mb: float) -> int:
+    """Taille du lot suivant : occupation réelle d'une ligne mesurée sur le lot lu, rapportée au budget."""
+    if chunk.empty:
+        return INITIAL_CHUNK_ROWS
+    bytes_per_row = max(chunk.memory_usage(deep=True, index=False).sum() / len(chunk), 1)
+    rows = int(budget_mb * 1024 * 1024 / (bytes_per_row * WORKING_SET_FACTOR))
+    return max(MIN_CHUNK_ROWS, min(MAX_CHUNK_ROWS, rows))
+
+
+def read_sql_chunks(conn: Connection, sql: str, *params,
+                    budget_mb: Optional[float] = None) -> Iterator[pd.DataFrame]:
+    """
+    Équivalent de pd.read_sql(sql, conn, chunksize=...) dont la taille de lot s'adapte au budget mémoire :
+    le premier lot est mesuré, les suivants sont dimensionnés pour que leur transformation tienne dans
+    `budget_mb` (par défaut config.MEMORY_BUDGET_MB). La lecture passe par un curseur dédié
+    (Connection.read_cursor) : la connexion peut écrire entre deux lots.
+    """
+    budget_mb = config.MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    cursor = conn.read_cursor()
+    try:
+        cursor.execute(sql, *params)
+        columns = [col[0] for col in cursor.description]
+        chunk_rows = INITIAL_CHUNK_ROWS
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            chunk = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+            del rows
+            chunk_rows = next_chunk_rows(chunk, budget_mb)
+            yield chunk
+    finally:
+        cursor.close()
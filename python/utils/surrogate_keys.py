@@ -0,0 +1,123 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.categorical import to_records
+from utils.db import Connection, bulk_insert
+
+# --- 1. CONFIGURATION ---
+# Clé de substitution d'une clé métier absente de la dimension
+MISSING_SK = -1
+
+
+# --- 2. CORRESPONDANCE CLÉ MÉTIER -> CLÉ DE SUBSTITUTION ---
+
+class KeyMap:
+    """
+    Clés métier d'une dimension indexées par hachage (pd.Index / pd.MultiIndex) et tableau des clés
+    de substitution aligné : la résolution d'une colonne de fait entière est un seul get_indexer,
+    sans requête ni boucle par ligne. Les valeurs manquantes d'une clé composée sont comparables (NaN = NaN).
+    """
+
+    def __init__(self, dimension: str, sk_column: str, bk_columns: Sequence[str], frame: pd.DataFrame):
+        self.dimension = dimension
+        self.sk_column = sk_column
+        self.bk_columns = list(bk_columns)
+        self.index = self._index(frame, self.bk_columns)
+        self.sks = frame[sk_column].to_numpy(dtype=np.int64)
+
+    @staticmethod
+    def _index(frame: pd.DataFrame, columns: List[str]) -> pd.Index:
+        if len(columns) == 1:
+            return pd.Index(frame[columns[0]].astype(object))
+        return pd.MultiIndex.from_frame(frame[columns].astype(object))
+
+    @classmethod
+    def from_table(cls, conn: Connection, table: str, sk_column: str, bk_columns: Sequence[str]) -> 'KeyMap':
+        """Relit la dimension chargée (une requête) : les clés de substitution sont attribuées par le moteur."""
+        columns = [sk_column] + list(bk_columns)
+        frame = pd.DataFrame.from_records(
+            conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall(), columns=columns)
+        return cls(table, sk_column, bk_columns, frame)
+
+    def __len__(self) -> int:
+        return len(self.sks)
+
+    def lookup(self, df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+        """Clés de substitution des lignes de `df` (colonnes métier `columns`, dans l'ordre des clés) ; MISSING_SK si absente."""
+        positions = self.index.get_indexer(self._index(df, list(columns)))
+        return np.where(positions >= 0, self.sks[positions], MISSING_SK)
+
+    def as_dict(self) -> Dict:
+        return dict(zip(self.index, self.sks.tolist()))
+
+    def business_keys(self) -> Dict[int, object]:
+        """Correspondance inverse clé de substitution -> clé métier (libellés des rapports)."""
+        return dict(zip(self.sks.tolist(), self.index))
+
+
+# --- 3. CHARGEMENT INCRÉMENTAL DES DIMENSIONS ---
+
+class DimensionReport:
+    """Membres ajoutés / mis à jour (type 1) / inchangés lors de la fusion d'une dimension."""
+
+    def __init__(self, table: str):
+        self.table = table
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    def __str__(self):
+        return (f"{self.table} : {self.inserted} membre(s) ajouté(s), {self.updated} mis à jour, "
+                f"{self.unchanged} inchangé(s).")
+
+
+def _comparable(series: pd.Series) -> pd.Series:
+    """Texte commun d'un attribut, qu'il vienne du DataFrame source ou de la table (entiers relus en réels, NULL)."""
+    values = series.astype(object)
+    try:
+        return pd.to_numeric(values).astype('Float64').astype('string').fillna('')
+    except (ValueError, TypeError):
+        return values.astype('string').fillna('')
+
+
+def merge_dimension(conn: Connection, table: str, sk_column: str, bk_columns: Sequence[str],
+                    attributes: Sequence[str], members: pd.DataFrame):
+    """
+    Fusionne les membres dans la dimension sans jamais réattribuer une clé de substitution :
+    les nouvelles clés métier sont insérées (clé attribuée par le moteur, ou clé intelligente
+    fournie comme clé métier : Date_SK AAAAMMJJ de DimDate), les attributs des membres
+    existants sont écrasés s'ils ont changé (type 1), les membres absents de la source sont conservés
+    (des partitions de faits plus anciennes peuvent les référencer).
+    Retourne (KeyMap, DimensionReport) ; ne valide pas la transaction.
+    """
+    bk_columns, attributes = list(bk_columns), list(attributes)
+    columns = list(dict.fromkeys([sk_column] + bk_columns + attributes))
+    current = pd.DataFrame.from_records(
+        conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall(), columns=columns)
+    key_map = KeyMap(table, sk_column, bk_columns, current)
+    report = DimensionReport(table)
+
+    positions = key_map.index.get_indexer(KeyMap._index(members, bk_columns))
+    new_members = members[positions < 0]
+    if len(new_members):
+        report.inserted = bulk_insert(conn, table, bk_columns + attributes, new_members)
+
+    existing = members[positions >= 0]
+    if attributes and len(existing):
+        stored = current.iloc[positions[positions >= 0]]
+        differs = np.zeros(len(existing), dtype=bool)
+        for col in attributes:
+            differs |= (_comparable(existing[col]).to_numpy() != _comparable(stored[col]).to_numpy())
+        if differs.any():
+            changed = existing[differs].assign(**{sk_column: stored[sk_column].to_numpy()[differs]})
+            assignments = ', '.join(f'[{col}] = ?' for col in attributes)
+            conn.prepare(f"UPDATE {table} SET {assignments} WHERE [{sk_column}] = ?").executemany(
+                to_records(changed, attributes + [sk_column]))
+            report.updated = int(differs.sum())
+    report.unchanged = len(members) - report.inserted - report.updated
+
+    if report.inserted:
+        key_map = KeyMap.from_table(conn, table, sk_column, bk_columns)
+    return key_map, report
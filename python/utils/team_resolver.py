@@ -0,0 +1,210 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from utils.db import Connection
+from utils.reference_cache import bump_version, get_mapping
+
+# --- 1. CONFIGURATION ---
+MAPPING_TABLE = 'silver.Team_Mapping'
+
+# Score minimal d'une correspondance acceptée, et écart minimal avec la meilleure équipe concurrente
+# (ex: 'Manchester' est aussi proche de City que de United : rejeté)
+ACCEPT_SCORE = 0.75
+MIN_MARGIN = 0.15
+
+# Rejet sous ce score : aucun candidat plausible, seul le nombre de noms concernés est rapporté
+REPORT_MIN_SCORE = 0.3
+
+# Taille des n-grammes de caractères
+NGRAM_SIZE = 3
+
+# Mots sans valeur discriminante dans un nom de club
+STOP_TOKENS = {'fc', 'afc', 'cf', 'the', 'and', 'club'}
+
+# Abréviations courantes des sources (football-data, FBref)
+TOKEN_ALIASES = {
+    'utd': 'united', 'man': 'manchester', 'nottm': 'nottingham', 'notth': 'nottingham',
+    'nottham': 'nottingham', 'brom': 'bromwich', 'qpr': 'queens park rangers',
+}
+
+# Origine d'une ligne de silver.Team_Mapping
+SOURCE_EXPLICIT = 'explicit'
+SOURCE_FUZZY = 'fuzzy'
+
+
+# --- 2. NORMALISATION ---
+
+def normalize_name(name: str) -> str:
+    """'Nott'm Forest' -> 'nottingham forest', 'Brighton & Hove Albion FC' -> 'brighton hove albion'."""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r"['’]", '', text)
+    tokens = re.findall(r'[a-z0-9]+', text)
+    tokens = ' '.join(TOKEN_ALIASES.get(token, token) for token in tokens).split()
+    return ' '.join(token for token in tokens if token not in STOP_TOKENS)
+
+
+def ngrams(normalized: str, size: int = NGRAM_SIZE) -> Set[str]:
+    padded = f" {normalized} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+# --- 3. RÉSOLUTION ---
+
+class Resolution:
+    """Résultat de la résolution d'un nom source."""
+
+    def __init__(self, source_name: str, standard_name: Optional[str], score: float,
+                 runner_up: Optional[str] = None, accepted: bool = False, known: bool = False):
+        self.source_name = source_name
+        self.persisted = known
+        self.standard_name = standard_name
+        self.score = score
+        self.runner_up = runner_up
+        self.accepted = accepted
+        self.known = known
+
+    def __str__(self):
+        if self.standard_name is None:
+            return f"'{self.source_name}' : aucun candidat"
+        verdict = 'acceptée' if self.accepted else 'rejetée'
+        runner_up = f", concurrent : '{self.runner_up}'" if self.runner_up else ''
+        return f"'{self.source_name}' -> '{self.standard_name}' (score {self.score:.2f}{runner_up}) : {verdict}"
+
+
+class TeamResolver:
+    """
+    Résout les noms d'équipe absents du mapping vers un nom standard.
+    Index construit une fois sur les noms standard et tous les alias connus :
+    jetons normalisés et n-grammes de caractères -> alias candidats.
+    Score d'un candidat : moyenne du coefficient de Dice sur les n-grammes et de la part
+    des jetons du nom source présents dans l'alias. Chaque nom distinct n'est résolu qu'une fois.
+    """
+
+    def __init__(self, mapping: Dict[str, str], accept_score: float = ACCEPT_SCORE, min_margin: float = MIN_MARGIN):
+        self.mapping = dict(mapping)
+        self.accept_score = accept_score
+        self.min_margin = min_margin
+        self._resolutions: Dict[str, Resolution] = {}
+
+        # Alias indexés : noms sources connus + noms standard eux-mêmes
+        aliases = dict(self.mapping)
+        aliases.update({standard: standard for standard in set(self.mapping.values())})
+        self._alias_names: List[str] = []
+        self._alias_standard: List[str] = []
+        self._alias_grams: List[Set[str]] = []
+        self._alias_tokens: List[Set[str]] = []
+        self._by_normalized: Dict[str, str] = {}
+        self._gram_index: Dict[str, List[int]] = defaultdict(list)
+        self._token_index: Dict[str, List[int]] = defaultdict(list)
+        for alias, standard in aliases.items():
+            normalized = normalize_name(alias)
+            alias_id = len(self._alias_names)
+            self._alias_names.append(alias)
+            self._alias_standard.append(standard)
+            self._alias_grams.append(ngrams(normalized))
+            self._alias_tokens.append(set(normalized.split()))
+            self._by_normalized.setdefault(normalized, standard)
+            for gram in self._alias_grams[-1]:
+                self._gram_index[gram].append(alias_id)
+            for token in self._alias_tokens[-1]:
+                self._token_index[token].append(alias_id)
+
+    @classmethod
+    def from_reference(cls, conn: Connection, **thresholds) -> 'TeamResolver':
+        """Résolveur construit sur le mapping des équipes du cache de référence (utils.reference_cache)."""
+        return cls(get_mapping(conn, 'team').as_dict(), **thresholds)
+
+    def _score_candidates(self, name: str) -> Dict[str, float]:
+        """Meilleur score par nom standard parmi les alias partageant au moins un n-gramme ou un jeton."""
+        normalized = normalize_name(name)
+        grams, tokens = ngrams(normalized), set(normalized.split())
+        candidates = {alias_id for gram in grams for alias_id in self._gram_index.get(gram, ())}
+        candidates.update(alias_id for token in tokens for alias_id in self._token_index.get(token, ()))
+
+        scores: Dict[str, float] = {}
+        for alias_id in candidates:
+            alias_grams = self._alias_grams[alias_id]
+            dice = 2 * len(grams & alias_grams) / (len(grams) + len(alias_grams))
+            containment = len(tokens & self._alias_tokens[alias_id]) / len(tokens) if tokens else 0.0
+            score = (dice + containment) / 2
+            standard = self._alias_standard[alias_id]
+            scores[standard] = max(scores.get(standard, 0.0), score)
+        return scores
+
+    def resolve_one(self, name: str) -> Resolution:
+        if name in self._resolutions:
+            return self._resolutions[name]
+
+        if name in self.mapping:
+            resolution = Resolution(name, self.mapping[name], 1.0, accepted=True, known=True)
+        elif normalize_name(name) in self._by_normalized:
+            resolution = Resolution(name, self._by_normalized[normalize_name(name)], 1.0, accepted=True)
+        else:
+            ranked = sorted(self._score_candidates(name).items(), key=lambda item: -item[1])
+            if not ranked:
+                resolution = Resolution(name, None, 0.0)
+            else:
+                (best, best_score), runner_up = ranked[0], (ranked[1] if len(ranked) > 1 else (None, 0.0))
+                accepted = best_score >= self.accept_score and best_score - runner_up[1] >= self.min_margin
+                resolution = Resolution(name, best, best_score, runner_up=runner_up[0], accepted=accepted)
+
+        self._resolutions[name] = resolution
+        return resolution
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Resolution]:
+        """Résolution par lot des noms distincts (les valeurs manquantes sont ignorées)."""
+        return {name: self.resolve_one(name) for name in set(names) if isinstance(name, str) and name}
+
+    def standard_name(self, name: str) -> Optional[str]:
+        """Nom standard accepté, ou None (la valeur source est alors conservée par map_categorical)."""
+        if not isinstance(name, str) or not name:
+            return None
+        resolution = self.resolve_one(name)
+        return resolution.standard_name if resolution.accepted else None
+
+    def new_matches(self) -> List[Resolution]:
+        """Correspondances acceptées pendant l'exécution et pas encore enregistrées."""
+        return [r for r in self._resolutions.values() if r.accepted and not r.persisted]
+
+    def report(self):
+        unmatched = 0
+        for resolution in self._resolutions.values():
+            if resolution.known:
+                continue
+            if not resolution.accepted and resolution.score < REPORT_MIN_SCORE:
+                unmatched += 1
+                continue
+            print(f"{'✅' if resolution.accepted else '⚠️'} Équipe non mappée {resolution}")
+        if unmatched:
+            print(f"⚠️ {unmatched} équipe(s) non mappée(s) sans candidat plausible (score < {REPORT_MIN_SCORE}) : "
+                  f"nom source conservé.")
+
+    def persist(self, conn: Connection, mapping_table: str = MAPPING_TABLE) -> int:
+        """
+        Enregistre les correspondances acceptées dans silver.Team_Mapping et change la version du mapping
+        (ne valide pas la transaction).
+        """
+        matches = self.new_matches()
+        if matches:
+            conn.prepare(
+                f"INSERT INTO {mapping_table} (Team_Source_Name, Team_Standard_Name, Match_Source, Match_Score) "
+                f"VALUES (?, ?, ?, ?)"
+            ).executemany([(m.source_name, m.standard_name, SOURCE_FUZZY, round(m.score, 3)) for m in matches])
+            bump_version(conn, 'team', inserted=len(matches))
+            for match in matches:
+                self.mapping[match.source_name] = match.standard_name
+                match.persisted = True
+        return len(matches)
+
+
+def resolve_source_names(conn: Connection, source_sql: str, mapping_table: str = MAPPING_TABLE) -> TeamResolver:
+    """
+    Mode pushdown : les noms distincts de la source (`source_sql`, une colonne) sont résolus par lot
+    et les correspondances acceptées enregistrées avant la jointure sur silver.Team_Mapping.
+    """
+    resolver = TeamResolver.from_reference(conn)
+    resolver.resolve(row[0] for row in conn.execute(source_sql).fetchall())
+    resolver.persist(conn, mapping_table)
+    return resolver
@@ -0,0 +1,122 @@
+import re
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# --- 1. CONFIGURATION ---
+# Formats de date rencontrés dans les sources, essayés dans cet ordre
+# (football-data : JJ/MM/AAAA puis JJ/MM/AA selon la saison ; bronze déjà nettoyé : AAAA-MM-JJ)
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d')
+
+# Mois de bascule d'une saison à la suivante (août : 2015-08-08 -> 2015/16, 2016-04-02 -> 2015/16)
+SEASON_CUTOVER_MONTH = 8
+
+# Valeur retournée quand le nom de fichier ne contient pas de saison
+UNKNOWN_SEASON = 'Unknown/Season'
+
+# Motifs de saison dans les noms de fichiers sources (groupes : année de début, année de fin)
+SEASON_FILENAME_PATTERNS = (
+    re.compile(r'^(\d{4})-(\d{4})_'),         # '2014-2015_player_info.json' (Transfermarkt)
+    re.compile(r'_(\d{2})_(\d{2})\.json$'),   # 'epl_league_table_overall_14_15.json' (FBref)
+    re.compile(r'^(\d{2})-(\d{2})\.csv$'),    # '14-15.csv' (football-data)
+)
+
+
+# --- 2. DATES MULTI-FORMATS ---
+
+def _parse_formats(text: pd.Series, formats: Sequence[str]) -> Tuple[pd.Series, np.ndarray]:
+    """Dates converties et, pour chaque valeur, l'indice du format reconnu (-1 : aucun)."""
+    parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    matched_format = np.full(len(text), -1)
+    for position, date_format in enumerate(formats):
+        pending = parsed.isna() & text.notna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(text[pending], format=date_format, errors='coerce')
+        matched_format[(pending & parsed.notna()).to_numpy()] = position
+    return parsed, matched_format
+
+
+def parse_dates(values: pd.Series, formats: Sequence[str] = DATE_FORMATS) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Convertit une colonne de dates texte en datetime64, un passage vectorisé par format :
+    chaque format n'est essayé que sur les valeurs que les formats précédents n'ont pas reconnues.
+    Une colonne catégorielle n'est convertie qu'une fois par valeur distincte.
+    Retourne (dates, nombre de lignes reconnues par format + 'invalid').
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Conversion des catégories, puis retour aux lignes par les codes
+        categories = pd.Series(values.cat.categories, dtype='string').str.strip()
+        parsed_categories, category_format = _parse_formats(categories, formats)
+        codes = values.cat.codes.to_numpy()
+        dates = np.append(parsed_categories.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT'))[codes]
+        parsed = pd.Series(dates, index=values.index, name=values.name)
+        matched_format = np.append(category_format, -2)[codes]   # -2 : valeur source manquante
+    else:
+        text = values.astype('string').str.strip()
+        parsed, matched_format = _parse_formats(text.reset_index(drop=True), formats)
+        parsed.index, parsed.name = values.index, values.name
+        matched_format[text.isna().to_numpy()] = -2
+
+    hits = {date_format: int((matched_format == position).sum()) for position, date_format in enumerate(formats)}
+    hits['invalid'] = int((matched_format == -1).sum())
+    return parsed, hits
+
+
+def format_hits(hits: Dict[str, int]) -> str:
+    """Résumé lisible des formats reconnus (ex: '%d/%m/%Y: 3420, %d/%m/%y: 760, invalid: 0')."""
+    return ', '.join(f"{fmt}: {count}" for fmt, count in hits.items() if count or fmt == 'invalid')
+
+
+# --- 3. SAISONS ---
+
+def derive_season(dates: pd.Series, cutover_month: int = SEASON_CUTOVER_MONTH) -> pd.Series:
+    """
+    Saison 'AAAA/AA' de chaque date, en une opération sur tableaux :
+    une date antérieure au mois de bascule appartient à la saison commencée l'année précédente.
+    Le résultat est catégoriel (une étiquette par saison distincte) ; NaT -> valeur manquante.
+    """
+    dates = pd.to_datetime(dates)
+    valid = dates.notna().to_numpy()
+    start_years = (dates.dt.year - (dates.dt.month < cutover_month)).to_numpy(dtype='float64')
+
+    if not valid.any():
+        return pd.Series(pd.Categorical([None] * len(dates)), index=dates.index, dtype='category')
+
+    first, last = int(np.nanmin(start_years)), int(np.nanmax(start_years))
+    labels = [f'{year}/{(year + 1) % 100:02d}' for year in range(first, last + 1)]
+    codes = np.where(valid, np.nan_to_num(start_years, nan=first) - first, -1).astype(int)
+    seasons = pd.Categorical.from_codes(codes, categories=labels).remove_unused_categories()
+    return pd.Series(seasons, index=dates.index)
+
+
+def season_sql(dialect, date_expr: str, cutover_month: int = SEASON_CUTOVER_MONTH) -> str:
+    """
+    Expression SQL équivalente à derive_season, calculée par le moteur (`dialect` : utils.db.Dialect) :
+    année de début de saison, puis étiquette 'AAAA/AA' (fin de saison sur deux chiffres, complétée d'un zéro).
+    """
+    start_year = (f"({dialect.date_part_sql('year', date_expr)} - CASE WHEN "
+                  f"{dialect.date_part_sql('month', date_expr)} < {cutover_month} THEN 1 ELSE 0 END)")
+    end_year = f"(({start_year} + 1) % 100)"
+    return dialect.concat_sql(
+        f"CAST({start_year} AS VARCHAR(4))", "'/'",
+        f"CASE WHEN {end_year} < 10 THEN '0' ELSE '' END", f"CAST({end_year} AS VARCHAR(2))",
+    )
+
+
+@lru_cache(maxsize=None)
+def season_from_filename(filename: str) -> str:
+    """
+    Saison 'AAAA/AA' extraite du nom d'un fichier source, quel que soit son fournisseur
+    (ex: '2014-2015_player_info.json', '..._14_15.json', '14-15.csv' -> '2014/15').
+    """
+    for pattern in SEASON_FILENAME_PATTERNS:
+        match = pattern.search(filename)
+        if match:
+            start_year, end_year = match.groups()
+            # Années sur deux chiffres : on suppose 20xx
+            start_year = start_year if len(start_year) == 4 else f"20{start_year}"
+            return f"{start_year}/{end_year[-2:]}"
+    return UNKNOWN_SEASON
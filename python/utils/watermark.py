@@ -0,0 +1,101 @@
+import hashlib
+from typing import Dict, List, Optional, Sequence
+
+from utils import config
+from utils.db import Connection
+from utils.manifest import MANIFEST_TABLE
+from utils.reference_cache import read_versions
+
+# --- 1. CONFIGURATION ---
+WATERMARK_TABLE = 'silver.Stage_Watermark'
+INPUT_TABLE = 'silver.Stage_Input'
+
+# Préfixe des entrées de mapping dans silver.Stage_Input (les autres entrées sont des fichiers bronze)
+MAPPING_INPUT_PREFIX = 'mapping:'
+
+
+# --- 2. EMPREINTE DES ENTRÉES D'UNE ÉTAPE ---
+
+def input_token(conn: Connection, mappings: Sequence[str], bronze_tables: Sequence[str]) -> Optional[str]:
+    """
+    SHA-256 des entrées d'une étape : version de chaque mapping lu et empreinte de chaque fichier
+    chargé dans les tables bronze lues (bronze.load_manifest).
+    None si une entrée n'est pas versionnée (mapping jamais chargé, table bronze sans manifeste) :
+    l'étape est alors toujours reconstruite, avec un avertissement.
+    """
+    versions = read_versions(conn)
+    parts = []
+    for name in mappings:
+        if versions.get(name) is None:
+            print(f"⚠️ Mapping '{name}' non versionné : filigrane désactivé, l'étape est reconstruite.")
+            return None
+        parts.append(f"mapping:{name}={versions[name]}")
+    for table in bronze_tables:
+        files = conn.execute(
+            f"SELECT Source_File, File_Hash FROM {MANIFEST_TABLE} WHERE Target_Table = ? ORDER BY Source_File", table
+        ).fetchall()
+        if not files:
+            print(f"⚠️ {table} absente de {MANIFEST_TABLE} : filigrane désactivé, l'étape est reconstruite.")
+            return None
+        parts.extend(f"bronze:{table}:{source_file}={file_hash.strip()}" for source_file, file_hash in files)
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+# --- 3. FILIGRANE DES ÉTAPES ---
+
+def is_up_to_date(conn: Connection, stage: str, token: Optional[str]) -> bool:
+    """Vrai si l'étape a déjà été chargée avec exactement ces entrées (jamais si FORCE_REBUILD)."""
+    if token is None or config.FORCE_REBUILD:
+        return False
+    row = conn.execute(f"SELECT Input_Token FROM {WATERMARK_TABLE} WHERE Stage_Name = ?", stage).fetchone()
+    return row is not None and row[0].strip() == token
+
+
+def record_watermark(conn: Connection, stage: str, token: Optional[str]):
+    """Enregistre les entrées du chargement (dans sa transaction) ; None efface le filigrane."""
+    conn.execute(f"DELETE FROM {WATERMARK_TABLE} WHERE Stage_Name = ?", stage)
+    if token is not None:
+        conn.execute(
+            f"INSERT INTO {WATERMARK_TABLE} (Stage_Name, Input_Token, Updated_At) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            stage, token
+        )
+
+
+# --- 4. ENTRÉES DÉTAILLÉES (RECONSTRUCTION PAR PARTITION) ---
+
+def stage_inputs(conn: Connection, mappings: Sequence[str], bronze_table: str) -> Dict[str, str]:
+    """Entrées actuelles d'une étape : 'mapping:<nom>' -> version, fichier de `bronze_table` -> empreinte."""
+    versions = read_versions(conn)
+    inputs = {f"{MAPPING_INPUT_PREFIX}{name}": versions.get(name) or '' for name in mappings}
+    inputs.update((source_file, file_hash.strip()) for source_file, file_hash in conn.execute(
+        f"SELECT Source_File, File_Hash FROM {MANIFEST_TABLE} WHERE Target_Table = ?", bronze_table).fetchall())
+    return inputs
+
+
+def changed_sources(conn: Connection, stage: str, mappings: Sequence[str], bronze_table: str) -> Optional[List[str]]:
+    """
+    Fichiers de `bronze_table` nouveaux ou modifiés depuis le dernier chargement de l'étape.
+    None si l'étape doit être reconstruite entièrement : premier chargement, mapping modifié ou non versionné,
+    fichier retiré du manifeste, ou FORCE_REBUILD.
+    """
+    if config.FORCE_REBUILD:
+        return None
+    recorded = {name: version.strip() for name, version in conn.execute(
+        f"SELECT Input_Name, Input_Version FROM {INPUT_TABLE} WHERE Stage_Name = ?", stage).fetchall()}
+    if not recorded:
+        return None
+    current = stage_inputs(conn, mappings, bronze_table)
+    if set(recorded) - set(current):
+        return None
+    for name, version in current.items():
+        if name.startswith(MAPPING_INPUT_PREFIX) and (not version or recorded.get(name) != version):
+            return None
+    return sorted(name for name, version in current.items()
+                  if not name.startswith(MAPPING_INPUT_PREFIX) and recorded.get(name) != version)
+
+
+def record_sources(conn: Connection, stage: str, mappings: Sequence[str], bronze_table: str):
+    """Enregistre les entrées détaillées du chargement (dans sa transaction)."""
+    conn.execute(f"DELETE FROM {INPUT_TABLE} WHERE Stage_Name = ?", stage)
+    conn.prepare(f"INSERT INTO {INPUT_TABLE} (Stage_Name, Input_Name, Input_Version) VALUES (?, ?, ?)").executemany(
+        [(stage, name, version) for name, version in stage_inputs(conn, mappings, bronze_table).items()])
@@ -5,6 +5,7 @@ IF OBJECT_ID('bronze.staging_league_table_away','U') IS NOT NULL DROP TABLE bron
 IF OBJECT_ID('bronze.staging_league_table_overall','U') IS NOT NULL DROP TABLE bronze.staging_league_table_overall;
 IF OBJECT_ID('bronze.staging_player_stats','U') IS NOT NULL DROP TABLE bronze.staging_player_stats;
 IF OBJECT_ID('bronze.staging_squad_stats','U') IS NOT NULL DROP TABLE bronze.staging_squad_stats;
+IF OBJECT_ID('bronze.load_manifest','U') IS NOT NULL DROP TABLE bronze.load_manifest;
 GO
 
 CREATE TABLE bronze.staging_epl_matchs(
@@ -38,7 +39,19 @@ CREATE TABLE bronze.staging_epl_matchs(
     [AR] FLOAT NULL, 
     [B365H] FLOAT NULL,
     [B365D] FLOAT NULL, 
-    [B365A] FLOAT NULL
+    [B365A] FLOAT NULL,
+
+    [Source_File] VARCHAR(100) NULL   -- fichier CSV d'origine (rechargement par fichier)
+);
+
+-- Fichiers déjà chargés : un fichier dont l'empreinte n'a pas changé n'est pas relu
+CREATE TABLE bronze.load_manifest (
+    Target_Table    VARCHAR(100) NOT NULL,
+    Source_File     VARCHAR(100) NOT NULL,
+    File_Hash       CHAR(64) NOT NULL,      -- SHA-256 du contenu
+    Row_Count       INT NOT NULL,
+    Loaded_At       DATETIME2 NOT NULL,
+    PRIMARY KEY (Target_Table, Source_File)
 );
 
 
@@ -98,7 +111,8 @@ CREATE TABLE bronze.staging_player_stats (
     Gls_1               DECIMAL(5,2),
     Ast_1               DECIMAL(5,2),
     market_value_euro_k INT,
-    market_value_last_update DATE
+    market_value_last_update DATE,
+    Source_File         VARCHAR(100) NULL   -- fichier JSON d'origine (rechargement par fichier)
 );
 GO
 
@@ -114,7 +128,8 @@ CREATE TABLE bronze.staging_league_table_home (
     GA              INT,
     GD              VARCHAR(10),   -- ex: "+14"
     Pts             INT,
-    Pts_per_MP      DECIMAL(4,2)
+    Pts_per_MP      DECIMAL(4,2),
+    Source_File     VARCHAR(100) NULL   -- fichier JSON d'origine (rechargement par fichier)
 );
 
 CREATE TABLE bronze.staging_league_table_away (
@@ -129,7 +144,8 @@ CREATE TABLE bronze.staging_league_table_away (
     GA              INT,
     GD              VARCHAR(10),
     Pts             INT,
-    Pts_per_MP      DECIMAL(4,2)
+    Pts_per_MP      DECIMAL(4,2),
+    Source_File     VARCHAR(100) NULL   -- fichier JSON d'origine (rechargement par fichier)
 );
 
 CREATE TABLE bronze.staging_league_table_overall (
@@ -149,7 +165,8 @@ CREATE TABLE bronze.staging_league_table_overall (
     Attendance          INT,             -- cleaned
     Top_Team_Scorer     VARCHAR(100),
     Goalkeeper          VARCHAR(100),
-    Notes               VARCHAR(500)
+    Notes               VARCHAR(500),
+    Source_File         VARCHAR(100) NULL   -- fichier JSON d'origine (rechargement par fichier)
 );
 
 CREATE TABLE bronze.staging_squad_stats (
@@ -179,7 +196,8 @@ CREATE TABLE bronze.staging_squad_stats (
     Ast_per_90      DECIMAL(5,2),
     GA_per_90       DECIMAL(5,2),
     G_minus_PK_90   DECIMAL(5,2),
-    GA_minus_PK     DECIMAL(5,2)
+    GA_minus_PK     DECIMAL(5,2),
+    Source_File     VARCHAR(100) NULL   -- fichier JSON d'origine (rechargement par fichier)
 );
 
 
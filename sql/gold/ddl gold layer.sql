@@ -1,194 +1,286 @@
--- ***************************************************************** --
--- 1. DDL DES DIMENSIONS (DIMs)
--- ***************************************************************** --
-IF OBJECT_ID('gold.DimTime','U') IS NOT NULL DROP TABLE gold.DimTime;
-IF OBJECT_ID('gold.DimTeam','U') IS NOT NULL DROP TABLE gold.DimTeam;
-IF OBJECT_ID('gold.DimNation','U') IS NOT NULL DROP TABLE gold.DimNation;
-IF OBJECT_ID('gold.DimPlayer','U') IS NOT NULL DROP TABLE gold.DimPlayer;
-IF OBJECT_ID('gold.DimNotes','U') IS NOT NULL DROP TABLE gold.DimNotes;
-IF OBJECT_ID('gold.FactTeamPerformance','U') IS NOT NULL DROP TABLE gold.FactTeamPerformance;
-IF OBJECT_ID('gold.FactPlayerPerformance','U') IS NOT NULL DROP TABLE gold.FactPlayerPerformance;
+-- Généré par python/utils/gold_schema.py (disposition 'rowstore') : ne pas modifier à la main.
+-- python -m utils.gold_schema --layout <rowstore|indexed|columnstore> --output "sql/gold/ddl gold layer.sql"
+
+-- Les faits sont supprimés avant les dimensions qu'ils référencent (clés étrangères)
+IF OBJECT_ID('gold.Load_Version','U') IS NOT NULL DROP TABLE gold.Load_Version;
+IF OBJECT_ID('gold.Aggregate_State','U') IS NOT NULL DROP TABLE gold.Aggregate_State;
+IF OBJECT_ID('gold.Agg_Nation_Season','U') IS NOT NULL DROP TABLE gold.Agg_Nation_Season;
+IF OBJECT_ID('gold.Agg_Squad_Season','U') IS NOT NULL DROP TABLE gold.Agg_Squad_Season;
+IF OBJECT_ID('gold.Agg_Team_Season_Venue','U') IS NOT NULL DROP TABLE gold.Agg_Team_Season_Venue;
+IF OBJECT_ID('gold.Fact_Partition_State','U') IS NOT NULL DROP TABLE gold.Fact_Partition_State;
 IF OBJECT_ID('gold.FactMatchEvent','U') IS NOT NULL DROP TABLE gold.FactMatchEvent;
+IF OBJECT_ID('gold.FactPlayerPerformance','U') IS NOT NULL DROP TABLE gold.FactPlayerPerformance;
+IF OBJECT_ID('gold.FactTeamPerformance','U') IS NOT NULL DROP TABLE gold.FactTeamPerformance;
+IF OBJECT_ID('gold.DimNotes','U') IS NOT NULL DROP TABLE gold.DimNotes;
+IF OBJECT_ID('gold.DimPlayer','U') IS NOT NULL DROP TABLE gold.DimPlayer;
+IF OBJECT_ID('gold.DimNation','U') IS NOT NULL DROP TABLE gold.DimNation;
+IF OBJECT_ID('gold.DimTeam','U') IS NOT NULL DROP TABLE gold.DimTeam;
+IF OBJECT_ID('gold.DimDate','U') IS NOT NULL DROP TABLE gold.DimDate;
+IF OBJECT_ID('gold.DimTime','U') IS NOT NULL DROP TABLE gold.DimTime;
+IF EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = 'ps_Gold_Season') DROP PARTITION SCHEME ps_Gold_Season;
+IF EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_Gold_Season') DROP PARTITION FUNCTION pf_Gold_Season;
 GO
 
 -----------------------------------
--- 1.1. DimTime (Basé sur Season)
+-- DimTime (Basé sur Season)
 -----------------------------------
--- Source: silver.League_Table_Conformed, silver.Match_Odds_Conformed, etc.
+-- Source: silver.League_Table_Conformed, silver.Match_Reconciled, etc.
 CREATE TABLE gold.DimTime (
-    Time_SK             INT IDENTITY(1,1) PRIMARY KEY,
-    
-    Season_BK           VARCHAR(10) NOT NULL UNIQUE,  -- Clé métier (Ex: '2014/15')
-    Season_Start_Year   INT NOT NULL,                 -- 2014
-    Season_End_Year     INT NOT NULL                  -- 2015
+    Time_SK                 INT IDENTITY(1,1) PRIMARY KEY,
+    Season_BK               VARCHAR(10) NOT NULL,  -- Clé métier (Ex: '2014/15')
+    Season_Start_Year       INT NOT NULL,  -- 2014
+    Season_End_Year         INT NOT NULL,  -- 2015
+    UNIQUE (Season_BK)
 );
 GO
 
 -----------------------------------
--- 1.2. DimTeam (Basé sur Squad_Conformed)
+-- DimDate (Calendrier, granularité journalière)
+-----------------------------------
+-- Générée par utils.date_dimension (saisons de DimTime, journées de silver.Match_Reconciled)
+CREATE TABLE gold.DimDate (
+    Date_SK                 INT NOT NULL,  -- Clé AAAAMMJJ (Ex: 20140816), dans l'ordre des dates
+    Full_Date               DATE NOT NULL,
+    Time_SK                 INT NOT NULL REFERENCES gold.DimTime(Time_SK),  -- Saison (intersaison rattachée à la saison écoulée)
+    Matchweek               INT NULL,  -- Journée de championnat (dernière jouée les jours sans match)
+    Calendar_Year           INT NOT NULL,
+    Month_Number            INT NOT NULL,
+    Month_Name              VARCHAR(20) NOT NULL,  -- Ex: 'Août'
+    Year_Month              CHAR(7) NOT NULL,  -- Ex: '2014-08'
+    Day_Of_Month            INT NOT NULL,
+    Weekday_Number          INT NOT NULL,  -- 1 = lundi ... 7 = dimanche
+    Weekday_Name            VARCHAR(10) NOT NULL,  -- Ex: 'Samedi'
+    UNIQUE (Full_Date),
+    CONSTRAINT PK_DimDate PRIMARY KEY (Date_SK)
+);
+GO
+
+-----------------------------------
+-- DimTeam (Basé sur Squad_Conformed)
 -----------------------------------
 -- Source: silver.Team_Mapping
 CREATE TABLE gold.DimTeam (
-    Team_SK             INT IDENTITY(1,1) PRIMARY KEY,
-    
-    Squad_Conformed_BK  VARCHAR(100) NOT NULL UNIQUE -- Clé métier (Ex: 'Manchester City')
+    Team_SK                 INT IDENTITY(1,1) PRIMARY KEY,
+    Squad_Conformed_BK      VARCHAR(100) NOT NULL,  -- Clé métier (Ex: 'Manchester City')
+    UNIQUE (Squad_Conformed_BK)
 );
 GO
 
 -----------------------------------
--- 1.3. DimNation
+-- DimNation
 -----------------------------------
 -- Source: silver.Nation_Mapping
 CREATE TABLE gold.DimNation (
-    Nation_SK           INT IDENTITY(1,1) PRIMARY KEY,
-    
-    Nation_Standard_Name_BK VARCHAR(100) NOT NULL UNIQUE
+    Nation_SK               INT IDENTITY(1,1) PRIMARY KEY,
+    Nation_Standard_Name_BK VARCHAR(100) NOT NULL,
+    UNIQUE (Nation_Standard_Name_BK)
 );
 GO
 
 -----------------------------------
--- 1.4. DimPlayer (Basé sur Player_Name et BirthYear)
+-- DimPlayer (Basé sur Player_Name et BirthYear)
 -----------------------------------
--- Source: silver.Player_Stats_Conformed
+-- Source: silver.Player_Stats_Conformed, silver.Player_Identity
 CREATE TABLE gold.DimPlayer (
-    Player_SK           INT IDENTITY(1,1) PRIMARY KEY,
-    
-    Player_Name_BK      VARCHAR(100) NOT NULL,          -- Clé métier (Nom du joueur)
-    BirthYear           INT NULL,
-    
-    -- Attributs statiques/semi-statiques
-    Current_Position    VARCHAR(10) NULL,
-    Nation_SK           INT NULL REFERENCES gold.DimNation(Nation_SK), -- FK vers Nation
-    
-    -- Clé naturelle composée unique (pour gestion SCD Type 1)
+    Player_SK               INT IDENTITY(1,1) PRIMARY KEY,
+    Player_Name_BK          VARCHAR(100) NOT NULL,  -- Clé métier (Nom du joueur)
+    BirthYear               INT NULL,
+    Current_Position        VARCHAR(10) NULL,  -- Attribut semi-statique (SCD Type 1)
+    Nation_SK               INT NULL REFERENCES gold.DimNation(Nation_SK),  -- FK vers Nation
+    Player_Id               INT NULL,  -- Identité résolue (variantes de nom, profil Transfermarkt)
     UNIQUE (Player_Name_BK, BirthYear)
 );
 GO
 
 -----------------------------------
--- 1.5. DimNotes (Qualification/Relégation)
+-- DimNotes (Qualification/Relégation)
 -----------------------------------
 -- Source: silver.Notes_Mapping
 CREATE TABLE gold.DimNotes (
-    Notes_SK            INT IDENTITY(1,1) PRIMARY KEY,
-    
-    Notes_Standard_Name_BK VARCHAR(255) NOT NULL UNIQUE, -- Clé métier (Ex: 'Champions League')
-    Notes_Category      VARCHAR(50) NULL                -- Ex: 'Qualification', 'Relegation'
+    Notes_SK                INT IDENTITY(1,1) PRIMARY KEY,
+    Notes_Standard_Name_BK  VARCHAR(255) NOT NULL,  -- Clé métier (Ex: 'Champions League')
+    Notes_Category          VARCHAR(50) NULL,  -- Ex: 'Qualification Europe', 'Status Change (Relegated)'
+    UNIQUE (Notes_Standard_Name_BK)
 );
 GO
 
--- ***************************************************************** --
--- 2. DDL DES TABLES DE FAITS (FACTs)
--- ***************************************************************** --
-
 -----------------------------------
--- 2.1. FactTeamPerformance (Agrégé par Saison/Équipe)
+-- FactTeamPerformance (Agrégé par Saison/Équipe)
 -----------------------------------
 -- Grain: 1 ligne par Équipe et par Saison
--- Sources: silver.League_Table_Conformed (pour le classement), silver.Team_extra_details (pour les détails)
+-- Sources: silver.League_Table_Conformed (Type = Overall), silver.Team_extra_details
 CREATE TABLE gold.FactTeamPerformance (
-    -- Clés de Substitution (Foreign Keys)
-    Time_SK             INT NOT NULL REFERENCES gold.DimTime(Time_SK),
-    Team_SK             INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
-    Notes_SK            INT NOT NULL REFERENCES gold.DimNotes(Notes_SK), -- Qualification / Relégation
-    
-    -- Clé Primaire Composite
-    PRIMARY KEY (Time_SK, Team_SK), 
-
-    -- Mesures de League Table (Type = 'Overall')
-    Final_Rank          INT NULL,           -- Rk
-    MatchesPlayed       INT NULL,           -- MP
-    Wins                INT NULL,           -- W
-    Draws               INT NULL,           -- D
-    Losses              INT NULL,           -- L
-    GoalsFor            INT NULL,           -- GF
-    GoalsAgainst        INT NULL,           -- GA
-    GoalDifference      INT NULL,           -- GD
-    Points              INT NULL,           -- Pts
-    PointsPerMatch      DECIMAL(4,2) NULL,  -- Pts_per_MP
-
-    -- Mesures de Team Extra Details
-    Season_Attendance   INT NULL,
-    TopScorer_Goals     INT NULL,
-    
-    -- Attributs de pont (Pour identification directe sans FactPlayer ou pour un Top Buteur non mappé)
-    TopScorer_PlayerName VARCHAR(100) NULL,
-    Goalkeeper_PlayerName VARCHAR(100) NULL
+    Time_SK                 INT NOT NULL REFERENCES gold.DimTime(Time_SK),
+    Team_SK                 INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
+    Notes_SK                INT NOT NULL REFERENCES gold.DimNotes(Notes_SK),  -- Qualification / Relégation
+    Final_Rank              INT NULL,  -- Rk
+    MatchesPlayed           INT NULL,  -- MP
+    Wins                    INT NULL,  -- W
+    Draws                   INT NULL,  -- D
+    Losses                  INT NULL,  -- L
+    GoalsFor                INT NULL,  -- GF
+    GoalsAgainst            INT NULL,  -- GA
+    GoalDifference          INT NULL,  -- GD
+    Points                  INT NULL,  -- Pts
+    PointsPerMatch          DECIMAL(4,2) NULL,  -- Pts_per_MP
+    Season_Attendance       INT NULL,
+    TopScorer_Goals         INT NULL,
+    TopScorer_PlayerName    VARCHAR(100) NULL,  -- Attribut de pont (Top Buteur non mappé)
+    Goalkeeper_PlayerName   VARCHAR(100) NULL,
+    CONSTRAINT PK_FactTeamPerformance PRIMARY KEY (Time_SK, Team_SK)
 );
 GO
 
 -----------------------------------
--- 2.2. FactPlayerPerformance (Détaillé par Saison/Équipe/Joueur)
+-- FactPlayerPerformance (Détaillé par Saison/Équipe/Joueur)
 -----------------------------------
 -- Grain: 1 ligne par Joueur, par Équipe, par Saison
 -- Source: silver.Player_Stats_Conformed
 CREATE TABLE gold.FactPlayerPerformance (
-    -- Clés de Substitution (Foreign Keys)
-    Time_SK             INT NOT NULL REFERENCES gold.DimTime(Time_SK),
-    Team_SK             INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
-    Player_SK           INT NOT NULL REFERENCES gold.DimPlayer(Player_SK),
-    
-    -- Clé Primaire Composite
-    PRIMARY KEY (Time_SK, Team_SK, Player_SK), 
-    
-    -- Mesures de Performance
-    MatchesPlayed       INT NULL,
-    MinutesPlayed       INT NULL,
-    Goals               INT NULL,
-    Assists             INT NULL,
-    YellowCards         INT NULL,
-    RedCards            INT NULL,
-
-    Goals_Per_90        DECIMAL(5,2) NULL,
-    Assists_Per_90      DECIMAL(5,2) NULL,
-    
-    -- Mesures du Joueur
-    MarketValue_Euro_k  INT NULL
+    Time_SK                 INT NOT NULL REFERENCES gold.DimTime(Time_SK),
+    Team_SK                 INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
+    Player_SK               INT NOT NULL REFERENCES gold.DimPlayer(Player_SK),
+    MatchesPlayed           INT NULL,
+    MinutesPlayed           INT NULL,
+    Goals                   INT NULL,
+    Assists                 INT NULL,
+    YellowCards             INT NULL,
+    RedCards                INT NULL,
+    Goals_Per_90            DECIMAL(5,2) NULL,
+    Assists_Per_90          DECIMAL(5,2) NULL,
+    MarketValue_Euro_k      INT NULL,
+    CONSTRAINT PK_FactPlayerPerformance PRIMARY KEY (Time_SK, Team_SK, Player_SK)
 );
 GO
 
 -----------------------------------
--- 2.3. FactMatchEvent (Granulaire par Match)
+-- FactMatchEvent (Granulaire par Match)
 -----------------------------------
 -- Grain: 1 ligne par Match
--- Sources: silver.EPL_Match_History_Conformed (Stats primaires), silver.Match_Odds_Conformed (Cotes)
+-- Source: silver.Match_Reconciled (historique EPL_Match_History_Conformed et cotes Match_Odds_Conformed rapprochés)
 CREATE TABLE gold.FactMatchEvent (
-    -- Clés de Substitution (Foreign Keys)
-    Time_SK             INT NOT NULL REFERENCES gold.DimTime(Time_SK),
-    HomeTeam_SK         INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
-    AwayTeam_SK         INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
-    
-    -- Clé Primaire Composite (Clé de substitution du match si vous en aviez une, sinon clés naturelles)
-    PRIMARY KEY (Time_SK, HomeTeam_SK, AwayTeam_SK), 
-
-    -- Attributs de Date
-    MatchDate           DATE NOT NULL, -- Clé de la date exacte (pour la granularité journalière)
-
-    -- Mesures de Résultat (Priorité à EPL_Match_History_Conformed)
-    FullTimeHomeGoals   INT NULL,
-    FullTimeAwayGoals   INT NULL,
-    FullTimeResult      VARCHAR(5) NULL,
-    HalfTimeHomeGoals   INT NULL,
-    HalfTimeAwayGoals   INT NULL,
-    HalfTimeResult      VARCHAR(5) NULL,
-
-    -- Statistiques de Match (Priorité à EPL_Match_History_Conformed)
-    HomeShots           INT NULL,
-    AwayShots           INT NULL,
-    HomeShotsOnTarget   INT NULL,
-    AwayShotsOnTarget   INT NULL,
-    HomeFouls           INT NULL,
-    AwayFouls           INT NULL,
-    HomeCorners         INT NULL,
-    AwayCorners         INT NULL,
-    HomeYellowCards     INT NULL,
-    AwayYellowCards     INT NULL,
-    HomeRedCards        INT NULL,
-    AwayRedCards        INT NULL,
-
-    -- Cotes de Paris (Uniquement de Match_Odds_Conformed)
-    B365HomeOdds        DECIMAL(5,2) NULL,
-    B365DrawOdds        DECIMAL(5,2) NULL,
-    B365AwayOdds        DECIMAL(5,2) NULL
+    Time_SK                 INT NOT NULL REFERENCES gold.DimTime(Time_SK),
+    HomeTeam_SK             INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
+    AwayTeam_SK             INT NOT NULL REFERENCES gold.DimTeam(Team_SK),
+    Date_SK                 INT NOT NULL REFERENCES gold.DimDate(Date_SK),  -- Date du match (AAAAMMJJ)
+    MatchDate               DATE NOT NULL,  -- Date exacte (granularité journalière)
+    FullTimeHomeGoals       INT NULL,
+    FullTimeAwayGoals       INT NULL,
+    FullTimeResult          VARCHAR(5) NULL,
+    HalfTimeHomeGoals       INT NULL,
+    HalfTimeAwayGoals       INT NULL,
+    HalfTimeResult          VARCHAR(5) NULL,
+    HomeShots               INT NULL,
+    AwayShots               INT NULL,
+    HomeShotsOnTarget       INT NULL,
+    AwayShotsOnTarget       INT NULL,
+    HomeFouls               INT NULL,
+    AwayFouls               INT NULL,
+    HomeCorners             INT NULL,
+    AwayCorners             INT NULL,
+    HomeYellowCards         INT NULL,
+    AwayYellowCards         INT NULL,
+    HomeRedCards            INT NULL,
+    AwayRedCards            INT NULL,
+    B365HomeOdds            DECIMAL(5,2) NULL,
+    B365DrawOdds            DECIMAL(5,2) NULL,
+    B365AwayOdds            DECIMAL(5,2) NULL,
+    CONSTRAINT PK_FactMatchEvent PRIMARY KEY (Time_SK, HomeTeam_SK, AwayTeam_SK)
+);
+GO
+
+-----------------------------------
+-- Fact_Partition_State (Empreinte de chaque partition saison des faits)
+-----------------------------------
+-- Renseignée par utils.fact_partitions : seules les partitions dont l'empreinte change sont rechargées
+CREATE TABLE gold.Fact_Partition_State (
+    Fact_Table              VARCHAR(100) NOT NULL,  -- Ex: 'gold.FactMatchEvent'
+    Partition_Value         INT NOT NULL,  -- Time_SK de la saison
+    Partition_Hash          CHAR(32) NOT NULL,
+    Row_Count               INT NOT NULL,
+    Loaded_At               DATETIME NULL,
+    CONSTRAINT PK_Fact_Partition_State PRIMARY KEY (Fact_Table, Partition_Value)
 );
-GO
\ No newline at end of file
+GO
+
+-----------------------------------
+-- Agg_Team_Season_Venue (Agrégat de gold.FactMatchEvent)
+-----------------------------------
+-- Grain: Time_SK, Team_SK, Venue ; rafraîchi par saison par utils.aggregates
+CREATE TABLE gold.Agg_Team_Season_Venue (
+    Time_SK                 INT NOT NULL,
+    Team_SK                 INT NOT NULL,
+    Venue                   VARCHAR(4) NOT NULL,
+    Matches                 INT NULL,
+    Wins                    INT NULL,
+    Draws                   INT NULL,
+    Losses                  INT NULL,
+    GoalsFor                INT NULL,
+    GoalsAgainst            INT NULL,
+    Shots                   INT NULL,
+    ShotsOnTarget           INT NULL,
+    Corners                 INT NULL,
+    CONSTRAINT PK_Agg_Team_Season_Venue PRIMARY KEY (Time_SK, Team_SK, Venue)
+);
+GO
+
+-----------------------------------
+-- Agg_Squad_Season (Agrégat de gold.FactPlayerPerformance)
+-----------------------------------
+-- Grain: Time_SK, Team_SK ; rafraîchi par saison par utils.aggregates
+CREATE TABLE gold.Agg_Squad_Season (
+    Time_SK                 INT NOT NULL,
+    Team_SK                 INT NOT NULL,
+    Player_Rows             INT NULL,
+    Players                 INT NULL,
+    MatchesPlayed           INT NULL,
+    MinutesPlayed           INT NULL,
+    Goals                   INT NULL,
+    Assists                 INT NULL,
+    YellowCards             INT NULL,
+    RedCards                INT NULL,
+    MarketValue_Euro_k      INT NULL,
+    CONSTRAINT PK_Agg_Squad_Season PRIMARY KEY (Time_SK, Team_SK)
+);
+GO
+
+-----------------------------------
+-- Agg_Nation_Season (Agrégat de gold.FactPlayerPerformance)
+-----------------------------------
+-- Grain: Time_SK, Nation_SK ; rafraîchi par saison par utils.aggregates
+CREATE TABLE gold.Agg_Nation_Season (
+    Time_SK                 INT NOT NULL,
+    Nation_SK               INT NOT NULL,
+    Player_Rows             INT NULL,
+    Players                 INT NULL,
+    MinutesPlayed           INT NULL,
+    Goals                   INT NULL,
+    Assists                 INT NULL,
+    CONSTRAINT PK_Agg_Nation_Season PRIMARY KEY (Time_SK, Nation_SK)
+);
+GO
+
+-----------------------------------
+-- Aggregate_State (Définition de chaque agrégat matérialisé)
+-----------------------------------
+-- Une définition modifiée reconstruit l'agrégat entier au chargement suivant
+CREATE TABLE gold.Aggregate_State (
+    Aggregate_Name          VARCHAR(100) NOT NULL,
+    Definition_Hash         CHAR(32) NOT NULL,  -- Empreinte de la requête de l'agrégat
+    Refreshed_At            DATETIME NULL,
+    CONSTRAINT PK_Aggregate_State PRIMARY KEY (Aggregate_Name)
+);
+GO
+
+-----------------------------------
+-- Load_Version (Version de la couche gold, une ligne par chargement modifiant des données)
+-----------------------------------
+-- Renseignée par load/gold.Gold_Builder.py ; clé du cache de résultats de gold_query_service.py
+CREATE TABLE gold.Load_Version (
+    Load_Id                 INT IDENTITY(1,1) PRIMARY KEY,
+    Version_Token           CHAR(32) NOT NULL,  -- Jeton unique de la version
+    Changed_Partitions      INT NULL,  -- Partitions saison de faits remplacées ou supprimées
+    Changed_Members         INT NULL,  -- Membres de dimension ajoutés ou mis à jour
+    Loaded_At               DATETIME NULL
+);
+GO
@@ -1,12 +1,20 @@
 IF OBJECT_ID('silver.League_Table_Conformed','U') IS NOT NULL DROP TABLE silver.League_Table_Conformed;
 IF OBJECT_ID('silver.Team_Mapping','U') IS NOT NULL DROP TABLE silver.Team_Mapping;
+IF OBJECT_ID('silver.Mapping_Version','U') IS NOT NULL DROP TABLE silver.Mapping_Version;
+IF OBJECT_ID('silver.Mapping_Change_Log','U') IS NOT NULL DROP TABLE silver.Mapping_Change_Log;
+IF OBJECT_ID('silver.Stage_Watermark','U') IS NOT NULL DROP TABLE silver.Stage_Watermark;
+IF OBJECT_ID('silver.Stage_Input','U') IS NOT NULL DROP TABLE silver.Stage_Input;
 IF OBJECT_ID('silver.squad_stats_conformed','U') IS NOT NULL DROP TABLE silver.squad_stats_conformed;
 IF OBJECT_ID('silver.EPL_Match_History_Conformed','U') IS NOT NULL DROP TABLE silver.EPL_Match_History_Conformed;
 IF OBJECT_ID('silver.Nation_Mapping','U') IS NOT NULL DROP TABLE silver.Nation_Mapping;
 IF OBJECT_ID('silver.Player_Stats_Conformed','U') IS NOT NULL DROP TABLE silver.Player_Stats_Conformed;
 IF OBJECT_ID('silver.Team_extra_details','U') IS NOT NULL DROP TABLE silver.Team_extra_details;
+IF OBJECT_ID('silver.Team_Top_Scorers','U') IS NOT NULL DROP TABLE silver.Team_Top_Scorers;
 IF OBJECT_ID('silver.Notes_Mapping','U') IS NOT NULL DROP TABLE silver.Notes_Mapping;
 IF OBJECT_ID('silver.Match_Odds_Conformed','U') IS NOT NULL DROP TABLE silver.Match_Odds_Conformed;
+IF OBJECT_ID('silver.Match_Reconciled','U') IS NOT NULL DROP TABLE silver.Match_Reconciled;
+IF OBJECT_ID('silver.Match_Conflicts','U') IS NOT NULL DROP TABLE silver.Match_Conflicts;
+IF OBJECT_ID('silver.Player_Identity','U') IS NOT NULL DROP TABLE silver.Player_Identity;
 GO
 
 -- DDL de la table Silver consolidée pour les classements
@@ -23,12 +31,54 @@ CREATE TABLE silver.League_Table_Conformed (
     GA                  INT,
     GD                  INT,                  -- Converti de VARCHAR à INT
     Pts                 INT,
-    Pts_per_MP          DECIMAL(4,2)
+    Pts_per_MP          DECIMAL(4,2),
+    Row_Hash            CHAR(16) NULL,        -- Empreinte des attributs (voir utils/silver_sync.py)
+    PRIMARY KEY (Season, Squad_Conformed, Type)
 );
 
 CREATE TABLE silver.Team_Mapping (
     Team_Source_Name    VARCHAR(100) PRIMARY KEY, -- Le nom tel qu'il apparaît dans les fichiers JSON (ex: 'Man City')
-    Team_Standard_Name  VARCHAR(100) NOT NULL     -- Le nom standardisé pour le DW (ex: 'Manchester City')
+    Team_Standard_Name  VARCHAR(100) NOT NULL,    -- Le nom standardisé pour le DW (ex: 'Manchester City')
+    Match_Source        VARCHAR(10) NULL,         -- 'explicit' (Team_Mapping_loader) ou 'fuzzy' (utils.team_resolver)
+    Match_Score         DECIMAL(4,3) NULL         -- Score de la correspondance approchée
+);
+
+-- Version de chaque mapping de référence ('team', 'nation', 'notes'), changée par les loaders :
+-- invalide le cache des mappings (utils.reference_cache)
+CREATE TABLE silver.Mapping_Version (
+    Mapping_Name        VARCHAR(50) PRIMARY KEY,
+    Version             INT NOT NULL,
+    Version_Token       VARCHAR(32) NOT NULL,     -- Jeton unique de la version (comparé au cache)
+    Updated_At          DATETIME NULL
+);
+
+-- Journal des versions des mappings : résumé du différentiel appliqué par chaque chargement
+CREATE TABLE silver.Mapping_Change_Log (
+    Mapping_Name        VARCHAR(50) NOT NULL,
+    Version             INT NOT NULL,
+    Version_Token       VARCHAR(32) NOT NULL,
+    Inserted            INT NOT NULL,
+    Updated             INT NOT NULL,
+    Deleted             INT NOT NULL,
+    Changed_At          DATETIME NULL,
+    PRIMARY KEY (Mapping_Name, Version)
+);
+
+-- Empreinte des entrées (versions des mappings, fichiers bronze) du dernier chargement de chaque étape :
+-- une étape dont les entrées n'ont pas changé n'est pas reconstruite (utils.watermark)
+CREATE TABLE silver.Stage_Watermark (
+    Stage_Name          VARCHAR(100) PRIMARY KEY,
+    Input_Token         CHAR(64) NOT NULL,        -- SHA-256 des entrées
+    Updated_At          DATETIME NULL
+);
+
+-- Détail des entrées du dernier chargement d'une étape reconstruite par partition :
+-- seules les saisons des fichiers bronze nouveaux ou modifiés sont relues (utils.watermark)
+CREATE TABLE silver.Stage_Input (
+    Stage_Name          VARCHAR(100) NOT NULL,
+    Input_Name          VARCHAR(150) NOT NULL,    -- 'mapping:team' ou nom du fichier bronze
+    Input_Version       VARCHAR(64) NOT NULL,     -- version du mapping ou SHA-256 du fichier
+    PRIMARY KEY (Stage_Name, Input_Name)
 );
 
 CREATE TABLE silver.Match_Odds_Conformed (
@@ -69,7 +119,10 @@ CREATE TABLE silver.Match_Odds_Conformed (
     -- Cotes de Paris (Bet365 - Garder en FLOAT/DECIMAL)
     [B365HomeOdds]              DECIMAL(5,2) NULL,          -- B365H
     [B365DrawOdds]              DECIMAL(5,2) NULL,          -- B365D
-    [B365AwayOdds]              DECIMAL(5,2) NULL           -- B365A
+    [B365AwayOdds]              DECIMAL(5,2) NULL,          -- B365A
+
+    -- Empreinte des clés et attributs (rafraîchissement incrémental, voir utils/silver_sync.py)
+    [Row_Hash]                  CHAR(16) NULL
 );
 GO
 
@@ -173,7 +226,10 @@ CREATE TABLE silver.Player_Stats_Conformed (
     
     -- Valeur marchande (mesure candidate)
     [MarketValue_Euro_k]        INT,
-    [MarketValue_LastUpdate]    DATE
+    [MarketValue_LastUpdate]    DATE,
+
+    -- Empreinte des clés et attributs (rafraîchissement incrémental)
+    [Row_Hash]                  CHAR(16) NULL
 );
 GO
 
@@ -189,7 +245,26 @@ CREATE TABLE silver.Team_extra_details (
     [TopScorer_PlayerName]     VARCHAR(100) NULL,      -- Nom du joueur après extraction
     [TopScorer_Goals]          INT NULL,               -- Nombre de buts après extraction
     [Goalkeeper_PlayerName]    VARCHAR(100) NULL,      -- Nom du gardien
-    [Qualification_Notes]      VARCHAR(255) NULL       -- Remplacement de Notes
+    [Qualification_Notes]      VARCHAR(255) NULL,      -- Remplacement de Notes
+
+    -- Empreinte des clés et attributs (rafraîchissement incrémental)
+    [Row_Hash]                 CHAR(16) NULL
+);
+GO
+
+-- Table de liaison équipe / saison -> meilleur(s) buteur(s)
+-- (Top_Team_Scorer peut lister plusieurs joueurs à égalité : 'Sadio Mané,Mohamed Salah-22')
+CREATE TABLE silver.Team_Top_Scorers (
+    [Season]                   VARCHAR(10) NOT NULL,
+    [Squad_Conformed]          VARCHAR(100) NOT NULL,  -- Nom d'équipe standardisé via mapping
+    [Player_Name]              VARCHAR(100) NOT NULL,
+    [Scorer_Rank]              INT NOT NULL,           -- Position dans la liste source (1 = TopScorer_PlayerName)
+    [Goals]                    INT NULL,               -- Buts (partagés par les co-meilleurs buteurs)
+
+    -- Empreinte des clés et attributs (rafraîchissement incrémental)
+    [Row_Hash]                 CHAR(16) NULL,
+
+    PRIMARY KEY ([Season], [Squad_Conformed], [Player_Name])
 );
 GO
 
@@ -202,3 +277,66 @@ CREATE TABLE silver.Notes_Mapping (
     Notes_Standard_Name     VARCHAR(255) NOT NULL
 );
 GO
+
+-- Matchs rapprochés entre l'historique (EPL_Match_History_Conformed) et les cotes (Match_Odds_Conformed)
+-- (load/silver.Match_Reconciliation.py) : source unique de gold.FactMatchEvent
+CREATE TABLE silver.Match_Reconciled (
+    [Season]                    VARCHAR(10) NULL,
+    [MatchDate]                 DATE NOT NULL,               -- Date de l'historique (des cotes si match absent de l'historique)
+    [HomeTeam_Conformed]        VARCHAR(100) NOT NULL,
+    [AwayTeam_Conformed]        VARCHAR(100) NOT NULL,
+    [Match_Source]              VARCHAR(10) NOT NULL,        -- 'both', 'history' ou 'odds'
+    [Odds_MatchDate]            DATE NULL,
+    [Date_Offset_Days]          INT NULL,                    -- Écart de date cotes - historique (0 : clé exacte)
+
+    [FullTimeHomeGoals]         INT NULL,
+    [FullTimeAwayGoals]         INT NULL,
+    [HalfTimeHomeGoals]         INT NULL,
+    [HalfTimeAwayGoals]         INT NULL,
+    [HomeShots]                 INT NULL,
+    [AwayShots]                 INT NULL,
+    [HomeShotsOnTarget]         INT NULL,
+    [AwayShotsOnTarget]         INT NULL,
+    [HomeCorners]               INT NULL,
+    [AwayCorners]               INT NULL,
+    [HomeFouls]                 INT NULL,
+    [AwayFouls]                 INT NULL,
+    [HomeYellowCards]           INT NULL,
+    [AwayYellowCards]           INT NULL,
+    [HomeRedCards]              INT NULL,
+    [AwayRedCards]              INT NULL,
+    [FullTimeResult]            VARCHAR(5) NULL,
+    [HalfTimeResult]            VARCHAR(5) NULL,
+
+    [B365HomeOdds]              DECIMAL(5,2) NULL,
+    [B365DrawOdds]              DECIMAL(5,2) NULL,
+    [B365AwayOdds]              DECIMAL(5,2) NULL,
+
+    PRIMARY KEY ([MatchDate], [HomeTeam_Conformed], [AwayTeam_Conformed])
+);
+
+-- Valeurs divergentes entre les deux sources pour un même match
+CREATE TABLE silver.Match_Conflicts (
+    [Season]                    VARCHAR(10) NULL,
+    [MatchDate]                 DATE NOT NULL,
+    [HomeTeam_Conformed]        VARCHAR(100) NOT NULL,
+    [AwayTeam_Conformed]        VARCHAR(100) NOT NULL,
+    [Column_Name]               VARCHAR(50) NOT NULL,
+    [History_Value]             VARCHAR(20) NULL,
+    [Odds_Value]                VARCHAR(20) NULL
+);
+
+-- Identité résolue des joueurs (load/silver.Player_Identity_Resolver.py) : un identifiant stable
+-- relie les lignes FBref (nom, année de naissance) et les profils Transfermarkt d'un même joueur
+CREATE TABLE silver.Player_Identity (
+    [Source]                    VARCHAR(20) NOT NULL,  -- 'fbref' ou 'transfermarkt'
+    [Source_Key]                VARCHAR(255) NOT NULL, -- 'Player_Name|BirthYear' (FBref) ou profile_url (Transfermarkt)
+    [Player_Id]                 INT NOT NULL,
+    [Player_Name]               VARCHAR(100) NULL,
+    [BirthYear]                 INT NULL,
+    [Nation]                    VARCHAR(100) NULL,
+    [Match_Score]               DECIMAL(4,3) NULL,     -- Meilleur score de liaison au groupe (0 : joueur seul)
+    [Resolved_At]               DATETIME NULL,
+
+    PRIMARY KEY ([Source], [Source_Key])
+);